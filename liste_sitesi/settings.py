@@ -72,6 +72,8 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "liste_sitesi.wsgi.application"
+# API arama view'ları async; ASGI sunucusunda (uvicorn/daphne) çalışırken upstream beklemesi thread bloklamaz
+ASGI_APPLICATION = "liste_sitesi.asgi.application"
 
 
 # Database
@@ -121,6 +123,113 @@ SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 MANGADEX_API_URL = "https://api.mangadex.org"
 JIKAN_API_URL = "https://api.jikan.moe/v4"
 
+# Harici API'lar için ortak HTTP istemcisi (tracker/services/http_client.py)
+# Host başına keep-alive bağlantı havuzu; POOL_MAXSIZE eşzamanlı worker thread sayısı kadar olmalı.
+API_HTTP_CLIENT = {
+    "POOL_CONNECTIONS": 4,  # Önbellekte tutulacak host havuzu sayısı
+    "POOL_MAXSIZE": 10,     # Host başına en fazla açık bağlantı
+    "CONNECT_TIMEOUT": 5,   # Saniye
+    "READ_TIMEOUT": 15,     # Saniye
+    "MAX_RETRIES": 0,       # urllib3 seviyesinde bağlantı hatası tekrar denemesi
+}
+
+# Upstream başına token-bucket rate limit (tracker/services/rate_limiter.py)
+# RATE: saniyede eklenen token, CAPACITY: anlık en fazla istek (burst).
+# SHARED=True ise bütçe CACHE_ALIAS cache'i üzerinden süreçler arası paylaşılır (Redis/Memcached önerilir).
+API_RATE_LIMITS = {
+    "jikan": {"RATE": 1, "CAPACITY": 3, "SHARED": False},     # Jikan: saniyede 3, dakikada 60 istek
+    "mangadex": {"RATE": 5, "CAPACITY": 5, "SHARED": False},  # MangaDex: saniyede ~5 istek
+}
+
+# search_* / get_*_details yanıt önbelleği (tracker/services/response_cache.py)
+# BACKEND: "memory" (süreç içi LRU, MAX_BYTES limitli) veya "django" (CACHE_ALIAS ile paylaşılan cache)
+API_RESPONSE_CACHE = {
+    "BACKEND": "memory",
+    "CACHE_ALIAS": "default",
+    "SEARCH_TTL": 60 * 10,         # Arama sonuçları: 10 dakika
+    "DETAIL_TTL": 60 * 60 * 24,    # Detay sonuçları: 1 gün
+    "MAX_BYTES": 8 * 1024 * 1024,  # 8 MB
+    # Detaylarda stale-while-revalidate: DETAIL_TTL'i geçen kayıt MAX_STALENESS boyunca hemen sunulur,
+    # arka planda yenilenir. Ekleme sayfalarında ?refresh=1 ile zorla yenileme yapılabilir.
+    "STALE_WHILE_REVALIDATE": True,
+    "MAX_STALENESS": 60 * 60 * 24 * 7,  # 1 hafta
+}
+
+# Medya liste görünümlerinde sayfalama modu: "page" (sayfa numaraları, COUNT + OFFSET) veya
+# "cursor" (keyset sayfalama: sonraki/önceki token'ları, derin sayfalarda da sabit maliyet)
+LIST_PAGINATION_MODE = "page"
+
+# Liste aramasında kullanılan tam metin arama backend'i (tracker/services/fulltext_search.py)
+# "auto": SQLite'ta FTS5, PostgreSQL'de tsvector/GIN; "icontains": indekssiz yedek arama
+FULLTEXT_SEARCH_BACKEND = "auto"
+
+# Dashboard liste bölümleri için kullanıcı başına fragment cache (tracker/services/dashboard_cache.py)
+# Kullanıcının medya/favori kayıtlarına her yazma sürüm sayacını artırır, eski fragment'lar kullanılmaz.
+# Çok süreçli kurulumda CACHE_ALIAS paylaşılan bir cache (Redis/Memcached) olmalı.
+DASHBOARD_CACHE = {
+    "ENABLED": True,
+    "CACHE_ALIAS": "default",
+    "TIMEOUT": 60 * 15,  # 15 dakika
+}
+
+# Navbar favori rozeti: kullanıcı başına cache'lenmiş sayaç (tracker/services/favorite_counts.py).
+# Favori kümesinin sürümüyle anahtarlanır; favori ekleme/silmeden sonraki ilk okumada yeniden sayılır.
+FAVORITE_COUNT_CACHE = {
+    "ENABLED": True,
+    "CACHE_ALIAS": "default",
+    "TIMEOUT": 60 * 60 * 24,  # 1 gün
+}
+
+# Kullanıcı başına favori kümesi {tür: {pk, ...}} (tracker/services/favorite_index.py): liste/detay
+# sayfalarındaki favori işaretleri ve favoriler sayfası Favorite tablosuna gitmeden buradan okunur.
+FAVORITE_INDEX_CACHE = {
+    "ENABLED": True,
+    "CACHE_ALIAS": "default",
+    "TIMEOUT": 60 * 60 * 24,  # 1 gün; favori eklenip silinince sürüm değişir
+}
+
+# Liste sayfalarındaki etiket filtresi: kullanıcı ve tür başına sayılı etiket facet'leri
+# (tracker/services/tag_facets.py). Etiket/durum değişince ilgili sürüm artırılır.
+TAG_FACET_CACHE = {
+    "ENABLED": True,
+    "CACHE_ALIAS": "default",
+    "TIMEOUT": 60 * 60 * 6,  # 6 saat
+}
+
+# CSV dışa aktarımı StreamingHttpResponse ile akıtılır; veritabanından bu kadar satırlık parçalar
+# halinde okunur (etiketler her parça için tek sorguyla prefetch edilir). Bellek kullanımı parça boyutuyla sınırlıdır.
+EXPORT_CHUNK_SIZE = 1000
+
+# Toplu içe aktarım (tracker/services/importer.py): yükleme ve açılmış .gz boyut sınırları (bayt)
+LIBRARY_IMPORT = {
+    "MAX_UPLOAD_SIZE": 20 * 1024 * 1024,         # 20 MB
+    "MAX_DECOMPRESSED_SIZE": 100 * 1024 * 1024,  # 100 MB
+}
+
+# Arka plan iş kuyruğu (tracker/services/jobs.py): içe/dışa aktarım ve API bilgi yenileme işleri
+# `python manage.py run_jobs` worker'ında çalışır. Başarısız işler RETRY_BACKOFF * 2^n saniye sonra yeniden denenir.
+BACKGROUND_JOBS = {
+    "MAX_ATTEMPTS": 3,
+    "RETRY_BACKOFF": 30,        # saniye
+    "RETRY_BACKOFF_MAX": 60 * 60,
+    "STALE_AFTER": 60 * 30,     # Bu süredir "çalışıyor" görünen iş (worker çöktü) yeniden sıraya alınır
+    "KEEP_DAYS": 7,             # Biten işler ve dosyaları bu süre sonunda silinir
+}
+
+# mal_id / mangadex_id ile bağlı öğelerin API bilgisi yenileme (tracker/services/metadata_refresh.py)
+# Aynı başlık tüm kullanıcılar için bir kez çekilir; istekler API_RATE_LIMITS bucket'larıyla sınırlıdır.
+# Periyodik çalıştırma: cron ile `python manage.py refresh_metadata --older-than-days 30 [--enqueue]`
+METADATA_REFRESH = {
+    "CONCURRENCY": 4,    # Aynı anda beklenen API isteği
+    "BATCH_SIZE": 50,    # Parça başına başlık (çekme + bulk_update)
+    "MAX_AGE_DAYS": 30,  # --older-than-days varsayılanı
+}
+
+# Yüklenen/üretilen dosyalar (arka plan işlerinin içe aktarım dosyaları ve ZIP dışa aktarımları).
+# Worker ayrı bir sunucuda çalışıyorsa paylaşılan bir storage (örn: S3) kullanılmalı.
+MEDIA_URL = "media/"
+MEDIA_ROOT = BASE_DIR / "media"
+
 # --- YENİ: Debug Toolbar Ayarları ---
 # DEBUG True ise ve bu IP'lerden birinden istek gelirse Toolbar görünür.
 INTERNAL_IPS = [
@@ -7,7 +7,7 @@ from django.contrib import admin
 # from django.contrib.contenttypes.admin import GenericTabularInline
 
 # Modelleri import et
-from .models import Anime, Manga, Novel, Webtoon, Favorite
+from .models import Anime, Manga, Novel, Webtoon, Favorite, MediaStats, BackgroundJob
 
 # Ortak Admin Ayarları (Opsiyonel - Tekrarlanan ayarlar için)
 # class BaseMediaAdmin(admin.ModelAdmin):
@@ -80,4 +80,24 @@ class FavoriteAdmin(admin.ModelAdmin):
     # İlişkili objeleri (user, content_type) seçmek için raw_id_fields kullanışlı olabilir
     # özellikle çok fazla kullanıcı veya içerik türü varsa. Popup açarak seçimi sağlar.
     raw_id_fields = ('user',) # Sadece kullanıcı için raw_id kullanalım
-    # raw_id_fields = ('user', 'content_type',)
\ No newline at end of file
+    # raw_id_fields = ('user', 'content_type',)
+
+
+# --- MediaStats Modeli İçin Admin (Sinyallerle güncellenir, elle düzenlenmez) ---
+@admin.register(MediaStats)
+class MediaStatsAdmin(admin.ModelAdmin):
+    list_display = ('user', 'media_type', 'total_count', 'completed_count', 'rated_count', 'average_rating', 'updated_at')
+    list_filter = ('media_type',)
+    search_fields = ('user__username',)
+    list_per_page = 30
+    readonly_fields = ('updated_at',)
+
+
+# --- Arka Plan İşleri (tracker/services/jobs.py, manage.py run_jobs) ---
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'job_type', 'user', 'status', 'progress', 'attempts', 'run_after', 'created_at', 'finished_at')
+    list_filter = ('status', 'job_type')
+    search_fields = ('user__username', 'locked_by')
+    list_per_page = 30
+    readonly_fields = ('locked_by', 'locked_at', 'created_at', 'finished_at')
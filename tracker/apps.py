@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class TrackerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tracker'
+
+    def ready(self):
+        # Model sinyallerini bağla (MediaStats artımlı güncellemeleri, dashboard cache sürümleri)
+        from . import signals
+        signals.connect_signals()
+        # SQLite tablo yeniden oluşturma sonrası kaybolan FTS tetikleyicilerini onar
+        post_migrate.connect(_ensure_fulltext_triggers, sender=self, dispatch_uid="tracker_ensure_fts_triggers")
+
+
+def _ensure_fulltext_triggers(sender, using='default', **kwargs):
+    from .services import fulltext_search
+    fulltext_search.ensure_sqlite_triggers(using)
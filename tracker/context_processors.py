@@ -1,23 +1,25 @@
 # tracker/context_processors.py
 
-from .models import Favorite # Favorite modelini import et
+from django.utils.functional import SimpleLazyObject
+
+from .services import favorite_counts
+
 
 def favorites_processor(request):
     """
-    Giriş yapmış kullanıcı için toplam favori sayısını hesaplar
-    ve template context'ine 'favorite_count' olarak ekler.
+    Giriş yapmış kullanıcının toplam favori sayısını template context'ine 'favorite_count' olarak ekler.
+    Değer tembeldir (SimpleLazyObject): sadece şablon gerçekten okursa hesaplanır ve o da
+    kullanıcı başına cache'lenmiş sayaçtan gelir (services/favorite_counts.py); rozet göstermeyen
+    sayfalarda hiç sorgu yapılmaz.
     """
-    favorite_count = 0
-    # Sadece giriş yapmış kullanıcılar için sayıyı hesapla
-    if request.user.is_authenticated:
+    def _favorite_count():
+        # Sadece giriş yapmış kullanıcılar için sayıyı hesapla
+        if not request.user.is_authenticated:
+            return 0
         try:
-            # Kullanıcının favori sayısını veritabanından al
-            favorite_count = Favorite.objects.filter(user=request.user).count()
-        except Exception as e:
-            # Olası bir hata durumunda loglama yapılabilir
-            # import logging
-            # logger = logging.getLogger(__name__)
-            # logger.error(f"Favori sayısı alınırken hata oluştu: Kullanıcı={request.user.id}, Hata={e}")
-            pass # Hata olsa bile 0 olarak devam et
-    # Sözlüğü döndür (her zaman, kullanıcı giriş yapmamışsa count=0 olur)
-    return {'favorite_count': favorite_count}
\ No newline at end of file
+            return favorite_counts.get_favorite_count(request.user.pk)
+        except Exception:
+            # Olası bir hata durumunda sayfa yine render edilsin; 0 olarak devam et
+            return 0
+
+    return {'favorite_count': SimpleLazyObject(_favorite_count)}
@@ -376,4 +376,42 @@ class NovelForm(MediaItemBaseForm):
             )
         if errors:
             raise ValidationError(errors)
-        return cleaned_data
\ No newline at end of file
+        return cleaned_data
+
+# --- Toplu İçe Aktarım Formu ---
+class ImportForm(forms.Form):
+    """Kendi dışa aktarımlarımız (CSV / JSON Lines), MAL XML (.xml / .xml.gz) veya MangaDex JSON listesi."""
+    MEDIA_TYPE_CHOICES = [
+        ("anime", "Anime"),
+        ("webtoon", "Webtoon"),
+        ("manga", "Manga"),
+        ("novel", "Novel"),
+    ]
+    media_type = forms.ChoiceField(
+        choices=MEDIA_TYPE_CHOICES,
+        widget=forms.Select(attrs={"class": "form-select mb-2"}),
+        label="Medya Türü",
+    )
+    file = forms.FileField(
+        widget=forms.ClearableFileInput(
+            attrs={"class": "form-control mb-2", "accept": ".csv,.json,.jsonl,.ndjson,.xml,.gz"}
+        ),
+        label="Dosya",
+        help_text="CSV, JSON Lines, MyAnimeList XML (.xml / .xml.gz) veya MangaDex JSON.",
+    )
+    run_in_background = forms.BooleanField(
+        required=False,
+        widget=forms.CheckboxInput(attrs={"class": "form-check-input ms-2"}),
+        label="Arka planda çalıştır",
+        help_text="Büyük listeler için: dosya sıraya alınır, ilerleme Arka Plan İşleri sayfasında izlenir.",
+    )
+
+    def clean_file(self):
+        upload = self.cleaned_data["file"]
+        from .services.importer import get_import_settings # Döngüsel import'u önlemek için burada (importer formları kullanır)
+        max_size = get_import_settings()["MAX_UPLOAD_SIZE"]
+        if upload.size > max_size:
+            raise ValidationError(
+                f"Dosya çok büyük (en fazla {max_size // (1024 * 1024)} MB).", code="file_too_large"
+            )
+        return upload
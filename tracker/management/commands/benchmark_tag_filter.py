@@ -0,0 +1,133 @@
+# tracker/management/commands/benchmark_tag_filter.py
+# Çoklu etiket filtresinin (apply_tag_filter: ilişkili EXISTS alt sorguları) süresini
+# zincirleme tags__slug join'leriyle karşılaştırır. Geçici kullanıcılar, öğeler ve etiketler oluşturulur,
+# ölçümden sonra geri alınır. Sonuç kümelerinin aynı olduğu da doğrulanır.
+# --other-users: aynı etiketleri kullanan başka kullanıcılar da eklenir; filtre maliyeti ölçülen kullanıcının
+# öğe sayısıyla sınırlı kalmalı, sitedeki toplam etiket ilişkisi sayısıyla büyümemeli.
+# Kullanım: python manage.py benchmark_tag_filter [--model anime] [--items 5000] [--other-users 0] [--tags 40] [--repeat 10]
+
+import time
+import random
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from taggit.models import Tag, TaggedItem
+
+from tracker.models import Anime, Manga, Novel, Webtoon, MediaItem
+from tracker.views.helpers import apply_tag_filter
+
+TAG_FILTER_MODELS = {'anime': Anime, 'webtoon': Webtoon, 'manga': Manga, 'novel': Novel}
+
+
+class _Rollback(Exception):
+    """Geçici veriyi geri almak için atomic bloğu bilerek bozar."""
+
+
+class Command(BaseCommand):
+    help = "Çoklu etiket filtresini (EXISTS) zincirleme join'lerle karşılaştırır (geçici veriyle)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=sorted(TAG_FILTER_MODELS), default='anime', help="Ölçülecek medya türü.")
+        parser.add_argument('--items', type=int, default=5000, help="Geçici kullanıcı başına eklenecek öğe sayısı.")
+        parser.add_argument('--other-users', type=int, default=0, help="Aynı etiketleri kullanan ek kullanıcı sayısı.")
+        parser.add_argument('--tags', type=int, default=40, help="Etiket havuzu büyüklüğü.")
+        parser.add_argument('--repeat', type=int, default=10, help="Süre ölçümü için tekrar sayısı.")
+        parser.add_argument('--page-size', type=int, default=15, help="Sayfa boyutu (LIMIT).")
+
+    def handle(self, *args, **options):
+        model = TAG_FILTER_MODELS[options['model']]
+        self.stdout.write(f"Veritabanı: {connection.vendor}")
+        try:
+            with transaction.atomic():
+                user, slugs = self._seed(
+                    model, max(options['items'], 1), max(options['tags'], 3), 1 + max(options['other_users'], 0),
+                )
+                self._run(model, user, slugs, options)
+                raise _Rollback()
+        except _Rollback:
+            self.stdout.write(self.style.WARNING("Geçici veriler geri alındı."))
+
+    def _seed(self, model, item_count, tag_count, user_count):
+        """
+        Geçici kullanıcılar (ilki ölçülür), kullanıcı başına item_count öğe ve öğe başına 0-5 etiket;
+        popüler etiketler daha sık seçilir. Tüm kullanıcılar aynı etiket havuzunu kullanır.
+        """
+        stamp = time.time_ns()
+        get_user_model().objects.bulk_create([
+            get_user_model()(username=f"tagbench_{stamp}_{n}") for n in range(user_count)
+        ])
+        users = list(get_user_model().objects.filter(username__startswith=f"tagbench_{stamp}_").order_by('pk'))
+        rng = random.Random(42)
+        statuses = [value for value, _ in MediaItem.STATUS_CHOICES]
+        now = timezone.now()
+        # bulk_create sinyal göndermez; geçici veri olduğu için MediaStats/facet'ler güncellenmez
+        model.objects.bulk_create([
+            model(
+                user=user, title=f"{model.__name__} {i:06d}", status=rng.choice(statuses),
+                added_date=now - datetime.timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+            ) for user in users for i in range(item_count)
+        ], batch_size=1000)
+        items = list(model.objects.filter(user__in=users).only('pk')) # Bazı veritabanları bulk_create'te pk döndürmez
+        slugs = [f"tagbench-{stamp}-{i}" for i in range(tag_count)]
+        Tag.objects.bulk_create([Tag(name=slug, slug=slug) for slug in slugs])
+        tag_ids = list(Tag.objects.filter(slug__in=slugs).order_by('slug').values_list('pk', flat=True))
+        weights = [1 / (rank + 1) for rank in range(len(tag_ids))]
+        content_type = ContentType.objects.get_for_model(model)
+        tagged = []
+        for item in items:
+            chosen = set(rng.choices(tag_ids, weights=weights, k=rng.randint(0, 5)))
+            tagged.extend(TaggedItem(content_type=content_type, object_id=item.pk, tag_id=tag_id) for tag_id in chosen)
+        TaggedItem.objects.bulk_create(tagged, batch_size=1000)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE") # Planlayıcı yeni veri istatistiklerini görsün
+        self.stdout.write(
+            f"{len(users)} kullanıcı, {len(items)} öğe, {len(slugs)} etiket, {len(tagged)} etiket ilişkisi eklendi "
+            f"(ölçülen kullanıcı: {item_count} öğe)."
+        )
+        return users[0], sorted(slugs, key=lambda slug: int(slug.rsplit('-', 1)[1]))
+
+    def _run(self, model, user, slugs, options):
+        base = model.objects.filter(user=user).order_by('-added_date')
+        # (açıklama, slug'lar): popüler + popüler, popüler + orta, üç etiket
+        patterns = [
+            ("2 popüler etiket", slugs[:2]),
+            ("popüler + seyrek", [slugs[0], slugs[len(slugs) // 2]]),
+            ("3 etiket", slugs[:3]),
+        ]
+        for description, tag_slugs in patterns:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n== {description} =="))
+            chained = base
+            for slug in tag_slugs:
+                chained = chained.filter(tags__slug=slug)
+            joined_any = base.filter(tags__slug__in=tag_slugs)
+            candidates = [
+                ("all", "zincirleme join ", chained),
+                ("all", "EXISTS (etiket) ", apply_tag_filter(base, model, tag_slugs, 'all')),
+                ("any", "join + DISTINCT ", joined_any.distinct()),
+                ("any", "EXISTS          ", apply_tag_filter(base, model, tag_slugs, 'any')),
+            ]
+            expected = {}
+            for mode, label, queryset in candidates:
+                ids = set(queryset.values_list('pk', flat=True))
+                if expected.setdefault(mode, ids) != ids:
+                    self.stdout.write(self.style.ERROR(f"   {mode} / {label.strip()}: sonuç kümesi farklı!"))
+                page_ms = self._time(lambda: list(queryset[:options['page_size']]), options['repeat'])
+                count_ms = self._time(queryset.count, options['repeat'])
+                self.stdout.write(
+                    f"  {mode:<3} {label}: {len(ids):>6} öğe | ilk sayfa {page_ms:7.2f} ms | COUNT {count_ms:7.2f} ms"
+                )
+            self.stdout.write(self.style.WARNING(
+                f"  (DISTINCT'siz join 'any' için {joined_any.count()} satır döndürür: çoğalmış satırlar)"
+            ))
+
+    def _time(self, func, repeat):
+        """Ortalama süre (ms)."""
+        repeat = max(repeat, 1)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) * 1000 / repeat
@@ -0,0 +1,109 @@
+# tracker/management/commands/explain_list_queries.py
+# Liste sayfası sorgularının (filtre + sıralama + ilk sayfa) sorgu planlarını ve sürelerini gösterir.
+# MediaItem.Meta.indexes'teki bileşik/kısmi indekslerin kullanıldığını doğrulamak için kullanılır.
+# SQLite ve PostgreSQL'de çalışır (QuerySet.explain()).
+# Kullanım: python manage.py explain_list_queries [--user KULLANICI_ADI] [--seed 5000] [--repeat 20] [--analyze]
+
+import time
+import random
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from tracker.models import Anime, Manga, Novel, Webtoon, MediaItem
+from tracker.views.helpers import apply_sorting
+
+MEDIA_MODELS = (Anime, Webtoon, Manga, Novel)
+
+# (açıklama, ek filtre, sıralama anahtarı) - _get_filtered_queryset + apply_sorting kalıpları
+LIST_QUERY_PATTERNS = [
+    ("Varsayılan (en yeni)", {}, "-added_date"),
+    ("Durum filtresi + en yeni", {"status": "Completed"}, "-added_date"),
+    ("Başlığa göre", {}, "title_asc"),
+    ("Puanlılar, puana göre", {"rating__isnull": False}, "rating_desc"),
+]
+
+
+class _Rollback(Exception):
+    """--seed verisini geri almak için atomic bloğu bilerek bozar."""
+
+
+class Command(BaseCommand):
+    help = "Medya liste sorgularının sorgu planlarını (EXPLAIN) ve ortalama sürelerini gösterir."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', dest='username', help="Sorgular bu kullanıcı için çalıştırılır (varsayılan: ilk kullanıcı).")
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help="Her model için bu kadar geçici öğe ekle (geçici kullanıcıyla, sonunda geri alınır).",
+        )
+        parser.add_argument('--repeat', type=int, default=20, help="Süre ölçümü için tekrar sayısı.")
+        parser.add_argument('--page-size', type=int, default=15, help="Sayfa boyutu (LIMIT).")
+        parser.add_argument('--analyze', action='store_true', help="PostgreSQL'de EXPLAIN ANALYZE kullan.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Veritabanı: {connection.vendor}")
+        if options['seed']:
+            try:
+                with transaction.atomic():
+                    user = self._seed(options['seed'])
+                    self._run(user, options)
+                    raise _Rollback()
+            except _Rollback:
+                self.stdout.write(self.style.WARNING("Geçici veriler geri alındı."))
+            return
+        self._run(self._get_user(options['username']), options)
+
+    def _get_user(self, username):
+        users = get_user_model().objects.order_by('pk')
+        user = users.filter(username=username).first() if username else users.first()
+        if user is None:
+            raise CommandError("Kullanıcı bulunamadı (--user verin veya --seed kullanın).")
+        return user
+
+    def _seed(self, count):
+        """Geçici kullanıcı ve her model için count öğe oluşturur, planlayıcı istatistiklerini günceller."""
+        user = get_user_model().objects.create(username=f"explain_{int(time.time())}")
+        statuses = [value for value, _ in MediaItem.STATUS_CHOICES]
+        now = timezone.now()
+        rng = random.Random(42)
+        for model in MEDIA_MODELS:
+            # bulk_create sinyal göndermez; geçici veri olduğu için MediaStats güncellenmez
+            model.objects.bulk_create([
+                model(
+                    user=user, title=f"{model.__name__} {i:06d}", status=rng.choice(statuses),
+                    rating=rng.choice([None, *range(11)]),
+                    added_date=now - datetime.timedelta(minutes=rng.randint(0, 60 * 24 * 365 * 3)),
+                ) for i in range(count)
+            ], batch_size=1000)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE") # Planlayıcı yeni indeks/veri istatistiklerini görsün
+        self.stdout.write(f"{count} x {len(MEDIA_MODELS)} geçici öğe eklendi (kullanıcı: {user.username}).")
+        return user
+
+    def _run(self, user, options):
+        explain_options = {'analyze': True} if options['analyze'] and connection.vendor == 'postgresql' else {}
+        for model in MEDIA_MODELS:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n== {model.__name__} (user={user.username}) =="))
+            for description, extra_filter, sort_by in LIST_QUERY_PATTERNS:
+                queryset = apply_sorting(model.objects.filter(user=user, **extra_filter), sort_by)[:options['page_size']]
+                plan = queryset.explain(**explain_options)
+                elapsed_ms = self._time_query(queryset, options['repeat'])
+                index_names = [index.name for index in model._meta.indexes if index.name in plan]
+                self.stdout.write(self.style.SQL_KEYWORD(f"-- {description} ({elapsed_ms:.2f} ms ortalama)"))
+                self.stdout.write(plan)
+                if index_names:
+                    self.stdout.write(self.style.SUCCESS(f"   Kullanılan indeks: {', '.join(index_names)}"))
+                else:
+                    self.stdout.write(self.style.WARNING("   Bileşik indeks kullanılmadı."))
+
+    def _time_query(self, queryset, repeat):
+        """Sorgunun ortalama çalışma süresini (ms) ölçer; her seferinde yeni queryset (cache yok)."""
+        repeat = max(repeat, 1)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            list(queryset.all())
+        return (time.perf_counter() - start) * 1000 / repeat
@@ -0,0 +1,58 @@
+# tracker/management/commands/export_library.py
+# Kullanıcı kütüphanelerini (dört medya türü + favoriler + etiketler) kullanıcı başına bir ZIP olarak diske yazar.
+# /export/library/ view'ı ile aynı akış üreticisini kullanır; her dosya parça parça yazılır, bellek kullanımı sabittir.
+# Kullanım: python manage.py export_library --output-dir /yedek [--user KULLANICI_ADI ...] [--format csv|jsonl|parquet]
+
+import os
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tracker.services import export_formats
+from tracker.views.export_views import library_export_chunks
+
+
+class Command(BaseCommand):
+    help = "Kullanıcı kütüphanelerini kullanıcı başına bir ZIP dosyası olarak dışa aktarır (yedekleme için)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', required=True, help="ZIP dosyalarının yazılacağı dizin.")
+        parser.add_argument(
+            '--user', action='append', dest='usernames', default=[],
+            help="Sadece bu kullanıcı(lar) (birden fazla kez verilebilir; varsayılan: tüm kullanıcılar).",
+        )
+        parser.add_argument('--format', dest='export_format', default=export_formats.DEFAULT_FORMAT,
+                            help="Arşiv içindeki dosyaların biçimi: csv, jsonl veya parquet.")
+
+    def handle(self, *args, **options):
+        export_format = options['export_format']
+        try:
+            export_formats.validate(export_format)
+        except export_formats.ExportFormatError as e:
+            raise CommandError(str(e))
+
+        users = get_user_model().objects.order_by('pk')
+        usernames = options['usernames']
+        if usernames:
+            users = users.filter(username__in=usernames)
+            missing = set(usernames) - set(users.values_list('username', flat=True))
+            if missing:
+                raise CommandError(f"Kullanıcı bulunamadı: {', '.join(sorted(missing))}")
+
+        output_dir = options['output_dir']
+        os.makedirs(output_dir, exist_ok=True)
+        timestamp = timezone.localtime(timezone.now()).strftime("%Y%m%d_%H%M")
+        exported = 0
+        for user in users.iterator():
+            path = os.path.join(output_dir, f"{user.username}_kutuphane_{export_format}_{timestamp}.zip")
+            start = time.perf_counter()
+            size = 0
+            with open(path, 'wb') as output:
+                for chunk in library_export_chunks(user, export_format):
+                    output.write(chunk)
+                    size += len(chunk)
+            exported += 1
+            self.stdout.write(f"{user.username}: {path} ({size / 1024:.1f} KB, {time.perf_counter() - start:.2f} sn)")
+        self.stdout.write(self.style.SUCCESS(f"{exported} kullanıcının kütüphanesi dışa aktarıldı."))
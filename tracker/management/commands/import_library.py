@@ -0,0 +1,47 @@
+# tracker/management/commands/import_library.py
+# Bir kullanıcının listesine dosyadan toplu içe aktarım (/import/ view'ı ile aynı servis: tracker/services/importer.py).
+# Desteklenen dosyalar: kendi CSV / JSON Lines dışa aktarımlarımız, MyAnimeList XML (.xml / .xml.gz), MangaDex JSON.
+# Kullanım: python manage.py import_library --user KULLANICI_ADI --type anime dosya.xml [--batch-size 500]
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.services import importer
+
+
+class Command(BaseCommand):
+    help = "Bir dosyadaki listeyi (CSV, JSON Lines, MAL XML, MangaDex JSON) kullanıcının kütüphanesine toplu ekler."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="İçe aktarılacak dosya.")
+        parser.add_argument('--user', dest='username', required=True, help="Öğelerin ekleneceği kullanıcı.")
+        parser.add_argument('--type', dest='media_type', required=True, choices=sorted(importer.IMPORT_TARGETS),
+                            help="Medya türü.")
+        parser.add_argument('--batch-size', type=int, default=importer.DEFAULT_BATCH_SIZE,
+                            help="Tek bulk insert'teki öğe sayısı.")
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['username'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"Kullanıcı bulunamadı: {options['username']}")
+        try:
+            with open(options['path'], 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            raise CommandError(f"Dosya okunamadı: {e}")
+
+        start = time.perf_counter()
+        try:
+            result = importer.import_file(user, options['media_type'], data, options['path'],
+                                          batch_size=max(options['batch_size'], 1))
+        except importer.ImportFormatError as e:
+            raise CommandError(str(e))
+        for row_number, message in result.errors:
+            self.stdout.write(self.style.WARNING(f"Satır {row_number}: {message}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"{result.created} eklendi, {result.skipped} atlandı, {result.invalid} geçersiz, "
+            f"{result.tags_created} yeni etiket ({time.perf_counter() - start:.2f} sn)."
+        ))
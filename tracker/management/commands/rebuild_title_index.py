@@ -0,0 +1,31 @@
+# tracker/management/commands/rebuild_title_index.py
+# Fuzzy başlık araması için trigram indeksini (TitleTrigram) medya öğelerinden yeniden oluşturur.
+# Kullanım: python manage.py rebuild_title_index [--user KULLANICI_ADI ...]
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.services import fuzzy_search
+
+
+class Command(BaseCommand):
+    help = "TitleTrigram tablosunu medya başlıklarından yeniden oluşturur (toplu işlemlerden veya normalizasyon değişikliğinden sonra)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', action='append', dest='usernames', default=[],
+            help="Sadece bu kullanıcı(lar) için yeniden oluştur (birden fazla kez verilebilir).",
+        )
+
+    def handle(self, *args, **options):
+        user_ids = None
+        usernames = options['usernames']
+        if usernames:
+            users = dict(get_user_model().objects.filter(username__in=usernames).values_list('username', 'id'))
+            missing = set(usernames) - set(users)
+            if missing:
+                raise CommandError(f"Kullanıcı bulunamadı: {', '.join(sorted(missing))}")
+            user_ids = list(users.values())
+
+        row_count = fuzzy_search.rebuild_index(user_ids=user_ids)
+        self.stdout.write(self.style.SUCCESS(f"Başlık trigram indeksi yeniden oluşturuldu ({row_count} satır)."))
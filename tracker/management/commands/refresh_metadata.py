@@ -0,0 +1,56 @@
+# tracker/management/commands/refresh_metadata.py
+# mal_id / mangadex_id ile API kaydına bağlı öğelerin toplam bölüm/cilt ve kapak bilgisini yeniler
+# (tracker/services/metadata_refresh.py). Aynı başlık tüm kullanıcılar için tek istekle alınır.
+# Kullanım: python manage.py refresh_metadata [--type anime ...] [--older-than-days 30 | --all] [--limit N]
+#           [--concurrency 4] [--enqueue]
+#   --enqueue: işi arka plan kuyruğuna ekler (run_jobs worker'ı çalıştırır), komut hemen döner.
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.services import jobs, metadata_refresh
+
+
+class Command(BaseCommand):
+    help = "API'ye bağlı öğelerin (mal_id / mangadex_id) toplam bölüm/cilt ve kapak bilgisini toplu yeniler."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--type', action='append', dest='media_types', choices=sorted(metadata_refresh.REFRESH_TARGETS),
+            help="Sadece bu tür(ler) (birden fazla kez verilebilir; varsayılan: hepsi).",
+        )
+        parser.add_argument('--older-than-days', type=int, default=None,
+                            help="Sadece hiç yenilenmemiş veya bu kadar günden eski öğeler (varsayılan: ayarlardaki MAX_AGE_DAYS).")
+        parser.add_argument('--all', action='store_true', help="Yaşına bakmadan tüm bağlı öğeleri yenile.")
+        parser.add_argument('--limit', type=int, default=None, help="En fazla bu kadar tekil başlık (API isteği).")
+        parser.add_argument('--concurrency', type=int, default=None, help="Aynı anda beklenen API isteği.")
+        parser.add_argument('--enqueue', action='store_true', help="Arka plan kuyruğuna ekle ve çık.")
+
+    def handle(self, *args, **options):
+        if options['all'] and options['older_than_days'] is not None:
+            raise CommandError("--all ve --older-than-days birlikte kullanılamaz.")
+        older_than_days = None if options['all'] else (
+            options['older_than_days'] if options['older_than_days'] is not None
+            else metadata_refresh.get_metadata_refresh_settings()['MAX_AGE_DAYS']
+        )
+
+        if options['enqueue']:
+            job = jobs.enqueue('refresh_all_metadata', payload={
+                'media_types': options['media_types'], 'older_than_days': older_than_days, 'limit': options['limit'],
+            })
+            self.stdout.write(self.style.SUCCESS(f"Bilgi yenileme işi kuyruğa eklendi (iş #{job.pk})."))
+            return
+
+        start = time.perf_counter()
+        def progress(done, total):
+            self.stdout.write(f"  {done}/{total} başlık işlendi")
+
+        result = metadata_refresh.refresh_metadata(
+            media_types=options['media_types'], older_than_days=older_than_days, limit=options['limit'],
+            concurrency=options['concurrency'], progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{result.titles} başlık ({result.items} öğe) yenilendi: {result.updated_items} öğe güncellendi, "
+            f"{result.failed_titles} başlık alınamadı ({time.perf_counter() - start:.1f} sn)."
+        ))
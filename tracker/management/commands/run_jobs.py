@@ -0,0 +1,51 @@
+# tracker/management/commands/run_jobs.py
+# Arka plan iş kuyruğu worker'ı (tracker/services/jobs.py). Birden fazla worker aynı anda çalışabilir;
+# işler koşullu UPDATE ile sahiplenildiği için aynı iş iki kez alınmaz.
+# Kullanım: python manage.py run_jobs [--once] [--max-jobs N] [--sleep 2] [--worker-id ad]
+#   --once : kuyruktaki işleri bitirip çıkar (cron / zamanlanmış görevler için)
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from tracker.services import jobs
+
+PURGE_INTERVAL = 60 * 60 # Biten eski işler en fazla saatte bir temizlenir
+
+
+class Command(BaseCommand):
+    help = "Arka plan işlerini (içe/dışa aktarım, API bilgi yenileme) kuyruktan alıp çalıştırır."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Kuyruk boşalınca çık.")
+        parser.add_argument('--max-jobs', type=int, default=None, help="Bu kadar iş çalıştırdıktan sonra çık.")
+        parser.add_argument('--sleep', type=float, default=None, help="Kuyruk boşken bekleme süresi (saniye).")
+        parser.add_argument('--worker-id', default=None, help="Worker adı (varsayılan: host:pid).")
+
+    def handle(self, *args, **options):
+        worker_id = options['worker_id'] or jobs.default_worker_id()
+        sleep = options['sleep'] if options['sleep'] is not None else jobs.get_jobs_settings()['POLL_INTERVAL']
+        max_jobs = options['max_jobs']
+        self.stdout.write(f"Worker başladı: {worker_id}")
+
+        processed = 0
+        last_purge = 0
+        try:
+            while max_jobs is None or processed < max_jobs:
+                close_old_connections() # Uzun süre açık kalan bağlantılar (DB yeniden başlatma vb.)
+                if time.monotonic() - last_purge > PURGE_INTERVAL:
+                    purged = jobs.purge_finished_jobs()
+                    if purged:
+                        self.stdout.write(f"{purged} eski iş silindi.")
+                    last_purge = time.monotonic()
+                remaining = None if max_jobs is None else max_jobs - processed
+                count = jobs.run_pending_jobs(worker_id=worker_id, max_jobs=remaining)
+                processed += count
+                if count == 0:
+                    if options['once']:
+                        break
+                    time.sleep(sleep)
+        except KeyboardInterrupt:
+            self.stdout.write("Worker durduruldu.")
+        self.stdout.write(self.style.SUCCESS(f"{processed} iş çalıştırıldı."))
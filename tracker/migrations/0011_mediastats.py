@@ -0,0 +1,70 @@
+# Generated by Django 5.2 on 2026-10-18 12:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import Coalesce
+
+# Durum değeri -> MediaStats sayaç alanı (models.MediaStats.STATUS_FIELDS ile aynı)
+STATUS_FIELDS = {
+    "Watching": "watching_count",
+    "Completed": "completed_count",
+    "On Hold": "on_hold_count",
+    "Dropped": "dropped_count",
+    "Plan to Watch": "plan_to_watch_count",
+}
+
+
+def backfill_media_stats(apps, schema_editor):
+    """Mevcut öğelerden istatistik satırlarını oluşturur (model başına tek GROUP BY sorgusu)."""
+    MediaStats = apps.get_model('tracker', 'MediaStats')
+    rows = []
+    for media_type in ('anime', 'webtoon', 'manga', 'novel'):
+        model = apps.get_model('tracker', media_type)
+        aggregates = {
+            'total_count': Count('id'),
+            'rated_count': Count('rating'),
+            'rating_sum': Coalesce(Sum('rating'), 0),
+            'latest_added': Max('added_date'),
+        }
+        for status, field in STATUS_FIELDS.items():
+            aggregates[field] = Count('id', filter=Q(status=status))
+        for row in model.objects.order_by().values('user_id').annotate(**aggregates):
+            rows.append(MediaStats(media_type=media_type, **row))
+    MediaStats.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0010_novel_mal_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('media_type', models.CharField(choices=[('anime', 'Anime'), ('webtoon', 'Webtoon'), ('manga', 'Manga'), ('novel', 'Novel')], max_length=10, verbose_name='Medya Türü')),
+                ('total_count', models.PositiveIntegerField(default=0, verbose_name='Toplam')),
+                ('watching_count', models.PositiveIntegerField(default=0, verbose_name='İzliyorum/Okuyorum')),
+                ('completed_count', models.PositiveIntegerField(default=0, verbose_name='Tamamladım')),
+                ('on_hold_count', models.PositiveIntegerField(default=0, verbose_name='Beklemede')),
+                ('dropped_count', models.PositiveIntegerField(default=0, verbose_name='Bıraktım')),
+                ('plan_to_watch_count', models.PositiveIntegerField(default=0, verbose_name='İzleyeceğim/Okuyacağım')),
+                ('rated_count', models.PositiveIntegerField(default=0, verbose_name='Puanlanan')),
+                ('rating_sum', models.PositiveIntegerField(default=0, verbose_name='Puan Toplamı')),
+                ('latest_added', models.DateTimeField(blank=True, null=True, verbose_name='Son Eklenme')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Güncellenme Zamanı')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='media_stats', to=settings.AUTH_USER_MODEL, verbose_name='Kullanıcı')),
+            ],
+            options={
+                'verbose_name': 'Medya İstatistiği',
+                'verbose_name_plural': 'Medya İstatistikleri',
+                'constraints': [models.UniqueConstraint(fields=('user', 'media_type'), name='unique_user_media_stats')],
+            },
+        ),
+        migrations.RunPython(backfill_media_stats, migrations.RunPython.noop),
+    ]
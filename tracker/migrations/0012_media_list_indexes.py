@@ -0,0 +1,80 @@
+# Generated by Django 5.2 on 2026-10-18 12:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+        ('tracker', '0011_mediastats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='anime',
+            index=models.Index(fields=['user', 'status', '-added_date'], name='anime_user_status_added'),
+        ),
+        migrations.AddIndex(
+            model_name='anime',
+            index=models.Index(fields=['user', '-added_date'], name='anime_user_added'),
+        ),
+        migrations.AddIndex(
+            model_name='anime',
+            index=models.Index(fields=['user', 'title'], name='anime_user_title'),
+        ),
+        migrations.AddIndex(
+            model_name='anime',
+            index=models.Index(condition=models.Q(('rating__isnull', False)), fields=['user', '-rating'], name='anime_user_rating_rated'),
+        ),
+        migrations.AddIndex(
+            model_name='manga',
+            index=models.Index(fields=['user', 'status', '-added_date'], name='manga_user_status_added'),
+        ),
+        migrations.AddIndex(
+            model_name='manga',
+            index=models.Index(fields=['user', '-added_date'], name='manga_user_added'),
+        ),
+        migrations.AddIndex(
+            model_name='manga',
+            index=models.Index(fields=['user', 'title'], name='manga_user_title'),
+        ),
+        migrations.AddIndex(
+            model_name='manga',
+            index=models.Index(condition=models.Q(('rating__isnull', False)), fields=['user', '-rating'], name='manga_user_rating_rated'),
+        ),
+        migrations.AddIndex(
+            model_name='novel',
+            index=models.Index(fields=['user', 'status', '-added_date'], name='novel_user_status_added'),
+        ),
+        migrations.AddIndex(
+            model_name='novel',
+            index=models.Index(fields=['user', '-added_date'], name='novel_user_added'),
+        ),
+        migrations.AddIndex(
+            model_name='novel',
+            index=models.Index(fields=['user', 'title'], name='novel_user_title'),
+        ),
+        migrations.AddIndex(
+            model_name='novel',
+            index=models.Index(condition=models.Q(('rating__isnull', False)), fields=['user', '-rating'], name='novel_user_rating_rated'),
+        ),
+        migrations.AddIndex(
+            model_name='webtoon',
+            index=models.Index(fields=['user', 'status', '-added_date'], name='webtoon_user_status_added'),
+        ),
+        migrations.AddIndex(
+            model_name='webtoon',
+            index=models.Index(fields=['user', '-added_date'], name='webtoon_user_added'),
+        ),
+        migrations.AddIndex(
+            model_name='webtoon',
+            index=models.Index(fields=['user', 'title'], name='webtoon_user_title'),
+        ),
+        migrations.AddIndex(
+            model_name='webtoon',
+            index=models.Index(condition=models.Q(('rating__isnull', False)), fields=['user', '-rating'], name='webtoon_user_rating_rated'),
+        ),
+    ]
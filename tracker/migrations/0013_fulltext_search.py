@@ -0,0 +1,104 @@
+# Tam metin arama tabloları/indeksleri (tracker/services/fulltext_search.py)
+# SQLite: FTS5 external-content sanal tabloları + senkronizasyon tetikleyicileri (FTS5 yoksa atlanır).
+# PostgreSQL: ağırlıklı tsvector ifadesi üzerinde GIN indeksi. Diğer veritabanlarında işlem yapılmaz.
+
+from django.db import migrations
+
+# Tablo -> ağırlık grubuna göre alanlar (A: başlık, B: kişiler/stüdyo/platform, C: notlar)
+# Bu migration anındaki dondurulmuş kopya; servis modülündeki SEARCH_FIELDS ile aynı.
+SEARCH_TABLES = {
+    'tracker_anime': {'A': ['title'], 'B': ['studio'], 'C': ['notes']},
+    'tracker_webtoon': {'A': ['title'], 'B': ['author', 'artist', 'platform'], 'C': ['notes']},
+    'tracker_manga': {'A': ['title'], 'B': ['author', 'artist'], 'C': ['notes']},
+    'tracker_novel': {'A': ['title'], 'B': ['author'], 'C': ['notes']},
+}
+WEIGHT_GROUPS = ('A', 'B', 'C')
+
+
+def _fields(groups):
+    return [field for group in WEIGHT_GROUPS for field in groups.get(group, [])]
+
+
+def _sqlite_statements(table, groups):
+    fts = f"{table}_fts"
+    fields = _fields(groups)
+    columns = ", ".join(f'"{f}"' for f in fields)
+    new_values = ", ".join(f'new."{f}"' for f in fields)
+    old_values = ", ".join(f'old."{f}"' for f in fields)
+    return [
+        # remove_diacritics 2: "cok" -> "Çok" eşleşir; prefix: 2-3 harflik prefix aramaları için ek indeks
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS "{fts}" USING fts5({columns}, content='{table}', content_rowid='id', """
+        f"""tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+        f"""CREATE TRIGGER IF NOT EXISTS "{fts}_ai" AFTER INSERT ON "{table}" BEGIN
+            INSERT INTO "{fts}"(rowid, {columns}) VALUES (new."id", {new_values});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS "{fts}_ad" AFTER DELETE ON "{table}" BEGIN
+            INSERT INTO "{fts}"("{fts}", rowid, {columns}) VALUES ('delete', old."id", {old_values});
+        END""",
+        # Sadece aranan alanlar değiştiğinde indeksi güncelle (durum/ilerleme güncellemeleri FTS'e dokunmaz)
+        f"""CREATE TRIGGER IF NOT EXISTS "{fts}_au" AFTER UPDATE OF {columns} ON "{table}" BEGIN
+            INSERT INTO "{fts}"("{fts}", rowid, {columns}) VALUES ('delete', old."id", {old_values});
+            INSERT INTO "{fts}"(rowid, {columns}) VALUES (new."id", {new_values});
+        END""",
+        # Mevcut kayıtları indeksle
+        f"""INSERT INTO "{fts}"("{fts}") VALUES ('rebuild')""",
+    ]
+
+
+def _pg_vector(groups):
+    parts = []
+    for group in WEIGHT_GROUPS:
+        fields = groups.get(group)
+        if not fields:
+            continue
+        text = " || ' ' || ".join(f"coalesce(\"{field}\", '')" for field in fields)
+        parts.append(f"setweight(to_tsvector('simple', {text}), '{group}')")
+    return " || ".join(parts)
+
+
+def _sqlite_has_fts5(cursor):
+    try:
+        cursor.execute("CREATE VIRTUAL TABLE temp.tracker_fts5_probe USING fts5(x)")
+        cursor.execute("DROP TABLE temp.tracker_fts5_probe")
+        return True
+    except Exception:
+        return False
+
+
+def create_fulltext_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            if not _sqlite_has_fts5(cursor):
+                return # FTS5 derlenmemiş: arama icontains backend'ine düşer
+            for table, groups in SEARCH_TABLES.items():
+                for statement in _sqlite_statements(table, groups):
+                    cursor.execute(statement)
+        elif connection.vendor == 'postgresql':
+            for table, groups in SEARCH_TABLES.items():
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{table}_fts_gin" ON "{table}" USING GIN (({_pg_vector(groups)}))'
+                )
+
+
+def drop_fulltext_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        for table in SEARCH_TABLES:
+            if connection.vendor == 'sqlite':
+                for suffix in ('ai', 'ad', 'au'):
+                    cursor.execute(f'DROP TRIGGER IF EXISTS "{table}_fts_{suffix}"')
+                cursor.execute(f'DROP TABLE IF EXISTS "{table}_fts"')
+            elif connection.vendor == 'postgresql':
+                cursor.execute(f'DROP INDEX IF EXISTS "{table}_fts_gin"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0012_media_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_indexes, drop_fulltext_indexes),
+    ]
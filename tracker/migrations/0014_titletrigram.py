@@ -0,0 +1,73 @@
+# Generated by Django 5.2 on 2026-10-18 12:29
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Başlık normalizasyonu ve trigram üretimi (tracker/services/fuzzy_search.py ile aynı, migration anındaki kopya)
+_FOLD_MAP = str.maketrans({
+    'I': 'i', 'İ': 'i', 'ı': 'i',
+    'ø': 'o', 'Ø': 'o', 'đ': 'd', 'Đ': 'd', 'ł': 'l', 'Ł': 'l',
+    'æ': 'ae', 'Æ': 'ae', 'œ': 'oe', 'Œ': 'oe',
+})
+_NON_WORD_RE = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def _title_trigrams(text):
+    text = (text or '')[:200].translate(_FOLD_MAP).casefold()
+    text = ''.join(ch for ch in unicodedata.normalize('NFKD', text) if not unicodedata.combining(ch))
+    trigrams = set()
+    for word in _NON_WORD_RE.sub(' ', text).split():
+        padded = f"  {word} "
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def backfill_title_trigrams(apps, schema_editor):
+    """Mevcut öğelerin başlık trigram'larını oluşturur."""
+    TitleTrigram = apps.get_model('tracker', 'TitleTrigram')
+    batch = []
+    for media_type in ('anime', 'webtoon', 'manga', 'novel'):
+        model = apps.get_model('tracker', media_type)
+        for pk, user_id, title in model.objects.order_by().values_list('pk', 'user_id', 'title').iterator():
+            trigrams = _title_trigrams(title)
+            batch.extend(
+                TitleTrigram(user_id=user_id, media_type=media_type, object_id=pk, trigram=trigram, trigram_count=len(trigrams))
+                for trigram in trigrams
+            )
+            if len(batch) >= 2000:
+                TitleTrigram.objects.bulk_create(batch)
+                batch = []
+    if batch:
+        TitleTrigram.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0013_fulltext_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('media_type', models.CharField(choices=[('anime', 'Anime'), ('webtoon', 'Webtoon'), ('manga', 'Manga'), ('novel', 'Novel')], max_length=10, verbose_name='Medya Türü')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Obje ID')),
+                ('trigram', models.CharField(max_length=3, verbose_name='Trigram')),
+                ('trigram_count', models.PositiveSmallIntegerField(verbose_name='Trigram Sayısı')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='title_trigrams', to=settings.AUTH_USER_MODEL, verbose_name='Kullanıcı')),
+            ],
+            options={
+                'verbose_name': "Başlık Trigram'ı",
+                'verbose_name_plural': "Başlık Trigram'ları",
+                'indexes': [models.Index(fields=['user', 'trigram', 'media_type', 'object_id', 'trigram_count'], name='titletrigram_lookup'), models.Index(fields=['media_type', 'object_id'], name='titletrigram_object')],
+            },
+        ),
+        migrations.RunPython(backfill_title_trigrams, migrations.RunPython.noop),
+    ]
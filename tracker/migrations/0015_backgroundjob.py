@@ -0,0 +1,44 @@
+# Generated by Django 5.2 on 2026-10-18 12:49
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0014_titletrigram'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackgroundJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_type', models.CharField(max_length=50, verbose_name='İş Türü')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Parametreler')),
+                ('status', models.CharField(choices=[('queued', 'Sırada'), ('running', 'Çalışıyor'), ('succeeded', 'Tamamlandı'), ('failed', 'Başarısız')], default='queued', max_length=10, verbose_name='Durum')),
+                ('progress', models.PositiveSmallIntegerField(default=0, verbose_name='İlerleme (%)')),
+                ('progress_message', models.CharField(blank=True, max_length=255, verbose_name='İlerleme Mesajı')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='Sonuç')),
+                ('error', models.TextField(blank=True, verbose_name='Hata')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Deneme Sayısı')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3, verbose_name='En Fazla Deneme')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='En Erken Çalışma Zamanı')),
+                ('locked_by', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Alınma Zamanı')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Zamanı')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Bitiş Zamanı')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='background_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Kullanıcı')),
+            ],
+            options={
+                'verbose_name': 'Arka Plan İşi',
+                'verbose_name_plural': 'Arka Plan İşleri',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='backgroundjob_queue'), models.Index(fields=['user', '-created_at'], name='backgroundjob_user')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-18 12:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0015_backgroundjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='anime',
+            name='metadata_refreshed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='API Bilgisi Güncellenme Zamanı'),
+        ),
+        migrations.AddField(
+            model_name='manga',
+            name='metadata_refreshed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='API Bilgisi Güncellenme Zamanı'),
+        ),
+        migrations.AddField(
+            model_name='novel',
+            name='metadata_refreshed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='API Bilgisi Güncellenme Zamanı'),
+        ),
+        migrations.AddField(
+            model_name='webtoon',
+            name='metadata_refreshed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='API Bilgisi Güncellenme Zamanı'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-18 13:01
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def delete_orphan_favorites(apps, schema_editor):
+    """
+    Öğesi silinmiş favori kayıtlarını temizler. Bu migration'dan önce GenericForeignKey cascade
+    yapmadığı için öğe silinince favorisi kalıyordu; artık MediaItem.favorites (GenericRelation) siler.
+    """
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Favorite = apps.get_model('tracker', 'Favorite')
+    for media_type in ('anime', 'webtoon', 'manga', 'novel'):
+        model = apps.get_model('tracker', media_type)
+        content_type = ContentType.objects.filter(app_label='tracker', model=media_type).first()
+        if content_type is None: # Yeni kurulum: henüz favori yok
+            continue
+        Favorite.objects.filter(content_type=content_type).exclude(
+            Exists(model.objects.filter(pk=OuterRef('object_id')))
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('tracker', '0016_mediaitem_metadata_refreshed_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='favorite',
+            index=models.Index(fields=['content_type', 'object_id'], name='favorite_object'),
+        ),
+        migrations.RunPython(delete_orphan_favorites, migrations.RunPython.noop),
+    ]
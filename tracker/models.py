@@ -7,7 +7,7 @@ from django.db import models
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.utils import timezone
 from django.conf import settings
-from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from django.contrib.contenttypes.models import ContentType
 from taggit.managers import TaggableManager
 
@@ -63,16 +63,38 @@ class MediaItem(models.Model):
         db_index=True,    # Sorguları hızlandırmak için indeks
         verbose_name="MangaDex ID"
     )
+    # API'den (Jikan/MangaDex) toplam bölüm/cilt ve kapak bilgisinin son alındığı zaman.
+    # None: hiç yenilenmedi; `manage.py refresh_metadata --older-than-days N` önce bunları yeniler.
+    metadata_refreshed_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="API Bilgisi Güncellenme Zamanı"
+    )
     tags = TaggableManager(
         blank=True,
         verbose_name="Etiketler",
         help_text="Etiketleri virgülle ayırarak giriniz."
     )
+    # Öğe silindiğinde favori kayıtları da silinir (GenericForeignKey'in kendi cascade'i yoktur).
+    # Veritabanı sütunu eklemez; Favorite post_delete sinyalleri favori sayacını/kümesini günceller.
+    favorites = GenericRelation('Favorite', verbose_name="Favoriler")
 
     class Meta:
         abstract = True
         # Varsayılan sıralama: Önce kullanıcı, sonra eklenme tarihi (en yeni), sonra başlık
         ordering = ['user', "-added_date", "title"]
+        # Liste görünümlerinin filtre/sıralama kalıplarına uygun bileşik indeksler
+        # (_get_filtered_queryset her zaman user ile, opsiyonel olarak status ile filtreler; apply_sorting
+        # -added_date, title veya rating ile sıralar). %(class)s her somut model için ayrı isim üretir.
+        # Kontrol: python manage.py explain_list_queries
+        indexes = [
+            models.Index(fields=['user', 'status', '-added_date'], name='%(class)s_user_status_added'),
+            models.Index(fields=['user', '-added_date'], name='%(class)s_user_added'),
+            models.Index(fields=['user', 'title'], name='%(class)s_user_title'),
+            # Sadece puanlı öğeler (dashboard "En Yüksek Puanlılar", puan sıralaması)
+            models.Index(
+                fields=['user', '-rating'], name='%(class)s_user_rating_rated',
+                condition=models.Q(rating__isnull=False),
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -187,6 +209,10 @@ class Favorite(models.Model):
         constraints = [
             models.UniqueConstraint(fields=['user', 'content_type', 'object_id'], name='unique_user_content_favorite')
         ]
+        # Öğe silinirken GenericRelation cascade'i favorileri kullanıcıdan bağımsız (tür, ID) ile arar
+        indexes = [
+            models.Index(fields=['content_type', 'object_id'], name='favorite_object'),
+        ]
         ordering = ['-created_at']
         verbose_name = "Favori"
         verbose_name_plural = "Favoriler"
@@ -194,4 +220,155 @@ class Favorite(models.Model):
     def __str__(self):
         # content_object None olabilir (ilişkili nesne silinmişse)
         item_title = str(self.content_object) if self.content_object else f"{self.content_type.model}-{self.object_id}"
-        return f"{self.user.username} - {item_title}"
\ No newline at end of file
+        return f"{self.user.username} - {item_title}"
+
+# --- Kullanıcı İstatistikleri (Denormalize) ---
+class MediaStats(models.Model):
+    """
+    Kullanıcı ve medya türü başına özet istatistikler (dashboard için).
+    Öğe ekleme/düzenleme/silme sinyalleriyle artımlı olarak güncellenir (tracker/signals.py,
+    tracker/services/stats_service.py). Tutarsızlık şüphesinde `manage.py rebuild_media_stats` ile yeniden oluşturulur.
+    """
+    MEDIA_TYPE_CHOICES = [
+        ("anime", "Anime"),
+        ("webtoon", "Webtoon"),
+        ("manga", "Manga"),
+        ("novel", "Novel"),
+    ]
+    # MediaItem.STATUS_CHOICES değeri -> sayaç alanı
+    STATUS_FIELDS = {
+        "Watching": "watching_count",
+        "Completed": "completed_count",
+        "On Hold": "on_hold_count",
+        "Dropped": "dropped_count",
+        "Plan to Watch": "plan_to_watch_count",
+    }
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='media_stats',
+        verbose_name="Kullanıcı"
+    )
+    media_type = models.CharField(max_length=10, choices=MEDIA_TYPE_CHOICES, verbose_name="Medya Türü")
+    total_count = models.PositiveIntegerField(default=0, verbose_name="Toplam")
+    watching_count = models.PositiveIntegerField(default=0, verbose_name="İzliyorum/Okuyorum")
+    completed_count = models.PositiveIntegerField(default=0, verbose_name="Tamamladım")
+    on_hold_count = models.PositiveIntegerField(default=0, verbose_name="Beklemede")
+    dropped_count = models.PositiveIntegerField(default=0, verbose_name="Bıraktım")
+    plan_to_watch_count = models.PositiveIntegerField(default=0, verbose_name="İzleyeceğim/Okuyacağım")
+    rated_count = models.PositiveIntegerField(default=0, verbose_name="Puanlanan")
+    rating_sum = models.PositiveIntegerField(default=0, verbose_name="Puan Toplamı")
+    latest_added = models.DateTimeField(null=True, blank=True, verbose_name="Son Eklenme")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Güncellenme Zamanı")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'media_type'], name='unique_user_media_stats')
+        ]
+        verbose_name = "Medya İstatistiği"
+        verbose_name_plural = "Medya İstatistikleri"
+
+    def __str__(self):
+        return f"{self.user_id} - {self.media_type} ({self.total_count})"
+
+    @property
+    def average_rating(self):
+        """Puanlanan öğelerin ortalaması (puanlanan yoksa None)."""
+        return (self.rating_sum / self.rated_count) if self.rated_count else None
+
+    def status_counts(self):
+        """{durum_değeri: sayı} sözlüğü döndürür."""
+        return {status: getattr(self, field) for status, field in self.STATUS_FIELDS.items()}
+
+
+# --- Başlık Trigram İndeksi (Fuzzy Arama) ---
+class TitleTrigram(models.Model):
+    """
+    Medya başlıklarının normalize edilmiş trigram'ları (öğe başına trigram sayısı kadar satır).
+    Kaydetme/silme sinyalleriyle güncellenir (tracker/signals.py, tracker/services/fuzzy_search.py).
+    Toplu işlemlerden sonra `manage.py rebuild_title_index` ile yeniden oluşturulur.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='title_trigrams',
+        verbose_name="Kullanıcı"
+    )
+    media_type = models.CharField(max_length=10, choices=MediaStats.MEDIA_TYPE_CHOICES, verbose_name="Medya Türü")
+    object_id = models.PositiveIntegerField(verbose_name="Obje ID")
+    trigram = models.CharField(max_length=3, verbose_name="Trigram")
+    # Öğenin toplam trigram sayısı (Jaccard benzerliği için, her satırda tekrarlanır)
+    trigram_count = models.PositiveSmallIntegerField(verbose_name="Trigram Sayısı")
+
+    class Meta:
+        indexes = [
+            # Arama: user + trigram IN (...) -> (tür, obje) grupları; sorgu tablo yerine sadece indeksten okunur
+            models.Index(fields=['user', 'trigram', 'media_type', 'object_id', 'trigram_count'], name='titletrigram_lookup'),
+            # Öğe yeniden indekslenirken/silinirken eski satırları bulmak için
+            models.Index(fields=['media_type', 'object_id'], name='titletrigram_object'),
+        ]
+        verbose_name = "Başlık Trigram'ı"
+        verbose_name_plural = "Başlık Trigram'ları"
+
+    def __str__(self):
+        return f"{self.media_type}:{self.object_id} '{self.trigram}'"
+
+
+# --- Arka Plan İşleri (Kuyruk) ---
+class BackgroundJob(models.Model):
+    """
+    Veritabanı tabanlı iş kuyruğu: içe/dışa aktarım ve API'den bilgi yenileme gibi uzun işler istek
+    thread'i yerine `manage.py run_jobs` worker'ında çalışır (tracker/services/jobs.py).
+    Başarısız işler artan bekleme süresiyle (exponential backoff) max_attempts kez yeniden denenir.
+    """
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Sırada"),
+        (STATUS_RUNNING, "Çalışıyor"),
+        (STATUS_SUCCEEDED, "Tamamlandı"),
+        (STATUS_FAILED, "Başarısız"),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True, blank=True, # Sistem işleri (örn: toplu yenileme) kullanıcısız olabilir
+        related_name='background_jobs',
+        verbose_name="Kullanıcı"
+    )
+    job_type = models.CharField(max_length=50, verbose_name="İş Türü")
+    payload = models.JSONField(default=dict, blank=True, verbose_name="Parametreler")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED, verbose_name="Durum")
+    progress = models.PositiveSmallIntegerField(default=0, verbose_name="İlerleme (%)")
+    progress_message = models.CharField(max_length=255, blank=True, verbose_name="İlerleme Mesajı")
+    result = models.JSONField(null=True, blank=True, verbose_name="Sonuç")
+    error = models.TextField(blank=True, verbose_name="Hata")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Deneme Sayısı")
+    max_attempts = models.PositiveSmallIntegerField(default=3, verbose_name="En Fazla Deneme")
+    run_after = models.DateTimeField(default=timezone.now, verbose_name="En Erken Çalışma Zamanı")
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name="Worker")
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name="Alınma Zamanı")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma Zamanı")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Bitiş Zamanı")
+
+    class Meta:
+        indexes = [
+            # Worker: status='queued' AND run_after <= now ORDER BY run_after
+            models.Index(fields=['status', 'run_after'], name='backgroundjob_queue'),
+            # Kullanıcının iş listesi (en yeniler önce)
+            models.Index(fields=['user', '-created_at'], name='backgroundjob_user'),
+        ]
+        ordering = ['-created_at']
+        verbose_name = "Arka Plan İşi"
+        verbose_name_plural = "Arka Plan İşleri"
+
+    def __str__(self):
+        return f"{self.job_type} #{self.pk} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_SUCCEEDED, self.STATUS_FAILED)
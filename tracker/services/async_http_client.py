@@ -0,0 +1,131 @@
+# tracker/services/async_http_client.py
+# Jikan ve MangaDex servislerinin async (asyncio) varyantları için httpx tabanlı HTTP istemcisi.
+# Senkron http_client ile aynı ayarları (settings.API_HTTP_CLIENT), aynı rate limit bucket'larını
+# ve aynı gecikme metriklerini kullanır. httpx.AsyncClient bir event loop'a bağlı olduğundan
+# bağlantı havuzu event loop başına tutulur: ASGI altında (tek, uzun ömürlü loop) tüm istekler
+# aynı havuzu paylaşır; WSGI altında her async view kendi loop'unda çalıştığı için havuz istekle sınırlıdır.
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+
+import httpx
+
+from . import http_client, rate_limiter
+
+# Logger oluştur
+logger = logging.getLogger(__name__)
+
+
+class AsyncPooledHTTPClient:
+    """
+    Tek bir upstream (örn: Jikan) için keep-alive bağlantı havuzu kullanan async HTTP istemcisi.
+    Bekleme (rate limit, ağ) sırasında worker thread'i bloklanmaz; event loop diğer isteklere devam eder.
+    """
+
+    def __init__(self, name, default_headers=None, config=None):
+        self.name = name
+        self.config = config or http_client.get_http_client_settings()
+        self.default_headers = {'User-Agent': http_client.DEFAULT_USER_AGENT}
+        self.default_headers.update(default_headers or {})
+        self.timeout = httpx.Timeout(self.config['READ_TIMEOUT'], connect=self.config['CONNECT_TIMEOUT'])
+        # Metrikler senkron istemciyle ortak tutulur (http_client.get_metrics() ikisini birlikte gösterir)
+        self.metrics = http_client.get_client(name, default_headers=default_headers).metrics
+        self._clients = weakref.WeakKeyDictionary() # event loop -> httpx.AsyncClient
+        self._lock = threading.Lock()
+
+    def _get_async_client(self):
+        """Çalışan event loop'un httpx istemcisini döndürür (yoksa oluşturur)."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            with self._lock:
+                client = self._clients.get(loop)
+                if client is None or client.is_closed:
+                    client = httpx.AsyncClient(
+                        headers=self.default_headers,
+                        timeout=self.timeout,
+                        limits=httpx.Limits(
+                            max_connections=self.config['POOL_MAXSIZE'],
+                            max_keepalive_connections=self.config['POOL_MAXSIZE'],
+                        ),
+                        transport=httpx.AsyncHTTPTransport(retries=self.config['MAX_RETRIES']),
+                    )
+                    self._clients[loop] = client
+        return client
+
+    @property
+    def bucket(self):
+        """Bu upstream için tanımlı token bucket (senkron istemciyle ortak), yoksa None."""
+        return rate_limiter.get_bucket(self.name)
+
+    async def get(self, url, params=None, headers=None, timeout=None):
+        """
+        Async GET isteği yapar ve gecikmeyi metriklere kaydeder.
+        Rate limit bütçesi yoksa asyncio.sleep ile bekler (thread bloklanmaz); 429 yanıtında
+        Retry-After süresi bucket'a bildirilir. httpx istisnaları çağırana iletilir.
+        """
+        host = urlsplit(url).netloc
+        bucket = self.bucket
+        if bucket is not None:
+            await bucket.aacquire() # Bekleme süresi gecikme metriğine dahil edilmez
+        start = time.perf_counter()
+        status_code = None
+        error = False
+        try:
+            response = await self._get_async_client().get(
+                url, params=params, headers=headers, timeout=timeout or self.timeout
+            )
+            status_code = response.status_code
+            error = status_code >= 400
+            if status_code == 429 and bucket is not None:
+                bucket.penalize(rate_limiter.parse_retry_after(
+                    response.headers.get('Retry-After'), default=bucket.default_retry_after
+                ))
+            return response
+        except httpx.HTTPError:
+            error = True
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.metrics.record(host, elapsed_ms, status_code=status_code, error=error)
+            logger.debug(f"{self.name} async HTTP GET {host} -> {status_code} ({elapsed_ms:.1f} ms)")
+
+    async def aclose(self):
+        """Çalışan event loop'a ait bağlantı havuzunu kapatır."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+
+# --- İstemci Kayıt Defteri (Servisler arasında paylaşılır) ---
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_async_client(name, default_headers=None):
+    """Verilen isim için paylaşılan async istemciyi döndürür (yoksa oluşturur)."""
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = AsyncPooledHTTPClient(name, default_headers=default_headers)
+                _clients[name] = client
+    return client
+
+
+async def aclose_all():
+    """Çalışan event loop'taki tüm async bağlantı havuzlarını kapatır (örn: ASGI lifespan shutdown)."""
+    for client in list(_clients.values()):
+        await client.aclose()
+
+
+def reset_clients():
+    """Kayıt defterini temizler (ayar değişiklikleri ve testler için). Açık havuzlar loop ile birlikte düşer."""
+    with _clients_lock:
+        _clients.clear()
@@ -0,0 +1,87 @@
+# tracker/services/dashboard_cache.py
+# Dashboard'daki "Son Eklenenler" / "En Yüksek Puanlılar" bölümleri için kullanıcı başına fragment cache.
+# Her kullanıcının bir sürüm (version) sayacı vardır ve fragment anahtarına eklenir. Kullanıcının
+# Anime/Manga/Novel/Webtoon/Favorite kayıtlarına yapılan her yazma sayacı artırır (signals.py);
+# eski fragment'lar silinmez, yeni anahtar kullanılacağı için kendiliğinden geçersiz kalır ve TTL ile düşer.
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Logger oluştur
+logger = logging.getLogger(__name__)
+
+# settings.DASHBOARD_CACHE tanımlı değilse (veya eksikse) kullanılacak varsayılanlar
+DEFAULT_DASHBOARD_CACHE_SETTINGS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',  # Fragment'ların ve sürüm sayaçlarının tutulacağı cache
+    'TIMEOUT': 60 * 15,        # Fragment ömrü (saniye); sürüm değişince zaten kullanılmaz
+    'KEY_PREFIX': 'dashboard',
+}
+
+# Sürüm sayaçları fragment'lardan uzun yaşamalı; süresiz tutulur (None = timeout yok)
+VERSION_TIMEOUT = None
+
+
+def get_dashboard_cache_settings():
+    """Varsayılan ayarları settings.DASHBOARD_CACHE ile birleştirip döndürür."""
+    config = DEFAULT_DASHBOARD_CACHE_SETTINGS.copy()
+    config.update(getattr(settings, 'DASHBOARD_CACHE', {}) or {})
+    return config
+
+
+def _get_cache(config=None):
+    config = config or get_dashboard_cache_settings()
+    return caches[config['CACHE_ALIAS']]
+
+
+def _version_key(user_id, config):
+    return f"{config['KEY_PREFIX']}:version:{user_id}"
+
+
+def _initial_version():
+    # Sayaç cache'ten düşerse 1'den başlamak eski fragment'ları geri getirebilir; zaman tabanlı başlangıç bunu önler
+    return int(time.time() * 1000)
+
+
+def get_user_version(user_id):
+    """Kullanıcının dashboard sürüm sayacını döndürür (yoksa oluşturur)."""
+    config = get_dashboard_cache_settings()
+    cache = _get_cache(config)
+    key = _version_key(user_id, config)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=VERSION_TIMEOUT)
+        version = cache.get(key)
+    return version
+
+
+def bump_user_version(user_id):
+    """Kullanıcının dashboard fragment'larını geçersiz kılar (sürüm sayacını artırır)."""
+    if user_id is None:
+        return
+    config = get_dashboard_cache_settings()
+    cache = _get_cache(config)
+    key = _version_key(user_id, config)
+    try:
+        cache.incr(key) # Atomik (Redis/Memcached); sayaç yoksa ValueError
+    except ValueError:
+        cache.set(key, _initial_version(), timeout=VERSION_TIMEOUT)
+    logger.debug(f"Dashboard cache sürümü artırıldı (user_id={user_id}).")
+
+
+def fragment_context(user):
+    """
+    Dashboard şablonundaki {% cache %} etiketleri için context değerleri.
+    Cache kapalıysa timeout 0 döner (fragment her istekte yeniden oluşturulur).
+    """
+    config = get_dashboard_cache_settings()
+    if not config['ENABLED']:
+        return {'dashboard_cache_timeout': 0, 'dashboard_cache_version': 0, 'dashboard_cache_alias': config['CACHE_ALIAS']}
+    return {
+        'dashboard_cache_timeout': config['TIMEOUT'],
+        'dashboard_cache_version': get_user_version(user.pk),
+        'dashboard_cache_alias': config['CACHE_ALIAS'],
+    }
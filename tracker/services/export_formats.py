@@ -0,0 +1,250 @@
+# tracker/services/export_formats.py
+# Dışa aktarım biçimleri ve sıkıştırma (tracker/views/helpers.py::_export_media kullanır).
+# Tüm yazıcılar satır parçalarını (chunk) alıp bayt parçaları üreten generator'lardır; çıktı
+# StreamingHttpResponse ile akıtılır, dosyanın tamamı hiçbir zaman bellekte tutulmaz.
+#   csv     : noktalı virgüllü CSV (UTF-8 BOM, Excel uyumlu) - başlıklar Türkçe
+#   jsonl   : satır başına bir JSON nesnesi (NDJSON) - anahtarlar model alan adları, tipli değerler
+#   parquet : sütunlu Parquet (isteğe bağlı pyarrow), her veritabanı parçası bir row group
+# Sıkıştırma: gzip (standart kütüphane) veya zstd (isteğe bağlı zstandard); Parquet'te dış sarmalayıcı
+# yerine Parquet'in kendi sütun sıkıştırması kullanılır.
+
+import csv
+import datetime
+import io
+import logging
+import zipfile
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+# İsteğe bağlı bağımlılıklar: kurulu değillerse ilgili biçim/sıkıştırma sunulmaz
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Biçim -> (dosya uzantısı, content type)
+EXPORT_FORMATS = {
+    'csv': ('csv', 'text/csv; charset=utf-8'),
+    'jsonl': ('jsonl', 'application/x-ndjson; charset=utf-8'),
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+DEFAULT_FORMAT = 'csv'
+
+# Sıkıştırma -> (dosya uzantısı eki, content type)
+COMPRESSIONS = {
+    'gzip': ('gz', 'application/gzip'),
+    'zstd': ('zst', 'application/zstd'),
+}
+
+# Değer türü (helpers._export_field_kind) -> Parquet sütun tipi üreticisi
+_PARQUET_TYPES = {
+    'int': lambda: pyarrow.int64(),
+    'date': lambda: pyarrow.date32(),
+    'datetime': lambda: pyarrow.timestamp('us', tz='UTC'),
+    'tags': lambda: pyarrow.list_(pyarrow.string()),
+}
+
+
+class ExportFormatError(ValueError):
+    """Bilinmeyen veya bu kurulumda kullanılamayan biçim/sıkıştırma."""
+
+
+def available_formats():
+    """Bu kurulumda sunulabilen biçimler (pyarrow yoksa parquet hariç)."""
+    return [name for name in EXPORT_FORMATS if name != 'parquet' or pyarrow is not None]
+
+
+def available_compressions():
+    """Bu kurulumda sunulabilen sıkıştırmalar (zstandard yoksa zstd hariç)."""
+    return [name for name in COMPRESSIONS if name != 'zstd' or zstandard is not None]
+
+
+def validate(export_format, compression=None):
+    """Biçim ve sıkıştırmayı doğrular; kullanılamıyorsa ExportFormatError (Türkçe mesajla) fırlatır."""
+    if export_format not in EXPORT_FORMATS:
+        raise ExportFormatError(f"Bilinmeyen dışa aktarım biçimi: '{export_format}'.")
+    if export_format not in available_formats():
+        raise ExportFormatError("Parquet dışa aktarımı için 'pyarrow' paketi kurulu olmalı.")
+    if compression:
+        if compression not in COMPRESSIONS:
+            raise ExportFormatError(f"Bilinmeyen sıkıştırma: '{compression}'.")
+        if compression not in available_compressions():
+            raise ExportFormatError("zstd sıkıştırması için 'zstandard' paketi kurulu olmalı.")
+
+
+def file_extension(export_format, compression=None):
+    extension = EXPORT_FORMATS[export_format][0]
+    if compression and export_format != 'parquet':
+        extension += f".{COMPRESSIONS[compression][0]}"
+    return extension
+
+
+def content_type(export_format, compression=None):
+    if compression and export_format != 'parquet':
+        return COMPRESSIONS[compression][1]
+    return EXPORT_FORMATS[export_format][1]
+
+
+# --- Yazıcılar ---
+def _drain(buffer):
+    """Tamponun içeriğini döndürür ve tamponu boşaltır."""
+    value = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return value
+
+
+def csv_chunks(headers, row_chunks):
+    """Başlık satırı (BOM ile) hemen, sonra her satır parçası için tek bayt parçası üretir."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=";", quotechar='"', quoting=csv.QUOTE_MINIMAL)
+    # UTF-8 BOM (Byte Order Mark) ekleyerek Excel uyumluluğunu artır
+    buffer.write("\ufeff")
+    writer.writerow(headers)
+    yield _drain(buffer).encode("utf-8")
+    for rows in row_chunks:
+        writer.writerows(rows)
+        yield _drain(buffer).encode("utf-8")
+
+
+def jsonl_chunks(keys, row_chunks):
+    """Her satır bir JSON nesnesi; tarih/saatler ISO 8601 (DjangoJSONEncoder)."""
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    for rows in row_chunks:
+        lines = [encoder.encode(dict(zip(keys, row))) for row in rows]
+        if lines:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class StreamSink:
+    """
+    pyarrow/zipfile için yalnızca yazılabilir dosya benzeri nesne.
+    Yazılanlar her parçadan sonra drain() ile dışarı alınır; tell() toplam konumu verir
+    (Parquet footer'ındaki ve ZIP merkez dizinindeki ofsetler bu değere göre yazılır).
+    seek() olmadığından zipfile girdileri veri tanımlayıcılı (data descriptor) akış kipinde yazar.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def writable(self):
+        return True
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+def parquet_chunks(keys, kinds, row_chunks, compression=None):
+    """Her satır parçası bir row group olarak yazılır; şema alan türlerinden bir kez oluşturulur."""
+    if pyarrow is None:
+        raise ExportFormatError("Parquet dışa aktarımı için 'pyarrow' paketi kurulu olmalı.")
+    schema = pyarrow.schema([
+        (key, _PARQUET_TYPES.get(kind, pyarrow.string)()) for key, kind in zip(keys, kinds)
+    ])
+    sink = StreamSink()
+    writer = pyarrow.parquet.ParquetWriter(
+        pyarrow.PythonFile(sink, mode='w'), schema, compression=compression or 'snappy',
+    )
+    try:
+        for rows in row_chunks:
+            if not rows:
+                continue
+            columns = list(zip(*rows))
+            writer.write_table(pyarrow.Table.from_arrays(
+                [pyarrow.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema,
+            ))
+            yield sink.drain()
+    finally:
+        writer.close() # Footer (şema + row group ofsetleri)
+    yield sink.drain()
+
+
+def _csv_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, list): # Etiket listeleri
+        return ", ".join(value)
+    if isinstance(value, datetime.datetime):
+        return timezone.localtime(value).strftime("%Y-%m-%d %H:%M:%S")
+    return str(value)
+
+
+def table_chunks(columns, row_chunks, export_format):
+    """
+    Model dışı basit tablolar (favoriler, etiketler) için yazıcı seçimi.
+    columns: [(anahtar, CSV başlığı, değer türü), ...]; satırlar bu sırada tipli değerlerdir.
+    """
+    if export_format == 'csv':
+        text_chunks = ([[_csv_text(value) for value in row] for row in rows] for rows in row_chunks)
+        return csv_chunks([header for _, header, _ in columns], text_chunks)
+    keys = [key for key, _, _ in columns]
+    if export_format == 'jsonl':
+        return jsonl_chunks(keys, row_chunks)
+    return parquet_chunks(keys, [kind for _, _, kind in columns], row_chunks)
+
+
+def zip_chunks(entries):
+    """
+    ZIP arşivini akış halinde üretir. entries: [(dosya adı, bayt parçası üreticisi), ...]
+    Her girdi sırayla, parça parça sıkıştırılır; arşiv hiçbir zaman bellekte toplanmaz.
+    """
+    sink = StreamSink()
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, chunks in entries:
+            # force_zip64: boyut önceden bilinmiyor, 2 GB'ı aşan girdiler de yazılabilsin
+            with archive.open(name, mode='w', force_zip64=True) as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+    yield sink.drain() # Merkez dizin
+
+
+# --- Sıkıştırma ---
+def compress_chunks(chunks, compression):
+    """Bayt parçalarını akış halinde gzip/zstd ile sıkıştırır (tüm içerik bellekte toplanmaz)."""
+    if compression == 'gzip':
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) # 16+: gzip başlığı
+    elif compression == 'zstd':
+        if zstandard is None:
+            raise ExportFormatError("zstd sıkıştırması için 'zstandard' paketi kurulu olmalı.")
+        compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    else:
+        yield from chunks
+        return
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data: # Sıkıştırıcı küçük girdileri tamponlayabilir
+            yield data
+    yield compressor.flush()
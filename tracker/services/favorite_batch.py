@@ -0,0 +1,109 @@
+# tracker/services/favorite_batch.py
+# Birden fazla öğenin favori durumunu tek istekte ayarlar (çoklu seçim arayüzleri, senkronizasyon istemcileri).
+# Her değişiklik (item_type, item_id, istenen durum) üçlüsüdür; sorgu sayısı öğe sayısından bağımsızdır:
+#   - ContentType'lar süreç içi ContentType cache'inden (get_for_models) çözülür,
+#   - sahiplik tür başına tek IN sorgusuyla doğrulanır (sadece kullanıcının kendi öğeleri),
+#   - eklemeler tek bulk_create(ignore_conflicts=True), çıkarmalar tek QuerySet.delete() ile yapılır.
+# bulk_create sinyal göndermediği için favori kümesi/sayacı sürümü ve dashboard sürümü sonunda bir kez güncellenir.
+
+import logging
+from dataclasses import dataclass, field
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Q
+
+from ..models import Favorite
+from . import dashboard_cache, favorite_index
+
+# Logger oluştur
+logger = logging.getLogger(__name__)
+
+# Tek istekte kabul edilen en fazla değişiklik
+MAX_BATCH_SIZE = 500
+
+
+class FavoriteBatchError(ValueError):
+    """İstek gövdesi geçersiz (eksik alan, bilinmeyen tür, çok fazla öğe vb.)."""
+
+
+@dataclass
+class FavoriteBatchResult:
+    added: list = field(default_factory=list)      # [(media_type, pk), ...] favori olması istenenler
+    removed: list = field(default_factory=list)    # [(media_type, pk), ...] favoriden çıkarılması istenenler
+    not_found: list = field(default_factory=list)  # Kullanıcıya ait olmayan veya var olmayan öğeler
+
+
+def parse_changes(entries):
+    """
+    [{"item_type": "anime", "item_id": 12, "favorite": true}, ...] listesini
+    {(media_type, pk): bool} sözlüğüne çevirir (aynı öğe tekrar ederse sonuncusu geçerli).
+    """
+    if not isinstance(entries, list) or not entries:
+        raise FavoriteBatchError("'items' boş olmayan bir liste olmalı.")
+    if len(entries) > MAX_BATCH_SIZE:
+        raise FavoriteBatchError(f"Tek istekte en fazla {MAX_BATCH_SIZE} öğe gönderilebilir.")
+    changes = {}
+    for position, entry in enumerate(entries, start=1):
+        if not isinstance(entry, dict):
+            raise FavoriteBatchError(f"{position}. öğe bir nesne olmalı.")
+        media_type = str(entry.get('item_type') or '').lower()
+        if media_type not in favorite_index.FAVORITE_MODELS:
+            raise FavoriteBatchError(f"{position}. öğe: geçersiz öğe türü '{entry.get('item_type')}'.")
+        try:
+            pk = int(entry.get('item_id'))
+        except (TypeError, ValueError):
+            raise FavoriteBatchError(f"{position}. öğe: geçersiz item_id.")
+        desired = entry.get('favorite')
+        if not isinstance(desired, bool):
+            raise FavoriteBatchError(f"{position}. öğe: 'favorite' true veya false olmalı.")
+        changes[(media_type, pk)] = desired
+    return changes
+
+
+def apply_changes(user, changes):
+    """{(media_type, pk): istenen durum} değişikliklerini uygular ve FavoriteBatchResult döndürür."""
+    models = favorite_index.FAVORITE_MODELS
+    content_types = ContentType.objects.get_for_models(*models.values()) # Süreç içi cache (ilk seferden sonra sorgusuz)
+
+    pks_by_type = {}
+    for media_type, pk in changes:
+        pks_by_type.setdefault(media_type, set()).add(pk)
+    # Sahiplik: tür başına tek IN sorgusu
+    owned = {
+        media_type: set(models[media_type].objects.filter(user=user, pk__in=pks).values_list('pk', flat=True))
+        for media_type, pks in pks_by_type.items()
+    }
+
+    result = FavoriteBatchResult()
+    to_create = []
+    remove_by_type = {}
+    for (media_type, pk), desired in changes.items():
+        if pk not in owned[media_type]:
+            result.not_found.append((media_type, pk))
+        elif desired:
+            result.added.append((media_type, pk))
+            to_create.append(Favorite(user=user, content_type=content_types[models[media_type]], object_id=pk))
+        else:
+            result.removed.append((media_type, pk))
+            remove_by_type.setdefault(media_type, []).append(pk)
+
+    with transaction.atomic():
+        if to_create:
+            # Zaten favori olanlar unique kısıtına takılır ve sessizce atlanır
+            Favorite.objects.bulk_create(to_create, ignore_conflicts=True)
+        if remove_by_type:
+            condition = Q()
+            for media_type, pks in remove_by_type.items():
+                condition |= Q(content_type=content_types[models[media_type]], object_id__in=pks)
+            Favorite.objects.filter(condition, user=user).delete()
+
+    if to_create or remove_by_type:
+        # bulk_create sinyal göndermez: kullanıcının favori cache'leri bir kez sıfırlanır
+        favorite_index.invalidate_on_commit(user.pk) # Favori kümesi ve sayacı aynı sürümü kullanır
+        dashboard_cache.bump_user_version(user.pk)
+    logger.debug(
+        f"Toplu favori: User {user.pk}, {len(result.added)} ekleme, {len(result.removed)} çıkarma, "
+        f"{len(result.not_found)} bulunamadı."
+    )
+    return result
@@ -0,0 +1,53 @@
+# tracker/services/favorite_counts.py
+# Navbar'daki favori rozeti için kullanıcı başına cache'lenmiş favori sayısı.
+# Sayı tek COUNT sorgusuyla hesaplanıp favori kümesinin sürümüyle (favorite_index.get_version) anahtarlanan
+# cache'e yazılır. Favorite ekleme/silme sinyalleri (toggle_favorite, admin, cascade) sürümü hem yazma anında hem
+# commit'ten sonra artırır; bir sonraki okuma yeni anahtarda yeniden sayar. Sayaç artırılıp azaltılmaz:
+# sürüm COUNT'tan önce okunduğu için eski veriyle hesaplanan sayı her zaman artık okunmayan bir anahtara düşer
+# (COUNT ile cache yazımı arasındaki toggle veya geri alınan transaction sayacı kaydıramaz).
+# Not: Favorite.bulk_create() sinyal göndermez -> favorite_index.invalidate_on_commit() çağrılmalı.
+
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+
+from ..models import Favorite
+from . import favorite_index
+
+# Logger oluştur
+logger = logging.getLogger(__name__)
+
+# settings.FAVORITE_COUNT_CACHE tanımlı değilse (veya eksikse) kullanılacak varsayılanlar
+DEFAULT_FAVORITE_COUNT_SETTINGS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 60 * 60 * 24,  # Sayaç ömrü (saniye); sürüm değişince zaten kullanılmaz
+    'KEY_PREFIX': 'favorite_count',
+}
+
+
+def get_favorite_count_settings():
+    """Varsayılan ayarları settings.FAVORITE_COUNT_CACHE ile birleştirip döndürür."""
+    config = DEFAULT_FAVORITE_COUNT_SETTINGS.copy()
+    config.update(getattr(settings, 'FAVORITE_COUNT_CACHE', {}) or {})
+    return config
+
+
+def _count_key(user_id, version, config):
+    return f"{config['KEY_PREFIX']}:{user_id}:{version}"
+
+
+def get_favorite_count(user_id):
+    """Kullanıcının favori sayısı (bu sürüm için cache'te yoksa veritabanından sayılır ve cache'e yazılır)."""
+    config = get_favorite_count_settings()
+    if not config['ENABLED']:
+        return Favorite.objects.filter(user_id=user_id).count()
+    cache = caches[config['CACHE_ALIAS']]
+    key = _count_key(user_id, favorite_index.get_version(user_id), config) # Sürüm COUNT'tan önce okunur
+    count = cache.get(key)
+    if count is None:
+        count = Favorite.objects.filter(user_id=user_id).count()
+        cache.set(key, count, timeout=config['TIMEOUT'])
+        logger.debug(f"Favori sayısı hesaplandı (user_id={user_id}): {count}")
+    return count
@@ -0,0 +1,123 @@
+# tracker/services/favorite_index.py
+# Kullanıcı başına cache'lenmiş kompakt favori kümesi: {media_type: frozenset(pk, ...)}.
+# Liste sayfalarındaki yıldız işaretleri, detay sayfasındaki favori durumu ve favoriler sayfasının
+# tür başına ID listeleri bu kümeden okunur; ContentType çözümlemesi veya tür başına Favorite sorgusu yapılmaz.
+# Küme ilk okumada tek sorguyla (content_type_id, object_id) oluşturulur. Favorite ekleme/silme sinyalleri
+# (toggle_favorite, öğe silinince GenericRelation cascade'i, admin) kullanıcının sürüm sayacını artırır;
+# dashboard_cache ile aynı yöntem: eski sürümle yazılmış kümeler okunmaz, TTL ile düşer (yarış durumunda bile tutarlı).
+# Sürüm hem yazma anında hem commit'ten sonra artırılır (invalidate_on_commit): commit'ten önce başka bir istek
+# yeni sürümü okuyup henüz görünmeyen veriyle küme hesaplamış olabilir. favorite_counts aynı sürümü kullanır.
+# Not: Favorite.bulk_create() sinyal göndermez -> invalidate_on_commit() çağrılmalı.
+
+import functools
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
+from django.db import transaction
+
+from ..models import Anime, Manga, Novel, Webtoon, Favorite
+
+# Logger oluştur
+logger = logging.getLogger(__name__)
+
+# settings.FAVORITE_INDEX_CACHE tanımlı değilse (veya eksikse) kullanılacak varsayılanlar
+DEFAULT_FAVORITE_INDEX_SETTINGS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 60 * 60 * 24,  # Küme ömrü (saniye); sürüm değişince zaten kullanılmaz
+    'KEY_PREFIX': 'favorite_index',
+}
+
+# media_type -> Model (favoriler sayfasındaki grup sırası)
+FAVORITE_MODELS = {'anime': Anime, 'webtoon': Webtoon, 'manga': Manga, 'novel': Novel}
+
+
+def get_favorite_index_settings():
+    """Varsayılan ayarları settings.FAVORITE_INDEX_CACHE ile birleştirip döndürür."""
+    config = DEFAULT_FAVORITE_INDEX_SETTINGS.copy()
+    config.update(getattr(settings, 'FAVORITE_INDEX_CACHE', {}) or {})
+    return config
+
+
+def _version_key(user_id, config):
+    return f"{config['KEY_PREFIX']}:version:{user_id}"
+
+
+def _load_index(user_id):
+    """Kullanıcının tüm favorilerini tek sorguyla {media_type: frozenset(pk)} olarak yükler."""
+    # get_for_models ContentType cache'ini kullanır (süreç başına bir kez sorgu)
+    media_type_by_ct = {
+        content_type.pk: model._meta.model_name
+        for model, content_type in ContentType.objects.get_for_models(*FAVORITE_MODELS.values()).items()
+    }
+    pks_by_type = {media_type: set() for media_type in FAVORITE_MODELS}
+    rows = Favorite.objects.filter(user_id=user_id).order_by().values_list('content_type_id', 'object_id')
+    for content_type_id, object_id in rows:
+        media_type = media_type_by_ct.get(content_type_id)
+        if media_type:
+            pks_by_type[media_type].add(object_id)
+    return {media_type: frozenset(pks) for media_type, pks in pks_by_type.items()}
+
+
+def get_version(user_id, config=None):
+    """
+    Kullanıcının favori sürümü; her Favorite ekleme/silmede değişir.
+    Favorilerden türetilen cache değerleri (küme, sayaç) hesaplamadan ÖNCE okunan sürümle anahtarlanmalıdır.
+    """
+    config = config or get_favorite_index_settings()
+    cache = caches[config['CACHE_ALIAS']]
+    version_key = _version_key(user_id, config)
+    version = cache.get(version_key)
+    if version is None:
+        # Sayaç düşerse 1'den başlamak eski kümeleri geri getirebilir; zaman tabanlı başlangıç bunu önler
+        cache.add(version_key, int(time.time() * 1000), timeout=None)
+        version = cache.get(version_key)
+    return version
+
+
+def get_user_favorites(user_id):
+    """Kullanıcının favori kümesi: {media_type: frozenset(pk)} (cache'te yoksa oluşturulur)."""
+    config = get_favorite_index_settings()
+    if not config['ENABLED']:
+        return _load_index(user_id)
+    cache = caches[config['CACHE_ALIAS']]
+    index_key = f"{config['KEY_PREFIX']}:{user_id}:{get_version(user_id, config)}"
+    index = cache.get(index_key)
+    if index is None:
+        index = _load_index(user_id)
+        cache.set(index_key, index, timeout=config['TIMEOUT'])
+    return index
+
+
+def favorite_pks(user_id, model):
+    """Kullanıcının verilen modeldeki favori PK'ları (frozenset)."""
+    return get_user_favorites(user_id).get(model._meta.model_name, frozenset())
+
+
+def is_favorite(user_id, item):
+    return item.pk in favorite_pks(user_id, item.__class__)
+
+
+def invalidate(user_id):
+    """Kullanıcının favori kümesini geçersiz kılar (sürüm sayacını artırır)."""
+    if user_id is None:
+        return
+    config = get_favorite_index_settings()
+    cache = caches[config['CACHE_ALIAS']]
+    key = _version_key(user_id, config)
+    try:
+        cache.incr(key) # Atomik (Redis/Memcached); sayaç yoksa ValueError
+    except ValueError:
+        cache.set(key, int(time.time() * 1000), timeout=None)
+    logger.debug(f"Favori kümesi geçersiz kılındı (user_id={user_id}).")
+
+
+def invalidate_on_commit(user_id):
+    """Şimdi ve transaction commit edildikten sonra tekrar geçersiz kılar (commit'e kadar hesaplananlar da düşer)."""
+    if user_id is None:
+        return
+    invalidate(user_id)
+    transaction.on_commit(functools.partial(invalidate, user_id))
@@ -0,0 +1,267 @@
+# tracker/services/fulltext_search.py
+# Medya listeleri için değiştirilebilir tam metin arama (full-text search) backend'leri.
+# - sqlite_fts5: Her model için FTS5 sanal tablosu (tracker_<model>_fts), tetikleyicilerle (trigger) senkron.
+#   Sıralama bm25() ile, başlık eşleşmeleri yazar/stüdyo/notlardan daha ağırlıklı.
+# - postgresql: Ağırlıklı tsvector ifadesi üzerinde GIN indeksi, ts_rank ile sıralama.
+# - icontains: Yedek (FTS olmayan veritabanları); tüm metin alanlarında LIKE araması.
+# Tablolar/indeksler 0013_fulltext_search migration'ı ile oluşturulur. Tüm backend'ler kelime başı
+# (prefix) eşleşmesi yapar: "nar" -> "Naruto". Sonuçlar search_rank ile (büyük = daha alakalı) işaretlenir.
+
+import logging
+import re
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from ..models import Anime, Manga, Novel, Webtoon
+
+# Logger oluştur
+logger = logging.getLogger(__name__)
+
+# Model -> aranan alanlar (ağırlık grubu sırasıyla: A başlık, B kişiler/stüdyo/platform, C notlar)
+# 0013_fulltext_search migration'ındaki alan listeleriyle aynı olmalı.
+SEARCH_FIELDS = {
+    Anime: {'A': ['title'], 'B': ['studio'], 'C': ['notes']},
+    Webtoon: {'A': ['title'], 'B': ['author', 'artist', 'platform'], 'C': ['notes']},
+    Manga: {'A': ['title'], 'B': ['author', 'artist'], 'C': ['notes']},
+    Novel: {'A': ['title'], 'B': ['author'], 'C': ['notes']},
+}
+WEIGHT_GROUPS = ('A', 'B', 'C')
+# bm25 sütun ağırlıkları (FTS5); PostgreSQL'de setweight A/B/C karşılıkları kullanılır
+BM25_WEIGHTS = {'A': 10.0, 'B': 4.0, 'C': 1.0}
+PG_SEARCH_CONFIG = 'simple' # Dil bağımsız (Türkçe/İngilizce/Japonca başlıklar karışık)
+
+RANK_ANNOTATION = 'search_rank'
+
+# Kelimeler (harf/rakam dizileri); FTS sözdizimi karakterleri (", *, :, &, | ...) atılır
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize_query(query):
+    """Arama metnini kelimelere ayırır (en fazla 10 kelime)."""
+    return _TOKEN_RE.findall(query or '')[:10]
+
+
+def searchable_fields(model):
+    """Modelin aranan tüm alanları (ağırlık sırasıyla)."""
+    groups = SEARCH_FIELDS.get(model, {'A': ['title']})
+    return [field for group in WEIGHT_GROUPS for field in groups.get(group, [])]
+
+
+def fts_table_name(model):
+    return f"{model._meta.db_table}_fts"
+
+
+def pg_vector_sql(model, table_alias=None):
+    """
+    PostgreSQL ağırlıklı tsvector ifadesi. Migration'daki GIN indeksiyle birebir aynı ifade olmalı
+    (aksi halde planlayıcı indeksi kullanmaz); sorguda sütunlar tablo adıyla nitelenir.
+    """
+    groups = SEARCH_FIELDS.get(model, {'A': ['title']})
+    prefix = f'"{table_alias}".' if table_alias else ''
+    parts = []
+    for group in WEIGHT_GROUPS:
+        fields = groups.get(group)
+        if not fields:
+            continue
+        text = " || ' ' || ".join(f"coalesce({prefix}\"{field}\", '')" for field in fields)
+        parts.append(f"setweight(to_tsvector('{PG_SEARCH_CONFIG}', {text}), '{group}')")
+    return " || ".join(parts)
+
+
+# --- Backend'ler ---
+class BaseSearchBackend:
+    """Arama backend'i arayüzü: search() queryset'i filtreler ve search_rank ile işaretler."""
+    name = None
+
+    def is_available(self, model, using):
+        return True
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+
+class IContainsSearchBackend(BaseSearchBackend):
+    """Yedek backend: tüm kelimeler aranan alanlardan birinde geçmeli (büyük/küçük harf duyarsız)."""
+    name = 'icontains'
+
+    def search(self, queryset, query):
+        tokens = tokenize_query(query) or [query.strip()]
+        fields = searchable_fields(queryset.model)
+        for token in tokens:
+            condition = Q()
+            for field in fields:
+                condition |= Q(**{f"{field}__icontains": token})
+            queryset = queryset.filter(condition)
+        # Sıralama yok; tüm sonuçlar eşit alakalı
+        return queryset.annotate(**{RANK_ANNOTATION: Value(0.0, output_field=FloatField())})
+
+
+class SQLiteFTS5SearchBackend(BaseSearchBackend):
+    """SQLite FTS5 backend'i (external content tablo + tetikleyiciler)."""
+    name = 'sqlite_fts5'
+
+    def is_available(self, model, using):
+        connection = connections[using]
+        return connection.vendor == 'sqlite' and fts_table_name(model) in _table_names(using)
+
+    @staticmethod
+    def build_match(tokens):
+        # Her kelime tırnaklı (sözdizimi karakterlerinden korunur) + '*' ile prefix araması; boşluk = AND
+        return " ".join(f'"{token}"*' for token in tokens)
+
+    def search(self, queryset, query):
+        tokens = tokenize_query(query)
+        if not tokens:
+            return IContainsSearchBackend().search(queryset, query)
+        model = queryset.model
+        table = model._meta.db_table
+        fts = fts_table_name(model)
+        weights = ", ".join(
+            str(BM25_WEIGHTS[group])
+            for group in WEIGHT_GROUPS for _ in SEARCH_FIELDS.get(model, {}).get(group, [])
+        )
+        # FTS5 sanal tablosu bir Django modeli olmadığından ORM ile JOIN kurulamaz. extra() FROM'a tabloyu
+        # ekler ve MATCH ile rowid eşlemesi WHERE'de yapılır: SQLite FTS tablosundan başlayıp pk ile
+        # medya tablosuna gider (bm25 sadece bu JOIN bağlamında hesaplanabilir; ilişkili alt sorgu
+        # her satır için MATCH'i tekrarladığından çok daha yavaştır).
+        return queryset.extra(
+            tables=[fts],
+            where=[f'"{fts}" MATCH %s', f'"{fts}"."rowid" = "{table}"."id"'],
+            params=[self.build_match(tokens)],
+            select={RANK_ANNOTATION: f'-bm25("{fts}", {weights})'}, # bm25 küçük = alakalı; işaret çevrilir
+        )
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """PostgreSQL tsvector/GIN backend'i."""
+    name = 'postgresql'
+
+    def is_available(self, model, using):
+        return connections[using].vendor == 'postgresql'
+
+    @staticmethod
+    def build_tsquery(tokens):
+        # Kelimeler \w+ olduğundan tsquery operatörü içermez; ':*' prefix eşleşmesi, '&' = AND
+        return " & ".join(f"{token}:*" for token in tokens)
+
+    def search(self, queryset, query):
+        tokens = tokenize_query(query)
+        if not tokens:
+            return IContainsSearchBackend().search(queryset, query)
+        model = queryset.model
+        vector = pg_vector_sql(model, table_alias=model._meta.db_table)
+        tsquery = self.build_tsquery(tokens)
+        ts_query_sql = f"to_tsquery('{PG_SEARCH_CONFIG}', %s)"
+        return queryset.filter(
+            RawSQL(f"({vector}) @@ {ts_query_sql}", [tsquery], output_field=BooleanField())
+        ).annotate(**{
+            RANK_ANNOTATION: RawSQL(f"ts_rank({vector}, {ts_query_sql})", [tsquery], output_field=FloatField())
+        })
+
+
+SEARCH_BACKENDS = {
+    backend.name: backend
+    for backend in (IContainsSearchBackend, SQLiteFTS5SearchBackend, PostgresSearchBackend)
+}
+# 'auto' modunda veritabanı türüne göre tercih edilen backend
+VENDOR_BACKENDS = {'sqlite': 'sqlite_fts5', 'postgresql': 'postgresql'}
+
+_table_names_cache = {}
+
+
+def _table_names(using):
+    """Veritabanındaki tablo adları (FTS tablosu var mı kontrolü için, bağlantı başına bir kez)."""
+    names = _table_names_cache.get(using)
+    if names is None:
+        with connections[using].cursor() as cursor:
+            names = set(connections[using].introspection.table_names(cursor))
+        _table_names_cache[using] = names
+    return names
+
+
+def reset_cache():
+    """Tablo adı önbelleğini temizler (migration sonrası ve testler için)."""
+    _table_names_cache.clear()
+
+
+# --- SQLite Tetikleyici Bakımı ---
+def sqlite_trigger_statements(model):
+    """FTS5 tablosunu medya tablosuyla senkron tutan tetikleyiciler (0013 migration'ındakilerle aynı)."""
+    table = model._meta.db_table
+    fts = fts_table_name(model)
+    fields = searchable_fields(model)
+    columns = ", ".join(f'"{f}"' for f in fields)
+    new_values = ", ".join(f'new."{f}"' for f in fields)
+    old_values = ", ".join(f'old."{f}"' for f in fields)
+    return {
+        f"{fts}_ai": f"""CREATE TRIGGER IF NOT EXISTS "{fts}_ai" AFTER INSERT ON "{table}" BEGIN
+            INSERT INTO "{fts}"(rowid, {columns}) VALUES (new."id", {new_values});
+        END""",
+        f"{fts}_ad": f"""CREATE TRIGGER IF NOT EXISTS "{fts}_ad" AFTER DELETE ON "{table}" BEGIN
+            INSERT INTO "{fts}"("{fts}", rowid, {columns}) VALUES ('delete', old."id", {old_values});
+        END""",
+        f"{fts}_au": f"""CREATE TRIGGER IF NOT EXISTS "{fts}_au" AFTER UPDATE OF {columns} ON "{table}" BEGIN
+            INSERT INTO "{fts}"("{fts}", rowid, {columns}) VALUES ('delete', old."id", {old_values});
+            INSERT INTO "{fts}"(rowid, {columns}) VALUES (new."id", {new_values});
+        END""",
+    }
+
+
+def ensure_sqlite_triggers(using='default'):
+    """
+    SQLite'ta Django bazı şema değişikliklerinde tabloyu yeniden oluşturur (yeni tablo + kopyala + yeniden adlandır)
+    ve tetikleyiciler bu sırada kaybolur. post_migrate'te çağrılır: eksik tetikleyicileri yeniden oluşturur ve
+    aradaki değişiklikler kaçırılmış olabileceği için o modelin FTS indeksini yeniden inşa eder.
+    Oluşturulan tetikleyici sayısını döndürür.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return 0
+    reset_cache()
+    table_names = _table_names(using)
+    created = 0
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        existing_triggers = {row[0] for row in cursor.fetchall()}
+        for model in SEARCH_FIELDS:
+            fts = fts_table_name(model)
+            if fts not in table_names:
+                continue # FTS5 yok veya migration henüz çalışmadı
+            missing = {name: sql for name, sql in sqlite_trigger_statements(model).items() if name not in existing_triggers}
+            if not missing:
+                continue
+            for sql in missing.values():
+                cursor.execute(sql)
+            cursor.execute(f"""INSERT INTO "{fts}"("{fts}") VALUES ('rebuild')""")
+            created += len(missing)
+            logger.warning(f"{model.__name__} için {len(missing)} FTS tetikleyicisi yeniden oluşturuldu, indeks yeniden inşa edildi.")
+    return created
+
+
+def get_search_backend(model, using=None):
+    """
+    settings.FULLTEXT_SEARCH_BACKEND ('auto' | 'sqlite_fts5' | 'postgresql' | 'icontains') ile seçilen backend.
+    Seçilen backend bu veritabanında kullanılamıyorsa (örn: FTS5 derlenmemiş) icontains'e düşülür.
+    """
+    using = using or router.db_for_read(model)
+    name = getattr(settings, 'FULLTEXT_SEARCH_BACKEND', 'auto')
+    if name == 'auto':
+        name = VENDOR_BACKENDS.get(connections[using].vendor, 'icontains')
+    backend_class = SEARCH_BACKENDS.get(name)
+    if backend_class is None:
+        logger.warning(f"Bilinmeyen arama backend'i '{name}', icontains kullanılıyor.")
+        backend_class = IContainsSearchBackend
+    backend = backend_class()
+    if not backend.is_available(model, using):
+        logger.warning(f"Arama backend'i '{backend.name}' {model.__name__} için kullanılamıyor, icontains kullanılıyor.")
+        backend = IContainsSearchBackend()
+    return backend
+
+
+def search_queryset(queryset, query):
+    """Queryset'i tam metin aramayla filtreler; sonuçlar search_rank ile işaretlenir."""
+    backend = get_search_backend(queryset.model, using=queryset.db)
+    return backend.search(queryset, query)
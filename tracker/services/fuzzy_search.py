@@ -0,0 +1,181 @@
+# tracker/services/fuzzy_search.py
+# Kullanıcının kütüphanesinde yazım hatalarına toleranslı (fuzzy) başlık araması.
+# Başlıklar Türkçe'ye uygun şekilde küçük harfe çevrilir ve aksanlardan arındırılır ("Işık" -> "isik",
+# "Shingeki no Kyōjin" -> "shingeki no kyojin"), sonra kelime başı/sonu boşlukla doldurulmuş trigram'lara
+# (3'lü harf grupları) ayrılır. Trigram'lar TitleTrigram tablosunda önceden hesaplanmış tutulur (signals.py);
+# arama tek bir GROUP BY sorgusuyla ortak trigram sayısını bulur ve Jaccard benzerliğine göre sıralar
+# (PostgreSQL pg_trgm'in similarity() ile aynı ölçü).
+
+import logging
+import re
+import unicodedata
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Max
+from django.db.models.functions import Cast
+
+from ..models import Anime, Manga, Novel, Webtoon, TitleTrigram
+
+# Logger oluştur
+logger = logging.getLogger(__name__)
+
+# media_type -> Model (MediaStats/TitleTrigram.MEDIA_TYPE_CHOICES ile aynı)
+FUZZY_MODELS = {
+    'anime': Anime,
+    'webtoon': Webtoon,
+    'manga': Manga,
+    'novel': Novel,
+}
+
+DEFAULT_THRESHOLD = 0.3   # pg_trgm varsayılanı
+DUPLICATE_THRESHOLD = 0.5 # Ekleme sayfalarında "zaten listende olabilir" uyarısı için
+MAX_QUERY_LENGTH = 200
+
+# Türkçe büyük/küçük harf: "I" -> "ı", "İ" -> "i". Romanize başlıklarda ı/i ayrımı yazım hatası
+# kaynağı olduğundan ikisi de "i"ye katlanır. NFKD ile ayrışmayan harfler elle eşlenir.
+_FOLD_MAP = str.maketrans({
+    'I': 'i', 'İ': 'i', 'ı': 'i',
+    'ø': 'o', 'Ø': 'o', 'đ': 'd', 'Đ': 'd', 'ł': 'l', 'Ł': 'l',
+    'æ': 'ae', 'Æ': 'ae', 'œ': 'oe', 'Œ': 'oe',
+})
+_NON_WORD_RE = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def normalize_title(text):
+    """Türkçe'ye uygun küçük harf + aksan katlama; harf/rakam dışındaki karakterler boşluk olur."""
+    text = (text or '')[:MAX_QUERY_LENGTH].translate(_FOLD_MAP).casefold()
+    text = ''.join(ch for ch in unicodedata.normalize('NFKD', text) if not unicodedata.combining(ch))
+    return _NON_WORD_RE.sub(' ', text).strip()
+
+
+def title_trigrams(text):
+    """Başlığın trigram kümesi. Her kelime başta iki, sonda bir boşlukla doldurulur (pg_trgm gibi)."""
+    trigrams = set()
+    for word in normalize_title(text).split():
+        padded = f"  {word} "
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def media_type_for(model_or_instance):
+    model = model_or_instance if isinstance(model_or_instance, type) else model_or_instance.__class__
+    return model._meta.model_name
+
+
+# --- İndeks Bakımı ---
+def _trigram_rows(user_id, media_type, object_id, title):
+    trigrams = title_trigrams(title)
+    return [
+        TitleTrigram(user_id=user_id, media_type=media_type, object_id=object_id,
+                     trigram=trigram, trigram_count=len(trigrams))
+        for trigram in trigrams
+    ]
+
+
+def index_item(instance):
+    """Öğenin trigram'larını (yeniden) oluşturur: eski satırlar silinir, yenileri toplu eklenir."""
+    media_type = media_type_for(instance)
+    with transaction.atomic():
+        TitleTrigram.objects.filter(media_type=media_type, object_id=instance.pk).delete()
+        TitleTrigram.objects.bulk_create(_trigram_rows(instance.user_id, media_type, instance.pk, instance.title))
+
+
+def remove_item(instance):
+    """Silinen öğenin trigram'larını kaldırır."""
+    TitleTrigram.objects.filter(media_type=media_type_for(instance), object_id=instance.pk).delete()
+
+
+def rebuild_index(user_ids=None, batch_size=2000):
+    """
+    Tüm (veya verilen kullanıcıların) trigram indeksini yeniden oluşturur.
+    bulk_create/update sinyal göndermediği için toplu işlemlerden sonra çağrılmalıdır. Eklenen satır sayısını döndürür.
+    """
+    total = 0
+    with transaction.atomic():
+        existing = TitleTrigram.objects.all()
+        if user_ids is not None:
+            existing = existing.filter(user_id__in=user_ids)
+        existing.delete()
+        for media_type, model in FUZZY_MODELS.items():
+            items = model.objects.order_by()
+            if user_ids is not None:
+                items = items.filter(user_id__in=user_ids)
+            batch = []
+            for pk, user_id, title in items.values_list('pk', 'user_id', 'title').iterator(chunk_size=batch_size):
+                batch.extend(_trigram_rows(user_id, media_type, pk, title))
+                if len(batch) >= batch_size:
+                    TitleTrigram.objects.bulk_create(batch, batch_size=batch_size)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                TitleTrigram.objects.bulk_create(batch, batch_size=batch_size)
+                total += len(batch)
+    logger.info(f"Başlık trigram indeksi yeniden oluşturuldu: {total} satır.")
+    return total
+
+
+# --- Arama ---
+@dataclass
+class FuzzyMatch:
+    """Fuzzy arama sonucu: öğe, türü ve 0-1 arası benzerlik."""
+    item: object
+    media_type: str
+    similarity: float
+
+    @property
+    def url_name(self):
+        return f"{self.media_type}_detail"
+
+
+def similar_item_ids(user, query, media_types=None, threshold=DEFAULT_THRESHOLD, limit=20, exclude=None):
+    """
+    Benzer başlıklı öğelerin [(media_type, object_id, similarity), ...] listesi (benzerliğe göre azalan).
+    Tek sorgu: (user, trigram) indeksinden ortak trigram'lar sayılır; Jaccard = ortak / (q + n - ortak).
+    exclude: [(media_type, object_id), ...] sonuçlardan çıkarılacak öğeler.
+    """
+    query_trigrams = title_trigrams(query)
+    if not query_trigrams or user is None or not user.is_authenticated:
+        return []
+    query_count = len(query_trigrams)
+    rows = TitleTrigram.objects.filter(user=user, trigram__in=query_trigrams)
+    if media_types:
+        rows = rows.filter(media_type__in=media_types)
+    rows = (
+        rows.order_by()
+        .values('media_type', 'object_id')
+        .annotate(shared=Count('pk'), item_count=Max('trigram_count'))
+        .annotate(similarity=Cast(F('shared'), FloatField()) / (F('item_count') + query_count - F('shared')))
+        .filter(similarity__gte=threshold)
+        .order_by('-similarity', 'media_type', 'object_id')
+    )
+    excluded = set(exclude or [])
+    results = []
+    for row in rows[:limit + len(excluded)]:
+        key = (row['media_type'], row['object_id'])
+        if key not in excluded:
+            results.append((row['media_type'], row['object_id'], row['similarity']))
+    return results[:limit]
+
+
+def find_similar(user, query, media_types=None, threshold=DEFAULT_THRESHOLD, limit=20, exclude=None):
+    """similar_item_ids sonuçlarını model nesneleriyle (tür başına tek sorgu) FuzzyMatch listesi olarak döndürür."""
+    ids = similar_item_ids(user, query, media_types=media_types, threshold=threshold, limit=limit, exclude=exclude)
+    pks_by_type = {}
+    for media_type, object_id, _ in ids:
+        pks_by_type.setdefault(media_type, []).append(object_id)
+    items = {
+        (media_type, item.pk): item
+        for media_type, pks in pks_by_type.items()
+        for item in FUZZY_MODELS[media_type].objects.filter(user=user, pk__in=pks)
+    }
+    return [
+        FuzzyMatch(items[(media_type, object_id)], media_type, similarity)
+        for media_type, object_id, similarity in ids
+        if (media_type, object_id) in items # İndeks eskiyse silinmiş öğeler atlanır
+    ]
+
+
+def find_possible_duplicates(user, title, media_types, limit=5):
+    """Ekleme sayfaları için: listede zaten olabilecek (farklı ID ile eklenmiş) benzer başlıklar."""
+    return find_similar(user, title, media_types=media_types, threshold=DUPLICATE_THRESHOLD, limit=limit)
@@ -0,0 +1,182 @@
+# tracker/services/http_client.py
+# Jikan ve MangaDex servisleri için ortak, thread-safe HTTP istemci katmanı.
+# Host başına keep-alive bağlantı havuzu, settings.py'den ayarlanabilir havuz/timeout değerleri
+# ve istek başına gecikme (latency) metrikleri sağlar. İstemci adıyla eşleşen bir rate limit
+# bucket'ı varsa (rate_limiter) istekten önce bütçe alınır, 429 yanıtları bucket'a geri beslenir.
+
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+from . import rate_limiter
+
+# Logger oluştur
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = 'DjangoListeApp/0.1 (Contact: YourEmail@example.com)' # E-postanı güncelle
+
+# settings.API_HTTP_CLIENT tanımlı değilse (veya eksikse) kullanılacak varsayılanlar
+DEFAULT_HTTP_CLIENT_SETTINGS = {
+    'POOL_CONNECTIONS': 4,   # Önbellekte tutulacak host havuzu sayısı
+    'POOL_MAXSIZE': 10,      # Host başına açık tutulacak en fazla bağlantı (thread sayısı kadar olmalı)
+    'CONNECT_TIMEOUT': 5,    # Bağlantı kurma zaman aşımı (saniye)
+    'READ_TIMEOUT': 15,      # Yanıt okuma zaman aşımı (saniye)
+    'MAX_RETRIES': 0,        # Bağlantı hatalarında urllib3 seviyesinde tekrar deneme sayısı
+}
+
+
+def get_http_client_settings():
+    """Varsayılan ayarları settings.API_HTTP_CLIENT ile birleştirip döndürür."""
+    config = DEFAULT_HTTP_CLIENT_SETTINGS.copy()
+    config.update(getattr(settings, 'API_HTTP_CLIENT', {}) or {})
+    return config
+
+
+# --- Gecikme Metrikleri ---
+class RequestMetrics:
+    """Host bazında istek sayısı, hata sayısı ve gecikme (ms) istatistiklerini thread-safe tutar."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def record(self, host, elapsed_ms, status_code=None, error=False):
+        """Tek bir isteğin sonucunu metriklere ekler."""
+        with self._lock:
+            stats = self._hosts.setdefault(host, {
+                'count': 0, 'errors': 0, 'total_ms': 0.0,
+                'max_ms': 0.0, 'last_ms': 0.0, 'status_codes': {},
+            })
+            stats['count'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['last_ms'] = elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            if error:
+                stats['errors'] += 1
+            if status_code is not None:
+                stats['status_codes'][status_code] = stats['status_codes'].get(status_code, 0) + 1
+
+    def snapshot(self):
+        """Metriklerin bir kopyasını (ortalama gecikme dahil) döndürür."""
+        with self._lock:
+            result = {}
+            for host, stats in self._hosts.items():
+                copied = dict(stats, status_codes=dict(stats['status_codes']))
+                copied['avg_ms'] = (stats['total_ms'] / stats['count']) if stats['count'] else 0.0
+                result[host] = copied
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._hosts.clear()
+
+
+# --- Havuzlu HTTP İstemcisi ---
+class PooledHTTPClient:
+    """
+    Tek bir upstream (örn: Jikan) için keep-alive bağlantı havuzu kullanan HTTP istemcisi.
+    Bağlantı havuzu (HTTPAdapter/urllib3 PoolManager) tüm thread'ler arasında paylaşılır,
+    requests.Session nesnesi ise (cookie/header durumu thread-safe olmadığı için) thread başına oluşturulur.
+    """
+
+    def __init__(self, name, default_headers=None, config=None):
+        self.name = name
+        self.config = config or get_http_client_settings()
+        self.default_headers = {'User-Agent': DEFAULT_USER_AGENT}
+        self.default_headers.update(default_headers or {})
+        self.timeout = (self.config['CONNECT_TIMEOUT'], self.config['READ_TIMEOUT'])
+        self.metrics = RequestMetrics()
+        self._adapter = HTTPAdapter(
+            pool_connections=self.config['POOL_CONNECTIONS'],
+            pool_maxsize=self.config['POOL_MAXSIZE'],
+            max_retries=self.config['MAX_RETRIES'],
+        )
+        self._local = threading.local()
+
+    def _get_session(self):
+        """Mevcut thread'in session'ını döndürür (yoksa paylaşılan adapter ile oluşturur)."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.default_headers)
+            # Aynı adapter'ı bağlamak, bağlantı havuzunun thread'ler arasında paylaşılmasını sağlar
+            session.mount('https://', self._adapter)
+            session.mount('http://', self._adapter)
+            self._local.session = session
+        return session
+
+    @property
+    def bucket(self):
+        """Bu upstream için tanımlı token bucket (settings.API_RATE_LIMITS), yoksa None."""
+        return rate_limiter.get_bucket(self.name)
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        """
+        GET isteği yapar ve gecikmeyi metriklere kaydeder.
+        Rate limit bütçesi tükenmişse sadece gerektiği kadar bekler; 429 yanıtında
+        Retry-After süresi bucket'a bildirilir. requests istisnaları çağırana iletilir.
+        """
+        host = urlsplit(url).netloc
+        bucket = self.bucket
+        if bucket is not None:
+            bucket.acquire() # Bekleme süresi gecikme metriğine dahil edilmez
+        start = time.perf_counter()
+        status_code = None
+        error = False
+        try:
+            response = self._get_session().get(
+                url, params=params, headers=headers, timeout=timeout or self.timeout
+            )
+            status_code = response.status_code
+            error = status_code >= 400
+            if status_code == 429 and bucket is not None:
+                bucket.penalize(rate_limiter.parse_retry_after(
+                    response.headers.get('Retry-After'), default=bucket.default_retry_after
+                ))
+            return response
+        except requests.exceptions.RequestException:
+            error = True
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.metrics.record(host, elapsed_ms, status_code=status_code, error=error)
+            logger.debug(f"{self.name} HTTP GET {host} -> {status_code} ({elapsed_ms:.1f} ms)")
+
+    def close(self):
+        """Havuzdaki tüm bağlantıları kapatır."""
+        self._adapter.close()
+
+
+# --- İstemci Kayıt Defteri (Servisler arasında paylaşılır) ---
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name, default_headers=None):
+    """Verilen isim için paylaşılan istemciyi döndürür (yoksa oluşturur)."""
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = PooledHTTPClient(name, default_headers=default_headers)
+                _clients[name] = client
+    return client
+
+
+def get_metrics():
+    """Tüm istemcilerin metriklerini {istemci_adı: {host: {...}}} şeklinde döndürür."""
+    return {name: client.metrics.snapshot() for name, client in list(_clients.items())}
+
+
+def close_all():
+    """Tüm paylaşılan istemcilerin bağlantılarını kapatır ve kayıt defterini temizler."""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
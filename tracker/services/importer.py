@@ -0,0 +1,452 @@
+# tracker/services/importer.py
+# Toplu içe aktarım: kendi dışa aktarım dosyalarımız (CSV / JSON Lines), MyAnimeList XML listeleri ve
+# MangaDex tarzı JSON listeleri. Satırlar AnimeForm/MangaForm/NovelForm/WebtoonForm kurallarıyla doğrulanır
+# (form her satır için yeniden oluşturulmaz; alanlar ve clean() tek form örneği üzerinden çalıştırılır),
+# geçerli satırlar parça parça bulk_create ile eklenir. Etiketler toplu çözülür: mevcutlar tek sorgu,
+# yeniler tek bulk insert, ilişki (through) satırları tek bulk insert.
+# bulk_create sinyal göndermez: MediaStats, trigram indeksi, dashboard cache ve etiket facet sürümleri içe aktarım sonunda
+# kullanıcı için bir kez yeniden oluşturulur (FTS5 tabloları veritabanı tetikleyicileriyle güncellenir).
+# Boyut sınırları (settings.LIBRARY_IMPORT): yükleme boyutu ImportForm'da, açılmış gzip boyutu okurken parça parça
+# denetlenir (gzip bombası worker'ın belleğini dolduramaz). Bozuk/kesik gzip de ImportFormatError olur.
+
+import csv
+import datetime
+import gzip
+import io
+import json
+import logging
+import uuid
+import xml.etree.ElementTree as ET
+import zlib
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.forms.utils import ErrorDict
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from taggit.models import Tag, TaggedItem
+
+from ..forms import AnimeForm, MangaForm, NovelForm, WebtoonForm
+from ..models import Anime, Manga, Novel, Webtoon, MediaItem
+from . import dashboard_cache, fuzzy_search, stats_service, tag_facets
+
+# Logger oluştur
+logger = logging.getLogger(__name__)
+
+# media_type -> (Model, Form)
+IMPORT_TARGETS = {
+    'anime': (Anime, AnimeForm),
+    'webtoon': (Webtoon, WebtoonForm),
+    'manga': (Manga, MangaForm),
+    'novel': (Novel, NovelForm),
+}
+DEFAULT_BATCH_SIZE = 500
+GZIP_READ_CHUNK_SIZE = 1024 * 1024
+
+# settings.LIBRARY_IMPORT tanımlı değilse (veya eksikse) kullanılacak varsayılanlar
+DEFAULT_IMPORT_SETTINGS = {
+    'MAX_UPLOAD_SIZE': 20 * 1024 * 1024,         # Yüklenen dosya (bayt); ImportForm denetler
+    'MAX_DECOMPRESSED_SIZE': 100 * 1024 * 1024,  # .gz dosyasının açılmış hali (bayt)
+}
+MAX_REPORTED_ERRORS = 50 # Sonuçta saklanan satır hatası sayısı (geri kalanlar sadece sayılır)
+TAG_NAME_MAX_LENGTH = Tag._meta.get_field('name').max_length
+
+# Form dışındaki, içe aktarımda korunan alanlar (dış ID'ler ve eklenme zamanı)
+EXTRA_FIELDS = ('mal_id', 'mangadex_id', 'added_date')
+
+# Durum değerleri: kendi değerlerimiz ve etiketlerimiz + MAL (metin/sayı kodu) + MangaDex okuma durumları
+STATUS_ALIASES = {
+    **{value.casefold(): value for value, _ in MediaItem.STATUS_CHOICES},
+    **{str(label).casefold(): value for value, label in MediaItem.STATUS_CHOICES},
+    'reading': 'Watching', 're_reading': 'Watching', 'rewatching': 'Watching', '1': 'Watching',
+    'completed': 'Completed', '2': 'Completed',
+    'on-hold': 'On Hold', 'on_hold': 'On Hold', '3': 'On Hold',
+    'dropped': 'Dropped', '4': 'Dropped',
+    'plan to read': 'Plan to Watch', 'plan_to_read': 'Plan to Watch', 'plan_to_watch': 'Plan to Watch', '6': 'Plan to Watch',
+}
+
+
+class ImportFormatError(ValueError):
+    """Dosya okunamadı veya biçimi tanınmadı."""
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    skipped: int = 0 # Listede zaten olan (dış ID veya başlık) ya da dosyada tekrar eden satırlar
+    invalid: int = 0
+    errors: list = field(default_factory=list) # [(satır no, mesaj), ...] ilk MAX_REPORTED_ERRORS tanesi
+    tags_created: int = 0
+
+    def add_error(self, row_number, message):
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row_number, message))
+
+
+# --- Dosya Okuyucular (her biri alan adı -> ham değer sözlükleri üretir) ---
+def _csv_header_map(media_type):
+    """Kendi CSV dışa aktarımımızın Türkçe başlıkları -> alan adları (alan adlarının kendisi de kabul edilir)."""
+    from ..views.export_views import LIBRARY_EXPORT_MODELS # Döngüsel import'u önlemek için burada
+    fields_map = next(fields for name, _, fields in LIBRARY_EXPORT_MODELS if name == media_type)
+    header_map = {header: name for name, header in fields_map.items()}
+    header_map.update({'Durum': 'status', 'ID': None}) # Durum etiketi STATUS_ALIASES ile çözülür; ID yok sayılır
+    return header_map
+
+
+def read_csv_rows(text, media_type):
+    """Noktalı virgüllü (bizim dışa aktarım) veya virgüllü CSV."""
+    text = text.lstrip("\ufeff")
+    first_line = text.split("\n", 1)[0]
+    delimiter = ";" if first_line.count(";") >= first_line.count(",") else ","
+    header_map = _csv_header_map(media_type)
+    reader = csv.reader(io.StringIO(text), delimiter=delimiter)
+    headers = next(reader, None)
+    if not headers:
+        raise ImportFormatError("CSV dosyası boş.")
+    keys = [header_map.get(header.strip(), header.strip()) for header in headers]
+    for values in reader:
+        if any(values):
+            row = {key: value for key, value in zip(keys, values) if key}
+            if isinstance(row.get('tags'), str): # Dışa aktarımda ", " ile birleştirilir; boşluklu etiketler korunur
+                row['tags'] = [name.strip() for name in row['tags'].split(",") if name.strip()]
+            yield row
+
+
+def read_json_rows(text):
+    """
+    JSON Lines (bizim dışa aktarım) veya JSON dizisi/nesnesi.
+    MangaDex tarzı: {"data": [{"id": ..., "attributes": {"title": {"en": ...}}}], "statuses": {id: durum}}
+    Tek belge yolu sadece dizi veya "data" listesi olan nesne için kullanılır; tek satırlık JSON Lines
+    ({"title": ...}) de tek bir nesne olarak çözüldüğü için satır olarak okunur.
+    """
+    stripped = text.strip()
+    payload = None
+    if stripped.startswith(("[", "{")):
+        try:
+            payload = json.loads(stripped)
+        except json.JSONDecodeError as e:
+            if stripped.startswith("["):
+                raise ImportFormatError(f"JSON okunamadı: {e}")
+            # Birden fazla satır: JSON Lines olarak okunur (hatalı satır orada bildirilir)
+    if isinstance(payload, list) or isinstance(payload, dict) and isinstance(payload.get("data"), list):
+        statuses = payload.get("statuses", {}) if isinstance(payload, dict) else {}
+        entries = payload["data"] if isinstance(payload, dict) else payload
+        for entry in entries:
+            yield _mangadex_row(entry, statuses)
+        return
+    if isinstance(payload, dict) and "\n" in stripped:
+        # Birden fazla satıra yayılmış tek nesne: ne MangaDex belgesi ne JSON Lines
+        raise ImportFormatError("JSON nesnesinde 'data' listesi yok (MangaDex JSON veya JSON Lines bekleniyor).")
+    for line_number, line in enumerate(stripped.splitlines(), start=1):
+        if line.strip():
+            try:
+                yield _mangadex_row(json.loads(line), {})
+            except json.JSONDecodeError as e:
+                raise ImportFormatError(f"JSON Lines {line_number}. satır okunamadı: {e}")
+
+
+def _mangadex_row(entry, statuses):
+    """Bizim JSONL satırı olduğu gibi; MangaDex varlığı (id + attributes) alan adlarına çevrilir."""
+    if not isinstance(entry, dict):
+        return {}
+    attributes = entry.get("attributes")
+    if not isinstance(attributes, dict):
+        row = dict(entry)
+        row.pop("id", None) # Bizim dışa aktarımdaki birincil anahtar
+        if "mangadex_id" not in row and _is_uuid(entry.get("id")):
+            row["mangadex_id"] = entry["id"]
+        return row
+    title = attributes.get("title") or {}
+    if isinstance(title, dict): # Çok dilli başlık: önce İngilizce, yoksa ilk dil
+        title = title.get("en") or next(iter(title.values()), "")
+    tags = [
+        (tag.get("attributes", {}).get("name") or {}).get("en")
+        for tag in attributes.get("tags", []) if isinstance(tag, dict)
+    ]
+    return {
+        "mangadex_id": entry.get("id"),
+        "title": title,
+        "status": statuses.get(entry.get("id")) or entry.get("status") or attributes.get("readingStatus"),
+        "tags": [name for name in tags if name],
+    }
+
+
+def _is_uuid(value):
+    try:
+        uuid.UUID(str(value))
+        return True
+    except ValueError:
+        return False
+
+
+# MAL XML etiketi -> alan adı (anime ve manga listeleri)
+MAL_XML_FIELDS = {
+    'series_animedb_id': 'mal_id', 'series_title': 'title', 'series_episodes': 'total_episodes',
+    'my_watched_episodes': 'episodes_watched',
+    'manga_mangadb_id': 'mal_id', 'manga_title': 'title', 'manga_chapters': 'total_chapters',
+    'manga_volumes': 'total_volumes', 'my_read_chapters': 'chapters_read', 'my_read_volumes': 'volumes_read',
+    'my_start_date': 'start_date', 'my_finish_date': 'end_date', 'my_score': 'rating',
+    'my_status': 'status', 'my_tags': 'tags', 'my_comments': 'notes',
+}
+
+
+def read_mal_xml_rows(data):
+    """MyAnimeList liste dışa aktarımı (<myanimelist><anime>... veya <manga>...). Boş/0 değerler boş sayılır."""
+    try:
+        events = ET.iterparse(io.BytesIO(data), events=("end",))
+        for _, element in events:
+            if element.tag not in ("anime", "manga"):
+                continue
+            row = {}
+            for child in element:
+                name = MAL_XML_FIELDS.get(child.tag)
+                value = (child.text or "").strip()
+                if name and value not in ("", "0", "0000-00-00"):
+                    row[name] = value
+            element.clear() # Büyük listelerde belleği serbest bırak
+            yield row
+    except ET.ParseError as e:
+        raise ImportFormatError(f"XML okunamadı: {e}")
+
+
+def get_import_settings():
+    """Varsayılan ayarları settings.LIBRARY_IMPORT ile birleştirip döndürür."""
+    config = DEFAULT_IMPORT_SETTINGS.copy()
+    config.update(getattr(settings, 'LIBRARY_IMPORT', {}) or {})
+    return config
+
+
+def decompress_gzip(data, max_size=None):
+    """gzip verisini parça parça açar; max_size aşılırsa veya dosya bozuk/kesikse ImportFormatError."""
+    max_size = max_size or get_import_settings()['MAX_DECOMPRESSED_SIZE']
+    output = io.BytesIO()
+    try:
+        with gzip.GzipFile(fileobj=io.BytesIO(data)) as f:
+            while chunk := f.read(GZIP_READ_CHUNK_SIZE):
+                if output.tell() + len(chunk) > max_size:
+                    raise ImportFormatError(f"Sıkıştırılmış dosyanın açılmış hali çok büyük (en fazla {max_size // (1024 * 1024)} MB).")
+                output.write(chunk)
+    except (OSError, EOFError, zlib.error) as e: # gzip.BadGzipFile bir OSError'dır
+        raise ImportFormatError(f"Sıkıştırılmış dosya açılamadı (bozuk veya eksik): {e}")
+    return output.getvalue()
+
+
+def read_rows(data, filename, media_type):
+    """Dosya adına/içeriğine göre uygun okuyucuyu seçer. gzip ile sıkıştırılmış dosyalar (MAL .xml.gz) açılır."""
+    if data[:2] == b"\x1f\x8b":
+        data = decompress_gzip(data)
+        filename = filename[:-3] if filename.endswith(".gz") else filename
+    name = filename.lower()
+    if name.endswith(".xml") or data.lstrip()[:5] == b"<?xml":
+        return read_mal_xml_rows(data)
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        raise ImportFormatError("Dosya UTF-8 olarak okunamadı.")
+    if name.endswith((".json", ".jsonl", ".ndjson")):
+        return read_json_rows(text)
+    if name.endswith(".csv"):
+        return read_csv_rows(text, media_type)
+    raise ImportFormatError("Desteklenmeyen dosya türü (CSV, JSON, JSON Lines veya MAL XML olmalı).")
+
+
+# --- Doğrulama ---
+class RowValidator:
+    """
+    Formun alan kurallarını ve clean() çapraz kontrollerini tek form örneği üzerinden satır satır uygular.
+    Her satır için ModelForm oluşturmak (alan kopyalama, widget'lar, model full_clean ve unique sorguları)
+    yerine alanların clean()'i doğrudan çağrılır; hata mesajları formdakiyle aynıdır.
+    """
+
+    def __init__(self, form_class):
+        self.form = form_class()
+        self.model = form_class._meta.model
+        self.fields = self.form.fields
+        # Dosyada olmayan zorunlu alanlar için model varsayılanı (örn: episodes_watched=0, status)
+        self.defaults = {}
+        for name in self.fields:
+            model_field = self.model._meta.get_field(name) if name != 'tags' else None
+            if model_field is not None and model_field.has_default():
+                self.defaults[name] = model_field.get_default()
+        self.extra_fields = [name for name in EXTRA_FIELDS if _has_field(self.model, name)]
+
+    def validate(self, raw):
+        """(temizlenmiş veri, hata sözlüğü) döndürür. Hata sözlüğü boşsa satır geçerlidir."""
+        form = self.form
+        form.cleaned_data = {}
+        form._errors = ErrorDict()
+        for name, form_field in self.fields.items():
+            value = raw.get(name)
+            if value in (None, "") and name in self.defaults:
+                value = self.defaults[name]
+            elif name == 'tags' and isinstance(value, (list, tuple)):
+                value = _tags_to_string(value)
+            elif name == 'status' and value is not None:
+                value = STATUS_ALIASES.get(str(value).strip().casefold(), value)
+            try:
+                form.cleaned_data[name] = form_field.clean(value)
+            except ValidationError as e:
+                form.add_error(name, e)
+        try:
+            form.clean()
+        except ValidationError as e:
+            form.add_error(None, e)
+
+        cleaned = form.cleaned_data
+        for name in self.extra_fields:
+            value = raw.get(name)
+            if value in (None, ""):
+                continue
+            try:
+                cleaned[name] = _clean_extra(self.model, name, value)
+            except (ValidationError, ValueError):
+                form.add_error(None, f"Geçersiz {name}: {value}")
+        return cleaned, form._errors
+
+
+def _has_field(model, name):
+    return any(f.name == name for f in model._meta.concrete_fields)
+
+
+def _tags_to_string(names):
+    # Virgül veya boşluk içeren etiketler tırnaklanır (taggit parse_tags kuralları)
+    return ", ".join(f'"{name}"' if ("," in name or " " in name) else name for name in names if name)
+
+
+def _clean_extra(model, name, value):
+    if name == 'added_date':
+        parsed = parse_datetime(str(value).replace(" ", "T", 1)) or parse_date(str(value))
+        if parsed is None:
+            raise ValueError(value)
+        if not hasattr(parsed, 'hour'): # Sadece tarih
+            parsed = datetime.datetime.combine(parsed, datetime.time.min)
+        return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+    return model._meta.get_field(name).to_python(value)
+
+
+def _error_text(errors):
+    return "; ".join(
+        f"{'' if name == '__all__' else name + ': '}{' '.join(messages)}" for name, messages in errors.items()
+    )
+
+
+# --- Ekleme ---
+def _resolve_tags(names):
+    """
+    Etiket adları -> Tag nesneleri. Mevcutlar tek sorguyla alınır, eksikler benzersiz slug'larla tek
+    bulk insert ile oluşturulur. (Tag sözlüğü, oluşturulan sayısı) döndürür.
+    """
+    tags = {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+    missing = [name for name in names if name not in tags]
+    if not missing:
+        return tags, 0
+    tag_helper = Tag()
+    slugs = {name: tag_helper.slugify(name) for name in missing}
+    taken = set(Tag.objects.filter(slug__in=slugs.values()).values_list('slug', flat=True))
+    new_tags = []
+    for name in missing:
+        slug, i = slugs[name], 1
+        while slug in taken: # taggit ile aynı çakışma çözümü (slug_1, slug_2, ...)
+            slug = tag_helper.slugify(name, i)
+            i += 1
+        taken.add(slug)
+        new_tags.append(Tag(name=name, slug=slug))
+    Tag.objects.bulk_create(new_tags)
+    # Bazı veritabanları bulk_create'te pk döndürmez; adlarla tekrar okunur
+    tags.update({tag.name: tag for tag in Tag.objects.filter(name__in=missing)})
+    return tags, len(new_tags)
+
+
+def _insert_batch(model, content_type, batch, result):
+    """[(öğe, etiket adları), ...] parçasını ekler: öğeler, etiketler ve ilişki satırları birer bulk insert."""
+    with transaction.atomic():
+        items = model.objects.bulk_create([item for item, _ in batch])
+        tag_names = sorted({name for _, names in batch for name in names})
+        if tag_names:
+            tags, created_count = _resolve_tags(tag_names)
+            result.tags_created += created_count
+            TaggedItem.objects.bulk_create([
+                TaggedItem(content_type=content_type, object_id=item.pk, tag=tags[name])
+                for item, (_, names) in zip(items, batch) for name in names
+            ], ignore_conflicts=True)
+    result.created += len(items)
+
+
+def import_items(user, media_type, rows, batch_size=DEFAULT_BATCH_SIZE, on_batch=None):
+    """
+    Satırları (alan adı -> ham değer) doğrulayıp kullanıcının listesine toplu ekler.
+    Listede zaten olan öğeler (aynı dış ID veya aynı başlık) ve dosyadaki tekrarlar atlanır.
+    Dış ID başka bir kullanıcıda kayıtlıysa (alanlar genel olarak benzersiz) öğe ID'siz eklenir.
+    on_batch(işlenen satır sayısı, result): her parça eklendikten sonra çağrılır (arka plan işi ilerlemesi).
+    """
+    model, form_class = IMPORT_TARGETS[media_type]
+    validator = RowValidator(form_class)
+    content_type = ContentType.objects.get_for_model(model)
+    external_fields = [name for name in ('mal_id', 'mangadex_id') if name in validator.extra_fields]
+    result = ImportResult()
+
+    # Mevcut başlıklar ve dış ID'ler (tekrar kontrolü için, tek sorgu)
+    existing = model.objects.filter(user=user).values_list('title', *external_fields)
+    seen_titles = {row[0].casefold() for row in existing}
+    seen_external = {(name, value) for row in existing for name, value in zip(external_fields, row[1:]) if value is not None}
+
+    batch = []
+    row_number = 0
+    for row_number, raw in enumerate(rows, start=1):
+        cleaned, errors = validator.validate(raw or {})
+        if errors:
+            result.add_error(row_number, _error_text(errors))
+            continue
+        title_key = cleaned['title'].casefold()
+        external = [(name, cleaned[name]) for name in external_fields if cleaned.get(name) is not None]
+        if title_key in seen_titles or any(key in seen_external for key in external):
+            result.skipped += 1
+            continue
+        seen_titles.add(title_key)
+        seen_external.update(external)
+        tag_names = [name[:TAG_NAME_MAX_LENGTH] for name in cleaned.pop('tags', None) or []]
+        batch.append((model(user=user, **cleaned), tag_names))
+        if len(batch) >= batch_size:
+            _flush(model, content_type, batch, external_fields, result)
+            batch = []
+            if on_batch:
+                on_batch(row_number, result)
+    if batch:
+        _flush(model, content_type, batch, external_fields, result)
+    if on_batch:
+        on_batch(row_number, result)
+
+    if result.created:
+        # bulk_create sinyal göndermez: türetilmiş veriler kullanıcı için bir kez yenilenir
+        stats_service.rebuild_user_stats(user.pk, media_types=[media_type])
+        fuzzy_search.rebuild_index(user_ids=[user.pk])
+        dashboard_cache.bump_user_version(user.pk)
+        tag_facets.invalidate(user.pk, media_type)
+    logger.info(
+        f"İçe aktarım ({media_type}, user_id={user.pk}): {result.created} eklendi, "
+        f"{result.skipped} atlandı, {result.invalid} geçersiz, {result.tags_created} yeni etiket."
+    )
+    return result
+
+
+def _flush(model, content_type, batch, external_fields, result):
+    # Dış ID'ler tüm kullanıcılar arasında benzersiz: başka kullanıcıda olanlar parça başına tek sorguyla bulunur
+    for name in external_fields:
+        values = [getattr(item, name) for item, _ in batch if getattr(item, name) is not None]
+        if values:
+            taken = set(model.objects.filter(**{f"{name}__in": values}).values_list(name, flat=True))
+            for item, _ in batch:
+                if getattr(item, name) in taken:
+                    setattr(item, name, None)
+    _insert_batch(model, content_type, batch, result)
+
+
+def import_file(user, media_type, data, filename, batch_size=DEFAULT_BATCH_SIZE):
+    """Dosya içeriğini (bytes) okuyup import_items ile ekler. Biçim hatasında ImportFormatError fırlatır."""
+    if media_type not in IMPORT_TARGETS:
+        raise ImportFormatError(f"Bilinmeyen medya türü: '{media_type}'.")
+    return import_items(user, media_type, read_rows(data, filename, media_type), batch_size=batch_size)
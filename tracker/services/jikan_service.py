@@ -1,72 +1,86 @@
 # tracker/jikan_service.py
-# İyileştirmeler: Logging, Hata Yönetimi (404, 429), time.sleep, Ortak Map Fonksiyonu, SFW filtre, .get() kullanımı iyileştirildi.
+# İyileştirmeler: Logging, Hata Yönetimi (404, 429), Ortak Map Fonksiyonu, SFW filtre, .get() kullanımı iyileştirildi.
+# İstekler ortak havuzlu HTTP istemcisi (http_client) üzerinden yapılır (keep-alive bağlantılar).
+# Rate limit: sabit time.sleep yerine 'jikan' token bucket'ı (settings.API_RATE_LIMITS) kullanılır.
+# search_* ve get_*_details sonuçları response_cache ile önbelleğe alınır (settings.API_RESPONSE_CACHE).
+# Her fonksiyonun async (httpx) karşılığı vardır: asearch_anime, aget_anime_details, asearch_novel, aget_novel_details.
+# Senkron ve async sürümler aynı URL/yanıt işleme fonksiyonlarını ve aynı önbellek kayıtlarını paylaşır.
 
 import requests
-import time
+import httpx
 import json
 import logging
 from django.conf import settings
 from urllib.parse import urlencode, quote # quote path parametreleri için
 
+from . import http_client, async_http_client
+from .response_cache import cached_api_call, KIND_SEARCH, KIND_DETAIL
+
 # Logger oluştur
 logger = logging.getLogger(__name__)
 
 # Jikan API base URL (settings.py'den)
 JIKAN_BASE_URL = settings.JIKAN_API_URL
 
-# Opsiyonel: requests.Session kullanımı
-# session = requests.Session()
-# session.headers.update({
-#     'User-Agent': 'DjangoListeApp/0.1 (Contact: YourEmail@example.com)' # E-postanı güncelle
-# })
+# Paylaşılan HTTP istemcisinin adı (bağlantı havuzu ve metrikler bu isimle tutulur)
+JIKAN_CLIENT_NAME = 'jikan'
+
+# --- İstek/Yanıt Yardımcıları (senkron ve async istekler için ortak) ---
+def _build_jikan_url(endpoint, params=None):
+    """Endpoint ve query parametrelerinden güvenli tam URL'i oluşturur."""
+    safe_endpoint = "/".join([quote(part, safe='') for part in endpoint.split('/')])
+    url = f"{JIKAN_BASE_URL}/{safe_endpoint}"
+    if params:
+        query_string = urlencode(params, doseq=True, safe='[]/:=')
+        return f"{url}?{query_string}"
+    return url
+
+def _check_jikan_status(status_code, full_url):
+    """404 ve 429 durumlarını loglar. Yanıt işlenmeye devam etmeliyse True döner."""
+    if status_code == 404:
+        logger.info(f"Jikan API 404 Not Found: {full_url}")
+        return False
+
+    if status_code == 429:
+        # Retry-After süresi http istemcisi tarafından 'jikan' bucket'ına bildirildi
+        logger.warning(f"Jikan API Rate Limit Aşıldı (429) - URL: {full_url}")
+        return False
+    return True
+
+def _validate_jikan_json(json_response, endpoint, params, full_url):
+    """JSON yanıtında 'data' anahtarını kontrol eder. Geçersizse None (arama için boş sonuç) döner."""
+    is_search_endpoint = ("anime" in endpoint or "manga" in endpoint) and params and 'q' in params
+    if 'data' not in json_response:
+        if not is_search_endpoint:
+             logger.warning(f"Jikan API yanıtında 'data' anahtarı bulunamadı: {full_url}")
+             return None
+        else:
+             logger.info(f"Jikan API araması 'data' anahtarı olmadan döndü (boş sonuç varsayılır): {full_url}")
+             return {'data': []}
+    elif not json_response['data'] and not is_search_endpoint:
+         logger.warning(f"Jikan API yanıtında 'data' boş geldi (detay için): {full_url}")
+         return None
+
+    return json_response
 
 # Genel Jikan istek fonksiyonu (Logging, Hata Yönetimi, Rate Limit ile güncellendi)
 def _make_jikan_request(endpoint, params=None):
     """Jikan API'na güvenli GET isteği yapar. Hata veya bulunamazsa None döner."""
-    safe_endpoint = "/".join([quote(part, safe='') for part in endpoint.split('/')])
-    url = f"{JIKAN_BASE_URL}/{safe_endpoint}"
-    headers = {
-        'User-Agent': 'DjangoListeApp/0.1 (Contact: YourEmail@example.com)'
-    }
-    full_url = url
+    full_url = _build_jikan_url(endpoint, params)
     response_text_snippet = ""
     try:
-        time.sleep(0.6) # Jikan rate limit (saniyede ~1.6 istek)
-
-        if params:
-            query_string = urlencode(params, doseq=True, safe='[]/:=')
-            full_url = f"{url}?{query_string}"
-
         logger.debug(f"Jikan API İsteği: {full_url}")
 
-        response = requests.get(full_url, headers=headers, timeout=15)
+        # Paylaşılan havuzlu istemci (User-Agent ve timeout istemcide tanımlı)
+        response = http_client.get_client(JIKAN_CLIENT_NAME).get(full_url)
         response_text_snippet = response.text[:500]
 
-        if response.status_code == 404:
-            logger.info(f"Jikan API 404 Not Found: {full_url}")
-            return None
-
-        if response.status_code == 429:
-            logger.warning(f"Jikan API Rate Limit Aşıldı (429) - URL: {full_url}")
+        if not _check_jikan_status(response.status_code, full_url):
             return None
 
         response.raise_for_status()
 
-        json_response = response.json()
-
-        is_search_endpoint = ("anime" in endpoint or "manga" in endpoint) and params and 'q' in params
-        if 'data' not in json_response:
-            if not is_search_endpoint:
-                 logger.warning(f"Jikan API yanıtında 'data' anahtarı bulunamadı: {full_url}")
-                 return None
-            else:
-                 logger.info(f"Jikan API araması 'data' anahtarı olmadan döndü (boş sonuç varsayılır): {full_url}")
-                 return {'data': []}
-        elif not json_response['data'] and not is_search_endpoint:
-             logger.warning(f"Jikan API yanıtında 'data' boş geldi (detay için): {full_url}")
-             return None
-
-        return json_response
+        return _validate_jikan_json(response.json(), endpoint, params, full_url)
 
     except requests.exceptions.Timeout:
         logger.error(f"Jikan API isteği zaman aşımına uğradı: {full_url}", exc_info=True)
@@ -91,12 +105,53 @@ def _make_jikan_request(endpoint, params=None):
         logger.error(f"Jikan API Genel Hata - URL: {full_url} - Hata: {e}", exc_info=True)
         return None
 
+# Async Jikan istek fonksiyonu (_make_jikan_request'in httpx karşılığı)
+async def _amake_jikan_request(endpoint, params=None):
+    """Jikan API'na async GET isteği yapar. Hata veya bulunamazsa None döner."""
+    full_url = _build_jikan_url(endpoint, params)
+    response_text_snippet = ""
+    try:
+        logger.debug(f"Jikan API İsteği (async): {full_url}")
+
+        response = await async_http_client.get_async_client(JIKAN_CLIENT_NAME).get(full_url)
+        response_text_snippet = response.text[:500]
+
+        if not _check_jikan_status(response.status_code, full_url):
+            return None
+
+        response.raise_for_status()
+
+        return _validate_jikan_json(response.json(), endpoint, params, full_url)
+
+    except httpx.TimeoutException:
+        logger.error(f"Jikan API isteği zaman aşımına uğradı (async): {full_url}", exc_info=True)
+        return None
+    except httpx.HTTPStatusError as http_err:
+        status_code = http_err.response.status_code
+        logger.error(
+            f"Jikan API HTTP Hatası ({status_code}) - URL: {full_url} - Detay: {response_text_snippet}",
+            exc_info=False
+        )
+        return None
+    except httpx.HTTPError as req_err:
+        logger.error(f"Jikan API Bağlantı/İstek Hatası (async) - URL: {full_url} - Hata: {req_err}", exc_info=True)
+        return None
+    except json.JSONDecodeError:
+         logger.error(
+            f"Jikan API JSON Decode Hatası - URL: {full_url} - Yanıt: {response_text_snippet}",
+            exc_info=True
+        )
+         return None
+    except Exception as e:
+        logger.error(f"Jikan API Genel Hata (async) - URL: {full_url} - Hata: {e}", exc_info=True)
+        return None
+
 # --- Anime Fonksiyonları ---
-def search_anime(title: str, limit: int = 10):
-    """Verilen başlığa göre Jikan API üzerinde anime arar."""
-    params = { 'q': title, 'limit': limit, 'sfw': "true" } # SFW filtrelemesi eklendi
-    data = _make_jikan_request("anime", params=params)
+def _anime_search_params(title, limit):
+    return { 'q': title, 'limit': limit, 'sfw': "true" } # SFW filtrelemesi eklendi
 
+def _parse_anime_search(data, title):
+    """Jikan anime arama yanıtını sonuç listesine dönüştürür."""
     if data is None: return None # API hatası
     if not isinstance(data.get('data'), list):
         logger.warning(f"Jikan anime arama yanıtı beklenmedik formatta: title='{title}', yanıt: {str(data)[:200]}")
@@ -130,23 +185,44 @@ def search_anime(title: str, limit: int = 10):
         })
     return results
 
-def get_anime_details(mal_id: int):
-    """Verilen MAL ID'sine sahip animenin detaylarını (/full endpoint'inden) getirir."""
-    endpoint = f"anime/{quote(str(mal_id))}/full"
-    data = _make_jikan_request(endpoint)
-
+def _parse_anime_details(data, mal_id):
+    """Jikan /anime/{id}/full yanıtını form verisine dönüştürür."""
     if data is None or not isinstance(data.get('data'), dict):
          logger.warning(f"Jikan anime detayları alınamadı veya format hatalı: MAL ID {mal_id}")
          return None
 
     return map_jikan_media_data_to_dict(data['data'], 'anime')
 
+@cached_api_call('jikan', KIND_SEARCH)
+def search_anime(title: str, limit: int = 10):
+    """Verilen başlığa göre Jikan API üzerinde anime arar."""
+    data = _make_jikan_request("anime", params=_anime_search_params(title, limit))
+    return _parse_anime_search(data, title)
+
+@cached_api_call('jikan', KIND_SEARCH, key_name='search_anime')
+async def asearch_anime(title: str, limit: int = 10):
+    """search_anime'nin async karşılığı (aynı önbellek kayıtlarını paylaşır)."""
+    data = await _amake_jikan_request("anime", params=_anime_search_params(title, limit))
+    return _parse_anime_search(data, title)
+
+@cached_api_call('jikan', KIND_DETAIL)
+def get_anime_details(mal_id: int):
+    """Verilen MAL ID'sine sahip animenin detaylarını (/full endpoint'inden) getirir."""
+    data = _make_jikan_request(f"anime/{quote(str(mal_id))}/full")
+    return _parse_anime_details(data, mal_id)
+
+@cached_api_call('jikan', KIND_DETAIL, key_name='get_anime_details')
+async def aget_anime_details(mal_id: int):
+    """get_anime_details'in async karşılığı (aynı önbellek kayıtlarını paylaşır)."""
+    data = await _amake_jikan_request(f"anime/{quote(str(mal_id))}/full")
+    return _parse_anime_details(data, mal_id)
+
 # --- Novel Fonksiyonları ---
-def search_novel(title: str, limit: int = 10):
-    """Verilen başlığa göre Jikan API üzerinde light novel arar."""
-    params = { 'q': title, 'limit': limit, 'type': 'lightnovel', 'sfw': "true" }
-    data = _make_jikan_request("manga", params=params) # manga endpoint
+def _novel_search_params(title, limit):
+    return { 'q': title, 'limit': limit, 'type': 'lightnovel', 'sfw': "true" }
 
+def _parse_novel_search(data, title):
+    """Jikan light novel arama yanıtını (manga formatında) sonuç listesine dönüştürür."""
     if data is None: return None
     if not isinstance(data.get('data'), list):
         logger.warning(f"Jikan novel arama yanıtı beklenmedik formatta: title='{title}', yanıt: {str(data)[:200]}")
@@ -189,11 +265,8 @@ def search_novel(title: str, limit: int = 10):
         })
     return results
 
-def get_novel_details(mal_id: int):
-    """Verilen MAL ID'sine sahip novelin detaylarını getirir."""
-    endpoint = f"manga/{quote(str(mal_id))}/full" # manga endpoint
-    data = _make_jikan_request(endpoint)
-
+def _parse_novel_details(data, mal_id):
+    """Jikan /manga/{id}/full yanıtını novel form verisine dönüştürür."""
     if data is None or not isinstance(data.get('data'), dict):
          logger.warning(f"Jikan novel detayları alınamadı veya format hatalı: MAL ID {mal_id}")
          return None
@@ -205,6 +278,30 @@ def get_novel_details(mal_id: int):
 
     return map_jikan_media_data_to_dict(data['data'], 'novel')
 
+@cached_api_call('jikan', KIND_SEARCH)
+def search_novel(title: str, limit: int = 10):
+    """Verilen başlığa göre Jikan API üzerinde light novel arar."""
+    data = _make_jikan_request("manga", params=_novel_search_params(title, limit)) # manga endpoint
+    return _parse_novel_search(data, title)
+
+@cached_api_call('jikan', KIND_SEARCH, key_name='search_novel')
+async def asearch_novel(title: str, limit: int = 10):
+    """search_novel'in async karşılığı (aynı önbellek kayıtlarını paylaşır)."""
+    data = await _amake_jikan_request("manga", params=_novel_search_params(title, limit))
+    return _parse_novel_search(data, title)
+
+@cached_api_call('jikan', KIND_DETAIL)
+def get_novel_details(mal_id: int):
+    """Verilen MAL ID'sine sahip novelin detaylarını getirir."""
+    data = _make_jikan_request(f"manga/{quote(str(mal_id))}/full") # manga endpoint
+    return _parse_novel_details(data, mal_id)
+
+@cached_api_call('jikan', KIND_DETAIL, key_name='get_novel_details')
+async def aget_novel_details(mal_id: int):
+    """get_novel_details'in async karşılığı (aynı önbellek kayıtlarını paylaşır)."""
+    data = await _amake_jikan_request(f"manga/{quote(str(mal_id))}/full")
+    return _parse_novel_details(data, mal_id)
+
 # --- Ortak Map Fonksiyonu (Anime & Novel Detayları İçin) ---
 def map_jikan_media_data_to_dict(jikan_data, media_type):
     """
@@ -0,0 +1,345 @@
+# tracker/services/jobs.py
+# Veritabanı tabanlı hafif iş kuyruğu (BackgroundJob modeli). Uzun işler (toplu içe aktarım, kütüphane ZIP'i,
+# API'den bilgi yenileme) view'da kuyruğa eklenir ve `manage.py run_jobs` worker'ında çalışır; istemci
+# ilerlemeyi /jobs/<id>/status/ üzerinden sorgular. Ayrı bir broker (Redis/RabbitMQ) gerekmez.
+# İş alma: aday seçilir, sonra "status='queued' ise running yap" koşullu UPDATE'i ile sahiplenilir
+# (compare-and-swap). SQLite'ta da çalışır (select_for_update(skip_locked) yok); aynı işi iki worker alamaz.
+# Hata: PermanentJobError hemen başarısız sayılır; diğer hatalarda iş artan beklemeyle (backoff) yeniden sıraya
+# girer. Worker çökerse "running" kalan işler STALE_AFTER süresi sonunda yeniden sıraya alınır; çalışan iş
+# report_progress ile locked_at'i yeniler (heartbeat). Sonuç yazımları "locked_by bu worker ise" koşulludur:
+# iş zaman aşımıyla başka worker'a geçtiyse eski worker'ın sonucu yenisinin üzerine yazılmaz.
+
+import datetime
+import logging
+import os
+import socket
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import BackgroundJob
+from . import metadata_refresh
+
+# Logger oluştur
+logger = logging.getLogger(__name__)
+
+# settings.BACKGROUND_JOBS tanımlı değilse (veya eksikse) kullanılacak varsayılanlar
+DEFAULT_BACKGROUND_JOBS_SETTINGS = {
+    'MAX_ATTEMPTS': 3,
+    'RETRY_BACKOFF': 30,           # İlk yeniden denemeden önceki bekleme (saniye); her denemede iki katına çıkar
+    'RETRY_BACKOFF_MAX': 60 * 60,  # Bekleme üst sınırı
+    'STALE_AFTER': 60 * 30,        # Bu kadar süredir "running" olan iş (worker çöktü) yeniden sıraya alınır
+    'POLL_INTERVAL': 2,            # Kuyruk boşken worker'ın bekleme süresi (saniye)
+    'KEEP_DAYS': 7,                # Biten işler (ve dosyaları) bu kadar gün sonra silinir
+    'STORAGE_DIR': 'jobs',         # Yüklenen/üretilen dosyalar için default_storage altındaki dizin
+}
+
+# job_type -> handler(job). Handler sonuç sözlüğü döndürür (BackgroundJob.result'a yazılır).
+HANDLERS = {}
+
+
+class PermanentJobError(Exception):
+    """Yeniden denenmesi anlamsız hata (geçersiz parametre, bozuk dosya vb.); iş hemen başarısız olur."""
+
+
+def get_jobs_settings():
+    """Varsayılan ayarları settings.BACKGROUND_JOBS ile birleştirip döndürür."""
+    config = DEFAULT_BACKGROUND_JOBS_SETTINGS.copy()
+    config.update(getattr(settings, 'BACKGROUND_JOBS', {}) or {})
+    return config
+
+
+def register(job_type):
+    """İş türü için handler kaydeden dekoratör."""
+    def decorator(func):
+        HANDLERS[job_type] = func
+        return func
+    return decorator
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# --- Kuyruğa Ekleme ---
+def enqueue(job_type, user=None, payload=None, max_attempts=None, run_after=None):
+    """Yeni iş oluşturur. Bilinmeyen iş türünde ValueError fırlatır (worker'da sessizce başarısız olmasın)."""
+    if job_type not in HANDLERS:
+        raise ValueError(f"Bilinmeyen iş türü: '{job_type}'.")
+    job = BackgroundJob.objects.create(
+        user=user, job_type=job_type, payload=payload or {},
+        max_attempts=max_attempts or get_jobs_settings()['MAX_ATTEMPTS'],
+        run_after=run_after or timezone.now(),
+    )
+    logger.info(f"İş kuyruğa eklendi: {job_type} #{job.pk} (user_id={job.user_id})")
+    return job
+
+
+def store_upload(data, filename):
+    """Yüklenen dosyayı worker'ın okuyabileceği yere (default_storage) kaydeder; kayıt yolunu döndürür."""
+    name = os.path.join(get_jobs_settings()['STORAGE_DIR'], 'uploads', f"{uuid.uuid4().hex}_{os.path.basename(filename)}")
+    with tempfile.TemporaryFile() as tmp:
+        tmp.write(data)
+        tmp.seek(0)
+        return default_storage.save(name, File(tmp))
+
+
+# --- İlerleme ---
+def report_progress(job, progress, message=""):
+    """
+    İlerlemeyi tek UPDATE ile yazar (işin diğer alanlarına dokunmaz) ve locked_at'i yeniler (heartbeat):
+    uzun süren ama ilerleme bildiren iş STALE_AFTER sonunda yeniden sıraya alınmaz.
+    İş artık bu worker'da değilse (zaman aşımıyla başka worker'a geçti) False döner.
+    """
+    progress = max(0, min(int(progress), 100))
+    message = message[:255]
+    now = timezone.now()
+    owned = BackgroundJob.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+        progress=progress, progress_message=message, locked_at=now,
+    )
+    job.progress, job.progress_message = progress, message
+    if job.locked_by:
+        job.locked_at = now
+    return bool(owned)
+
+
+# --- Worker Tarafı ---
+def retry_delay(attempts, config=None):
+    """attempts. başarısız denemeden sonraki bekleme (saniye): RETRY_BACKOFF * 2^(attempts-1), üst sınırlı."""
+    config = config or get_jobs_settings()
+    return min(config['RETRY_BACKOFF'] * 2 ** max(attempts - 1, 0), config['RETRY_BACKOFF_MAX'])
+
+
+def requeue_stale_jobs(now=None):
+    """Worker'ı çökmüş (STALE_AFTER süresidir running) işleri yeniden sıraya alır / deneme hakkı bittiyse düşürür."""
+    now = now or timezone.now()
+    stale = BackgroundJob.objects.filter(
+        status=BackgroundJob.STATUS_RUNNING,
+        locked_at__lt=now - datetime.timedelta(seconds=get_jobs_settings()['STALE_AFTER']),
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=BackgroundJob.STATUS_FAILED, error="Worker yanıt vermedi (zaman aşımı).", finished_at=now,
+    )
+    requeued = stale.update(status=BackgroundJob.STATUS_QUEUED, locked_by="", locked_at=None, run_after=now)
+    if failed or requeued:
+        logger.warning(f"Zaman aşımına uğrayan işler: {requeued} yeniden sıraya alındı, {failed} başarısız.")
+    return requeued
+
+
+def claim_next_job(worker_id, now=None):
+    """Çalışma zamanı gelmiş en eski işi bu worker için sahiplenir (yoksa None)."""
+    now = now or timezone.now()
+    queue = BackgroundJob.objects.filter(status=BackgroundJob.STATUS_QUEUED, run_after__lte=now)
+    for _ in range(5): # Başka bir worker aynı adayı önce aldıysa sıradakini dene
+        candidate = queue.order_by('run_after', 'pk').values_list('pk', flat=True).first()
+        if candidate is None:
+            return None
+        claimed = BackgroundJob.objects.filter(pk=candidate, status=BackgroundJob.STATUS_QUEUED).update(
+            status=BackgroundJob.STATUS_RUNNING, locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return BackgroundJob.objects.get(pk=candidate)
+    return None
+
+
+def run_job(job):
+    """Sahiplenilmiş işi çalıştırır ve sonucu (başarılı / yeniden dene / başarısız) kaydeder."""
+    handler = HANDLERS.get(job.job_type)
+    try:
+        if handler is None:
+            raise PermanentJobError(f"Bilinmeyen iş türü: '{job.job_type}'.")
+        result = handler(job)
+    except PermanentJobError as e:
+        _finish(job, BackgroundJob.STATUS_FAILED, error=str(e))
+        logger.warning(f"İş başarısız: {job} - {e}")
+    except Exception as e:
+        logger.exception(f"İş hata verdi: {job} (deneme {job.attempts}/{job.max_attempts})")
+        if job.attempts < job.max_attempts:
+            _save_if_owned(
+                job, status=BackgroundJob.STATUS_QUEUED, error=f"{type(e).__name__}: {e}",
+                run_after=timezone.now() + datetime.timedelta(seconds=retry_delay(job.attempts)),
+                locked_by="", locked_at=None,
+            )
+        else:
+            _finish(job, BackgroundJob.STATUS_FAILED, error=f"{type(e).__name__}: {e}")
+    else:
+        _finish(job, BackgroundJob.STATUS_SUCCEEDED, result=result or {})
+        logger.info(f"İş tamamlandı: {job}")
+    return job
+
+
+def _save_if_owned(job, **fields):
+    """
+    Alanları sadece iş hâlâ bu worker'daysa (locked_by) yazar; job nesnesi de güncellenir.
+    İş zaman aşımıyla yeniden sıraya alınıp başka worker'a geçtiyse hiçbir şey yazılmaz ve False döner.
+    """
+    owned = BackgroundJob.objects.filter(pk=job.pk, locked_by=job.locked_by).update(**fields)
+    if not owned:
+        logger.warning(f"İş artık bu worker'da değil ({job.locked_by}), sonuç yazılmadı: {job}")
+        job.refresh_from_db()
+        return False
+    for name, value in fields.items():
+        setattr(job, name, value)
+    return True
+
+
+def _finish(job, status, result=None, error=""):
+    fields = {'status': status, 'result': result, 'error': error, 'finished_at': timezone.now()}
+    if status == BackgroundJob.STATUS_SUCCEEDED:
+        fields['progress'] = 100
+    return _save_if_owned(job, **fields)
+
+
+def run_pending_jobs(worker_id=None, max_jobs=None):
+    """Sıradaki işleri kuyruk boşalana (veya max_jobs'a) kadar çalıştırır; çalıştırılan iş sayısını döndürür."""
+    worker_id = worker_id or default_worker_id()
+    requeue_stale_jobs()
+    count = 0
+    while max_jobs is None or count < max_jobs:
+        job = claim_next_job(worker_id)
+        if job is None:
+            break
+        run_job(job)
+        count += 1
+    return count
+
+
+def purge_finished_jobs(days=None):
+    """KEEP_DAYS günden eski biten işleri ve ürettikleri/yüklenen dosyaları siler."""
+    days = get_jobs_settings()['KEEP_DAYS'] if days is None else days
+    old_jobs = BackgroundJob.objects.filter(
+        status__in=[BackgroundJob.STATUS_SUCCEEDED, BackgroundJob.STATUS_FAILED],
+        finished_at__lt=timezone.now() - datetime.timedelta(days=days),
+    )
+    for payload, result in old_jobs.values_list('payload', 'result'):
+        for path in ((payload or {}).get('path'), (result or {}).get('path')):
+            if path and default_storage.exists(path):
+                default_storage.delete(path)
+    deleted, _ = old_jobs.delete()
+    return deleted
+
+
+# --- Handler'lar ---
+@register('import')
+def _run_import(job):
+    """
+    payload: {media_type, path, filename}. Okuma/ayrıştırma hataları kalıcıdır (aynı dosya her denemede aynı
+    hatayı verir). Yüklenen dosya iş başarılı veya kalıcı olarak başarısız bitince silinir; sadece yeniden
+    denenecek geçici hatalarda (örn: veritabanı) korunur.
+    """
+    from . import importer # Döngüsel import'u önlemek için burada
+
+    payload = job.payload
+    path = payload.get('path')
+    final = True # False: run_job işi yeniden sıraya alacak, dosya sonraki deneme için korunur
+    try:
+        if job.user is None:
+            raise PermanentJobError("İçe aktarım için kullanıcı gerekli.")
+        try:
+            with default_storage.open(path, 'rb') as f:
+                data = f.read()
+        except (TypeError, FileNotFoundError, OSError) as e:
+            raise PermanentJobError(f"Yüklenen dosya bulunamadı: {e}")
+        try:
+            rows = list(importer.read_rows(data, payload.get('filename', path), payload['media_type']))
+        except importer.ImportFormatError as e:
+            raise PermanentJobError(str(e))
+        except Exception as e:
+            logger.exception(f"İçe aktarım dosyası okunamadı: {job}")
+            raise PermanentJobError(f"Dosya okunamadı: {type(e).__name__}: {e}")
+
+        total = len(rows) or 1
+        def on_batch(processed, result):
+            report_progress(job, processed * 100 // total, f"{processed}/{len(rows)} satır işlendi, {result.created} eklendi")
+
+        result = importer.import_items(job.user, payload['media_type'], rows, on_batch=on_batch)
+    except PermanentJobError:
+        raise
+    except Exception:
+        final = job.attempts >= job.max_attempts
+        raise
+    finally:
+        if final and path and default_storage.exists(path):
+            default_storage.delete(path)
+    return {
+        'created': result.created, 'skipped': result.skipped, 'invalid': result.invalid,
+        'tags_created': result.tags_created, 'errors': result.errors,
+        'media_type': payload['media_type'],
+    }
+
+
+@register('export_library')
+def _run_library_export(job):
+    """payload: {format}. ZIP default_storage'a yazılır; result.path /jobs/<id>/download/ ile indirilir."""
+    from ..views.export_views import library_export_chunks # Döngüsel import'u önlemek için burada
+    from . import export_formats
+
+    export_format = job.payload.get('format') or export_formats.DEFAULT_FORMAT
+    try:
+        export_formats.validate(export_format)
+    except export_formats.ExportFormatError as e:
+        raise PermanentJobError(str(e))
+    if job.user is None:
+        raise PermanentJobError("Dışa aktarım için kullanıcı gerekli.")
+
+    timestamp = timezone.localtime(timezone.now()).strftime("%Y%m%d_%H%M")
+    filename = f"kutuphane_{export_format}_{timestamp}.zip"
+    size, next_report = 0, 1024 * 1024
+    with tempfile.TemporaryFile() as tmp:
+        for chunk in library_export_chunks(job.user, export_format):
+            tmp.write(chunk)
+            size += len(chunk)
+            if size >= next_report: # Toplam boyut önceden bilinmiyor; her MB'da bir mesaj
+                report_progress(job, 0, f"{size // (1024 * 1024)} MB yazıldı")
+                next_report = size + 1024 * 1024
+        tmp.seek(0)
+        path = default_storage.save(
+            os.path.join(get_jobs_settings()['STORAGE_DIR'], 'exports', f"{uuid.uuid4().hex}_{filename}"), File(tmp),
+        )
+    return {'path': path, 'filename': filename, 'size': size}
+
+
+def can_refresh_metadata(item):
+    """Öğe, türüne uygun bir API kaydına bağlı mı (detay sayfasındaki yenile butonu için)."""
+    target = metadata_refresh.REFRESH_TARGETS.get(item._meta.model_name)
+    return target is not None and getattr(item, target[2], None) is not None
+
+
+@register('refresh_metadata')
+def _run_metadata_refresh(job):
+    """payload: {media_type, pk}. Tek öğenin toplam bölüm/cilt ve kapak bilgisini API'den günceller."""
+    media_type = job.payload.get('media_type')
+    if media_type not in metadata_refresh.REFRESH_TARGETS:
+        raise PermanentJobError(f"Bilinmeyen medya türü: '{media_type}'.")
+    result = metadata_refresh.refresh_metadata(
+        media_types=[media_type], pks=[job.payload.get('pk')], user_ids=[job.user_id],
+    )
+    if not result.titles:
+        raise PermanentJobError("Öğe bulunamadı veya bir API kaydına bağlı değil.")
+    if result.failed_titles:
+        # Servisler ağ/API hatalarında None döndürür: geçici hata, backoff ile yeniden denenir
+        raise RuntimeError("API'den bilgi alınamadı.")
+    return {'updated': result.updated_items, 'media_type': media_type, 'pk': job.payload.get('pk')}
+
+
+@register('refresh_all_metadata')
+def _run_bulk_metadata_refresh(job):
+    """payload: {media_types, older_than_days, limit}. Tüm kullanıcıların bağlı öğeleri (manage.py refresh_metadata --enqueue)."""
+    payload = job.payload
+    def progress(done, total):
+        report_progress(job, done * 100 // max(total, 1), f"{done}/{total} başlık işlendi")
+
+    result = metadata_refresh.refresh_metadata(
+        media_types=payload.get('media_types'), older_than_days=payload.get('older_than_days'),
+        limit=payload.get('limit'), progress=progress,
+    )
+    # Alınamayan başlıkların metadata_refreshed_at'i değişmez; bir sonraki çalıştırmada yeniden denenir
+    return {
+        'titles': result.titles, 'items': result.items,
+        'failed_titles': result.failed_titles, 'updated_items': result.updated_items,
+    }
@@ -1,67 +1,75 @@
 # tracker/mangadex_service.py
-# İyileştirmeler: Logging detayları, None dönüşü, quote kullanımı, tag/type tespiti, time.sleep aktif edildi, .get() kullanımı iyileştirildi.
+# İyileştirmeler: Logging detayları, None dönüşü, quote kullanımı, tag/type tespiti, .get() kullanımı iyileştirildi.
+# İstekler ortak havuzlu HTTP istemcisi (http_client) üzerinden yapılır (keep-alive bağlantılar).
+# Rate limit: sabit time.sleep yerine 'mangadex' token bucket'ı (settings.API_RATE_LIMITS) kullanılır.
+# search_manga ve get_manga_details sonuçları response_cache ile önbelleğe alınır (settings.API_RESPONSE_CACHE).
+# Async (httpx) karşılıkları asearch_manga ve aget_manga_details aynı yanıt işleme ve önbelleği paylaşır.
 
 import requests
-import time
+import httpx
 import json
 import logging
 import uuid # ID çevirme için
 from django.conf import settings
 from urllib.parse import urlencode, quote # quote path parametreleri için
 
+from . import http_client, async_http_client
+from .response_cache import cached_api_call, KIND_SEARCH, KIND_DETAIL
+
 # Logger oluştur (settings.py'den yapılandırmayı alır)
 logger = logging.getLogger(__name__)
 
 # MangaDex API base URL (settings.py'den)
 BASE_URL = settings.MANGADEX_API_URL
 
-# Opsiyonel: requests.Session kullanımı (Tek bir session objesi oluşturup tekrar kullanmak için)
-# session = requests.Session()
-# session.headers.update({
-#     'User-Agent': 'DjangoListeApp/0.1 (Contact: YourEmail@example.com)', # E-postanı güncelle
-#     'Accept-Language': 'tr, en;q=0.9'
-# })
+# Paylaşılan HTTP istemcisi (bağlantı havuzu ve metrikler bu isimle tutulur)
+MANGADEX_CLIENT_NAME = 'mangadex'
+MANGADEX_HEADERS = {
+    'Accept-Language': 'tr, en;q=0.9' # Türkçe içeriği tercih et
+}
 
-# Genel istek fonksiyonu (Logging ve Hata Yönetimi İyileştirildi)
-def _make_request(endpoint, params=None):
-    """MangaDex API'na güvenli GET isteği yapar (Logging ile). Hata veya bulunamazsa None döner."""
+# --- İstek/Yanıt Yardımcıları (senkron ve async istekler için ortak) ---
+def _build_url(endpoint, params=None):
+    """Endpoint ve query parametrelerinden güvenli tam URL'i oluşturur."""
     # Endpoint'in path parametrelerini güvenli hale getir (örn: manga/{id})
     # quote_via parametresi ile '/' karakterinin encode edilmesini engelle
     safe_endpoint = "/".join([quote(part, safe='') for part in endpoint.split('/')])
     url = f"{BASE_URL}/{safe_endpoint}"
+    if params:
+        # Query parametrelerini URL'e güvenli bir şekilde ekle
+        # safe='[]/:=' -> köşeli parantezleri (includes[] için) ve diğer bazı özel karakterleri koru
+        query_string = urlencode(params, doseq=True, safe='[]/:=')
+        return f"{url}?{query_string}"
+    return url
+
+def _check_status(status_code, full_url):
+    """429 ve 404 durumlarını loglar. Yanıt işlenmeye devam etmeliyse True döner."""
+    # 429 Too Many Requests: Retry-After süresi http istemcisi tarafından 'mangadex' bucket'ına bildirildi
+    if status_code == 429:
+        logger.warning(f"MangaDex API Rate Limit Aşıldı (429) - URL: {full_url}")
+        return False
+
+    # 404 Not Found özel durumu (ID bulunamayınca)
+    if status_code == 404:
+         logger.warning(f"MangaDex API 404 Not Found: {full_url}")
+         return False # Bulunamadıysa None dön
+    return True
 
-    # Session kullanmıyorsak, her seferinde header oluştur
-    headers = {
-        'User-Agent': 'DjangoListeApp/0.1 (Contact: YourEmail@example.com)', # E-postanı güncelle
-        'Accept-Language': 'tr, en;q=0.9' # Türkçe içeriği tercih et
-    }
-
-    full_url = url # Loglama için
+# Genel istek fonksiyonu (Logging ve Hata Yönetimi İyileştirildi)
+def _make_request(endpoint, params=None):
+    """MangaDex API'na güvenli GET isteği yapar (Logging ile). Hata veya bulunamazsa None döner."""
+    full_url = _build_url(endpoint, params) # Loglama için
     response_text_snippet = "" # Hata durumunda loglamak için
     try:
-        # ----- YORUMU KALDIRILDI -----
-        time.sleep(0.2) # MangaDex rate limit için küçük bir bekleme (saniyede 5 istek)
-        # -------------------------
-
-        if params:
-            # Query parametrelerini URL'e güvenli bir şekilde ekle
-            # safe='[]/:=' -> köşeli parantezleri (includes[] için) ve diğer bazı özel karakterleri koru
-            query_string = urlencode(params, doseq=True, safe='[]/:=')
-            full_url = f"{url}?{query_string}"
-        # else: full_url = url # Zaten yukarıda tanımlı
-
         logger.debug(f"MangaDex API İsteği: {full_url}")
 
-        # Session kullanıyorsak:
-        # response = session.get(full_url, timeout=15)
-        # Session kullanmıyorsak:
-        response = requests.get(full_url, headers=headers, timeout=15)
+        # Paylaşılan havuzlu istemci (User-Agent, Accept-Language ve timeout istemcide tanımlı)
+        client = http_client.get_client(MANGADEX_CLIENT_NAME, default_headers=MANGADEX_HEADERS)
+        response = client.get(full_url)
         response_text_snippet = response.text[:500] # Hata logu için yanıtın başını al
 
-        # 404 Not Found özel durumu (ID bulunamayınca)
-        if response.status_code == 404:
-             logger.warning(f"MangaDex API 404 Not Found: {full_url}")
-             return None # Bulunamadıysa None dön
+        if not _check_status(response.status_code, full_url):
+            return None
 
         response.raise_for_status() # Diğer HTTP hata kodları için exception fırlat (4xx, 5xx)
 
@@ -95,6 +103,48 @@ def _make_request(endpoint, params=None):
         logger.error(f"MangaDex API Genel Hata - URL: {full_url} - Hata: {e}", exc_info=True)
         return None
 
+# Async istek fonksiyonu (_make_request'in httpx karşılığı)
+async def _amake_request(endpoint, params=None):
+    """MangaDex API'na async GET isteği yapar. Hata veya bulunamazsa None döner."""
+    full_url = _build_url(endpoint, params)
+    response_text_snippet = ""
+    try:
+        logger.debug(f"MangaDex API İsteği (async): {full_url}")
+
+        client = async_http_client.get_async_client(MANGADEX_CLIENT_NAME, default_headers=MANGADEX_HEADERS)
+        response = await client.get(full_url)
+        response_text_snippet = response.text[:500]
+
+        if not _check_status(response.status_code, full_url):
+            return None
+
+        response.raise_for_status()
+
+        return response.json()
+
+    except httpx.TimeoutException:
+        logger.error(f"MangaDex API isteği zaman aşımına uğradı (async): {full_url}", exc_info=True)
+        return None
+    except httpx.HTTPStatusError as http_err:
+        status_code = http_err.response.status_code
+        logger.error(
+            f"MangaDex API HTTP Hatası ({status_code}) - URL: {full_url} - Detay: {response_text_snippet}",
+            exc_info=False
+        )
+        return None
+    except httpx.HTTPError as req_err:
+        logger.error(f"MangaDex API Bağlantı/İstek Hatası (async) - URL: {full_url} - Hata: {req_err}", exc_info=True)
+        return None
+    except json.JSONDecodeError:
+         logger.error(
+             f"MangaDex API JSON Decode Hatası - URL: {full_url} - Yanıt: {response_text_snippet}",
+             exc_info=True
+         )
+         return None
+    except Exception as e:
+        logger.error(f"MangaDex API Genel Hata (async) - URL: {full_url} - Hata: {e}", exc_info=True)
+        return None
+
 def get_localized_text(data_dict, default_lang='en', preferred_lang='tr'):
     """
     Verilen sözlükten önce tercih edilen dili (tr), sonra varsayılanı (en),
@@ -105,17 +155,17 @@ def get_localized_text(data_dict, default_lang='en', preferred_lang='tr'):
     # Önce TR, sonra EN, sonra listedeki ilk geçerli değer
     return data_dict.get(preferred_lang) or data_dict.get(default_lang) or next((v for v in data_dict.values() if v), None)
 
-def search_manga(title: str, limit: int = 15):
-    """Verilen başlığa göre MangaDex'te manga/manhwa/manhua arar."""
-    params = {
+def _search_params(title, limit):
+    return {
         'title': title,
         'limit': limit,
         'includes[]': ['cover_art', 'author', 'artist'],
         'contentRating[]': ['safe', 'suggestive'],
         'order[relevance]': 'desc'
     }
-    data = _make_request("manga", params=params)
 
+def _parse_search(data, title):
+    """MangaDex /manga arama yanıtını sonuç listesine dönüştürür."""
     if data is None: return None
     if not data or data.get('result') != 'ok' or not isinstance(data.get('data'), list): # data'nın list olduğunu kontrol et
         logger.info(f"MangaDex araması '{title}' için sonuç döndürmedi veya hatalı formatta.")
@@ -170,20 +220,33 @@ def search_manga(title: str, limit: int = 15):
         })
     return results
 
-def get_manga_details(mangadex_id: str):
-    """Verilen MangaDex UUID'sine sahip öğenin detaylarını getirir."""
+@cached_api_call('mangadex', KIND_SEARCH)
+def search_manga(title: str, limit: int = 15):
+    """Verilen başlığa göre MangaDex'te manga/manhwa/manhua arar."""
+    data = _make_request("manga", params=_search_params(title, limit))
+    return _parse_search(data, title)
+
+@cached_api_call('mangadex', KIND_SEARCH, key_name='search_manga')
+async def asearch_manga(title: str, limit: int = 15):
+    """search_manga'nın async karşılığı (aynı önbellek kayıtlarını paylaşır)."""
+    data = await _amake_request("manga", params=_search_params(title, limit))
+    return _parse_search(data, title)
+
+def _details_endpoint(mangadex_id):
+    """Geçerli bir UUID ise detay endpoint'ini, değilse None döndürür."""
     try:
         uuid_obj = uuid.UUID(str(mangadex_id))
     except ValueError:
         logger.error(f"Geçersiz MangaDex ID formatı: {mangadex_id}")
         return None
+    return f"manga/{quote(str(uuid_obj))}"
 
-    params = {
-        'includes[]': ['cover_art', 'author', 'artist', 'tag']
-    }
-    endpoint = f"manga/{quote(str(uuid_obj))}"
-    data = _make_request(endpoint, params=params)
+DETAILS_PARAMS = {
+    'includes[]': ['cover_art', 'author', 'artist', 'tag']
+}
 
+def _parse_details(data, mangadex_id):
+    """MangaDex /manga/{id} yanıtını form verisine dönüştürür."""
     if data is None:
         logger.warning(f"MangaDex detayları alınamadı veya bulunamadı: ID={mangadex_id}")
         return None
@@ -193,6 +256,32 @@ def get_manga_details(mangadex_id: str):
 
     return map_mangadex_data_to_dict(data['data'])
 
+@cached_api_call('mangadex', KIND_DETAIL)
+def get_manga_details(mangadex_id: str):
+    """Verilen MangaDex UUID'sine sahip öğenin detaylarını getirir."""
+    endpoint = _details_endpoint(mangadex_id)
+    if endpoint is None:
+        return None
+    data = _make_request(endpoint, params=DETAILS_PARAMS)
+    return _parse_details(data, mangadex_id)
+
+@cached_api_call('mangadex', KIND_DETAIL, key_name='get_manga_details')
+async def aget_manga_details(mangadex_id: str):
+    """get_manga_details'in async karşılığı (aynı önbellek kayıtlarını paylaşır)."""
+    endpoint = _details_endpoint(mangadex_id)
+    if endpoint is None:
+        return None
+    data = await _amake_request(endpoint, params=DETAILS_PARAMS)
+    return _parse_details(data, mangadex_id)
+
+def _parse_last_number(value):
+    """MangaDex lastChapter/lastVolume (metin, örn: "120", "45.5", "") -> tam sayı veya None."""
+    try:
+        number = int(float(value))
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 else None
+
 def map_mangadex_data_to_dict(manga_data):
     """MangaDex'ten gelen detaylı veriyi Django formunu doldurmak için bir sözlüğe dönüştürür."""
     if not manga_data or not isinstance(manga_data, dict):
@@ -261,9 +350,9 @@ def map_mangadex_data_to_dict(manga_data):
         'author': author_str,
         'artist': artist_str,
         'notes': description,
-        'total_chapters': None,
+        'total_chapters': _parse_last_number(attributes.get('lastChapter')), # Sadece seri bitince dolu
         'chapters_read': 0,
-        'total_volumes': None,
+        'total_volumes': _parse_last_number(attributes.get('lastVolume')),
         'volumes_read': 0,
         'platform': '',
         'status': 'Plan to Watch',
@@ -0,0 +1,121 @@
+# tracker/services/media_queries.py
+# Dört medya modeli (Anime, Webtoon, Manga, Novel) üzerinde tek sorguda çalışan okuma yardımcıları.
+# Her model için sıralı ve LIMIT'li bir alt sorgu oluşturulur, alt sorgular UNION ALL ile birleştirilir
+# ve satırlar hafif, tipli namedtuple'lara (MediaRow) dönüştürülür. Sadece kartların ihtiyaç duyduğu
+# sütunlar seçilir; model nesnesi oluşturulmaz.
+
+import logging
+from collections import namedtuple
+from functools import cached_property
+
+from django.db import connections, router
+from django.db.models import CharField, F, Value
+
+from .stats_service import STATS_MODELS
+
+# Logger oluştur
+logger = logging.getLogger(__name__)
+
+# Kartlarda kullanılan sütunlar (şablonlar item.pk / item.title / item.added_date / item.rating kullanır)
+ROW_FIELDS = ('pk', 'title', 'added_date', 'rating')
+
+
+class MediaRow(namedtuple('MediaRow', ('section', 'media_type') + ROW_FIELDS)):
+    """Birleşik sorgudan dönen tek satır (model örneği yerine hafif, değiştirilemez kayıt)."""
+    __slots__ = ()
+
+    @property
+    def url_name(self):
+        """Detay sayfasının URL adı (örn: 'anime_detail')."""
+        return f"{self.media_type}_detail"
+
+
+def _compile_part(section, media_type, queryset, limit, using):
+    """Alt sorguyu (bölüm ve tür etiketleriyle) derler: (compiler, sql, params) döndürür."""
+    queryset = (
+        queryset.annotate(
+            row_section=Value(section, output_field=CharField()),
+            row_media_type=Value(media_type, output_field=CharField()),
+        )
+        .values_list('row_section', 'row_media_type', *ROW_FIELDS)[:limit]
+    )
+    compiler = queryset.query.get_compiler(using=using)
+    sql, params = compiler.as_sql()
+    return compiler, sql, params
+
+
+def union_all_rows(parts, using=None):
+    """
+    parts: [(section, media_type, queryset, limit), ...]
+    Tüm parçaları tek UNION ALL sorgusunda çalıştırır ve MediaRow listesi döndürür.
+    SQLite birleşik sorguların alt sorgularında ORDER BY/LIMIT'e izin vermediği için
+    her parça "SELECT * FROM (...)" ile sarılır (PostgreSQL/MySQL'de de geçerli).
+    Not: UNION ALL sonucunun sırası garanti değildir; çağıran gerekiyorsa Python'da sıralamalıdır.
+    """
+    if not parts:
+        return []
+    using = using or router.db_for_read(parts[0][2].model)
+    connection = connections[using]
+    compiled = [_compile_part(section, media_type, queryset, limit, using) for section, media_type, queryset, limit in parts]
+
+    sql_parts, params = [], []
+    for index, (_, part_sql, part_params) in enumerate(compiled):
+        sql_parts.append(f"SELECT * FROM ({part_sql}) {connection.ops.quote_name(f'u{index}')}")
+        params.extend(part_params)
+    sql = " UNION ALL ".join(sql_parts)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        raw_rows = cursor.fetchall()
+    # Tüm parçaların sütun tipleri aynı; ilk parçanın compiler'ı ile DB değerleri Python tiplerine çevrilir
+    # (örn: SQLite'ta metin olarak dönen added_date -> datetime)
+    compiler = compiled[0][0]
+    return [MediaRow(*row) for row in compiler.results_iter(results=[raw_rows])]
+
+
+# --- Dashboard Listeleri ---
+def _recent_sort_key(row):
+    return row.added_date
+
+
+def _top_sort_key(row):
+    # apply_sorting(..., "rating_desc") ile aynı: puan azalan, sonra eklenme tarihi azalan
+    return (row.rating, row.added_date)
+
+
+def dashboard_list_parts(user, limit=5):
+    """Her medya türü için 'recent' ve 'top' alt sorgularını döndürür (union_all_rows parçaları)."""
+    parts = []
+    for media_type, model in STATS_MODELS.items():
+        user_items = model.objects.filter(user=user)
+        parts.append(('recent', media_type, user_items.order_by('-added_date'), limit))
+        parts.append((
+            'top', media_type,
+            user_items.filter(rating__isnull=False).order_by(F('rating').desc(nulls_last=True), '-added_date'),
+            limit,
+        ))
+    return parts
+
+
+class DashboardLists:
+    """
+    Dashboard'un son eklenen / en yüksek puanlı listeleri. İlk erişimde tek UNION ALL sorgusu çalışır;
+    hiç erişilmezse (örn: şablon fragment'ı cache'ten geldiyse) sorgu yapılmaz.
+    """
+
+    def __init__(self, user, limit=5):
+        self.user = user
+        self.limit = limit
+
+    @cached_property
+    def _lists(self):
+        lists = {(section, media_type): [] for section in ('recent', 'top') for media_type in STATS_MODELS}
+        for row in union_all_rows(dashboard_list_parts(self.user, self.limit)):
+            lists[(row.section, row.media_type)].append(row)
+        for (section, _), rows in lists.items():
+            rows.sort(key=_recent_sort_key if section == 'recent' else _top_sort_key, reverse=True)
+        return lists
+
+    def get(self, section, media_type):
+        """Bölüm ('recent' / 'top') ve tür için MediaRow listesi."""
+        return self._lists[(section, media_type)]
@@ -0,0 +1,192 @@
+# tracker/services/metadata_refresh.py
+# mal_id / mangadex_id ile API kaydına bağlı öğelerin toplam bölüm/cilt ve kapak bilgisini toplu yeniler.
+# 1. Hedefler tüm kullanıcılardan toplanır ve (kaynak, dış ID) ile tekilleştirilir: aynı başlık kaç öğede
+#    olursa olsun (örn: aynı MangaDex ID'si hem Manga hem Webtoon listesinde) API'ye bir kez gidilir.
+# 2. Detaylar async servislerle (aget_*_details) sınırlı eşzamanlılıkla çekilir; istek hızı servislerin
+#    rate limit bucket'larıyla sınırlıdır. force_refresh=True: yanıt önbelleği atlanır, taze veri alınır.
+# 3. Değişen alanlar model başına tek bulk_update ile yazılır (parça başına). Kullanıcının girdiği
+#    ilerleme/puan/notlara dokunulmaz. Alınamayan başlıkların metadata_refreshed_at'i değişmez (sonra tekrar denenir).
+# bulk_update sinyal göndermez: etkilenen kullanıcıların dashboard cache sürümü elle artırılır
+# (bu alanlar MediaStats'ı ve başlık indeksini etkilemez).
+
+import asyncio
+import datetime
+import logging
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import Anime, Manga, Novel, Webtoon
+from . import async_http_client, dashboard_cache, jikan_service, mangadex_service
+
+# Logger oluştur
+logger = logging.getLogger(__name__)
+
+# settings.METADATA_REFRESH tanımlı değilse (veya eksikse) kullanılacak varsayılanlar
+DEFAULT_METADATA_REFRESH_SETTINGS = {
+    'CONCURRENCY': 4,         # Aynı anda beklenen API isteği (rate limit bucket'ı ayrıca sınırlar)
+    'BATCH_SIZE': 50,         # Parça başına tekil başlık (çekme + bulk_update birimi)
+    'MAX_AGE_DAYS': 30,       # Komutun varsayılan --older-than-days değeri
+}
+
+# media_type -> (Model, kaynak adı, dış ID alanı). Aynı kaynaktaki aynı ID tek istekle alınır.
+REFRESH_TARGETS = {
+    'anime': (Anime, 'jikan_anime', 'mal_id'),
+    'novel': (Novel, 'jikan_novel', 'mal_id'),
+    'manga': (Manga, 'mangadex', 'mangadex_id'),
+    'webtoon': (Webtoon, 'mangadex', 'mangadex_id'),
+}
+
+# API'den yenilenen alanlar (modelde olanlar kullanılır)
+REFRESHED_FIELDS = ('total_episodes', 'total_chapters', 'total_volumes', 'cover_image_url')
+
+
+def get_metadata_refresh_settings():
+    """Varsayılan ayarları settings.METADATA_REFRESH ile birleştirip döndürür."""
+    config = DEFAULT_METADATA_REFRESH_SETTINGS.copy()
+    config.update(getattr(settings, 'METADATA_REFRESH', {}) or {})
+    return config
+
+
+def _source_fetchers():
+    # Modül niteliği çağrı anında okunur (testlerde patch edilebilsin)
+    return {
+        'jikan_anime': jikan_service.aget_anime_details,
+        'jikan_novel': jikan_service.aget_novel_details,
+        'mangadex': mangadex_service.aget_manga_details,
+    }
+
+
+def refreshed_fields(model):
+    return [name for name in REFRESHED_FIELDS if any(f.name == name for f in model._meta.concrete_fields)]
+
+
+@dataclass
+class RefreshResult:
+    titles: int = 0          # Tekil (kaynak, dış ID) sayısı = API isteği
+    items: int = 0           # Bu başlıklara bağlı öğe sayısı (tüm kullanıcılar)
+    failed_titles: int = 0   # API'den alınamayan başlıklar
+    updated_items: int = 0   # En az bir alanı değişen öğeler
+
+
+# --- 1. Hedefleri Topla ---
+def collect_targets(media_types=None, older_than_days=None, user_ids=None, pks=None, limit=None):
+    """
+    {(kaynak, dış ID): [(media_type, pk), ...]} sözlüğü. older_than_days verilirse sadece hiç yenilenmemiş
+    veya bu süreden eski öğeler; en eskiler (ve hiç yenilenmemişler) önce. limit tekil başlık sayısını sınırlar.
+    """
+    cutoff = timezone.now() - datetime.timedelta(days=older_than_days) if older_than_days is not None else None
+    targets, oldest = {}, {}
+    for media_type in media_types or REFRESH_TARGETS:
+        model, source, id_field = REFRESH_TARGETS[media_type]
+        items = model.objects.filter(**{f"{id_field}__isnull": False})
+        if cutoff is not None:
+            items = items.filter(Q(metadata_refreshed_at__isnull=True) | Q(metadata_refreshed_at__lt=cutoff))
+        if user_ids is not None:
+            items = items.filter(user_id__in=user_ids)
+        if pks is not None:
+            items = items.filter(pk__in=pks)
+        items = items.order_by('pk').values_list('pk', id_field, 'metadata_refreshed_at')
+        for pk, external_id, refreshed_at in items.iterator(chunk_size=2000):
+            # View'larla aynı argüman tipleri (mal_id: int, MangaDex: str) -> aynı yanıt önbelleği anahtarları
+            key = (source, str(external_id) if id_field == 'mangadex_id' else external_id)
+            targets.setdefault(key, []).append((media_type, pk))
+            # Başlığın sırası: bağlı öğelerinden en eski yenilenen (hiç yenilenmemiş = en önce)
+            stamp = refreshed_at.timestamp() if refreshed_at else float('-inf')
+            oldest[key] = min(oldest.get(key, stamp), stamp)
+    keys = sorted(targets, key=oldest.__getitem__) # Tüm türler genelinde en eskiler önce (stabil sıralama)
+    if limit is not None:
+        keys = keys[:limit]
+    return {key: targets[key] for key in keys}
+
+
+# --- 2. Detayları Çek ---
+async def _fetch_all(keys, concurrency):
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    fetchers = _source_fetchers()
+
+    async def fetch(source, external_id):
+        async with semaphore:
+            try:
+                return await fetchers[source](external_id, force_refresh=True)
+            except Exception: # Bir başlığın hatası diğerlerini durdurmaz
+                logger.exception(f"Bilgi yenileme: {source} {external_id} alınamadı.")
+                return None
+
+    try:
+        return await asyncio.gather(*(fetch(source, external_id) for source, external_id in keys))
+    finally:
+        # Her parça kendi event loop'unda (asyncio.run) çalışır: loop'a bağlı bağlantı havuzları kapatılmazsa
+        # parça başına bir havuz sızar (unclosed client uyarıları)
+        await async_http_client.aclose_all()
+
+
+def fetch_details(keys, concurrency=None):
+    """[(kaynak, dış ID), ...] -> {anahtar: detay sözlüğü veya None}. Senkron bağlamdan (komut, worker) çağrılır."""
+    if not keys:
+        return {}
+    concurrency = concurrency or get_metadata_refresh_settings()['CONCURRENCY']
+    return dict(zip(keys, asyncio.run(_fetch_all(keys, concurrency))))
+
+
+# --- 3. Uygula ---
+def _apply_batch(targets, details, now, result):
+    """Bir parçanın detaylarını öğelere uygular; model başına tek bulk_update. Etkilenen kullanıcıları döndürür."""
+    pks_by_type = {}
+    for key, entries in targets.items():
+        if details.get(key):
+            for media_type, pk in entries:
+                pks_by_type.setdefault(media_type, {})[pk] = details[key]
+
+    user_ids = set()
+    with transaction.atomic():
+        for media_type, detail_by_pk in pks_by_type.items():
+            model = REFRESH_TARGETS[media_type][0]
+            fields = refreshed_fields(model)
+            items = list(model.objects.filter(pk__in=detail_by_pk).only('pk', 'user_id', *fields))
+            for item in items:
+                detail = detail_by_pk[item.pk]
+                changed = False
+                for name in fields:
+                    value = detail.get(name)
+                    if value not in (None, "") and getattr(item, name) != value:
+                        setattr(item, name, value)
+                        changed = True
+                if changed:
+                    result.updated_items += 1
+                    user_ids.add(item.user_id)
+                item.metadata_refreshed_at = now
+            model.objects.bulk_update(items, fields + ['metadata_refreshed_at'], batch_size=500)
+    return user_ids
+
+
+def refresh_metadata(media_types=None, older_than_days=None, user_ids=None, pks=None, limit=None,
+                     concurrency=None, batch_size=None, progress=None):
+    """
+    Bağlı öğelerin API bilgisini yeniler ve RefreshResult döndürür.
+    progress(işlenen başlık, toplam başlık): her parçadan sonra çağrılır (arka plan işi ilerlemesi).
+    """
+    config = get_metadata_refresh_settings()
+    batch_size = batch_size or config['BATCH_SIZE']
+    targets = collect_targets(media_types, older_than_days=older_than_days, user_ids=user_ids, pks=pks, limit=limit)
+    result = RefreshResult(titles=len(targets), items=sum(len(entries) for entries in targets.values()))
+    keys = list(targets)
+    affected_users = set()
+    for start in range(0, len(keys), batch_size):
+        batch_keys = keys[start:start + batch_size]
+        details = fetch_details(batch_keys, concurrency=concurrency)
+        result.failed_titles += sum(1 for key in batch_keys if not details.get(key))
+        affected_users |= _apply_batch({key: targets[key] for key in batch_keys}, details, timezone.now(), result)
+        if progress:
+            progress(start + len(batch_keys), len(keys))
+
+    for user_id in affected_users: # Dashboard kartlarındaki kapaklar değişmiş olabilir
+        dashboard_cache.bump_user_version(user_id)
+    logger.info(
+        f"Bilgi yenileme: {result.titles} başlık ({result.items} öğe), {result.failed_titles} başarısız, "
+        f"{result.updated_items} öğe güncellendi."
+    )
+    return result
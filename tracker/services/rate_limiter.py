@@ -0,0 +1,224 @@
+# tracker/services/rate_limiter.py
+# Upstream API'lar (Jikan, MangaDex) için token-bucket rate limiter.
+# Her istekten önce sabit time.sleep yerine sadece bütçe gerçekten tükendiğinde bekler.
+# Varsayılan olarak süreç içi (thread-safe), istenirse Django cache üzerinden süreçler arası paylaşılır.
+# 429 yanıtları (Retry-After) bucket'a geri beslenir. Async istemci için aacquire() thread'i bloklamadan bekler.
+
+import asyncio
+import datetime
+import logging
+import math
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Logger oluştur
+logger = logging.getLogger(__name__)
+
+# settings.API_RATE_LIMITS içinde tanımlı olmayan anahtarlar için varsayılanlar
+DEFAULT_BUCKET_SETTINGS = {
+    'RATE': 1.0,                 # Saniyede eklenen token (sürdürülebilir istek hızı)
+    'CAPACITY': 1,               # Anlık en fazla istek (burst)
+    'SHARED': False,             # True ise bütçe cache backend'i üzerinden süreçler arası paylaşılır
+    'CACHE_ALIAS': 'default',    # SHARED=True iken kullanılacak cache
+    'DEFAULT_RETRY_AFTER': 2.0,  # 429 yanıtında Retry-After yoksa kullanılacak bekleme (saniye)
+}
+
+
+def parse_retry_after(value, default=None):
+    """Retry-After başlığını (saniye veya HTTP tarihi) saniyeye çevirir. Geçersizse default döner."""
+    if value is None or value == '':
+        return default
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(str(value))
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+        return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+    except (TypeError, ValueError, IndexError):
+        logger.warning(f"Geçersiz Retry-After değeri: {value!r}")
+        return default
+
+
+class TokenBucket:
+    """
+    Süreç içi, thread-safe token bucket.
+    reserve() token'ı hemen ayırır (gerekirse borçlanır) ve beklenmesi gereken süreyi döndürür;
+    böylece eşzamanlı istekler sırayla ve adil biçimde yayılır.
+    """
+
+    def __init__(self, name, rate, capacity, default_retry_after=2.0, clock=time.monotonic):
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.default_retry_after = default_retry_after
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = clock() # Token'ların en son hesaplandığı an (429 sonrası ileri bir zaman olabilir)
+
+    def _refill(self, now):
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def reserve(self, tokens=1):
+        """Token ayırır ve isteğin gönderilmeden önce beklemesi gereken süreyi (saniye) döndürür."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= tokens
+            # 429 cezası varsa _updated gelecektedir; borç (negatif token) ise rate'e göre ödenir
+            wait = max(0.0, self._updated - now)
+            if self._tokens < 0:
+                wait += -self._tokens / self.rate
+            return wait
+
+    def acquire(self, tokens=1):
+        """Bütçe yoksa gerektiği kadar bekler (bloklar). Beklenen süreyi döndürür."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            logger.debug(f"Rate limit ({self.name}): {wait:.2f} sn bekleniyor.")
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self, tokens=1):
+        """acquire()'ın async karşılığı: bekleme asyncio.sleep ile yapılır (event loop bloklanmaz)."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            logger.debug(f"Rate limit ({self.name}): {wait:.2f} sn bekleniyor (async).")
+            await asyncio.sleep(wait)
+        return wait
+
+    def penalize(self, retry_after=None):
+        """429 geri bildirimi: bütçeyi sıfırlar ve Retry-After süresi dolana kadar yeni token vermez."""
+        retry_after = self.default_retry_after if retry_after is None else retry_after
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = max(self._updated, now + retry_after)
+        logger.warning(f"Rate limit ({self.name}): 429 alındı, {retry_after:.1f} sn boyunca istek yapılmayacak.")
+
+
+class SharedTokenBucket:
+    """
+    Django cache üzerinden süreçler (gunicorn worker'ları vb.) arasında paylaşılan bütçe.
+    Cache'te atomik karşılaştır-değiştir olmadığı için sabit pencereli sayaç kullanılır:
+    her pencere (CAPACITY / RATE saniye) en fazla CAPACITY istek alır. Memcached/Redis gibi
+    atomik incr destekleyen bir backend önerilir (LocMem sadece tek süreç içinde paylaşır).
+    """
+
+    def __init__(self, name, rate, capacity, cache_alias='default', default_retry_after=2.0,
+                 clock=time.time, key_prefix='tracker:ratelimit'):
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = int(capacity)
+        self.window = self.capacity / self.rate # Pencere uzunluğu (saniye)
+        self.default_retry_after = default_retry_after
+        self.cache_alias = cache_alias
+        self._clock = clock # Süreçler arası tutarlılık için duvar saati
+        self._key_prefix = f"{key_prefix}:{name}"
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _window_key(self, index):
+        return f"{self._key_prefix}:w:{index}"
+
+    def reserve(self, tokens=1, max_windows=60):
+        """Bütçesi olan ilk pencerede yer ayırır ve o pencereye kadar beklenecek süreyi döndürür."""
+        now = self._clock()
+        start = now
+        blocked_until = self.cache.get(f"{self._key_prefix}:blocked_until")
+        if blocked_until and blocked_until > now:
+            start = blocked_until
+        index = int(start // self.window)
+        timeout = max(1, int(math.ceil(self.window * 2)))
+        for offset in range(max_windows):
+            key = self._window_key(index + offset)
+            self.cache.add(key, 0, timeout=timeout + int(math.ceil(offset * self.window)))
+            try:
+                used = self.cache.incr(key, tokens)
+            except ValueError: # Anahtar arada expire olduysa
+                self.cache.add(key, tokens, timeout=timeout)
+                used = tokens
+            if used <= self.capacity:
+                window_start = (index + offset) * self.window
+                return max(0.0, max(window_start, start) - now)
+        # Çok uzun kuyruk (beklenmedik); en kötü durumda son pencereye kadar bekle
+        return max(0.0, (index + max_windows) * self.window - now)
+
+    def acquire(self, tokens=1):
+        wait = self.reserve(tokens)
+        if wait > 0:
+            logger.debug(f"Paylaşılan rate limit ({self.name}): {wait:.2f} sn bekleniyor.")
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self, tokens=1):
+        wait = self.reserve(tokens)
+        if wait > 0:
+            logger.debug(f"Paylaşılan rate limit ({self.name}): {wait:.2f} sn bekleniyor (async).")
+            await asyncio.sleep(wait)
+        return wait
+
+    def penalize(self, retry_after=None):
+        """429 geri bildirimini tüm süreçlerle paylaşır (blocked_until anahtarı)."""
+        retry_after = self.default_retry_after if retry_after is None else retry_after
+        blocked_until = self._clock() + retry_after
+        self.cache.set(f"{self._key_prefix}:blocked_until", blocked_until, timeout=int(math.ceil(retry_after)) + 1)
+        logger.warning(f"Paylaşılan rate limit ({self.name}): 429 alındı, {retry_after:.1f} sn boyunca istek yapılmayacak.")
+
+
+# --- Bucket Kayıt Defteri (upstream başına bir bucket) ---
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket_settings(name):
+    """Verilen upstream için ayarları döndürür. settings.API_RATE_LIMITS'te yoksa None döner."""
+    configured = (getattr(settings, 'API_RATE_LIMITS', {}) or {}).get(name)
+    if configured is None:
+        return None
+    config = DEFAULT_BUCKET_SETTINGS.copy()
+    config.update(configured)
+    return config
+
+
+def get_bucket(name):
+    """Upstream için paylaşılan bucket'ı döndürür (ayar yoksa None - sınırsız)."""
+    bucket = _buckets.get(name)
+    if bucket is None:
+        config = get_bucket_settings(name)
+        if config is None:
+            return None
+        with _buckets_lock:
+            bucket = _buckets.get(name)
+            if bucket is None:
+                if config['SHARED']:
+                    bucket = SharedTokenBucket(
+                        name, config['RATE'], config['CAPACITY'],
+                        cache_alias=config['CACHE_ALIAS'],
+                        default_retry_after=config['DEFAULT_RETRY_AFTER'],
+                    )
+                else:
+                    bucket = TokenBucket(
+                        name, config['RATE'], config['CAPACITY'],
+                        default_retry_after=config['DEFAULT_RETRY_AFTER'],
+                    )
+                _buckets[name] = bucket
+    return bucket
+
+
+def reset_buckets():
+    """Kayıtlı tüm bucket'ları siler (ayar değişiklikleri ve testler için)."""
+    with _buckets_lock:
+        _buckets.clear()
@@ -0,0 +1,400 @@
+# tracker/services/response_cache.py
+# Jikan/MangaDex servis fonksiyonları (search_* ve get_*_details) için yanıt önbelleği.
+# Anahtarlar normalize edilmiş sorgu + parametrelerden üretilir; arama ve detay için ayrı TTL,
+# bellek limitli LRU (varsayılan) veya Django cache backend'i (settings.API_RESPONSE_CACHE) kullanılır.
+# Detay sonuçları stale-while-revalidate ile sunulur: TTL'i geçmiş ama MAX_STALENESS içindeki kayıt
+# hemen döndürülür ve arka planda (thread havuzunda, anahtar başına tek istek) yenilenir.
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import pickle
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Logger oluştur
+logger = logging.getLogger(__name__)
+
+# settings.API_RESPONSE_CACHE içinde tanımlı olmayan anahtarlar için varsayılanlar
+DEFAULT_RESPONSE_CACHE_SETTINGS = {
+    'ENABLED': True,
+    'BACKEND': 'memory',          # 'memory' (süreç içi LRU) veya 'django' (CACHE_ALIAS)
+    'CACHE_ALIAS': 'default',     # BACKEND='django' iken kullanılacak cache
+    'SEARCH_TTL': 60 * 10,        # Arama sonuçları (saniye)
+    'DETAIL_TTL': 60 * 60 * 24,   # Detay (map edilmiş dict) sonuçları (saniye)
+    'MAX_BYTES': 8 * 1024 * 1024, # 'memory' backend'i için bellek limiti (pickle boyutu)
+    'KEY_PREFIX': 'tracker:api',
+    'STALE_WHILE_REVALIDATE': True,    # Detay sonuçlarında eski kaydı hemen sun, arka planda yenile
+    'MAX_STALENESS': 60 * 60 * 24 * 7, # TTL'den sonra en fazla bu kadar eski kayıt sunulur (saniye)
+    'REFRESH_WORKERS': 2,              # Arka plan yenileme thread sayısı
+}
+
+# Önbellek türleri (TTL seçimi için)
+KIND_SEARCH = 'search'
+KIND_DETAIL = 'detail'
+
+
+def get_response_cache_settings():
+    """Varsayılan ayarları settings.API_RESPONSE_CACHE ile birleştirip döndürür."""
+    config = DEFAULT_RESPONSE_CACHE_SETTINGS.copy()
+    config.update(getattr(settings, 'API_RESPONSE_CACHE', {}) or {})
+    return config
+
+
+# --- Backend'ler ---
+class LRUMemoryCache:
+    """
+    Süreç içi, thread-safe LRU önbellek. Değerler pickle'lanmış olarak saklanır; böylece
+    bellek kullanımı (byte) ölçülebilir ve her get() çağıranı bağımsız bir kopya alır.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._data = OrderedDict() # key -> (pickled_value, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            payload, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._data.move_to_end(key) # En son kullanılan sona
+        return pickle.loads(payload)
+
+    def set(self, key, value, timeout):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            logger.debug(f"Yanıt önbelleğe alınmadı (boyut limiti aşıyor): {key}")
+            return
+        expires_at = time.monotonic() + timeout if timeout is not None else None
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (payload, expires_at)
+            self.current_bytes += len(payload)
+            # Bellek limiti aşıldıysa en eski kullanılanları at (LRU)
+            while self.current_bytes > self.max_bytes and self._data:
+                oldest_key = next(iter(self._data))
+                self._remove(oldest_key)
+
+    def delete(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key):
+        payload, _ = self._data.pop(key)
+        self.current_bytes -= len(payload)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DjangoCacheBackend:
+    """settings.CACHES içindeki bir cache'i kullanan backend (Redis/Memcached ile süreçler arası paylaşılır)."""
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value, timeout):
+        self.cache.set(key, value, timeout=timeout)
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+    def clear(self):
+        # Paylaşılan cache'in tamamını silmemek için bilinçli olarak bir şey yapılmaz;
+        # kayıtlar TTL ile düşer.
+        logger.info("Django cache backend'i için yanıt önbelleği temizleme atlandı (TTL ile düşer).")
+
+
+_backend = None
+_backend_signature = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Ayarlara uygun backend'i döndürür (ayarlar değişirse yeniden oluşturur)."""
+    global _backend, _backend_signature
+    config = get_response_cache_settings()
+    signature = (config['BACKEND'], config['CACHE_ALIAS'], config['MAX_BYTES'])
+    if _backend is None or _backend_signature != signature:
+        with _backend_lock:
+            if _backend is None or _backend_signature != signature:
+                if config['BACKEND'] == 'django':
+                    _backend = DjangoCacheBackend(config['CACHE_ALIAS'])
+                else:
+                    _backend = LRUMemoryCache(config['MAX_BYTES'])
+                _backend_signature = signature
+    return _backend
+
+
+def clear():
+    """Yanıt önbelleğini temizler (memory backend'i için; testlerde ve yönetimde kullanılır)."""
+    get_backend().clear()
+    stats.reset()
+
+
+# --- İsabet İstatistikleri ---
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0 # hits içinde, eski kayıt sunulup arka planda yenilenenler
+        self.refreshes = 0  # Tamamlanan arka plan yenilemeleri
+
+    def record(self, hit, stale=False):
+        with self._lock:
+            if hit:
+                self.hits += 1
+                if stale:
+                    self.stale_hits += 1
+            else:
+                self.misses += 1
+
+    def record_refresh(self):
+        with self._lock:
+            self.refreshes += 1
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.stale_hits = 0
+            self.refreshes = 0
+
+
+stats = CacheStats()
+
+
+# --- Anahtar Üretimi ---
+def normalize_value(value):
+    """Sorgu değerlerini anahtar için normalize eder (Unicode NFKC, boşluk, büyük/küçük harf)."""
+    if isinstance(value, str):
+        value = unicodedata.normalize('NFKC', value)
+        return " ".join(value.split()).casefold()
+    if isinstance(value, (list, tuple, set)):
+        items = [normalize_value(v) for v in value]
+        return sorted(items, key=repr) if isinstance(value, set) else items
+    if isinstance(value, dict):
+        return {str(k): normalize_value(v) for k, v in value.items()}
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return str(value).casefold() # UUID vb.
+
+
+def make_key(namespace, func_name, arguments):
+    """namespace + fonksiyon adı + normalize edilmiş argümanlardan kararlı bir anahtar üretir."""
+    normalized = {name: normalize_value(value) for name, value in arguments.items()}
+    digest = hashlib.sha1(
+        json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+    ).hexdigest()
+    prefix = get_response_cache_settings()['KEY_PREFIX']
+    return f"{prefix}:{namespace}:{func_name}:{digest}"
+
+
+# --- Kayıt Zarfı ve Arka Plan Yenileme ---
+def _now():
+    """Kayıt yaşı için duvar saati (Django cache backend'i süreçler arası paylaşıldığı için)."""
+    return time.time()
+
+
+def _store(backend, key, result, ttl, config, kind):
+    """Sonucu kaydedilme zamanıyla birlikte saklar. SWR açıksa detaylar TTL + MAX_STALENESS kadar tutulur."""
+    timeout = ttl
+    if kind == KIND_DETAIL and config['STALE_WHILE_REVALIDATE']:
+        timeout = ttl + config['MAX_STALENESS']
+    backend.set(key, {'value': result, 'stored_at': _now()}, timeout)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_inflight = {} # key -> Future (aynı anahtar için tek yenileme)
+_async_inflight = {} # key -> asyncio.Task (async servis fonksiyonları için)
+_inflight_lock = threading.Lock()
+
+
+def _get_executor(config):
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=config['REFRESH_WORKERS'], thread_name_prefix='api-cache-refresh'
+                )
+    return _executor
+
+
+def _schedule_refresh(key, func, args, kwargs, ttl, config, kind, label):
+    """Anahtar için arka plan yenilemesi başlatır (zaten sürüyorsa yenisini açmaz)."""
+    with _inflight_lock:
+        if key in _inflight or key in _async_inflight:
+            return _inflight.get(key)
+
+        def refresh():
+            try:
+                result = func(*args, **kwargs)
+                if result is not None: # Hata olursa eski kayıt kalır, MAX_STALENESS içinde sunulmaya devam eder
+                    _store(get_backend(), key, result, ttl, config, kind)
+                    stats.record_refresh()
+                    logger.debug(f"API yanıt önbelleği arka planda yenilendi: {label}")
+            except Exception as e:
+                logger.error(f"API yanıt önbelleği arka plan yenileme hatası ({label}): {e}", exc_info=True)
+            finally:
+                with _inflight_lock:
+                    _inflight.pop(key, None)
+
+        future = _get_executor(config).submit(refresh)
+        _inflight[key] = future
+        return future
+
+
+def _schedule_async_refresh(key, func, args, kwargs, ttl, config, kind, label):
+    """
+    Async fonksiyonlar için arka plan yenilemesini çalışan event loop'ta bir task olarak başlatır.
+    Loop (örn: WSGI altında istek sonu) kapanırsa task iptal olur; eski kayıt bir sonraki istekte tekrar yenilenir.
+    """
+    with _inflight_lock:
+        if key in _inflight or key in _async_inflight:
+            return None
+
+        async def refresh():
+            try:
+                result = await func(*args, **kwargs)
+                if result is not None:
+                    _store(get_backend(), key, result, ttl, config, kind)
+                    stats.record_refresh()
+                    logger.debug(f"API yanıt önbelleği arka planda yenilendi (async): {label}")
+            except Exception as e:
+                logger.error(f"API yanıt önbelleği async yenileme hatası ({label}): {e}", exc_info=True)
+            finally:
+                with _inflight_lock:
+                    _async_inflight.pop(key, None)
+
+        task = asyncio.get_running_loop().create_task(refresh())
+        _async_inflight[key] = task # Task'ın çöp toplayıcıya gitmemesi için referans tutulur
+        return task
+
+
+def wait_for_refreshes(timeout=None):
+    """Devam eden arka plan yenilemelerinin bitmesini bekler (testler ve yönetim komutları için)."""
+    with _inflight_lock:
+        pending = list(_inflight.values())
+    if pending:
+        wait_futures(pending, timeout=timeout)
+
+
+def _lookup(backend, key, ttl, config, kind, label):
+    """
+    Önbellekte kayıt arar. (bulundu_mu, değer, yenilenmeli_mi) döndürür.
+    KIND_DETAIL için TTL'i geçmiş ama MAX_STALENESS içindeki kayıt bulunmuş sayılır ve yenilenmeli_mi=True olur.
+    """
+    entry = backend.get(key)
+    if entry is not None:
+        age = _now() - entry['stored_at']
+        if age < ttl:
+            stats.record(hit=True)
+            logger.debug(f"API yanıt önbelleği isabeti: {label}")
+            return True, entry['value'], False
+        if (kind == KIND_DETAIL and config['STALE_WHILE_REVALIDATE']
+                and age < ttl + config['MAX_STALENESS']):
+            stats.record(hit=True, stale=True)
+            logger.debug(f"API yanıt önbelleği: eski kayıt sunuldu ({age:.0f} sn), yenileniyor: {label}")
+            return True, entry['value'], True
+    stats.record(hit=False)
+    return False, None, False
+
+
+# --- Dekoratör ---
+def cached_api_call(namespace, kind, key_name=None):
+    """
+    Servis fonksiyonunun sonucunu önbelleğe alır. None (API hatası) önbelleğe alınmaz.
+    kind: KIND_SEARCH veya KIND_DETAIL (TTL seçimi için).
+    KIND_DETAIL için TTL'i geçmiş kayıtlar MAX_STALENESS içindeyse hemen döndürülür ve arka planda yenilenir.
+    Çağıran force_refresh=True vererek önbelleği atlayıp senkron yenileme yaptırabilir.
+    Async (coroutine) fonksiyonlar da desteklenir; key_name verilirse anahtar bu isimle üretilir
+    (örn: asearch_anime, search_anime ile aynı kayıtları paylaşır).
+    Orijinal (önbelleksiz) fonksiyona wrapper.uncached ile erişilebilir.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        name = key_name or func.__name__
+        label = f"{namespace}.{name}"
+
+        def prepare(config, args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = make_key(namespace, name, bound.arguments)
+            ttl = config['DETAIL_TTL'] if kind == KIND_DETAIL else config['SEARCH_TTL']
+            return key, ttl
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, force_refresh=False, **kwargs):
+                config = get_response_cache_settings()
+                if not config['ENABLED']:
+                    return await func(*args, **kwargs)
+
+                key, ttl = prepare(config, args, kwargs)
+                backend = get_backend()
+                if not force_refresh:
+                    found, value, stale = _lookup(backend, key, ttl, config, kind, label)
+                    if found:
+                        if stale:
+                            _schedule_async_refresh(key, func, args, kwargs, ttl, config, kind, label)
+                        return value
+
+                result = await func(*args, **kwargs)
+                if result is not None:
+                    _store(backend, key, result, ttl, config, kind)
+                return result
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, force_refresh=False, **kwargs):
+                config = get_response_cache_settings()
+                if not config['ENABLED']:
+                    return func(*args, **kwargs)
+
+                key, ttl = prepare(config, args, kwargs)
+                backend = get_backend()
+                if not force_refresh:
+                    found, value, stale = _lookup(backend, key, ttl, config, kind, label)
+                    if found:
+                        if stale:
+                            _schedule_refresh(key, func, args, kwargs, ttl, config, kind, label)
+                        return value
+
+                result = func(*args, **kwargs)
+                if result is not None:
+                    _store(backend, key, result, ttl, config, kind)
+                return result
+
+        wrapper.uncached = func
+        return wrapper
+    return decorator
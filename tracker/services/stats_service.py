@@ -0,0 +1,180 @@
+# tracker/services/stats_service.py
+# Kullanıcı başına denormalize istatistikler (MediaStats) için servis fonksiyonları.
+# Öğe ekleme/düzenleme/silme işlemlerinde sayaçlar F() ifadeleriyle artımlı güncellenir (tek UPDATE),
+# dashboard bu küçük tablodan tek sorguyla okur. rebuild_* fonksiyonları tabloyu gerçek verilerden yeniden üretir.
+
+import logging
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, Greatest
+
+from ..models import Anime, Manga, Novel, Webtoon, MediaStats
+
+# Logger oluştur
+logger = logging.getLogger(__name__)
+
+# media_type -> Model (MediaStats.MEDIA_TYPE_CHOICES ile aynı sıra)
+STATS_MODELS = {
+    'anime': Anime,
+    'webtoon': Webtoon,
+    'manga': Manga,
+    'novel': Novel,
+}
+
+
+def media_type_for(model_or_instance):
+    """Model sınıfı veya örneğinden media_type anahtarını döndürür (örn: Anime -> 'anime')."""
+    model = model_or_instance if isinstance(model_or_instance, type) else model_or_instance.__class__
+    return model._meta.model_name
+
+
+def item_state(instance):
+    """Bir öğenin istatistikleri etkileyen alanlarının anlık görüntüsü: (user_id, status, rating, added_date)."""
+    return (instance.user_id, instance.status, instance.rating, instance.added_date)
+
+
+# --- Artımlı Güncelleme ---
+def _state_deltas(state, sign):
+    """Tek bir öğe durumunun sayaçlara katkısını {alan: +/-değer} olarak döndürür."""
+    _, status, rating, _ = state
+    deltas = {'total_count': sign}
+    status_field = MediaStats.STATUS_FIELDS.get(status)
+    if status_field:
+        deltas[status_field] = deltas.get(status_field, 0) + sign
+    if rating is not None:
+        deltas['rated_count'] = sign
+        deltas['rating_sum'] = sign * rating
+    return deltas
+
+
+def _apply_deltas(user_id, media_type, deltas, extra_updates=None):
+    """Sayaç farklarını tek UPDATE ile uygular. Güncellenen satır sayısını döndürür."""
+    updates = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    updates.update(extra_updates or {})
+    if not updates:
+        return 1 # Değişiklik yok (örn: sadece başlık düzenlendi)
+    return MediaStats.objects.filter(user_id=user_id, media_type=media_type).update(**updates)
+
+
+def record_item_added(instance):
+    """Yeni öğe eklendiğinde istatistikleri artırır (satır yoksa oluşturur)."""
+    media_type = media_type_for(instance)
+    state = item_state(instance)
+    with transaction.atomic():
+        MediaStats.objects.get_or_create(user_id=instance.user_id, media_type=media_type)
+        _apply_deltas(
+            instance.user_id, media_type, _state_deltas(state, +1),
+            # latest_added: mevcut değer ile yeni tarihin büyüğü (NULL ise yeni tarih)
+            extra_updates={'latest_added': Greatest(Coalesce(F('latest_added'), instance.added_date), instance.added_date)},
+        )
+
+
+def record_item_changed(instance, old_state):
+    """
+    Düzenlenen öğenin eski ve yeni durumu arasındaki farkı uygular.
+    old_state yoksa (örn: alanlar defer edilmişti) veya kullanıcı değiştiyse ilgili satırlar yeniden hesaplanır.
+    """
+    media_type = media_type_for(instance)
+    new_state = item_state(instance)
+    if old_state is None or old_state[0] != new_state[0]:
+        for user_id in {new_state[0], old_state[0] if old_state else None} - {None}:
+            rebuild_user_stats(user_id, media_types=[media_type])
+        return
+    if old_state == new_state:
+        return
+
+    deltas = _state_deltas(old_state, -1)
+    for field, delta in _state_deltas(new_state, +1).items():
+        deltas[field] = deltas.get(field, 0) + delta
+    extra_updates = None
+    if old_state[3] != new_state[3]:
+        # Eklenme tarihi değişti: en son tarih bu öğe olabileceği için Max ile yeniden hesapla
+        extra_updates = {'latest_added': _latest_added_subquery(instance.user_id, media_type)}
+    if not _apply_deltas(instance.user_id, media_type, deltas, extra_updates):
+        rebuild_user_stats(instance.user_id, media_types=[media_type]) # Satır yoktu
+
+
+def record_item_deleted(instance, state=None):
+    """Silinen öğenin katkısını istatistiklerden düşer (satır yoksa hiçbir şey yapmaz)."""
+    media_type = media_type_for(instance)
+    state = state or item_state(instance)
+    extra_updates = None
+    if state[3] is not None:
+        # Silinen öğe en son eklenen olabilir; sadece o durumda yeniden hesapla
+        stats = MediaStats.objects.filter(user_id=state[0], media_type=media_type).values_list('latest_added', flat=True).first()
+        if stats is not None and stats <= state[3]:
+            extra_updates = {'latest_added': _latest_added_subquery(state[0], media_type)}
+    _apply_deltas(state[0], media_type, _state_deltas(state, -1), extra_updates)
+
+
+def _latest_added_subquery(user_id, media_type):
+    """Kullanıcının o türdeki en son eklenme tarihini veren alt sorgu (UPDATE içinde kullanılır)."""
+    model = STATS_MODELS[media_type]
+    return Subquery(
+        model.objects.filter(user_id=user_id).order_by().values('user_id')
+        .annotate(latest=Max('added_date')).values('latest')[:1]
+    )
+
+
+# --- Yeniden Hesaplama ---
+def _aggregate_rows(model, user_ids=None):
+    """Model için kullanıcı başına istatistikleri tek GROUP BY sorgusuyla hesaplar."""
+    queryset = model.objects.all()
+    if user_ids is not None:
+        queryset = queryset.filter(user_id__in=user_ids)
+    aggregates = {
+        'total_count': Count('id'),
+        'rated_count': Count('rating'),
+        'rating_sum': Coalesce(Sum('rating'), 0),
+        'latest_added': Max('added_date'),
+    }
+    for status, field in MediaStats.STATUS_FIELDS.items():
+        aggregates[field] = Count('id', filter=Q(status=status))
+    return queryset.order_by().values('user_id').annotate(**aggregates)
+
+
+def rebuild_user_stats(user_id, media_types=None):
+    """Kullanıcının istatistik satırlarını gerçek verilerden yeniden oluşturur."""
+    media_types = media_types or list(STATS_MODELS)
+    with transaction.atomic():
+        for media_type in media_types:
+            rows = list(_aggregate_rows(STATS_MODELS[media_type], user_ids=[user_id]))
+            values = rows[0] if rows else {}
+            values.pop('user_id', None)
+            defaults = {field: values.get(field, 0) for field in MediaStats.STATUS_FIELDS.values()}
+            defaults.update({
+                'total_count': values.get('total_count', 0),
+                'rated_count': values.get('rated_count', 0),
+                'rating_sum': values.get('rating_sum', 0),
+                'latest_added': values.get('latest_added'),
+            })
+            MediaStats.objects.update_or_create(user_id=user_id, media_type=media_type, defaults=defaults)
+
+
+def rebuild_all_stats(user_ids=None):
+    """
+    Tüm (veya verilen) kullanıcıların istatistiklerini yeniden oluşturur.
+    Model başına tek GROUP BY sorgusu + toplu silme/ekleme kullanır. Oluşturulan satır sayısını döndürür.
+    """
+    new_rows = []
+    for media_type, model in STATS_MODELS.items():
+        for row in _aggregate_rows(model, user_ids=user_ids):
+            new_rows.append(MediaStats(media_type=media_type, **row))
+    with transaction.atomic():
+        existing = MediaStats.objects.all()
+        if user_ids is not None:
+            existing = existing.filter(user_id__in=user_ids)
+        existing.delete()
+        MediaStats.objects.bulk_create(new_rows, batch_size=500)
+    logger.info(f"MediaStats yeniden oluşturuldu: {len(new_rows)} satır.")
+    return len(new_rows)
+
+
+# --- Okuma ---
+def get_user_stats(user):
+    """Kullanıcının istatistiklerini {media_type: MediaStats} olarak tek sorguyla döndürür (eksik türler boş)."""
+    stats = {row.media_type: row for row in MediaStats.objects.filter(user=user)}
+    for media_type in STATS_MODELS:
+        stats.setdefault(media_type, MediaStats(user=user, media_type=media_type))
+    return stats
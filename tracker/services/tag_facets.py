@@ -0,0 +1,119 @@
+# tracker/services/tag_facets.py
+# Liste sayfalarındaki etiket filtresi için kullanıcı ve medya türü başına önceden hesaplanmış etiket
+# facet'leri: her etiket için toplam öğe sayısı ve durum (status) başına sayılar ("Isekai (42)").
+# Facet'ler tek GROUP BY sorgusuyla hesaplanıp cache'lenir; (kullanıcı, tür) başına bir sürüm sayacı vardır
+# (dashboard_cache ile aynı yöntem). Sayaç şu durumlarda artırılır (signals.py):
+#   - öğe eklenince/düzenlenince/silinince (durum değişmiş olabilir),
+#   - öğenin etiketleri değişince (taggit m2m_changed: add/remove/clear/set),
+#   - toplu içe aktarımdan sonra (importer, bulk_create sinyal göndermez).
+# Not: Admin'den etiket adı değiştirmek sayacı artırmaz; eski ad en geç TIMEOUT sonunda yenilenir.
+
+import logging
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count
+
+# Logger oluştur
+logger = logging.getLogger(__name__)
+
+# settings.TAG_FACET_CACHE tanımlı değilse (veya eksikse) kullanılacak varsayılanlar
+DEFAULT_TAG_FACET_SETTINGS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 60 * 60 * 6,  # Facet ömrü (saniye); sürüm değişince zaten kullanılmaz
+    'KEY_PREFIX': 'tag_facets',
+}
+
+
+def get_tag_facet_settings():
+    """Varsayılan ayarları settings.TAG_FACET_CACHE ile birleştirip döndürür."""
+    config = DEFAULT_TAG_FACET_SETTINGS.copy()
+    config.update(getattr(settings, 'TAG_FACET_CACHE', {}) or {})
+    return config
+
+
+@dataclass
+class TagFacet:
+    """Şablonda Tag gibi kullanılır (name, slug) ve sayıları taşır."""
+    id: int
+    name: str
+    slug: str
+    count: int = 0                                     # Kullanıcının bu türdeki etiketli öğe sayısı
+    status_counts: dict = field(default_factory=dict)  # {status: sayı}
+
+    def __str__(self):
+        return self.name
+
+
+def _version_key(user_id, media_type, config):
+    return f"{config['KEY_PREFIX']}:version:{user_id}:{media_type}"
+
+
+def _get_version(cache, key):
+    version = cache.get(key)
+    if version is None:
+        # Sayaç düşerse 1'den başlamak eski facet'leri geri getirebilir; zaman tabanlı başlangıç bunu önler
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def compute_facets(user_id, model):
+    """Etiket facet'lerini (ada göre sıralı) tek GROUP BY sorgusuyla hesaplar."""
+    rows = (
+        model.objects.filter(user_id=user_id, tags__isnull=False)
+        .order_by()
+        .values('tags__id', 'tags__name', 'tags__slug', 'status')
+        .annotate(item_count=Count('pk'))
+    )
+    facets = {}
+    for row in rows:
+        facet = facets.get(row['tags__id'])
+        if facet is None:
+            facet = facets[row['tags__id']] = TagFacet(row['tags__id'], row['tags__name'], row['tags__slug'])
+        facet.count += row['item_count']
+        facet.status_counts[row['status']] = facet.status_counts.get(row['status'], 0) + row['item_count']
+    return sorted(facets.values(), key=lambda facet: facet.name)
+
+
+def get_facets(user_id, model):
+    """Kullanıcının verilen türdeki etiket facet'leri (cache'te yoksa hesaplanır)."""
+    config = get_tag_facet_settings()
+    if not config['ENABLED']:
+        return compute_facets(user_id, model)
+    cache = caches[config['CACHE_ALIAS']]
+    media_type = model._meta.model_name
+    version = _get_version(cache, _version_key(user_id, media_type, config))
+    key = f"{config['KEY_PREFIX']}:{user_id}:{media_type}:{version}"
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(user_id, model)
+        cache.set(key, facets, timeout=config['TIMEOUT'])
+    return facets
+
+
+def facets_for_status(facets, status):
+    """Durum filtresi seçiliyse sayıları o duruma göre verir (o durumda öğesi olmayan etiketler 0 görünür)."""
+    if not status:
+        return facets
+    return [
+        TagFacet(facet.id, facet.name, facet.slug, facet.status_counts.get(status, 0), facet.status_counts)
+        for facet in facets
+    ]
+
+
+def invalidate(user_id, media_type):
+    """(Kullanıcı, tür) facet'lerini geçersiz kılar (sürüm sayacını artırır)."""
+    if user_id is None:
+        return
+    config = get_tag_facet_settings()
+    cache = caches[config['CACHE_ALIAS']]
+    key = _version_key(user_id, media_type, config)
+    try:
+        cache.incr(key) # Atomik (Redis/Memcached); sayaç yoksa ValueError
+    except ValueError:
+        cache.set(key, int(time.time() * 1000), timeout=None)
+    logger.debug(f"Etiket facet'leri geçersiz kılındı (user_id={user_id}, tür={media_type}).")
@@ -0,0 +1,123 @@
+# tracker/signals.py
+# Model sinyalleri: Medya öğeleri eklendiğinde/düzenlendiğinde/silindiğinde denormalize
+# kullanıcı istatistiklerini (MediaStats) artımlı olarak günceller ve medya/favori yazmalarında
+# kullanıcının dashboard fragment cache sürümünü artırır (favorilerde favori kümesi ve navbar sayacının sürümünü de); başlık değiştiğinde fuzzy arama trigram
+# indeksini (TitleTrigram) yeniler; durum veya etiket değişince etiket facet'lerini geçersiz kılar.
+# TrackerConfig.ready() içinde bağlanır.
+# Not: QuerySet.update() ve bulk_create() sinyal göndermez; toplu işlemlerden sonra
+# stats_service.rebuild_user_stats() / rebuild_all_stats() ve fuzzy_search.rebuild_index() çağrılmalıdır.
+
+import logging
+
+from django.db.models.signals import post_init, post_save, post_delete, m2m_changed
+from taggit.models import TaggedItem
+
+from .models import Anime, Manga, Novel, Webtoon, Favorite
+from .services import dashboard_cache, favorite_index, fuzzy_search, stats_service, tag_facets
+
+# Logger oluştur
+logger = logging.getLogger(__name__)
+
+MEDIA_MODELS = (Anime, Webtoon, Manga, Novel)
+
+# İstatistikleri etkileyen alanlar (post_init anlık görüntüsü için, attname)
+STATS_TRACKED_ATTNAMES = ('user_id', 'status', 'rating', 'added_date')
+
+
+def _snapshot_item_state(sender, instance, **kwargs):
+    """
+    DB'den yüklenen öğenin istatistik alanlarını (düzenlemede fark hesabı için) ve sahibi/başlığını
+    (trigram indeksi sadece değişince yenilensin diye) saklar.
+    Her örneklenen satırda çalışır (liste, dışa aktarım, içe aktarım): tek receiver'dır ve get_deferred_fields()
+    yerine __dict__'e bakar (defer edilmiş alanlar __init__'te atanmaz, erişmek ek sorgu yapardı).
+    """
+    # Not: from_db() post_init'ten sonra _state.adding'i False yapar, bu yüzden pk kontrol edilir
+    if instance.pk is None: # Python'da oluşturulan (kaydedilmemiş) öğe: anlık görüntü gerekmez
+        instance._stats_state = instance._indexed_title = None
+        return
+    loaded = instance.__dict__
+    if all(name in loaded for name in STATS_TRACKED_ATTNAMES):
+        instance._stats_state = stats_service.item_state(instance)
+    else:
+        instance._stats_state = None # Kayıtta yeniden hesaplanır
+    if 'title' in loaded and 'user_id' in loaded:
+        instance._indexed_title = (instance.user_id, instance.title)
+    else:
+        instance._indexed_title = None # Kayıtta indeks yenilenir
+
+
+def _update_title_index_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    current = (instance.user_id, instance.title)
+    if created or getattr(instance, '_indexed_title', None) != current:
+        fuzzy_search.index_item(instance)
+    instance._indexed_title = current
+
+
+def _remove_title_index_on_delete(sender, instance, **kwargs):
+    fuzzy_search.remove_item(instance)
+
+
+def _update_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw: # loaddata: kullanıcı henüz yüklenmemiş olabilir, rebuild_media_stats ile hesaplanmalı
+        return
+    old_state = getattr(instance, '_stats_state', None)
+    if created:
+        stats_service.record_item_added(instance)
+    else:
+        stats_service.record_item_changed(instance, old_state)
+    # Dashboard fragment'ları (başlık, puan, tarih gösterir) geçersiz kılınır; öğe başka kullanıcıya geçtiyse ikisi de
+    dashboard_cache.bump_user_version(instance.user_id)
+    if old_state and old_state[0] != instance.user_id:
+        dashboard_cache.bump_user_version(old_state[0])
+    # Etiket facet'lerindeki durum sayıları: sadece durum/sahip değiştiyse (etiket değişiklikleri m2m_changed ile gelir)
+    if not created and (old_state is None or old_state[:2] != (instance.user_id, instance.status)):
+        media_type = sender._meta.model_name
+        tag_facets.invalidate(instance.user_id, media_type)
+        if old_state and old_state[0] != instance.user_id:
+            tag_facets.invalidate(old_state[0], media_type)
+    instance._stats_state = stats_service.item_state(instance) # Aynı nesne tekrar kaydedilirse fark doğru olsun
+
+
+def _update_stats_on_delete(sender, instance, **kwargs):
+    stats_service.record_item_deleted(instance)
+    dashboard_cache.bump_user_version(instance.user_id)
+    tag_facets.invalidate(instance.user_id, sender._meta.model_name)
+
+
+def _invalidate_tag_facets(sender, instance, action, reverse, pk_set, **kwargs):
+    """Öğenin etiketleri eklendiğinde/çıkarıldığında (taggit m2m_changed) etiket facet'lerini geçersiz kılar."""
+    if reverse or not isinstance(instance, MEDIA_MODELS):
+        return
+    if action == 'post_clear' or (action in ('post_add', 'post_remove') and pk_set):
+        tag_facets.invalidate(instance.user_id, instance._meta.model_name)
+
+
+def _bump_dashboard_version(sender, instance, raw=False, **kwargs):
+    """Favori eklendiğinde/silindiğinde kullanıcının dashboard fragment'larını geçersiz kılar."""
+    if raw:
+        return
+    dashboard_cache.bump_user_version(instance.user_id)
+
+
+def _invalidate_favorite_index(sender, instance, raw=False, **kwargs):
+    """Favori kümesi ve sayacı (aynı sürüm) şimdi ve commit'ten sonra geçersiz kılınır."""
+    if not raw:
+        favorite_index.invalidate_on_commit(instance.user_id)
+
+
+def connect_signals():
+    """Medya ve favori modelleri için sinyalleri bağlar (dispatch_uid ile tekrar bağlanmaz)."""
+    for model in MEDIA_MODELS:
+        label = model._meta.label_lower
+        post_init.connect(_snapshot_item_state, sender=model, dispatch_uid=f"item_state_snapshot_{label}")
+        post_save.connect(_update_stats_on_save, sender=model, dispatch_uid=f"stats_save_{label}")
+        post_delete.connect(_update_stats_on_delete, sender=model, dispatch_uid=f"stats_delete_{label}")
+        post_save.connect(_update_title_index_on_save, sender=model, dispatch_uid=f"title_index_save_{label}")
+        post_delete.connect(_remove_title_index_on_delete, sender=model, dispatch_uid=f"title_index_delete_{label}")
+    m2m_changed.connect(_invalidate_tag_facets, sender=TaggedItem, dispatch_uid="tag_facets_tags_changed")
+    post_save.connect(_bump_dashboard_version, sender=Favorite, dispatch_uid="dashboard_version_favorite_save")
+    post_delete.connect(_bump_dashboard_version, sender=Favorite, dispatch_uid="dashboard_version_favorite_delete")
+    post_save.connect(_invalidate_favorite_index, sender=Favorite, dispatch_uid="favorite_index_save")
+    post_delete.connect(_invalidate_favorite_index, sender=Favorite, dispatch_uid="favorite_index_delete")
@@ -0,0 +1,39 @@
+// tracker/static/tracker/js/job_status.js
+// Arka plan işleri sayfası: bitmemiş işlerin durumunu /jobs/<id>/status/ üzerinden periyodik olarak sorgular.
+
+document.addEventListener('DOMContentLoaded', function() {
+    const POLL_INTERVAL_MS = 2000;
+    const STATUS_CLASSES = { queued: 'bg-secondary', running: 'bg-primary', succeeded: 'bg-success', failed: 'bg-danger' };
+
+    function render(row, data) {
+        const badge = row.querySelector('.js-job-status');
+        badge.textContent = data.status_display;
+        badge.className = 'badge js-job-status ' + (STATUS_CLASSES[data.status] || 'bg-secondary');
+        row.querySelector('.js-job-progress').style.width = data.progress + '%';
+        row.querySelector('.js-job-message').textContent = data.error || data.message || '';
+        const download = row.querySelector('.js-job-download');
+        if (data.download_url) {
+            download.href = data.download_url;
+            download.classList.remove('d-none');
+        }
+    }
+
+    function poll(row) {
+        fetch(row.dataset.statusUrl, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+            .then(function(response) {
+                if (!response.ok) { throw new Error('HTTP ' + response.status); }
+                return response.json();
+            })
+            .then(function(data) {
+                render(row, data);
+                if (!data.finished) {
+                    setTimeout(function() { poll(row); }, POLL_INTERVAL_MS);
+                }
+            })
+            .catch(function(error) {
+                console.warn('İş durumu alınamadı:', error);
+            });
+    }
+
+    document.querySelectorAll('.js-job[data-finished="0"]').forEach(poll);
+});
@@ -2,25 +2,49 @@
 # Kapsamlı Güncelleme: Refactoring, Yeni Özellik Testleri (Favori, Tag, API Mocking), Model Testleri Güncellendi.
 
 import csv
+import gzip # Sıkıştırılmış export testleri için
 import io # CSV içeriğini kontrol etmek için
 import json # AJAX testleri için
 import uuid # MangaDex ID için
 import datetime # datetime modülünü import et
-from unittest.mock import patch # API çağrılarını mocklamak için
-
-from django.test import TestCase, Client
+import threading # Thread-safe servis testleri için
+import time
+import os
+import tempfile # export_library komutu testi için
+import zipfile # Kütüphane ZIP testleri için
+import asyncio # Async servis testleri için
+import importlib # Veri migration fonksiyonunu test etmek için
+from unittest.mock import patch, AsyncMock # API çağrılarını mocklamak için
+
+import requests # Sahte HTTP yanıtları için
+import httpx # Async servislerin sahte yanıtları için
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile # İçe aktarım view testi için
+from django.core.files.storage import default_storage # Arka plan işi dosyaları için
+
+from django.test import TestCase, Client, RequestFactory, override_settings
 from django.urls import reverse
 from django.utils import timezone
-from django.contrib.auth.models import User
+from django.contrib.auth.models import User, AnonymousUser
 from django.contrib.auth.forms import UserCreationForm # Signup testi için
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.messages import get_messages # Mesajları kontrol etmek için
-from django.db import IntegrityError # Unique constraint testi için
+from django.db import IntegrityError, connection, transaction # Unique constraint testi için
+from django.db.models import QuerySet # Sorgu araya girme (yarış) simülasyonu için
+from django.test.utils import CaptureQueriesContext # Sorgu sayımı için
 from taggit.models import Tag # Etiket testleri için
 
 # Modelleri ve Formları import et
-from .models import Anime, Novel, Webtoon, Manga, Favorite
+from .models import Anime, Novel, Webtoon, Manga, Favorite, MediaStats, TitleTrigram, BackgroundJob
 from .forms import AnimeForm, WebtoonForm, MangaForm, NovelForm
+from .views.helpers import _get_existing_api_ids, apply_sorting, _build_csv_row, _get_csv_row_serializer, _get_favorited_pks, _get_favorite_status, _get_all_user_tags, _get_filtered_queryset, apply_tag_filter
+from .views.export_views import ANIME_FIELDS_MAP, WEBTOON_FIELDS_MAP, library_export_chunks
+from .views import pagination
+from .services import http_client, async_http_client, jikan_service, mangadex_service, rate_limiter, response_cache, stats_service, dashboard_cache, media_queries, fulltext_search, fuzzy_search, export_formats, importer, jobs, metadata_refresh, favorite_counts, favorite_index
+from .context_processors import favorites_processor
 
 
 # --- Test Setup Mixin ---
@@ -35,6 +59,7 @@ class SetupMixin:
 
     def setUp(self):
         # Bu metod her test fonksiyonu (test_...) başında çalışır.
+        cache.clear() # Kullanıcı başına cache'ler (favori kümesi/sayacı) önceki testlerin ID'leriyle karışmasın
         self.client = Client()
         self.test_user1 = User.objects.create_user(username='testuser1', password='password123')
         self.other_user = User.objects.create_user(username='otheruser', password='password123')
@@ -304,7 +329,7 @@ class TrackerViewTests(SetupMixin, TestCase):
         if 'status' in params: self.assertEqual(response.context['current_status_filter'], params['status'])
         if 'q' in params: self.assertEqual(response.context['search_query'], params['q'])
         if 'sort' in params: self.assertEqual(response.context['current_sort'], params['sort'])
-        if 'tag' in params: self.assertEqual(response.context['current_tag_filter'], params['tag'])
+        if 'tag' in params: self.assertEqual(response.context['current_tag_filter'], [params['tag']]) # Çoklu etiket: liste
         print(f"Test Başarılı: {url_name} GET (Filtre/Sıralama: {params}). İçerik OK.")
 
     def _test_create_view_post_valid(self, url_name, model_class, form_data, expected_tags=None):
@@ -646,4 +671,1760 @@ class TrackerViewTests(SetupMixin, TestCase):
     # Dashboard, Signup testleri genellikle aynı kalabilir.
 
 
+# =========================================
+# --- Servis Katmanı Testleri ---
+# =========================================
+def _make_fake_response(status_code=200, payload=None, headers=None):
+    """HTTPAdapter.send mock'u için sahte bir requests.Response oluşturur."""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(payload if payload is not None else {}).encode('utf-8')
+    response.headers.update(headers or {})
+    response.encoding = 'utf-8'
+    return response
+
+
+class HTTPClientTests(TestCase):
+    """Ortak havuzlu HTTP istemcisi testleri (ağ erişimi mocklanır)."""
+
+    def setUp(self):
+        http_client.close_all() # Her test temiz bir kayıt defteriyle başlasın
+        rate_limiter.reset_buckets()
+        response_cache.clear()
+
+    def tearDown(self):
+        http_client.close_all()
+        rate_limiter.reset_buckets()
+
+    def test_client_is_shared_and_pool_reused(self):
+        """Aynı isimle alınan istemci ve bağlantı havuzu (adapter) paylaşılmalı."""
+        client = http_client.get_client('jikan')
+        self.assertIs(client, http_client.get_client('jikan'))
+        self.assertIsNot(client, http_client.get_client('mangadex'))
+
+        # Farklı thread'lerdeki session'lar aynı adapter'ı (bağlantı havuzunu) kullanmalı
+        adapters = []
+        def collect_adapter():
+            adapters.append(client._get_session().get_adapter('https://api.jikan.moe/v4'))
+        threads = [threading.Thread(target=collect_adapter) for _ in range(3)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        collect_adapter()
+        self.assertEqual(len(adapters), 4)
+        self.assertTrue(all(adapter is client._adapter for adapter in adapters))
+        self.assertEqual(client._adapter._pool_maxsize, settings.API_HTTP_CLIENT['POOL_MAXSIZE'])
+        self.assertEqual(client.timeout, (settings.API_HTTP_CLIENT['CONNECT_TIMEOUT'], settings.API_HTTP_CLIENT['READ_TIMEOUT']))
+
+    @patch('requests.adapters.HTTPAdapter.send')
+    def test_search_uses_client_and_records_metrics(self, mock_send):
+        """Servis istekleri paylaşılan istemciden geçmeli ve gecikme metrikleri kaydedilmeli."""
+        mock_send.return_value = _make_fake_response(payload={'data': [{'mal_id': 1, 'title': 'Metrik Anime'}]})
+        results = jikan_service.search_anime('metrik')
+        jikan_service.search_anime('metrik tekrar')
+        self.assertEqual(results[0]['title'], 'Metrik Anime')
+        self.assertEqual(mock_send.call_count, 2)
+
+        metrics = http_client.get_metrics()['jikan']['api.jikan.moe']
+        self.assertEqual(metrics['count'], 2)
+        self.assertEqual(metrics['errors'], 0)
+        self.assertEqual(metrics['status_codes'], {200: 2})
+        self.assertGreaterEqual(metrics['max_ms'], metrics['avg_ms'])
+
+        # Hata durumları da metriklere yansımalı
+        mock_send.side_effect = requests.exceptions.ConnectionError("bağlantı yok")
+        self.assertIsNone(jikan_service.search_anime('hata'))
+        metrics = http_client.get_metrics()['jikan']['api.jikan.moe']
+        self.assertEqual(metrics['count'], 3)
+        self.assertEqual(metrics['errors'], 1)
+        print("Test Başarılı: Ortak HTTP istemcisi (havuz paylaşımı & metrikler).")
+
+
+class RateLimiterTests(TestCase):
+    """Token-bucket rate limiter testleri (sahte saat ile, gerçek bekleme yapılmaz)."""
+
+    def setUp(self):
+        self.now = 1000.0
+        http_client.close_all()
+        rate_limiter.reset_buckets()
+        response_cache.clear()
+
+    def tearDown(self):
+        http_client.close_all()
+        rate_limiter.reset_buckets()
+
+    def _clock(self):
+        return self.now
+
+    def test_bucket_waits_only_when_budget_exhausted(self):
+        bucket = rate_limiter.TokenBucket('test', rate=2, capacity=2, clock=self._clock)
+        self.assertEqual(bucket.reserve(), 0) # Burst bütçesi
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertAlmostEqual(bucket.reserve(), 0.5) # Bütçe bitti: 1 token / 2 rate
+        self.assertAlmostEqual(bucket.reserve(), 1.0) # Kuyruktaki ikinci istek daha uzun bekler
+        # Uzun süre istek yapılmazsa bütçe kapasiteye kadar dolar, bekleme olmaz
+        self.now += 60
+        self.assertEqual(bucket.reserve(), 0)
+
+    def test_penalize_blocks_until_retry_after(self):
+        bucket = rate_limiter.TokenBucket('test', rate=5, capacity=5, clock=self._clock)
+        bucket.penalize(7)
+        self.assertAlmostEqual(bucket.reserve(), 7 + 1 / 5)
+        self.now += 10
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(rate_limiter.parse_retry_after('3'), 3.0)
+        self.assertEqual(rate_limiter.parse_retry_after('geçersiz', default=2.0), 2.0)
+
+    def test_shared_bucket_uses_cache_windows(self):
+        cache.clear()
+        bucket = rate_limiter.SharedTokenBucket('paylasimli', rate=2, capacity=2, clock=self._clock)
+        other_process_bucket = rate_limiter.SharedTokenBucket('paylasimli', rate=2, capacity=2, clock=self._clock)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(other_process_bucket.reserve(), 0) # Aynı pencere bütçesini paylaşır
+        self.assertAlmostEqual(bucket.reserve(), 1.0) # Pencere (1 sn) doldu, sonrakine kalır
+        other_process_bucket.penalize(5)
+        self.assertGreaterEqual(bucket.reserve(), 5)
+
+    @patch('requests.adapters.HTTPAdapter.send')
+    def test_429_response_feeds_back_into_bucket(self, mock_send):
+        mock_send.return_value = _make_fake_response(status_code=429, headers={'Retry-After': '30'})
+        self.assertIsNone(mangadex_service.search_manga('çok istek'))
+        bucket = rate_limiter.get_bucket('mangadex')
+        self.assertGreaterEqual(bucket.reserve(), 29) # Sonraki istek Retry-After kadar bekletilir
+        print("Test Başarılı: Rate limiter (token bucket, paylaşımlı pencere, 429 geri bildirimi).")
+
+
+class ResponseCacheTests(TestCase):
+    """search_* / get_*_details yanıt önbelleği testleri."""
+
+    def setUp(self):
+        http_client.close_all()
+        rate_limiter.reset_buckets()
+        response_cache.clear()
+
+    def tearDown(self):
+        response_cache.clear()
+
+    @patch('requests.adapters.HTTPAdapter.send')
+    def test_normalized_queries_hit_cache(self, mock_send):
+        """Aynı (normalize edilmiş) sorgu ikinci kez upstream'e gitmemeli."""
+        mock_send.return_value = _make_fake_response(payload={'data': [{'mal_id': 20, 'title': 'Naruto'}]})
+        first = jikan_service.search_anime('Naruto')
+        second = jikan_service.search_anime('  naruto ')
+        self.assertEqual(first, second)
+        self.assertEqual(mock_send.call_count, 1)
+        # Farklı parametre farklı anahtar üretmeli
+        jikan_service.search_anime('Naruto', limit=5)
+        self.assertEqual(mock_send.call_count, 2)
+        # Dönen değer bir kopya olmalı (view'ların değiştirmesi önbelleği bozmamalı)
+        first[0]['title'] = 'Değiştirildi'
+        self.assertEqual(jikan_service.search_anime('NARUTO')[0]['title'], 'Naruto')
+        self.assertEqual(response_cache.stats.hits, 2)
+
+    @patch('requests.adapters.HTTPAdapter.send')
+    def test_errors_are_not_cached_and_ttls_are_separate(self, mock_send):
+        mock_send.return_value = _make_fake_response(status_code=500)
+        self.assertIsNone(mangadex_service.search_manga('hata'))
+        self.assertIsNone(mangadex_service.search_manga('hata'))
+        self.assertEqual(mock_send.call_count, 2) # None önbelleğe alınmaz
+
+        with override_settings(API_RESPONSE_CACHE={'SEARCH_TTL': 0, 'DETAIL_TTL': 3600}):
+            mock_send.return_value = _make_fake_response(payload={'data': {'mal_id': 5, 'title': 'Detay'}})
+            jikan_service.get_anime_details(5)
+            jikan_service.get_anime_details(5)
+            self.assertEqual(mock_send.call_count, 3) # Detay TTL'i geçerli, tek istek
+            mock_send.return_value = _make_fake_response(payload={'data': []})
+            jikan_service.search_anime('ttl')
+            jikan_service.search_anime('ttl')
+            self.assertEqual(mock_send.call_count, 5) # Arama TTL'i 0: her seferinde istek
+
+    def test_lru_eviction_respects_memory_cap(self):
+        lru = response_cache.LRUMemoryCache(max_bytes=600)
+        for i in range(10):
+            lru.set(f"k{i}", 'x' * 100, timeout=60)
+            lru.get("k0") # k0 sürekli kullanıldığı için atılmamalı
+        self.assertLessEqual(lru.current_bytes, 600)
+        self.assertIsNotNone(lru.get("k0"))
+        self.assertIsNone(lru.get("k1")) # En eski kullanılmayan atıldı
+        self.assertIsNotNone(lru.get("k9"))
+
+    @patch('requests.adapters.HTTPAdapter.send')
+    def test_django_cache_backend_is_pluggable(self, mock_send):
+        cache.clear()
+        mock_send.return_value = _make_fake_response(payload={'data': []})
+        with override_settings(API_RESPONSE_CACHE={'BACKEND': 'django', 'CACHE_ALIAS': 'default'}):
+            self.assertIsInstance(response_cache.get_backend(), response_cache.DjangoCacheBackend)
+            jikan_service.search_novel('Mushoku Tensei')
+            jikan_service.search_novel('mushoku  tensei')
+        self.assertEqual(mock_send.call_count, 1)
+        print("Test Başarılı: API yanıt önbelleği (normalize anahtar, TTL, LRU, Django backend).")
+
+
+class StaleWhileRevalidateTests(TestCase):
+    """Detay sonuçları için stale-while-revalidate ve zorla yenileme testleri."""
+
+    def setUp(self):
+        http_client.close_all()
+        rate_limiter.reset_buckets()
+        response_cache.clear()
+        self.now = 1_000_000.0
+        patcher = patch('tracker.services.response_cache._now', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        response_cache.wait_for_refreshes(timeout=5)
+        response_cache.clear()
+
+    def _detail_payload(self, title):
+        return {'data': {'mal_id': 5, 'title': title, 'status': 'Finished Airing', 'score': 8.1}}
+
+    @patch('requests.adapters.HTTPAdapter.send')
+    def test_stale_entry_served_and_refreshed_in_background(self, mock_send):
+        """TTL'i geçmiş detay hemen sunulmalı, arka planda yenilenmeli."""
+        config = {'DETAIL_TTL': 100, 'MAX_STALENESS': 1000, 'STALE_WHILE_REVALIDATE': True}
+        with override_settings(API_RESPONSE_CACHE=config):
+            mock_send.return_value = _make_fake_response(payload=self._detail_payload('Eski'))
+            self.assertEqual(jikan_service.get_anime_details(5)['title'], 'Eski')
+
+            self.now += 500 # TTL geçti, MAX_STALENESS içinde
+            mock_send.return_value = _make_fake_response(payload=self._detail_payload('Yeni'))
+            self.assertEqual(jikan_service.get_anime_details(5)['title'], 'Eski') # Beklemeden eski veri
+            response_cache.wait_for_refreshes(timeout=5)
+            self.assertEqual(mock_send.call_count, 2)
+            self.assertEqual(response_cache.stats.stale_hits, 1)
+            self.assertEqual(response_cache.stats.refreshes, 1)
+            self.assertEqual(jikan_service.get_anime_details(5)['title'], 'Yeni') # Taze kayıt
+
+            self.now += 5000 # MAX_STALENESS de aşıldı: senkron istek
+            mock_send.return_value = _make_fake_response(payload=self._detail_payload('En Yeni'))
+            self.assertEqual(jikan_service.get_anime_details(5)['title'], 'En Yeni')
+            self.assertEqual(mock_send.call_count, 3)
+
+    @patch('requests.adapters.HTTPAdapter.send')
+    def test_failed_refresh_keeps_stale_entry_and_force_refresh(self, mock_send):
+        config = {'DETAIL_TTL': 100, 'MAX_STALENESS': 1000}
+        with override_settings(API_RESPONSE_CACHE=config):
+            mock_send.return_value = _make_fake_response(payload=self._detail_payload('Eski'))
+            jikan_service.get_anime_details(5)
+            self.now += 200
+            mock_send.return_value = _make_fake_response(status_code=500)
+            jikan_service.get_anime_details(5)
+            response_cache.wait_for_refreshes(timeout=5)
+            self.assertEqual(jikan_service.get_anime_details(5)['title'], 'Eski') # Hata eski kaydı silmez
+
+            # force_refresh önbelleği atlar ve senkron yeniler
+            mock_send.return_value = _make_fake_response(payload=self._detail_payload('Zorla'))
+            self.assertEqual(jikan_service.get_anime_details(5, force_refresh=True)['title'], 'Zorla')
+            response_cache.wait_for_refreshes(timeout=5)
+            calls_before = mock_send.call_count
+            self.assertEqual(jikan_service.get_anime_details(5)['title'], 'Zorla')
+            self.assertEqual(mock_send.call_count, calls_before)
+
+    @patch('requests.adapters.HTTPAdapter.send')
+    def test_search_results_are_not_served_stale(self, mock_send):
+        with override_settings(API_RESPONSE_CACHE={'SEARCH_TTL': 100}):
+            mock_send.return_value = _make_fake_response(payload={'data': []})
+            jikan_service.search_anime('bayat')
+            self.now += 200
+            jikan_service.search_anime('bayat')
+            self.assertEqual(mock_send.call_count, 2)
+            self.assertEqual(response_cache.stats.stale_hits, 0)
+
+    @patch('tracker.services.jikan_service.get_anime_details')
+    def test_add_view_refresh_parameter(self, mock_details):
+        """Ekleme sayfasında ?refresh=1 servis çağrısına force_refresh=True olarak iletilmeli."""
+        User.objects.create_user(username='swruser', password='password123')
+        self.client.login(username='swruser', password='password123')
+        mock_details.return_value = {'mal_id': 5, 'title': 'Test', 'status': 'Completed'}
+        url = reverse('tracker:jikan_add_anime', kwargs={'mal_id': 5})
+        self.client.get(url)
+        mock_details.assert_called_with(5, force_refresh=False)
+        self.client.get(url, {'refresh': '1'})
+        mock_details.assert_called_with(5, force_refresh=True)
+        print("Test Başarılı: Stale-while-revalidate (eski kayıt, arka plan yenileme, force_refresh).")
+
+
+def _make_fake_httpx_send(payload=None, status_code=200, headers=None, delay=0):
+    """httpx.AsyncClient.send yerine kullanılacak sahte coroutine (isteği yanıta bağlar)."""
+    async def fake_send(request, **kwargs):
+        if delay:
+            await asyncio.sleep(delay)
+        return httpx.Response(status_code, json=payload if payload is not None else {}, headers=headers, request=request)
+    return AsyncMock(side_effect=fake_send)
+
+
+class AsyncServiceTests(TestCase):
+    """Jikan/MangaDex servislerinin async (httpx) karşılıkları için testler."""
+
+    def setUp(self):
+        http_client.close_all()
+        async_http_client.reset_clients()
+        rate_limiter.reset_buckets()
+        response_cache.clear()
+
+    def tearDown(self):
+        async_http_client.reset_clients()
+        response_cache.clear()
+
+    async def test_async_search_parses_and_shares_cache_with_sync(self):
+        """asearch_anime senkron sürümle aynı sonucu üretmeli ve önbelleği paylaşmalı."""
+        fake_send = _make_fake_httpx_send({'data': [{'mal_id': 1, 'title': 'Cowboy Bebop', 'type': 'TV'}]})
+        with patch('httpx.AsyncClient.send', new=fake_send):
+            results = await jikan_service.asearch_anime('Cowboy Bebop')
+        self.assertEqual(results[0]['mal_id'], 1)
+        self.assertEqual(results[0]['type'], 'TV')
+        request = fake_send.call_args.args[0]
+        self.assertIn('q=Cowboy+Bebop', str(request.url))
+        self.assertTrue(request.headers['User-Agent'].startswith('DjangoListeApp'))
+
+        # Aynı sorgu senkron fonksiyondan önbellekten gelmeli (HTTP isteği yok)
+        with patch('requests.adapters.HTTPAdapter.send') as mock_send:
+            self.assertEqual(jikan_service.search_anime(' cowboy bebop'), results)
+            mock_send.assert_not_called()
+
+    async def test_async_errors_return_none_and_feed_rate_limiter(self):
+        fake_send = _make_fake_httpx_send(status_code=429, headers={'Retry-After': '7'})
+        with patch('httpx.AsyncClient.send', new=fake_send):
+            self.assertIsNone(await mangadex_service.asearch_manga('çok istek'))
+        bucket = rate_limiter.get_bucket('mangadex')
+        self.assertGreaterEqual(bucket.reserve(), 6.0) # Retry-After bucket'a bildirildi
+        metrics = http_client.get_metrics()['mangadex']['api.mangadex.org']
+        self.assertEqual(metrics['status_codes'], {429: 1}) # Metrikler senkron istemciyle ortak
+
+        with patch('httpx.AsyncClient.send', new=AsyncMock(side_effect=httpx.ConnectTimeout('zaman aşımı'))):
+            self.assertIsNone(await jikan_service.aget_anime_details(99))
+        self.assertIsNone(await mangadex_service.aget_manga_details('gecersiz-uuid'))
+
+    @override_settings(API_RATE_LIMITS={})
+    async def test_concurrent_async_requests_do_not_block_each_other(self):
+        """Yavaş upstream'e yapılan eşzamanlı async istekler sırayla değil paralel beklenmeli."""
+        fake_send = _make_fake_httpx_send({'data': {'mal_id': 3, 'title': 'Yavaş'}}, delay=0.2)
+        with patch('httpx.AsyncClient.send', new=fake_send):
+            start = time.perf_counter()
+            results = await asyncio.gather(*(jikan_service.aget_anime_details(i) for i in range(5)))
+            elapsed = time.perf_counter() - start
+        self.assertEqual(len(results), 5)
+        self.assertEqual(fake_send.call_count, 5)
+        self.assertLess(elapsed, 0.8) # Sıralı olsaydı >= 1 sn sürerdi
+
+    async def test_async_token_bucket_waits_without_blocking(self):
+        now = [100.0]
+        bucket = rate_limiter.TokenBucket('async-test', rate=1, capacity=1, clock=lambda: now[0])
+        with patch('tracker.services.rate_limiter.asyncio.sleep', new=AsyncMock()) as mock_sleep:
+            self.assertEqual(await bucket.aacquire(), 0.0)
+            self.assertAlmostEqual(await bucket.aacquire(), 1.0)
+            mock_sleep.assert_awaited_once()
+
+    @patch('tracker.services.jikan_service.asearch_anime', new_callable=AsyncMock)
+    def test_async_search_view(self, mock_search):
+        """API arama view'ı async servis fonksiyonunu kullanmalı ve listede olanları işaretlemeli."""
+        user = User.objects.create_user(username='asyncuser', password='password123')
+        Anime.objects.create(user=user, title='Listede', status='Watching', mal_id=42)
+        self.client.login(username='asyncuser', password='password123')
+        base = {'image_url': None, 'type': 'TV', 'episodes': 12, 'score': 7.5, 'status': 'Finished Airing', 'synopsis_snippet': ''}
+        mock_search.return_value = [dict(base, mal_id=42, title='Listede'), dict(base, mal_id=43, title='Yeni')]
+        response = self.client.post(reverse('tracker:anime_api_search'), {'query': 'test'})
+        self.assertEqual(response.status_code, 200)
+        mock_search.assert_awaited_once_with('test')
+        self.assertEqual(response.context['existing_ids_in_db'], {42})
+        print("Test Başarılı: Async servis fonksiyonları, async arama view'ı ve paylaşılan havuz/bucket.")
+
+
+class UnifiedAPISearchTests(TestCase):
+    """Birleşik (Jikan anime + Jikan novel + MangaDex) API araması testleri."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='unifieduser', password='password123')
+        self.client.login(username='unifieduser', password='password123')
+        self.url = reverse('tracker:unified_api_search')
+        self.md_in_list = uuid.uuid4()
+        self.md_webtoon = uuid.uuid4()
+        Anime.objects.create(user=self.user, title='A', status='Watching', mal_id=1)
+        Novel.objects.create(user=self.user, title='N', status='Reading', mal_id=2)
+        Manga.objects.create(user=self.user, title='M', status='Reading', mangadex_id=self.md_in_list)
+        Webtoon.objects.create(user=self.user, title='W', status='Reading', mangadex_id=self.md_webtoon)
+
+    def _jikan(self, mal_id, title):
+        return {'mal_id': mal_id, 'title': title, 'image_url': None, 'type': 'TV', 'score': None,
+                'status': None, 'synopsis_snippet': ''}
+
+    def _md(self, md_id, title):
+        return {'id': str(md_id), 'title': title, 'cover_url': None, 'year': 2020, 'status': 'ongoing',
+                'authors': '', 'artists': '', 'description_snippet': ''}
+
+    def test_existing_ids_single_query(self):
+        """Dört tablodaki listede olan ID'ler tek UNION sorgusuyla bulunmalı."""
+        request = type('Req', (), {'user': self.user})()
+        with self.assertNumQueries(1):
+            existing = _get_existing_api_ids(
+                request, {'anime': [1, 2, 99], 'novel': [1, 2]},
+                [str(self.md_in_list), str(self.md_webtoon), str(uuid.uuid4()), 'gecersiz']
+            )
+        self.assertEqual(existing['anime'], {1}) # Anime ve novel MAL ID alanları ayrı
+        self.assertEqual(existing['novel'], {2})
+        self.assertEqual(existing['manga'], {str(self.md_in_list), str(self.md_webtoon)})
+
+    def test_fan_out_merge_and_dedupe(self):
+        def slow(result, delay=0.3):
+            async def search(query):
+                await asyncio.sleep(delay)
+                return result
+            return search
+
+        anime = [self._jikan(1, 'Anime 1'), self._jikan(1, 'Anime 1 tekrar'), self._jikan(5, 'Anime 5')]
+        novel = [self._jikan(2, 'Novel 2')]
+        manga = [self._md(self.md_in_list, 'Manga'), self._md(uuid.uuid4(), 'Yeni Manga')]
+        with patch('tracker.services.jikan_service.asearch_anime', new=slow(anime)), \
+             patch('tracker.services.jikan_service.asearch_novel', new=slow(novel)), \
+             patch('tracker.services.mangadex_service.asearch_manga', new=slow(manga)):
+            start = time.perf_counter()
+            response = self.client.post(self.url, {'query': 'test'})
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(elapsed, 0.85) # Sıralı olsaydı >= 0.9 sn
+        merged = response.context['merged_results']
+        self.assertEqual([(e['source'], e['result']['title']) for e in merged], [
+            ('anime', 'Anime 1'), ('novel', 'Novel 2'), ('manga', 'Manga'),
+            ('manga', 'Yeni Manga'), ('anime', 'Anime 5'),
+        ]) # Sıra sıra birleştirildi, tekrar eden MAL ID 1 (2. sıra) atıldı
+        self.assertEqual(merged[0]['existing_ids_in_db'], {1})
+        self.assertContains(response, 'Listede Mevcut', count=3)
+
+    def test_failed_source_and_source_filter(self):
+        with patch('tracker.services.jikan_service.asearch_anime', new_callable=AsyncMock) as mock_anime, \
+             patch('tracker.services.jikan_service.asearch_novel', new_callable=AsyncMock) as mock_novel, \
+             patch('tracker.services.mangadex_service.asearch_manga', new_callable=AsyncMock) as mock_manga:
+            mock_anime.return_value = None # API hatası
+            mock_manga.side_effect = RuntimeError('beklenmedik')
+            response = self.client.post(self.url, {'query': 'test', 'sources': ['anime', 'manga']})
+            mock_novel.assert_not_called() # Seçilmeyen kaynak sorgulanmaz
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['merged_results'], [])
+        self.assertTrue(all(s['error'] for s in response.context['source_summaries']))
+        print("Test Başarılı: Birleşik API araması (eşzamanlı istek, birleştirme, tek DB sorgusu).")
+
+
+# --- Denormalize İstatistik (MediaStats) Testleri ---
+class MediaStatsTests(SetupMixin, TestCase):
+    """MediaStats tablosunun sinyallerle artımlı güncellenmesi ve dashboard'un bu tablodan okuması."""
+
+    def assertStatsMatchRebuild(self, user):
+        """Artımlı tutulan değerler, gerçek verilerden yeniden hesaplananlarla aynı olmalı."""
+        current = {s.media_type: s for s in MediaStats.objects.filter(user=user)}
+        stats_service.rebuild_user_stats(user.pk)
+        for rebuilt in MediaStats.objects.filter(user=user):
+            incremental = current[rebuilt.media_type]
+            for field in ['total_count', 'rated_count', 'rating_sum', 'latest_added', *MediaStats.STATUS_FIELDS.values()]:
+                self.assertEqual(getattr(incremental, field), getattr(rebuilt, field), f"{rebuilt.media_type}.{field}")
+
+    def test_incremental_updates_on_create_edit_delete(self):
+        stats = MediaStats.objects.get(user=self.test_user1, media_type='anime')
+        self.assertEqual((stats.total_count, stats.watching_count, stats.completed_count), (3, 1, 1))
+        self.assertEqual((stats.rated_count, stats.rating_sum), (2, 17))
+        self.assertEqual(stats.average_rating, 8.5)
+
+        self.anime1.status = 'Completed'
+        self.anime1.rating = 10
+        self.anime1.save()
+        stats.refresh_from_db()
+        self.assertEqual((stats.watching_count, stats.completed_count, stats.rating_sum), (0, 2, 19))
+
+        # Sadece başlık değişirse istatistik sorgusu yapılmaz (trigram indeksi güncellenir)
+        anime = Anime.objects.get(pk=self.anime2.pk)
+        anime.title = 'Yeni Başlık'
+        with CaptureQueriesContext(connection) as ctx:
+            anime.save()
+        self.assertFalse(any('tracker_mediastats' in q['sql'] for q in ctx.captured_queries))
+
+        newest = Anime.objects.get(pk=self.anime3_plan.pk)
+        newest.delete()
+        stats.refresh_from_db()
+        self.assertEqual(stats.total_count, 2)
+        self.assertEqual(stats.plan_to_watch_count, 0)
+        self.assertEqual(stats.latest_added, self.anime2.added_date) # En yeni silindi, yeniden hesaplandı
+        self.assertStatsMatchRebuild(self.test_user1)
+
+    def test_snapshot_with_deferred_fields(self):
+        # Defer edilmiş alan varsa anlık görüntü alınmaz ve ek sorgu yapılmaz
+        with self.assertNumQueries(1):
+            partial = Anime.objects.only('pk', 'title').get(pk=self.anime1.pk)
+        self.assertIsNone(partial._stats_state)
+        self.assertIsNone(partial._indexed_title)
+        self.assertIsNone(Anime(user=self.test_user1, title="Kaydedilmemiş")._stats_state)
+
+        full = Anime.objects.get(pk=self.anime1.pk)
+        self.assertEqual(full._indexed_title, (self.test_user1.pk, self.anime1.title))
+        partial.status = 'Dropped'
+        partial.save(update_fields=['status'])
+        self.assertStatsMatchRebuild(self.test_user1)
+
+    def test_rebuild_command_and_dashboard(self):
+        MediaStats.objects.all().delete()
+        call_command('rebuild_media_stats', stdout=io.StringIO())
+        self.assertEqual(MediaStats.objects.filter(user=self.test_user1).count(), 4)
+        self.assertEqual(MediaStats.objects.get(user=self.other_user, media_type='webtoon').completed_count, 1)
+
+        self.client.login(username='testuser1', password='password123')
+        response = self.client.get(reverse('tracker:dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['anime_count'], 3)
+        self.assertEqual(response.context['manga_count'], 2)
+        self.assertEqual(response.context['novel_count'], 2)
+        chart_data = json.loads(response.context['chart_data_json'])
+        self.assertEqual(sum(chart_data['statusData']), 8)
+        self.assertEqual(chart_data['statusData'][0], 4) # Watching: anime1, webtoon1, manga_vols_only, novel_vols_only
+        print("Test Başarılı: MediaStats artımlı güncelleme, yeniden hesaplama ve dashboard.")
+
+
+# --- Dashboard Fragment Cache Testleri ---
+class DashboardCacheTests(SetupMixin, TestCase):
+    """Dashboard liste bölümlerinin kullanıcı sürümüyle cache'lenmesi ve yazmalarda geçersiz kılınması."""
+
+    def setUp(self):
+        cache.clear()
+        super().setUp()
+        self.client.login(username='testuser1', password='password123')
+        self.url = reverse('tracker:dashboard')
+
+    def _media_queries(self):
+        """Dashboard isteğinde medya tablolarına giden sorguları döndürür."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        tables = ('tracker_anime', 'tracker_manga', 'tracker_novel', 'tracker_webtoon')
+        return response, [q['sql'] for q in ctx.captured_queries if any(t in q['sql'] for t in tables)]
+
+    def test_repeat_view_served_from_cache(self):
+        _, first_queries = self._media_queries()
+        self.assertEqual(len(first_queries), 1) # Son eklenen + en yüksek puanlı listeler tek UNION ALL sorgusunda
+        response, repeat_queries = self._media_queries()
+        self.assertEqual(repeat_queries, [])
+        self.assertContains(response, 'Test Anime Beta')
+
+    def test_writes_bump_user_version(self):
+        self._media_queries()
+        version = dashboard_cache.get_user_version(self.test_user1.pk)
+        other_version = dashboard_cache.get_user_version(self.other_user.pk)
+
+        self.anime2.title = 'Yeniden Adlandırılmış Anime'
+        self.anime2.save()
+        self.assertGreater(dashboard_cache.get_user_version(self.test_user1.pk), version)
+        response, queries = self._media_queries()
+        self.assertEqual(len(queries), 1)
+        self.assertContains(response, 'Yeniden Adlandırılmış Anime')
+
+        version = dashboard_cache.get_user_version(self.test_user1.pk)
+        favorite = Favorite.objects.create(user=self.test_user1, content_type=self.anime_content_type, object_id=self.anime1.pk)
+        favorite.delete()
+        Manga.objects.get(pk=self.manga1.pk).delete()
+        self.assertEqual(dashboard_cache.get_user_version(self.test_user1.pk), version + 3)
+        self.assertEqual(dashboard_cache.get_user_version(self.other_user.pk), other_version) # Diğer kullanıcı etkilenmez
+
+    @override_settings(DASHBOARD_CACHE={'ENABLED': False})
+    def test_disabled_cache_renders_every_time(self):
+        self._media_queries()
+        _, queries = self._media_queries()
+        self.assertEqual(len(queries), 1)
+        print("Test Başarılı: Dashboard fragment cache ve kullanıcı başına geçersiz kılma.")
+
+
+# --- Birleşik (UNION ALL) Medya Sorgusu Testleri ---
+class MediaQueriesTests(SetupMixin, TestCase):
+    """Dashboard listelerinin tek UNION ALL sorgusuyla ve ORM sıralamasıyla aynı sonuçla üretilmesi."""
+
+    def test_dashboard_lists_match_per_model_queries(self):
+        Anime.objects.create(user=self.test_user1, title="Yeni Puanlı", status="Completed", rating=9, added_date=timezone.now() + datetime.timedelta(minutes=1))
+        lists = media_queries.DashboardLists(self.test_user1, limit=2)
+        with self.assertNumQueries(1):
+            recent_anime = lists.get('recent', 'anime')
+            top_manga = lists.get('top', 'manga')
+            top_anime = lists.get('top', 'anime')
+        for model, media_type in ((Anime, 'anime'), (Webtoon, 'webtoon'), (Manga, 'manga'), (Novel, 'novel')):
+            expected_recent = list(model.objects.filter(user=self.test_user1).order_by('-added_date').values_list('pk', flat=True)[:2])
+            expected_top = list(model.objects.filter(user=self.test_user1, rating__isnull=False).order_by('-rating', '-added_date').values_list('pk', flat=True)[:2])
+            self.assertEqual([row.pk for row in lists.get('recent', media_type)], expected_recent, media_type)
+            self.assertEqual([row.pk for row in lists.get('top', media_type)], expected_top, media_type)
+
+        row = recent_anime[0]
+        self.assertIsInstance(row, media_queries.MediaRow)
+        self.assertEqual((row.title, row.rating, row.url_name), ("Yeni Puanlı", 9, 'anime_detail'))
+        self.assertIsInstance(row.added_date, datetime.datetime) # DB değeri Python tipine çevrildi
+        self.assertEqual([r.title for r in top_anime], ["Yeni Puanlı", "Test Anime Beta"]) # Eşit puanda yeni olan önce
+        self.assertEqual([r.title for r in top_manga], ["Test Manga 1"])
+        self.assertEqual(media_queries.DashboardLists(self.other_user).get('top', 'anime'), [])
+
+    def test_dashboard_renders_rows(self):
+        self.client.login(username='testuser1', password='password123')
+        cache.clear()
+        response = self.client.get(reverse('tracker:dashboard'))
+        self.assertContains(response, reverse('tracker:anime_detail', args=[self.anime2.pk]))
+        self.assertContains(response, 'Test Novel 1')
+        self.assertNotContains(response, 'Other User Anime')
+        print("Test Başarılı: Dashboard listeleri tek UNION ALL sorgusuyla.")
+
+
+# --- Cursor (Keyset) Sayfalama Testleri ---
+class CursorPaginationTests(SetupMixin, TestCase):
+    """Keyset sayfalamanın tüm sıralamalarda Paginator ile aynı öğeleri, COUNT/OFFSET olmadan döndürmesi."""
+
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+        base_date = timezone.now() - datetime.timedelta(days=10)
+        for i in range(9): # Aynı puan/başlık ve null puanlar: pk ile eşitlik bozma test edilir
+            Anime.objects.create(
+                user=self.test_user1, title=f"Seri {i % 3}", status="Completed",
+                rating=[None, 5, 7][i % 3], added_date=base_date + datetime.timedelta(hours=i),
+            )
+        self.queryset = Anime.objects.filter(user=self.test_user1)
+
+    def _expected_order(self, sort_key):
+        items = list(self.queryset)
+        field, descending, nullable = pagination.CURSOR_SORT_FIELDS[sort_key]
+        present = sorted((i for i in items if getattr(i, field) is not None),
+                         key=lambda i: (getattr(i, field), i.pk), reverse=descending)
+        nulls = sorted((i for i in items if getattr(i, field) is None), key=lambda i: i.pk, reverse=descending)
+        return [i.pk for i in present + nulls]
+
+    def _walk(self, sort_key, per_page=4):
+        """İleri ve geri tüm sayfaları gezer; (ileri pk'lar, geri pk'lar) döndürür."""
+        pages, cursor = [], None
+        while True:
+            params = {'cursor': cursor} if cursor else {}
+            page, _ = pagination.paginate_by_cursor(self.factory.get('/', params), self.queryset, per_page, sort_key)
+            pages.append(page)
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+        backward = [item.pk for item in pages[-1]]
+        page = pages[-1]
+        while page.has_previous():
+            page, _ = pagination.paginate_by_cursor(self.factory.get('/', {'cursor': page.previous_cursor}), self.queryset, per_page, sort_key)
+            backward = [item.pk for item in page] + backward
+        return [item.pk for p in pages for item in p], backward
+
+    def test_all_sorts_forward_and_backward(self):
+        for sort_key in pagination.CURSOR_SORT_FIELDS:
+            forward, backward = self._walk(sort_key)
+            expected = self._expected_order(sort_key)
+            self.assertEqual(forward, expected, sort_key)
+            self.assertEqual(backward, expected, sort_key)
+
+    def test_no_count_or_offset_and_invalid_cursor(self):
+        with CaptureQueriesContext(connection) as ctx:
+            page, _ = pagination.paginate_by_cursor(self.factory.get('/'), self.queryset, 4, 'date_desc')
+            pagination.paginate_by_cursor(self.factory.get('/', {'cursor': page.next_cursor}), self.queryset, 4, 'date_desc')
+        sql = ' '.join(q['sql'] for q in ctx.captured_queries).upper()
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
+        first_ids = [item.pk for item in page]
+        for bad in ('bozuk-token', page.next_cursor + 'x'):
+            bad_page, _ = pagination.paginate_by_cursor(self.factory.get('/', {'cursor': bad}), self.queryset, 4, 'date_desc')
+            self.assertEqual([item.pk for item in bad_page], first_ids) # Geçersiz token -> ilk sayfa
+        # Başka sıralamaya ait token da yok sayılır
+        other_page, _ = pagination.paginate_by_cursor(self.factory.get('/', {'cursor': page.next_cursor}), self.queryset, 4, 'title_asc')
+        self.assertFalse(other_page.has_previous())
+
+    @override_settings(LIST_PAGINATION_MODE='cursor')
+    def test_list_view_cursor_mode(self):
+        self.client.login(username='testuser1', password='password123')
+        url = reverse('tracker:anime_list_view')
+        response = self.client.get(url, {'status': 'Completed'})
+        self.assertEqual(response.status_code, 200)
+        page_obj = response.context['page_obj']
+        self.assertTrue(page_obj.is_cursor)
+        self.assertEqual(page_obj.paginator.count, 10) # Yaklaşık toplam MediaStats'tan (9 yeni + anime2)
+        self.assertEqual(len(page_obj), 10)
+        self.assertNotContains(response, 'Sonraki &raquo;</a>')
+
+        response = self.client.get(url, {'q': 'Seri', 'sort': 'title_asc'})
+        self.assertTrue(response.context['page_obj'].is_cursor)
+        self.assertIsNone(response.context['page_obj'].paginator.count) # Aramada toplam bilinmez
+
+        # Arama + alaka sıralaması: keyset yok, offset sayfalamaya düşülür ve sıra search_rank'e göre kalır
+        Anime.objects.create(user=self.test_user1, title="Seri Seri Özel", status="Completed")
+        response = self.client.get(url, {'q': 'Seri'})
+        self.assertEqual(response.context['current_sort'], 'relevance')
+        page_obj = response.context['page_obj']
+        self.assertFalse(getattr(page_obj, 'is_cursor', False))
+        self.assertEqual(page_obj.paginator.count, 10)
+        ranks = [item.search_rank for item in page_obj]
+        self.assertEqual(ranks, sorted(ranks, reverse=True))
+        print("Test Başarılı: Cursor (keyset) sayfalama.")
+
+
+# --- Liste Sorgusu İndeks Testleri ---
+class ListQueryIndexTests(TestCase):
+    """Liste sayfası sorgu kalıplarının MediaItem bileşik/kısmi indekslerini kullanması."""
+
+    def test_explain_command_uses_composite_indexes(self):
+        out = io.StringIO()
+        call_command('explain_list_queries', '--seed', '50', '--repeat', '1', stdout=out)
+        output = out.getvalue()
+        for model in (Anime, Webtoon, Manga, Novel):
+            for index in model._meta.indexes:
+                self.assertIn(f"Kullanılan indeks: {index.name}", output)
+        self.assertNotIn("Bileşik indeks kullanılmadı", output)
+        self.assertFalse(User.objects.filter(username__startswith='explain_').exists()) # Geçici veriler geri alındı
+        print("Test Başarılı: Liste sorguları bileşik indeksleri kullanıyor.")
+
+
+# --- Tam Metin Arama Testleri ---
+class FullTextSearchTests(SetupMixin, TestCase):
+    """FTS5 tabanlı arama: çok alanlı prefix eşleşme, alaka sıralaması, tetikleyici senkronu ve yedek backend."""
+
+    def setUp(self):
+        super().setUp()
+        fulltext_search.reset_cache()
+        self.title_hit = Manga.objects.create(user=self.test_user1, title="Berserk Deluxe", author="Kentaro Miura", status="Watching")
+        self.notes_hit = Manga.objects.create(user=self.test_user1, title="Vagabond", author="Takehiko Inoue", notes="Berserk kadar karanlık, çok sert", status="Completed")
+        self.other_user_hit = Manga.objects.create(user=self.other_user, title="Berserk", status="Completed")
+
+    def _search(self, query, model=Manga, user=None):
+        queryset = model.objects.filter(user=user or self.test_user1)
+        return list(apply_sorting(fulltext_search.search_queryset(queryset, query), 'relevance'))
+
+    def test_prefix_multi_field_ranked_search(self):
+        self.assertEqual(fulltext_search.get_search_backend(Manga).name, 'sqlite_fts5')
+        self.assertEqual(self._search("bers"), [self.title_hit, self.notes_hit]) # Başlık eşleşmesi notlardan önce
+        self.assertEqual(self._search("miura"), [self.title_hit]) # Yazar alanı
+        self.assertEqual(self._search("cok"), [self.notes_hit]) # Aksan duyarsız (ç -> c)
+        self.assertEqual(self._search("berserk inoue"), [self.notes_hit]) # Tüm kelimeler (AND)
+        self.assertEqual(self._search("stud"), []) # Manga'da stüdyo alanı yok
+        self.assertEqual(self._search("Studio", model=Anime), [self.anime1]) # Anime stüdyo alanı
+        self.assertEqual(self._search('"*)('), []) # FTS sözdizimi karakterleri hata vermez
+        self.assertGreater(self._search("bers")[0].search_rank, self._search("bers")[1].search_rank)
+
+    def test_triggers_keep_index_in_sync(self):
+        self.notes_hit.notes = ""
+        self.notes_hit.save()
+        self.assertEqual(self._search("bers"), [self.title_hit])
+        self.title_hit.delete()
+        self.assertEqual(self._search("bers"), [])
+        Manga.objects.bulk_create([Manga(user=self.test_user1, title="Berserk Toplu")]) # Sinyal yok, tetikleyici var
+        self.assertEqual([m.title for m in self._search("bers")], ["Berserk Toplu"])
+
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER "tracker_manga_fts_ai"') # SQLite tablo yeniden oluşturma simülasyonu
+        self.assertEqual(fulltext_search.ensure_sqlite_triggers(), 1)
+        Manga.objects.create(user=self.test_user1, title="Berserk Yeni")
+        self.assertEqual(len(self._search("bers")), 2)
+
+    @override_settings(FULLTEXT_SEARCH_BACKEND='icontains')
+    def test_icontains_fallback_and_list_view(self):
+        self.assertEqual(fulltext_search.get_search_backend(Manga).name, 'icontains')
+        self.assertEqual(set(self._search("erser")), {self.title_hit, self.notes_hit})
+
+    def test_list_view_defaults_to_relevance(self):
+        self.client.login(username='testuser1', password='password123')
+        response = self.client.get(reverse('tracker:manga_list_view'), {'q': 'bers'})
+        self.assertEqual(response.context['current_sort'], 'relevance')
+        self.assertEqual(list(response.context['page_obj']), [self.title_hit, self.notes_hit])
+        self.assertNotContains(response, 'name="sort"') # Alaka sıralaması varsayılan, gizli alan gerekmez
+        response = self.client.get(reverse('tracker:manga_list_view'), {'q': 'bers', 'sort': 'title_desc'})
+        self.assertEqual(list(response.context['page_obj']), [self.notes_hit, self.title_hit])
+        self.assertEqual(response.context['paginator'].count, 2)
+        print("Test Başarılı: Tam metin arama (FTS5, alaka sıralaması, tetikleyiciler, yedek backend).")
+
+
+# --- Fuzzy Başlık Arama Testleri ---
+class FuzzySearchTests(SetupMixin, TestCase):
+    """Trigram indeksi: normalizasyon, yazım hatalı arama, indeks senkronu, AJAX ucu ve ekleme sayfası uyarısı."""
+
+    def setUp(self):
+        super().setUp()
+        self.shingeki = Anime.objects.create(user=self.test_user1, title="Shingeki no Kyōjin", status="Completed")
+        self.isik = Novel.objects.create(user=self.test_user1, title="Işık Hızında", status="Reading")
+        Anime.objects.create(user=self.other_user, title="Shingeki no Kyojin", status="Completed") # Başka kullanıcı
+
+    def _titles(self, query, **kwargs):
+        return [match.item.title for match in fuzzy_search.find_similar(self.test_user1, query, **kwargs)]
+
+    def test_normalization_and_typo_match(self):
+        self.assertEqual(fuzzy_search.normalize_title("Işık Hızında!"), "isik hizinda")
+        self.assertEqual(fuzzy_search.normalize_title("Shingeki no Kyōjin"), "shingeki no kyojin")
+        self.assertIn("  s", fuzzy_search.title_trigrams("Shingeki")) # Kelime başı dolgusu
+        self.assertEqual(self._titles("shingeki no kyojn"), ["Shingeki no Kyōjin"]) # Yazım hatası + aksansız
+        self.assertEqual(self._titles("isik hizinda"), ["Işık Hızında"])
+        self.assertEqual(self._titles("kyojin", media_types=['novel']), [])
+        matches = fuzzy_search.find_similar(self.test_user1, "Shingeki no Kyōjin")
+        self.assertAlmostEqual(matches[0].similarity, 1.0) # Aynı başlık
+        self.assertEqual(self._titles("zzzz"), [])
+
+    def test_index_follows_edits_and_deletes(self):
+        self.shingeki.title = "Attack on Titan"
+        self.shingeki.save()
+        self.assertEqual(self._titles("shingeki kyojin"), [])
+        self.assertEqual(self._titles("atack on titan"), ["Attack on Titan"])
+        with CaptureQueriesContext(connection) as ctx:
+            self.shingeki.status = "Watching" # Başlık değişmedi: indekse dokunulmaz
+            self.shingeki.save()
+        self.assertFalse(any('tracker_titletrigram' in q['sql'] for q in ctx.captured_queries))
+        self.shingeki.delete()
+        self.assertEqual(self._titles("attack on titan"), [])
+        self.assertFalse(TitleTrigram.objects.filter(media_type='anime', object_id=self.shingeki.pk or 0).exists())
+
+    def test_rebuild_and_large_library(self):
+        Manga.objects.bulk_create([
+            Manga(user=self.test_user1, title=f"Seri {i:05d} Macera", status="Reading") for i in range(10000)
+        ] + [Manga(user=self.test_user1, title="Vinland Saga", status="Reading")]) # bulk_create sinyal göndermez
+        self.assertEqual(self._titles("vinland saga"), [])
+        out = io.StringIO()
+        call_command('rebuild_title_index', '--user', 'testuser1', stdout=out)
+        self.assertIn("satır", out.getvalue())
+        with CaptureQueriesContext(connection) as ctx:
+            titles = self._titles("vinlnd sag", media_types=['manga'])
+        self.assertEqual(titles, ["Vinland Saga"])
+        self.assertEqual(len(ctx.captured_queries), 2) # Trigram GROUP BY + model sorgusu
+
+    def test_ajax_endpoint(self):
+        url = reverse('tracker:fuzzy_title_search')
+        self.assertEqual(self.client.get(url, {'q': 'x'}).status_code, 302) # Giriş gerekli
+        self.client.login(username='testuser1', password='password123')
+        self.assertEqual(self.client.get(url).status_code, 400)
+        data = self.client.get(url, {'q': 'shingeki kyojin', 'type': 'anime'}).json()
+        self.assertEqual(data['status'], 'ok')
+        self.assertEqual([r['id'] for r in data['results']], [self.shingeki.pk])
+        self.assertEqual(data['results'][0]['url'], reverse('tracker:anime_detail', kwargs={'pk': self.shingeki.pk}))
+
+    @patch('tracker.views.api_views.jikan_service.get_anime_details')
+    def test_add_view_and_empty_list_hints(self, mock_details):
+        self.client.login(username='testuser1', password='password123')
+        mock_details.return_value = {'title': "Shingeki no Kyojin", 'mal_id': 16498, 'status': 'Plan to Watch'}
+        response = self.client.get(reverse('tracker:jikan_add_anime', kwargs={'mal_id': 16498}))
+        self.assertEqual([m.item for m in response.context['possible_duplicates']], [self.shingeki])
+        self.assertContains(response, "zaten ekli olabilir")
+
+        response = self.client.get(reverse('tracker:anime_list_view'), {'q': 'shingekk'})
+        self.assertEqual(len(response.context['page_obj']), 0)
+        self.assertEqual([m.item for m in response.context['fuzzy_suggestions']], [self.shingeki])
+        self.assertContains(response, "Bunu mu demek istediniz?")
+        print("Test Başarılı: Trigram fuzzy başlık arama (indeks, öneriler, kopya uyarısı).")
+
+
+# --- CSV Dışa Aktarım Testleri ---
+class CsvExportTests(SetupMixin, TestCase):
+    """Akış halinde CSV: filtreler korunur, parça parça okunur, sorgu sayısı satır sayısıyla büyümez."""
+
+    def _rows(self, response):
+        content = b"".join(response.streaming_content).decode("utf-8")
+        self.assertTrue(content.startswith("\ufeff"))
+        return list(csv.reader(io.StringIO(content.lstrip("\ufeff")), delimiter=";"))
+
+    def test_streaming_export_keeps_filters(self):
+        self.client.login(username='testuser1', password='password123')
+        response = self.client.get(reverse('tracker:export_anime_csv'))
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="anime_export_', response['Content-Disposition'])
+        rows = self._rows(response)
+        self.assertEqual(rows[0][:3], ["ID", "Baslik", "Durum"])
+        self.assertEqual([row[1] for row in rows[1:]], ["Anime Gamma Plan", "Test Anime Beta", "Test Anime Alpha"])
+        alpha = rows[3]
+        self.assertEqual(set(alpha[10].split(", ")), {"Aksiyon", "Komedi"}) # Prefetch edilmiş etiketler
+
+        rows = self._rows(self.client.get(reverse('tracker:export_anime_csv'), {'status': 'Completed'}))
+        self.assertEqual([row[1] for row in rows[1:]], ["Test Anime Beta"])
+        rows = self._rows(self.client.get(reverse('tracker:export_anime_csv'), {'tag': 'aksiyon'}))
+        self.assertEqual([row[1] for row in rows[1:]], ["Test Anime Alpha"])
+        rows = self._rows(self.client.get(reverse('tracker:export_anime_csv'), {'q': 'gamma'}))
+        self.assertEqual([row[1] for row in rows[1:]], ["Anime Gamma Plan"])
+
+    def test_compiled_row_serializer_matches_slow_path(self):
+        self.anime1.start_date = datetime.date(2024, 3, 1)
+        self.anime1.status = "Bilinmeyen" # choices dışı değer olduğu gibi yazılır
+        for item, fields_map in ((self.anime1, ANIME_FIELDS_MAP), (self.anime3_plan, ANIME_FIELDS_MAP), (self.webtoon1, WEBTOON_FIELDS_MAP)):
+            serialize_row = _get_csv_row_serializer(type(item), fields_map)
+            self.assertEqual(serialize_row(item), _build_csv_row(item, fields_map))
+        self.assertIs(_get_csv_row_serializer(Anime, ANIME_FIELDS_MAP), _get_csv_row_serializer(Anime, dict(ANIME_FIELDS_MAP)))
+        out = io.StringIO()
+        call_command('benchmark_csv_rows', '--rows', '200', '--repeat', '1', stdout=out)
+        self.assertIn("Hızlanma", out.getvalue())
+        self.assertNotIn("farklı", out.getvalue())
+
+    def _export(self, url_name='tracker:export_anime_csv', **params):
+        self.client.login(username='testuser1', password='password123')
+        return self.client.get(reverse(url_name), params)
+
+    def test_jsonl_and_compressed_exports(self):
+        response = self._export(format='jsonl', status='Completed')
+        self.assertTrue(response.streaming)
+        self.assertIn('.jsonl"', response['Content-Disposition'])
+        lines = b"".join(response.streaming_content).decode("utf-8").splitlines()
+        self.assertEqual(len(lines), 1)
+        record = json.loads(lines[0])
+        self.assertEqual((record['id'], record['title'], record['status']), (self.anime2.pk, "Test Anime Beta", "Completed"))
+        self.assertEqual((record['rating'], record['mal_id']), (9, 12345)) # Tipli değerler
+        self.assertEqual(sorted(record['tags']), ["Fantastik", "Macera"])
+        self.assertIsNone(record['start_date'])
+
+        plain = b"".join(self._export().streaming_content)
+        response = self._export(compression='gzip')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('.csv.gz"', response['Content-Disposition'])
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), plain)
+        if 'zstd' in export_formats.available_compressions():
+            import zstandard
+            response = self._export(format='jsonl', compression='zstd')
+            data = zstandard.ZstdDecompressor().decompressobj().decompress(b"".join(response.streaming_content))
+            self.assertEqual(len(data.decode("utf-8").splitlines()), 3)
+
+    def test_parquet_export_and_invalid_format(self):
+        response = self._export(format='xml')
+        self.assertRedirects(response, reverse('tracker:anime_list_view'))
+        if 'parquet' not in export_formats.available_formats():
+            self.skipTest("pyarrow kurulu değil")
+        import pyarrow
+        import pyarrow.parquet
+        Manga.objects.bulk_create([Manga(user=self.test_user1, title=f"Toplu {i:03d}", status="Reading") for i in range(120)])
+        with override_settings(EXPORT_CHUNK_SIZE=50):
+            response = self._export('tracker:export_manga_csv', format='parquet', compression='zstd')
+        self.assertEqual(response['Content-Type'], 'application/vnd.apache.parquet')
+        parquet_file = pyarrow.parquet.ParquetFile(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(parquet_file.metadata.num_rows, 122) # 2 mevcut + 120
+        self.assertEqual(parquet_file.metadata.num_row_groups, 3) # Parça başına bir row group
+        table = parquet_file.read()
+        self.assertTrue(pyarrow.types.is_list(table.schema.field('tags').type))
+        self.assertEqual(str(table.schema.field('total_volumes').type), 'int64')
+        self.assertIn("Test Manga 1", table.column('title').to_pylist())
+
+    @override_settings(EXPORT_CHUNK_SIZE=50)
+    def test_chunked_iteration_query_count(self):
+        Manga.objects.bulk_create([Manga(user=self.test_user1, title=f"Toplu {i:03d}", status="Reading") for i in range(200)])
+        self.client.login(username='testuser1', password='password123')
+        response = self.client.get(reverse('tracker:export_manga_csv'))
+        chunks = iter(response.streaming_content)
+        with CaptureQueriesContext(connection) as ctx:
+            first = next(chunks) # Başlık satırı: henüz veritabanı sorgusu yok
+        self.assertIn("Baslik".encode(), first)
+        self.assertEqual(len(ctx.captured_queries), 0)
+        with CaptureQueriesContext(connection) as ctx:
+            rest = list(chunks)
+        self.assertEqual(len(rest), 5) # 202 satır, 50'lik parçalar
+        self.assertEqual(sum(chunk.count(b"\n") for chunk in rest), 202)
+        self.assertLessEqual(len(ctx.captured_queries), 10) # Parça başına öğe + etiket sorgusu
+        print("Test Başarılı: Akış halinde CSV dışa aktarımı.")
+
+
+# --- Tüm Kütüphane Dışa Aktarım Testleri ---
+class LibraryExportTests(SetupMixin, TestCase):
+    """Tek ZIP: dört tür + favoriler + etiketler; model başına tek geçiş, yönetim komutu."""
+
+    def setUp(self):
+        super().setUp()
+        Favorite.objects.create(user=self.test_user1, content_type=ContentType.objects.get_for_model(Manga), object_id=self.manga1.pk)
+
+    def _archive(self, response):
+        self.assertTrue(response.streaming)
+        return zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+
+    def test_library_zip_contents(self):
+        self.client.login(username='testuser1', password='password123')
+        response = self.client.get(reverse('tracker:export_library'))
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        archive = self._archive(response)
+        self.assertEqual(archive.namelist(), ['anime.csv', 'webtoon.csv', 'manga.csv', 'novel.csv', 'favorites.csv', 'tags.csv'])
+        anime_rows = list(csv.reader(io.StringIO(archive.read('anime.csv').decode('utf-8-sig')), delimiter=';'))
+        self.assertEqual(len(anime_rows), 4) # Başlık + 3 anime (diğer kullanıcınınki yok)
+        favorites = archive.read('favorites.csv').decode('utf-8-sig')
+        self.assertIn("manga;%d;Test Manga 1" % self.manga1.pk, favorites)
+        tags = {row[0]: row[2:] for row in csv.reader(io.StringIO(archive.read('tags.csv').decode('utf-8-sig')), delimiter=';')}
+        self.assertEqual(tags["Aksiyon"], ["1", "1", "0", "0"]) # anime, webtoon, manga, novel
+
+        response = self.client.get(reverse('tracker:export_library'), {'format': 'jsonl'})
+        archive = self._archive(response)
+        novels = [json.loads(line) for line in archive.read('novel.jsonl').decode('utf-8').splitlines()]
+        self.assertEqual({n['title'] for n in novels}, {"Test Novel 1", "Novel Vols Only"})
+        self.assertRedirects(self.client.get(reverse('tracker:export_library'), {'format': 'xml'}), reverse('tracker:dashboard'))
+
+    def test_single_pass_per_model_and_command(self):
+        with CaptureQueriesContext(connection) as ctx:
+            archive = zipfile.ZipFile(io.BytesIO(b"".join(library_export_chunks(self.test_user1))))
+        self.assertEqual(len(archive.namelist()), 6)
+        # 4 model x (öğeler + etiket prefetch) + favori content type'ları + 4 favori + 4 etiket sayımı
+        self.assertLessEqual(len(ctx.captured_queries), 17)
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            out = io.StringIO()
+            call_command('export_library', '--output-dir', output_dir, '--user', 'testuser1', '--format', 'jsonl', stdout=out)
+            files = os.listdir(output_dir)
+            self.assertEqual(len(files), 1)
+            self.assertTrue(files[0].startswith("testuser1_kutuphane_jsonl_"))
+            with zipfile.ZipFile(os.path.join(output_dir, files[0])) as archive:
+                self.assertIn('favorites.jsonl', archive.namelist())
+        print("Test Başarılı: Tüm kütüphane ZIP dışa aktarımı.")
+
+
+# =========================================
+# --- Toplu İçe Aktarım Testleri ---
+# =========================================
+class ImportTests(SetupMixin, TestCase):
+    """CSV / JSON Lines / MAL XML / MangaDex JSON içe aktarımı: form kuralları, tekrarlar, toplu etiket çözümü."""
+
+    MAL_XML = """<?xml version="1.0" encoding="UTF-8" ?>
+<myanimelist>
+  <myinfo><user_export_type>1</user_export_type></myinfo>
+  <anime>
+    <series_animedb_id>12345</series_animedb_id><series_title><![CDATA[Test Anime Beta]]></series_title>
+    <series_episodes>24</series_episodes><my_watched_episodes>24</my_watched_episodes>
+    <my_score>9</my_score><my_status>Completed</my_status><my_tags></my_tags>
+  </anime>
+  <anime>
+    <series_animedb_id>5114</series_animedb_id><series_title><![CDATA[Fullmetal Alchemist: Brotherhood]]></series_title>
+    <series_episodes>64</series_episodes><my_watched_episodes>10</my_watched_episodes>
+    <my_start_date>2024-01-05</my_start_date><my_finish_date>0000-00-00</my_finish_date>
+    <my_score>0</my_score><my_status>On-Hold</my_status><my_tags><![CDATA[Aksiyon, Yeni Etiket]]></my_tags>
+    <my_comments><![CDATA[Tekrar izlenecek]]></my_comments>
+  </anime>
+  <anime>
+    <series_animedb_id>1</series_animedb_id><series_title><![CDATA[Hatalı Satır]]></series_title>
+    <series_episodes>12</series_episodes><my_watched_episodes>20</my_watched_episodes>
+    <my_status>Watching</my_status>
+  </anime>
+</myanimelist>"""
+
+    def test_csv_and_jsonl_round_trip(self):
+        self.client.login(username='testuser1', password='password123')
+        data = b"".join(self.client.get(reverse('tracker:export_anime_csv')).streaming_content)
+
+        result = importer.import_file(self.other_user, 'anime', data, "anime.csv")
+        self.assertEqual((result.created, result.skipped, result.invalid), (3, 0, 0))
+        imported = Anime.objects.get(user=self.other_user, title="Test Anime Alpha")
+        self.assertEqual((imported.status, imported.rating, imported.episodes_watched, imported.studio), ("Watching", 8, 5, "Studio A"))
+        self.assertEqual(set(imported.tags.names()), {"Aksiyon", "Komedi"})
+        self.assertEqual(imported.added_date, self.anime1.added_date.replace(microsecond=0))
+        # Dış ID'ler tüm kullanıcılar arasında benzersiz: başka kullanıcıdaki mal_id ID'siz eklenir
+        self.assertIsNone(Anime.objects.get(user=self.other_user, title="Test Anime Beta").mal_id)
+        self.assertEqual(MediaStats.objects.get(user=self.other_user, media_type='anime').total_count, 4)
+        self.assertTrue(TitleTrigram.objects.filter(user=self.other_user, media_type='anime', object_id=imported.pk).exists())
+
+        # Aynı dosya ikinci kez: hepsi zaten listede
+        result = importer.import_file(self.other_user, 'anime', data, "anime.csv")
+        self.assertEqual((result.created, result.skipped), (0, 3))
+
+        data = b"".join(self.client.get(reverse('tracker:export_manga_csv'), {'format': 'jsonl'}).streaming_content)
+        result = importer.import_file(self.other_user, 'manga', data, "manga.jsonl")
+        self.assertEqual(result.created, 2)
+        manga = Manga.objects.get(user=self.other_user, title="Test Manga 1")
+        self.assertEqual((manga.status, manga.volumes_read, manga.artist), ("On Hold", 3, "M Artist"))
+        self.assertEqual(list(manga.tags.names()), ["Komedi"])
+
+        # Tek satırlık JSON Lines (tek öğelik dışa aktarım) de içe aktarılır
+        data = b"".join(self.client.get(reverse('tracker:export_manga_csv'), {'format': 'jsonl', 'q': 'Test Manga 1'}).streaming_content)
+        self.assertEqual(data.decode('utf-8').strip().count("\n"), 0)
+        solo_user = User.objects.create_user(username='solouser', password='password123')
+        result = importer.import_file(solo_user, 'manga', data, "manga.jsonl")
+        self.assertEqual((result.created, result.invalid), (1, 0))
+        self.assertTrue(Manga.objects.filter(user=solo_user, title="Test Manga 1").exists())
+        self.assertEqual(list(importer.read_json_rows('{"id": 1, "title": "Solo"}\n')), [{"title": "Solo"}])
+        with self.assertRaises(importer.ImportFormatError):
+            list(importer.read_json_rows('{\n  "title": "Solo"\n}'))
+
+    def test_mal_xml_and_validation_errors(self):
+        result = importer.import_file(self.test_user1, 'anime', gzip.compress(self.MAL_XML.encode('utf-8')), "animelist.xml.gz")
+        self.assertEqual((result.created, result.skipped, result.invalid), (1, 1, 1))
+        self.assertEqual(result.errors[0][0], 3)
+        self.assertIn("İzlenen bölüm sayısı toplam bölüm sayısından fazla olamaz.", result.errors[0][1])
+        fma = Anime.objects.get(user=self.test_user1, mal_id=5114)
+        self.assertEqual((fma.status, fma.rating, fma.episodes_watched, fma.total_episodes), ("On Hold", None, 10, 64))
+        self.assertEqual((fma.start_date, fma.end_date, fma.notes), (datetime.date(2024, 1, 5), None, "Tekrar izlenecek"))
+        self.assertEqual(set(fma.tags.names()), {"Aksiyon", "Yeni Etiket"})
+        self.assertEqual(Tag.objects.filter(name="Aksiyon").count(), 1) # Mevcut etiket yeniden kullanıldı
+
+        # Form kuralları (clean() çapraz kontrolleri ve alan doğrulaması) içe aktarımda da geçerli
+        rows = [
+            {"title": "Ters Tarih", "start_date": "2024-05-01", "end_date": "2024-01-01"},
+            {"title": "Kötü Puan", "rating": "15"},
+            {"title": "", "status": "Completed"},
+            {"title": "Bilinmeyen Durum", "status": "izlemiyorum"},
+            {"title": "Geçerli", "status": "completed", "chapters_read": "5", "total_chapters": "10"},
+        ]
+        result = importer.import_items(self.test_user1, 'novel', rows)
+        self.assertEqual((result.created, result.invalid), (1, 4))
+        self.assertIn("Bitirme tarihi, başlama tarihinden önce olamaz.", result.errors[0][1])
+        self.assertEqual([row_number for row_number, _ in result.errors], [1, 2, 3, 4])
+        self.assertEqual(Novel.objects.get(user=self.test_user1, title="Geçerli").status, "Completed")
+
+    def test_corrupt_and_oversized_gzip(self):
+        compressed = gzip.compress(self.MAL_XML.encode('utf-8'))
+        for corrupt in (compressed[:len(compressed) // 2], b"\x1f\x8b" + b"bozuk veri" * 10):
+            with self.assertRaises(importer.ImportFormatError):
+                importer.import_file(self.test_user1, 'anime', corrupt, "animelist.xml.gz")
+        # Açılmış boyut sınırı: gzip bombası parça parça okunurken durdurulur
+        bomb = gzip.compress(b"<" * (3 * 1024 * 1024))
+        with override_settings(LIBRARY_IMPORT={'MAX_DECOMPRESSED_SIZE': 1024 * 1024}):
+            with self.assertRaisesMessage(importer.ImportFormatError, "çok büyük"):
+                importer.read_rows(bomb, "animelist.xml.gz", 'anime')
+
+        self.client.login(username='testuser1', password='password123')
+        upload = SimpleUploadedFile("animelist.xml.gz", compressed[:40], content_type="application/gzip")
+        response = self.client.post(reverse('tracker:import_library'), {'media_type': 'anime', 'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Sıkıştırılmış dosya açılamadı")
+        with override_settings(LIBRARY_IMPORT={'MAX_UPLOAD_SIZE': 100}):
+            upload = SimpleUploadedFile("animelist.xml.gz", compressed, content_type="application/gzip")
+            response = self.client.post(reverse('tracker:import_library'), {'media_type': 'anime', 'file': upload})
+        self.assertContains(response, "Dosya çok büyük")
+        self.assertEqual(Anime.objects.filter(user=self.test_user1).count(), 3)
+
+    def test_mangadex_json(self):
+        manga_id, duplicate_id = str(uuid.uuid4()), str(uuid.uuid4())
+        payload = {
+            "data": [
+                {"id": manga_id, "type": "manga", "attributes": {
+                    "title": {"ja-ro": "Kaguya-sama", "en": "Kaguya-sama: Love is War"},
+                    "tags": [{"attributes": {"name": {"en": "Romance"}}}, {"attributes": {"name": {"en": "Slice of Life"}}}],
+                }},
+                {"id": duplicate_id, "type": "manga", "attributes": {"title": {"en": "test manga 1"}}}, # Başlık zaten listede
+            ],
+            "statuses": {manga_id: "re_reading", duplicate_id: "completed"},
+        }
+        result = importer.import_file(self.test_user1, 'manga', json.dumps(payload).encode('utf-8'), "mangadex.json")
+        self.assertEqual((result.created, result.skipped), (1, 1))
+        manga = Manga.objects.get(user=self.test_user1, mangadex_id=manga_id)
+        self.assertEqual((manga.title, manga.status), ("Kaguya-sama: Love is War", "Watching"))
+        self.assertEqual(set(manga.tags.names()), {"Romance", "Slice of Life"})
+
+    def test_batched_inserts_and_tag_resolution(self):
+        rows = [
+            {"title": f"Toplu Anime {i:05d}", "status": "Completed", "episodes_watched": "12", "total_episodes": "12",
+             "tags": ["Aksiyon", f"Grup {i % 20}"]}
+            for i in range(2000)
+        ]
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as ctx:
+            result = importer.import_items(self.test_user1, 'anime', rows, batch_size=500)
+        elapsed = time.perf_counter() - start
+        self.assertEqual((result.created, result.tags_created), (2000, 20))
+        self.assertEqual(Anime.objects.filter(user=self.test_user1).count(), 2003)
+        self.assertEqual(Tag.objects.filter(name__startswith="Grup ").count(), 20)
+        self.assertEqual(Anime.objects.filter(user=self.test_user1, tags__name="Aksiyon").count(), 2001)
+        # Satır başına sorgu yok: parça başına birkaç bulk sorgu (SQLite değişken sınırı yüzünden bölünebilir) + sonda yenileme
+        tag_lookups = [q for q in ctx.captured_queries if q['sql'].startswith('SELECT') and 'FROM "taggit_tag"' in q['sql']]
+        self.assertLessEqual(len(tag_lookups), 4 * 3) # 4 parça x (mevcutlar + slug çakışması + yeni pk'lar)
+        self.assertLess(len(ctx.captured_queries), len(rows) // 5)
+        self.assertLess(elapsed, 20)
+
+    def test_import_view_and_command(self):
+        self.client.login(username='otheruser', password='password123')
+        self.assertEqual(self.client.get(reverse('tracker:import_library')).status_code, 200)
+        upload = SimpleUploadedFile("animelist.xml", self.MAL_XML.encode('utf-8'), content_type="text/xml")
+        response = self.client.post(reverse('tracker:import_library'), {'media_type': 'anime', 'file': upload})
+        self.assertRedirects(response, reverse('tracker:anime_list_view'))
+        message_texts = [str(m) for m in get_messages(response.wsgi_request)]
+        self.assertIn("2 öğe eklendi, 0 öğe zaten listede olduğu için atlandı.", message_texts)
+        self.assertTrue(any("Satır 3:" in text for text in message_texts))
+        # Başka kullanıcıdaki mal_id (12345) ID'siz eklendi
+        self.assertIsNone(Anime.objects.get(user=self.other_user, title="Test Anime Beta").mal_id)
+
+        upload = SimpleUploadedFile("liste.txt", b"title\nX\n")
+        response = self.client.post(reverse('tracker:import_library'), {'media_type': 'anime', 'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Desteklenmeyen dosya türü")
+
+        with tempfile.NamedTemporaryFile(suffix=".xml", delete=False) as f:
+            f.write(self.MAL_XML.encode('utf-8'))
+        try:
+            out = io.StringIO()
+            call_command('import_library', f.name, '--user', 'testuser1', '--type', 'anime', stdout=out)
+        finally:
+            os.remove(f.name)
+        self.assertIn("1 eklendi, 1 atlandı, 1 geçersiz", out.getvalue())
+        print("Test Başarılı: Toplu içe aktarım (CSV, JSONL, MAL XML, MangaDex JSON).")
+
+
+# =========================================
+# --- Arka Plan İş Kuyruğu Testleri ---
+# =========================================
+class BackgroundJobTests(SetupMixin, TestCase):
+    """Kuyruğa ekleme, sahiplenme, yeniden deneme (backoff), ilerleme ve iş türleri."""
+
+    def setUp(self):
+        super().setUp()
+        self.media_dir = tempfile.TemporaryDirectory()
+        self.media_override = override_settings(MEDIA_ROOT=self.media_dir.name)
+        self.media_override.enable()
+
+    def tearDown(self):
+        self.media_override.disable()
+        self.media_dir.cleanup()
+        super().tearDown()
+
+    def test_background_import_and_status(self):
+        self.client.login(username='otheruser', password='password123')
+        upload = SimpleUploadedFile("animelist.xml", ImportTests.MAL_XML.encode('utf-8'), content_type="text/xml")
+        response = self.client.post(reverse('tracker:import_library'), {'media_type': 'anime', 'file': upload, 'run_in_background': 'on'})
+        self.assertRedirects(response, reverse('tracker:job_list'))
+        job = BackgroundJob.objects.get(user=self.other_user)
+        self.assertEqual((job.job_type, job.status), ('import', BackgroundJob.STATUS_QUEUED))
+        self.assertFalse(Anime.objects.filter(user=self.other_user, mal_id=5114).exists()) # Henüz çalışmadı
+
+        out = io.StringIO()
+        call_command('run_jobs', '--once', stdout=out)
+        self.assertIn("1 iş çalıştırıldı.", out.getvalue())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.progress, job.attempts), (BackgroundJob.STATUS_SUCCEEDED, 100, 1))
+        self.assertEqual((job.result['created'], job.result['invalid']), (2, 1))
+        self.assertTrue(Anime.objects.filter(user=self.other_user, title="Fullmetal Alchemist: Brotherhood").exists())
+        self.assertFalse(default_storage.exists(job.payload['path'])) # Yüklenen dosya silindi
+
+        data = self.client.get(reverse('tracker:job_status', args=[job.pk])).json()
+        self.assertEqual((data['status'], data['finished'], data['result']['created']), ('succeeded', True, 2))
+        self.assertContains(self.client.get(reverse('tracker:job_list')), f'data-job-id="{job.pk}"')
+        self.client.login(username='testuser1', password='password123')
+        self.assertEqual(self.client.get(reverse('tracker:job_status', args=[job.pk])).status_code, 404) # Başkasının işi
+
+    def test_import_job_failures_clean_up_upload(self):
+        def enqueue_import(data, filename="animelist.xml.gz"):
+            path = jobs.store_upload(data, filename)
+            return jobs.enqueue('import', user=self.test_user1, payload={'media_type': 'anime', 'path': path, 'filename': filename})
+
+        # Bozuk gzip ve beklenmeyen ayrıştırma hatası: kalıcı (tek deneme), dosya silinir
+        corrupt = enqueue_import(gzip.compress(ImportTests.MAL_XML.encode('utf-8'))[:40])
+        jobs.run_pending_jobs('w1')
+        corrupt.refresh_from_db()
+        self.assertEqual((corrupt.status, corrupt.attempts), (BackgroundJob.STATUS_FAILED, 1))
+        self.assertIn("Sıkıştırılmış dosya açılamadı", corrupt.error)
+        self.assertFalse(default_storage.exists(corrupt.payload['path']))
+        broken = enqueue_import(b"title\nX\n", "liste.csv")
+        with patch.object(importer, 'read_rows', side_effect=KeyError('beklenmeyen')):
+            jobs.run_pending_jobs('w1')
+        broken.refresh_from_db()
+        self.assertEqual((broken.status, broken.attempts), (BackgroundJob.STATUS_FAILED, 1))
+        self.assertFalse(default_storage.exists(broken.payload['path']))
+
+        # Geçici hata: dosya yeniden deneme için korunur, son denemede silinir
+        job = enqueue_import(ImportTests.MAL_XML.encode('utf-8'), "animelist.xml")
+        with patch.object(importer, 'import_items', side_effect=RuntimeError("veritabanı meşgul")):
+            jobs.run_job(jobs.claim_next_job('w1'))
+            job.refresh_from_db()
+            self.assertEqual(job.status, BackgroundJob.STATUS_QUEUED)
+            self.assertTrue(default_storage.exists(job.payload['path']))
+            BackgroundJob.objects.filter(pk=job.pk).update(attempts=job.max_attempts - 1)
+            jobs.run_job(jobs.claim_next_job('w1', now=job.run_after))
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.STATUS_FAILED)
+        self.assertFalse(default_storage.exists(job.payload['path']))
+
+    def test_retry_backoff_and_permanent_failure(self):
+        calls = []
+        def flaky(job):
+            calls.append(job.attempts)
+            if len(calls) == 1:
+                raise RuntimeError("geçici hata")
+            jobs.report_progress(job, 50, "yarısı")
+            return {'ok': True}
+        def broken(job):
+            raise jobs.PermanentJobError("bozuk parametre")
+
+        with patch.dict(jobs.HANDLERS, {'flaky': flaky, 'broken': broken}):
+            job = jobs.enqueue('flaky', user=self.test_user1)
+            jobs.run_job(jobs.claim_next_job('w1'))
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), (BackgroundJob.STATUS_QUEUED, 1))
+            self.assertIn("RuntimeError: geçici hata", job.error)
+            self.assertGreater(job.run_after, timezone.now() + datetime.timedelta(seconds=20)) # İlk bekleme 30 sn
+            self.assertIsNone(jobs.claim_next_job('w1')) # Bekleme süresi dolmadan alınmaz
+
+            job = jobs.run_job(jobs.claim_next_job('w1', now=job.run_after))
+            self.assertEqual((job.status, job.attempts, job.result, calls), (BackgroundJob.STATUS_SUCCEEDED, 2, {'ok': True}, [1, 2]))
+
+            job = jobs.enqueue('broken', user=self.test_user1)
+            self.assertEqual(jobs.run_pending_jobs('w1'), 1)
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts, job.error), (BackgroundJob.STATUS_FAILED, 1, "bozuk parametre"))
+
+            with self.assertRaises(ValueError):
+                jobs.enqueue('bilinmeyen')
+        self.assertEqual([jobs.retry_delay(n) for n in (1, 2, 3)], [30, 60, 120])
+        self.assertEqual(jobs.retry_delay(20), 3600)
+
+    def test_claim_is_exclusive_and_stale_jobs_requeued(self):
+        with patch.dict(jobs.HANDLERS, {'noop': lambda job: {}}):
+            job = jobs.enqueue('noop')
+            claimed = jobs.claim_next_job('w1')
+            self.assertEqual((claimed.pk, claimed.locked_by, claimed.status), (job.pk, 'w1', BackgroundJob.STATUS_RUNNING))
+            self.assertIsNone(jobs.claim_next_job('w2'))
+
+            # Worker çöktü: STALE_AFTER sonra iş yeniden sıraya girer, deneme hakkı bitmişse başarısız olur
+            BackgroundJob.objects.filter(pk=job.pk).update(locked_at=timezone.now() - datetime.timedelta(hours=1))
+            self.assertEqual(jobs.requeue_stale_jobs(), 1)
+            self.assertEqual(jobs.claim_next_job('w2').locked_by, 'w2')
+            BackgroundJob.objects.filter(pk=job.pk).update(locked_at=timezone.now() - datetime.timedelta(hours=1), attempts=3)
+            jobs.requeue_stale_jobs()
+            job.refresh_from_db()
+            self.assertEqual(job.status, BackgroundJob.STATUS_FAILED)
+
+    def test_heartbeat_and_takeover(self):
+        hour_ago = timezone.now() - datetime.timedelta(hours=1)
+        def long_running(job):
+            # Uzun iş: ilerleme bildirimi locked_at'i yeniler, zaman aşımına uğramaz
+            BackgroundJob.objects.filter(pk=job.pk).update(locked_at=hour_ago)
+            self.assertTrue(jobs.report_progress(job, 50, "yarısı"))
+            self.assertEqual(jobs.requeue_stale_jobs(), 0)
+            return {'worker': job.locked_by}
+        def taken_over(job):
+            # Heartbeat gelmedi: iş yeniden sıraya alınıp w2'ye geçer, w1'in sonucu yazılmamalı
+            BackgroundJob.objects.filter(pk=job.pk).update(locked_at=hour_ago)
+            self.assertEqual(jobs.requeue_stale_jobs(), 1)
+            self.assertEqual(jobs.claim_next_job('w2').locked_by, 'w2')
+            self.assertFalse(jobs.report_progress(job, 10))
+            raise RuntimeError("geç kalan worker")
+
+        with patch.dict(jobs.HANDLERS, {'long': long_running, 'taken': taken_over}):
+            job = jobs.enqueue('long')
+            job = jobs.run_job(jobs.claim_next_job('w1'))
+            self.assertEqual((job.status, job.result, job.progress), (BackgroundJob.STATUS_SUCCEEDED, {'worker': 'w1'}, 100))
+
+            job = jobs.enqueue('taken')
+            jobs.run_job(jobs.claim_next_job('w1'))
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.locked_by, job.attempts, job.error), (BackgroundJob.STATUS_RUNNING, 'w2', 2, ""))
+
+    def test_library_export_job_and_download(self):
+        self.client.login(username='testuser1', password='password123')
+        response = self.client.post(reverse('tracker:enqueue_library_export'), {'format': 'jsonl'})
+        self.assertRedirects(response, reverse('tracker:job_list'))
+        jobs.run_pending_jobs('w1')
+        job = BackgroundJob.objects.get(user=self.test_user1, job_type='export_library')
+        self.assertEqual(job.status, BackgroundJob.STATUS_SUCCEEDED)
+        data = self.client.get(reverse('tracker:job_status', args=[job.pk])).json()
+        self.assertEqual(data['download_url'], reverse('tracker:job_download', args=[job.pk]))
+        self.assertNotIn('path', data['result'])
+
+        response = self.client.get(data['download_url'])
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertIn('anime.jsonl', archive.namelist())
+        self.client.login(username='otheruser', password='password123')
+        self.assertEqual(self.client.get(data['download_url']).status_code, 404)
+
+        # Biten eski işler dosyalarıyla birlikte temizlenir
+        BackgroundJob.objects.filter(pk=job.pk).update(finished_at=timezone.now() - datetime.timedelta(days=30))
+        self.assertEqual(jobs.purge_finished_jobs(), 1)
+        self.assertFalse(default_storage.exists(job.result['path']))
+
+    @patch('tracker.services.jikan_service.aget_anime_details', new_callable=AsyncMock)
+    def test_metadata_refresh_job(self, mock_details):
+        mock_details.return_value = {'total_episodes': 25, 'cover_image_url': 'http://example.com/yeni.jpg', 'episodes_watched': 0}
+        self.client.login(username='testuser1', password='password123')
+        detail_url = reverse('tracker:anime_detail', args=[self.anime2.pk])
+        self.assertContains(self.client.get(detail_url), reverse('tracker:enqueue_metadata_refresh', args=['anime', self.anime2.pk]))
+        response = self.client.post(reverse('tracker:enqueue_metadata_refresh', args=['anime', self.anime2.pk]))
+        self.assertRedirects(response, detail_url)
+        jobs.run_pending_jobs('w1')
+        self.anime2.refresh_from_db()
+        self.assertEqual((self.anime2.total_episodes, self.anime2.cover_image_url, self.anime2.episodes_watched), (25, 'http://example.com/yeni.jpg', 24))
+        mock_details.assert_awaited_once_with(12345, force_refresh=True)
+
+        # API bağlantısı olmayan öğe: iş oluşturulmaz
+        response = self.client.post(reverse('tracker:enqueue_metadata_refresh', args=['anime', self.anime1.pk]))
+        self.assertRedirects(response, reverse('tracker:anime_detail', args=[self.anime1.pk]))
+        self.assertEqual(BackgroundJob.objects.count(), 1)
+        # API yanıt vermezse iş yeniden denenmek üzere sıraya döner
+        mock_details.return_value = None
+        job = jobs.enqueue('refresh_metadata', user=self.test_user1, payload={'media_type': 'anime', 'pk': self.anime2.pk})
+        jobs.run_pending_jobs('w1')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (BackgroundJob.STATUS_QUEUED, 1))
+        print("Test Başarılı: Arka plan iş kuyruğu.")
+
+
+# =========================================
+# --- API Bilgi Yenileme Testleri ---
+# =========================================
+@patch('tracker.services.mangadex_service.aget_manga_details', new_callable=AsyncMock)
+@patch('tracker.services.jikan_service.aget_novel_details', new_callable=AsyncMock)
+@patch('tracker.services.jikan_service.aget_anime_details', new_callable=AsyncMock)
+class MetadataRefreshTests(SetupMixin, TestCase):
+    """Dış ID'ye göre tekilleştirme, toplu güncelleme, artımlı mod ve komut."""
+
+    def setUp(self):
+        super().setUp()
+        # Aynı MangaDex başlığı başka kullanıcının Manga listesinde de var (Webtoon/Manga tabloları ayrı)
+        self.shared_manga = Manga.objects.create(user=self.other_user, title="Ortak Başlık", mangadex_id=self.webtoon1.mangadex_id, chapters_read=7)
+
+    def _set_details(self, mock_anime, mock_novel, mock_manga):
+        mock_anime.return_value = {'total_episodes': 25, 'cover_image_url': 'http://example.com/a.jpg', 'episodes_watched': 0}
+        mock_novel.return_value = {'total_chapters': 210, 'total_volumes': None, 'cover_image_url': 'http://example.com/n.jpg'}
+        mock_manga.return_value = {'total_chapters': 120, 'total_volumes': None, 'cover_image_url': 'http://example.com/m.jpg', 'chapters_read': 0}
+
+    def test_dedupes_by_external_id_and_bulk_updates(self, mock_anime, mock_novel, mock_manga):
+        self._set_details(mock_anime, mock_novel, mock_manga)
+        with CaptureQueriesContext(connection) as ctx:
+            result = metadata_refresh.refresh_metadata()
+        self.assertEqual((result.titles, result.items, result.failed_titles, result.updated_items), (3, 4, 0, 4))
+        mock_manga.assert_awaited_once_with(str(self.webtoon1.mangadex_id), force_refresh=True) # İki öğe, tek istek
+        mock_anime.assert_awaited_once_with(12345, force_refresh=True)
+        self.assertFalse(any(q['sql'].startswith('UPDATE') and 'WHERE "tracker_manga"."id" =' in q['sql'] for q in ctx.captured_queries))
+
+        self.webtoon1.refresh_from_db()
+        self.shared_manga.refresh_from_db()
+        self.assertEqual((self.webtoon1.total_chapters, self.webtoon1.chapters_read, self.webtoon1.cover_image_url), (120, 50, 'http://example.com/m.jpg'))
+        self.assertEqual((self.shared_manga.total_chapters, self.shared_manga.chapters_read), (120, 7))
+        self.anime2.refresh_from_db()
+        self.assertEqual((self.anime2.total_episodes, self.anime2.episodes_watched), (25, 24))
+        self.assertIsNotNone(self.anime2.metadata_refreshed_at)
+        self.novel1.refresh_from_db()
+        self.assertEqual((self.novel1.total_chapters, self.novel1.total_volumes), (210, 5)) # None değerler korunur
+
+    def test_incremental_mode_and_failures(self, mock_anime, mock_novel, mock_manga):
+        self._set_details(mock_anime, mock_novel, mock_manga)
+        mock_novel.return_value = None # API hatası
+        Anime.objects.filter(pk=self.anime2.pk).update(metadata_refreshed_at=timezone.now() - datetime.timedelta(days=2))
+        result = metadata_refresh.refresh_metadata(older_than_days=30)
+        self.assertEqual((result.titles, result.failed_titles), (2, 1)) # Anime yeni yenilenmiş: atlandı
+        mock_anime.assert_not_awaited()
+        self.novel1.refresh_from_db()
+        self.assertIsNone(self.novel1.metadata_refreshed_at) # Alınamadı: sonraki çalıştırmada tekrar denenir
+
+        # En eski (hiç yenilenmemiş) önce; limit tekil başlık sayısını sınırlar
+        targets = metadata_refresh.collect_targets(older_than_days=0, limit=1)
+        self.assertEqual(list(targets.values()), [[('novel', self.novel1.pk)]])
+        self.assertEqual(mangadex_service.map_mangadex_data_to_dict({'id': 'x', 'attributes': {'lastChapter': '45.5', 'lastVolume': ''}})['total_chapters'], 45)
+
+        # Her parçanın event loop'unda açılan bağlantı havuzu parça bitince kapatılır (sızıntı yok)
+        pooled, opened = async_http_client.get_async_client('metadata_refresh_test'), []
+        async def details_with_pool(external_id, force_refresh=False):
+            opened.append(pooled._get_async_client())
+            return {'total_chapters': 130}
+        mock_manga.side_effect = details_with_pool
+        try:
+            result = metadata_refresh.refresh_metadata(media_types=['webtoon', 'manga'], older_than_days=0, batch_size=1)
+        finally:
+            async_http_client.reset_clients()
+        self.assertEqual(result.failed_titles, 0)
+        self.assertTrue(opened)
+        self.assertTrue(all(client.is_closed for client in opened))
+
+    def test_command_and_background_job(self, mock_anime, mock_novel, mock_manga):
+        self._set_details(mock_anime, mock_novel, mock_manga)
+        out = io.StringIO()
+        call_command('refresh_metadata', '--type', 'anime', '--all', stdout=out)
+        self.assertIn("1 başlık (1 öğe) yenilendi: 1 öğe güncellendi", out.getvalue())
+
+        call_command('refresh_metadata', '--older-than-days', '1', '--enqueue', stdout=out)
+        job = BackgroundJob.objects.get(job_type='refresh_all_metadata')
+        self.assertEqual(job.payload['older_than_days'], 1)
+        jobs.run_pending_jobs('w1')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result['titles'], job.result['items']), (BackgroundJob.STATUS_SUCCEEDED, 2, 3))
+        print("Test Başarılı: API bilgi yenileme.")
+
+
+# =========================================
+# --- Favori Sayacı (Context Processor) Testleri ---
+# =========================================
+class FavoriteCountTests(SetupMixin, TestCase):
+    """Tembel favorite_count context değeri ve toggle_favorite ile tutarlı cache sayacı."""
+
+    def setUp(self):
+        cache.clear()
+        super().setUp()
+        self.client.login(username='testuser1', password='password123')
+        Favorite.objects.create(user=self.test_user1, content_type=self.anime_content_type, object_id=self.anime1.pk)
+
+    def _favorite_queries(self, func):
+        with CaptureQueriesContext(connection) as ctx:
+            result = func()
+        return result, [q['sql'] for q in ctx.captured_queries if 'tracker_favorite' in q['sql'] and 'COUNT(' in q['sql']]
+
+    def test_context_value_is_lazy(self):
+        request = RequestFactory().get('/')
+        request.user = self.test_user1
+        context, queries = self._favorite_queries(lambda: favorites_processor(request))
+        self.assertEqual(queries, []) # Şablon okumadıkça sorgu yok
+        value, queries = self._favorite_queries(lambda: int(str(context['favorite_count'])))
+        self.assertEqual((value, len(queries)), (1, 1))
+
+        request.user = AnonymousUser()
+        self.assertEqual(str(favorites_processor(request)['favorite_count']), '0')
+
+    def test_count_cached_across_pages(self):
+        response, queries = self._favorite_queries(lambda: self.client.get(reverse('tracker:dashboard')))
+        self.assertContains(response, 'id="navbar-favorite-count" >1</span>', html=False)
+        self.assertEqual(len(queries), 1)
+        response, queries = self._favorite_queries(lambda: self.client.get(reverse('tracker:job_list')))
+        self.assertEqual(queries, []) # İkinci sayfada sayaç cache'ten
+
+    def test_toggle_keeps_count_exact(self):
+        self.assertEqual(favorite_counts.get_favorite_count(self.test_user1.pk), 1)
+        url = reverse('tracker:toggle_favorite')
+        toggle = lambda item_type, pk: self.client.post(url, json.dumps({'item_type': item_type, 'item_id': pk}), content_type='application/json')
+
+        count = lambda: favorite_counts.get_favorite_count(self.test_user1.pk)
+        toggle('webtoon', self.webtoon1.pk)
+        _, queries = self._favorite_queries(lambda: (count(), count()))
+        self.assertEqual((count(), len(queries)), (2, 1)) # Yeni sürümde bir kez yeniden sayıldı, sonra cache'ten
+        toggle('anime', self.anime1.pk)
+        self.assertEqual(count(), 1)
+        toggle('anime', self.anime1.pk)
+        self.assertEqual(count(), 2)
+        Favorite.objects.filter(user=self.test_user1, object_id=self.webtoon1.pk).delete() # QuerySet.delete de sinyal gönderir
+        self.assertEqual(favorite_counts.get_favorite_count(self.test_user1.pk), Favorite.objects.filter(user=self.test_user1).count())
+        self.assertEqual(favorite_counts.get_favorite_count(self.other_user.pk), 0)
+        print("Test Başarılı: Tembel ve cache'lenmiş favori sayacı.")
+
+    def test_interleaved_toggle_and_rollback(self):
+        user_id = self.test_user1.pk
+        count = lambda: favorite_counts.get_favorite_count(user_id)
+        original_count = QuerySet.count
+
+        # Toggle, COUNT ile cache yazımı arasında: eski sayı artık okunmayan (eski sürüm) anahtara yazılır
+        def count_then_toggle(queryset):
+            result = original_count(queryset)
+            Favorite.objects.create(user=self.test_user1, content_type=self.webtoon_content_type, object_id=self.webtoon1.pk)
+            return result
+        with patch.object(QuerySet, 'count', count_then_toggle):
+            self.assertEqual(count(), 1)
+        self.assertEqual(count(), 2)
+
+        # Başka istek sürümü commit'ten önce okuyup henüz görünmeyen veriyle saydı: commit sonrası sürüm tekrar artar
+        with self.captureOnCommitCallbacks(execute=True):
+            Favorite.objects.filter(user=self.test_user1, content_type=self.webtoon_content_type, object_id=self.webtoon1.pk).delete()
+            with patch.object(QuerySet, 'count', lambda queryset: 2): # Commit edilmemiş silme görünmüyor
+                self.assertEqual(count(), 2)
+        self.assertEqual(count(), 1)
+
+        # Geri alınan toggle sayacı kaydırmaz
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                Favorite.objects.create(user=self.test_user1, content_type=self.webtoon_content_type, object_id=self.webtoon1.pk)
+                Favorite.objects.create(user=self.test_user1, content_type=self.anime_content_type, object_id=self.anime1.pk) # Tekrar
+        self.assertEqual(count(), Favorite.objects.filter(user=self.test_user1).count())
+        self.assertEqual(count(), 1)
+
+
+# =========================================
+# --- Favori Kümesi (Cache) ve Cascade Testleri ---
+# =========================================
+class FavoriteIndexTests(SetupMixin, TestCase):
+    """Favori işaretlerinin cache'lenmiş kümeden okunması, öğe silinince favorilerin silinmesi ve eski kayıt temizliği."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.login(username='testuser1', password='password123')
+        Favorite.objects.create(user=self.test_user1, content_type=self.anime_content_type, object_id=self.anime1.pk)
+        Favorite.objects.create(user=self.test_user1, content_type=self.webtoon_content_type, object_id=self.webtoon1.pk)
+
+    def _favorite_queries(self, func):
+        with CaptureQueriesContext(connection) as ctx:
+            result = func()
+        return result, [q['sql'] for q in ctx.captured_queries if 'tracker_favorite' in q['sql']]
+
+    def test_flags_answered_from_cached_set(self):
+        index, queries = self._favorite_queries(lambda: favorite_index.get_user_favorites(self.test_user1.pk))
+        self.assertEqual(index['anime'], {self.anime1.pk})
+        self.assertEqual(index['manga'], frozenset())
+        self.assertLessEqual(len(queries), 1) # Tüm türler tek sorguda
+
+        request = RequestFactory().get('/')
+        request.user = self.test_user1
+        result, queries = self._favorite_queries(lambda: (
+            _get_favorited_pks(request, Anime, [self.anime1, self.anime2]),
+            _get_favorite_status(request, self.webtoon1),
+            _get_favorite_status(request, self.manga1),
+        ))
+        self.assertEqual((result, queries), (({self.anime1.pk}, True, False), []))
+
+        Favorite.objects.create(user=self.test_user1, content_type=ContentType.objects.get_for_model(Manga), object_id=self.manga1.pk)
+        self.assertTrue(_get_favorite_status(request, self.manga1)) # Sinyal kümeyi geçersiz kıldı
+        self.assertEqual(favorite_index.get_user_favorites(self.other_user.pk)['anime'], frozenset())
+
+    def test_favorites_view_uses_cached_set(self):
+        self.client.get(reverse('tracker:favorites_view'))
+        response, queries = self._favorite_queries(lambda: self.client.get(reverse('tracker:favorites_view')))
+        self.assertEqual(response.context['total_favorites'], 2)
+        self.assertEqual([group for group, _ in response.context['grouped_favorites_list']], ['anime', 'webtoon'])
+        self.assertEqual(queries, [])
+
+    def test_item_delete_cascades_and_orphans_are_cleaned(self):
+        self.assertEqual(favorite_counts.get_favorite_count(self.test_user1.pk), 2)
+        Anime.objects.get(pk=self.anime1.pk).delete()
+        self.assertFalse(Favorite.objects.filter(content_type=self.anime_content_type, object_id=self.anime1.pk).exists())
+        self.assertEqual(favorite_counts.get_favorite_count(self.test_user1.pk), 1)
+        self.assertEqual(favorite_index.get_user_favorites(self.test_user1.pk)['anime'], frozenset())
+
+        # Eski (cascade öncesi) veride kalmış yetim kayıtlar migration ile silinir
+        orphan = Favorite.objects.create(user=self.test_user1, content_type=self.anime_content_type, object_id=999999)
+        migration = importlib.import_module('tracker.migrations.0017_favorite_object_index_and_orphans')
+        migration.delete_orphan_favorites(django_apps, None)
+        self.assertFalse(Favorite.objects.filter(pk=orphan.pk).exists())
+        self.assertTrue(Favorite.objects.filter(object_id=self.webtoon1.pk).exists())
+        print("Test Başarılı: Cache'lenmiş favori kümesi ve favori cascade'i.")
+
+
+# =========================================
+# --- Toplu Favori Endpoint Testleri ---
+# =========================================
+class BatchFavoritesTests(SetupMixin, TestCase):
+    """Toplu favori ekleme/çıkarma: sabit sorgu sayısı, sahiplik kontrolü ve cache tutarlılığı."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.login(username='testuser1', password='password123')
+        self.url = reverse('tracker:batch_favorites')
+        Favorite.objects.create(user=self.test_user1, content_type=self.anime_content_type, object_id=self.anime1.pk)
+
+    def _post(self, items):
+        return self.client.post(self.url, json.dumps({'items': items}), content_type='application/json')
+
+    def test_batch_add_and_remove(self):
+        self.assertEqual(favorite_counts.get_favorite_count(self.test_user1.pk), 1)
+        favorite_index.get_user_favorites(self.test_user1.pk)
+        other_anime = Anime.objects.create(user=self.other_user, title="Başkasının Animesi", status="Watching")
+        items = [
+            {'item_type': 'anime', 'item_id': self.anime1.pk, 'favorite': False},
+            {'item_type': 'anime', 'item_id': self.anime2.pk, 'favorite': True},
+            {'item_type': 'Manga', 'item_id': self.manga1.pk, 'favorite': True},
+            {'item_type': 'webtoon', 'item_id': str(self.webtoon1.pk), 'favorite': True},
+            {'item_type': 'webtoon', 'item_id': self.webtoon1.pk, 'favorite': True}, # Tekrar: sonuncusu geçerli
+            {'item_type': 'novel', 'item_id': self.novel1.pk, 'favorite': False}, # Zaten favori değil
+            {'item_type': 'anime', 'item_id': other_anime.pk, 'favorite': True}, # Başka kullanıcının öğesi
+        ]
+        ContentType.objects.get_for_models(Anime, Webtoon, Manga, Novel) # Süreç içi cache ısınsın
+        with CaptureQueriesContext(connection) as ctx:
+            response = self._post(items)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['added']), 3)
+        self.assertEqual(len(data['removed']), 2)
+        self.assertEqual(data['not_found'], [{'item_type': 'anime', 'item_id': other_anime.pk}])
+        self.assertEqual(data['favorite_count'], 3)
+        favorite_sql = [q['sql'] for q in ctx.captured_queries if 'tracker_favorite' in q['sql']]
+        self.assertEqual(sum(sql.startswith('INSERT') for sql in favorite_sql), 1)
+        self.assertEqual(sum(sql.startswith('DELETE') for sql in favorite_sql), 1)
+        self.assertFalse(any('django_content_type' in q['sql'] for q in ctx.captured_queries))
+
+        self.assertEqual(favorite_counts.get_favorite_count(self.test_user1.pk), Favorite.objects.filter(user=self.test_user1).count())
+        index = favorite_index.get_user_favorites(self.test_user1.pk)
+        self.assertEqual((index['anime'], index['manga'], index['webtoon']), ({self.anime2.pk}, {self.manga1.pk}, {self.webtoon1.pk}))
+
+        # Aynı istek tekrar gönderilirse (zaten favori olanlar) çakışma hatası olmaz
+        self.assertEqual(self._post(items).json()['favorite_count'], 3)
+
+    def test_invalid_requests(self):
+        self.assertEqual(self._post([]).status_code, 400)
+        self.assertEqual(self._post([{'item_type': 'film', 'item_id': 1, 'favorite': True}]).status_code, 400)
+        self.assertEqual(self._post([{'item_type': 'anime', 'item_id': 'x', 'favorite': True}]).status_code, 400)
+        self.assertEqual(self._post([{'item_type': 'anime', 'item_id': 1, 'favorite': 'yes'}]).status_code, 400)
+        self.assertEqual(self.client.post(self.url, 'bozuk', content_type='application/json').status_code, 400)
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+        self.assertEqual(Favorite.objects.filter(user=self.test_user1).count(), 1)
+        print("Test Başarılı: Toplu favori endpoint'i.")
+
+
+# =========================================
+# --- Etiket Facet'leri Testleri ---
+# =========================================
+class TagFacetTests(SetupMixin, TestCase):
+    """Etiket filtresi için sayılı, cache'lenmiş facet'ler ve değişikliklerde geçersiz kılma."""
+
+    def setUp(self):
+        super().setUp()
+        self.anime3_plan.tags.add(self.tag_action)
+        Anime.objects.create(user=self.other_user, title="Başkasının Animesi", status="Watching").tags.add(self.tag_action)
+
+    def _facets(self, status=None):
+        return {facet.name: facet.count for facet in _get_all_user_tags(self.test_user1, Anime, status)}
+
+    def test_counts_total_and_per_status(self):
+        self.assertEqual(self._facets(), {'Aksiyon': 2, 'Komedi': 1, 'Fantastik': 1, 'Macera': 1})
+        self.assertEqual(self._facets('Watching'), {'Aksiyon': 1, 'Komedi': 1, 'Fantastik': 0, 'Macera': 0})
+        self.assertEqual([facet.name for facet in _get_all_user_tags(self.test_user1, Anime)], ['Aksiyon', 'Fantastik', 'Komedi', 'Macera'])
+        with self.assertNumQueries(0): # İkinci okuma cache'ten
+            _get_all_user_tags(self.test_user1, Anime)
+
+    def test_invalidated_on_tag_status_and_delete(self):
+        self._facets()
+        self.anime1.tags.remove(self.tag_comedy)
+        self.assertNotIn('Komedi', self._facets())
+        self.anime2.tags.add(self.tag_action)
+        self.assertEqual(self._facets()['Aksiyon'], 3)
+
+        anime = Anime.objects.get(pk=self.anime1.pk)
+        anime.status = 'Completed'
+        anime.save()
+        self.assertEqual(self._facets('Completed')['Aksiyon'], 2)
+        anime.notes = 'Sadece not değişti'
+        version = cache.get(f"tag_facets:version:{self.test_user1.pk}:anime")
+        anime.save()
+        self.assertEqual(cache.get(f"tag_facets:version:{self.test_user1.pk}:anime"), version) # Facet'ler korunur
+
+        Anime.objects.get(pk=self.anime2.pk).delete()
+        self.assertEqual(self._facets(), {'Aksiyon': 2})
+        self.assertEqual(_get_all_user_tags(self.test_user1, Manga)[0].count, 1) # Diğer türler ayrı
+
+    def test_list_page_shows_counts(self):
+        self.client.login(username='testuser1', password='password123')
+        importer.import_items(self.test_user1, 'anime', [{'title': 'İçe Aktarılan', 'status': 'Watching', 'tags': ['Aksiyon']}])
+        response = self.client.get(reverse('tracker:anime_list_view'), {'status': 'Watching'})
+        self.assertContains(response, 'Aksiyon (2)') # anime1 + içe aktarılan
+        self.assertContains(response, 'Macera (0)')
+        print("Test Başarılı: Sayılı etiket facet'leri.")
+
+
+# =========================================
+# --- Çoklu Etiket Filtresi Testleri ---
+# =========================================
+class MultiTagFilterTests(SetupMixin, TestCase):
+    """?tag=a&tag=b&mode=all|any: ilişkili EXISTS alt sorguları, satır çoğalması yok."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.login(username='testuser1', password='password123')
+        self.anime2.tags.add(self.tag_action)        # anime1: Aksiyon+Komedi, anime2: Fantastik+Macera+Aksiyon
+        self.anime3_plan.tags.add(self.tag_comedy)   # anime3_plan: Komedi
+
+    def _titles(self, params, model=Anime):
+        request = RequestFactory().get('/', params)
+        request.user = self.test_user1
+        queryset = _get_filtered_queryset(request, model)[0].order_by('title')
+        return list(queryset.values_list('title', flat=True))
+
+    def test_all_and_any_modes(self):
+        both = {'tag': ['aksiyon', 'komedi']}
+        self.assertEqual(self._titles(both), ["Test Anime Alpha"])
+        self.assertEqual(self._titles({**both, 'mode': 'all'}), ["Test Anime Alpha"])
+        self.assertEqual(self._titles({**both, 'mode': 'any'}), ["Anime Gamma Plan", "Test Anime Alpha", "Test Anime Beta"]) # Tekrar yok
+        self.assertEqual(self._titles({'tag': ['aksiyon', 'olmayan-etiket']}), [])
+        self.assertEqual(self._titles({'tag': ['aksiyon', 'olmayan-etiket'], 'mode': 'any'}), ["Test Anime Alpha", "Test Anime Beta"])
+        self.assertEqual(self._titles({'tag': ['aksiyon', 'aksiyon', ''], 'mode': 'bilinmeyen'}), ["Test Anime Alpha", "Test Anime Beta"])
+        self.assertEqual(self._titles({'tag': ['aksiyon', 'komedi'], 'status': 'Watching', 'mode': 'any'}), ["Test Anime Alpha"])
+        self.assertEqual(self._titles({'tag': ['aksiyon']}, model=Webtoon), ["Test Webtoon 1"]) # Tür başına content_type
+
+        # Join yerine alt sorgular: ana sorguda taggit join'i yok
+        all_sql = str(apply_tag_filter(Anime.objects.all(), Anime, ['aksiyon', 'komedi'], 'all').query)
+        any_sql = str(apply_tag_filter(Anime.objects.all(), Anime, ['aksiyon', 'komedi'], 'any').query)
+        self.assertEqual(all_sql.count('EXISTS'), 2) # Etiket başına bir EXISTS
+        self.assertNotIn('HAVING', all_sql) # Tüm sitenin etiket ilişkileri gruplanmaz
+        self.assertEqual(any_sql.count('EXISTS'), 1)
+        self.assertNotIn('DISTINCT "tracker_anime"', any_sql.upper())
+
+        # Benchmark komutu: çok kullanıcılı geçici veri, sonuç kümeleri aynı, veriler geri alınır
+        out = io.StringIO()
+        call_command('benchmark_tag_filter', '--items', '40', '--other-users', '2', '--tags', '5', '--repeat', '1', stdout=out)
+        self.assertIn("3 kullanıcı, 120 öğe", out.getvalue())
+        self.assertNotIn("farklı", out.getvalue())
+        self.assertIn("geri alındı", out.getvalue())
+        self.assertFalse(User.objects.filter(username__startswith="tagbench_").exists())
+
+    def test_list_and_export_keep_multiple_tags(self):
+        params = {'tag': ['aksiyon', 'komedi'], 'mode': 'any'}
+        response = self.client.get(reverse('tracker:anime_list_view'), params)
+        self.assertEqual(response.context['current_tag_filter'], ['aksiyon', 'komedi'])
+        self.assertEqual(response.context['current_tag_mode'], 'any')
+        self.assertEqual(response.context['paginator'].count, 3)
+        self.assertContains(response, '<option value="aksiyon" selected>', html=False)
+        self.assertContains(response, '<option value="komedi" selected>', html=False)
+        self.assertIn('tag=aksiyon&tag=komedi&mode=any', response.context['export_query'])
+
+        response = self.client.get(reverse('tracker:export_anime_csv'), {'tag': ['aksiyon', 'komedi']})
+        content = b"".join(response.streaming_content).decode("utf-8")
+        self.assertIn("_etiket-aksiyon-komedi", response['Content-Disposition'])
+        self.assertIn("Test Anime Alpha", content)
+        self.assertNotIn("Test Anime Beta", content)
+        print("Test Başarılı: Çoklu etiket filtresi (all/any).")
+
+
 # Testleri çalıştırmak için: python manage.py test tracker
\ No newline at end of file
@@ -20,8 +20,15 @@ urlpatterns = [
 
     # --- Favori URL'leri ---
     path("favorite/toggle/", views.toggle_favorite, name="toggle_favorite"), # AJAX endpoint
+    path("favorite/batch/", views.batch_favorites, name="batch_favorites"), # Toplu favori (AJAX/JSON)
     path("favorites/", views.favorites_view, name="favorites_view"), # Favori listesi sayfası
 
+    # --- Kütüphanede Fuzzy Başlık Araması (AJAX, JSON) ---
+    path("search/fuzzy/", views.fuzzy_title_search, name="fuzzy_title_search"),
+
+    # --- Birleşik API Araması (Jikan Anime + Jikan Novel + MangaDex aynı anda) ---
+    path("search-api/", views.unified_api_search_view, name="unified_api_search"),
+
     # --- MangaDex API (Manga/Webtoon) ---
     # Arama sayfası ve sonuçları için GET/POST
     path("manga/search-api/", views.manga_api_search_view, name="manga_api_search"),
@@ -66,6 +73,19 @@ urlpatterns = [
     path("novel/<int:pk>/delete/", views.novel_delete, name="novel_delete"),
     path("novel/export/csv/", views.export_novel_csv, name="export_novel_csv"),
 
+    # --- Tüm Kütüphane Dışa Aktarımı (ZIP: dört tür + favoriler + etiketler) ---
+    path("export/library/", views.export_library, name="export_library"),
+
+    # --- Toplu İçe Aktarım (CSV / JSON Lines / MAL XML / MangaDex JSON) ---
+    path("import/", views.import_library, name="import_library"),
+
+    # --- Arka Plan İşleri (kuyruk: içe/dışa aktarım, API bilgi yenileme) ---
+    path("jobs/", views.job_list, name="job_list"),
+    path("jobs/<int:pk>/status/", views.job_status, name="job_status"), # AJAX polling (JSON)
+    path("jobs/<int:pk>/download/", views.job_download, name="job_download"),
+    path("jobs/export-library/", views.enqueue_library_export, name="enqueue_library_export"),
+    path("jobs/refresh/<str:media_type>/<int:pk>/", views.enqueue_metadata_refresh, name="enqueue_metadata_refresh"),
+
     # --- Etiketleme URL'leri (Opsiyonel) ---
     # Eğer etikete göre filtreleme için ayrı bir sayfa istenirse:
     # path("tags/<slug:tag_slug>/", views.items_by_tag_view, name="items_by_tag"),
@@ -13,18 +13,24 @@ from .crud_views import (
 
 # api_views.py dosyasından ilgili view'ları import et
 from .api_views import (
-    manga_api_search_view, anime_api_search_view, novel_api_search_view,
+    manga_api_search_view, anime_api_search_view, novel_api_search_view, unified_api_search_view,
     md_add_item_view, jikan_add_anime_view, jikan_add_novel_view
 )
 
 # ajax_views.py dosyasından ilgili view'ları import et
-from .ajax_views import toggle_favorite
+from .ajax_views import toggle_favorite, batch_favorites, fuzzy_title_search
 
 # export_views.py dosyasından ilgili view'ları import et
 from .export_views import (
-    export_anime_csv, export_webtoon_csv, export_manga_csv, export_novel_csv
+    export_anime_csv, export_webtoon_csv, export_manga_csv, export_novel_csv, export_library
 )
 
+# import_views.py dosyasından ilgili view'ları import et
+from .import_views import import_library
+
+# job_views.py dosyasından ilgili view'ları import et
+from .job_views import job_list, job_status, job_download, enqueue_library_export, enqueue_metadata_refresh
+
 # Opsiyonel: Eğer yardımcı fonksiyonları başka view'larda doğrudan kullanmayacaksanız
 # __init__.py'ye import etmenize gerek yok. helpers.py içinden çağrılabilirler.
 
@@ -35,8 +41,10 @@ __all__ = [
     'webtoon_list_and_create', 'webtoon_detail', 'webtoon_edit', 'webtoon_delete',
     'manga_list_and_create', 'manga_detail', 'manga_edit', 'manga_delete',
     'novel_list_and_create', 'novel_detail', 'novel_edit', 'novel_delete',
-    'manga_api_search_view', 'anime_api_search_view', 'novel_api_search_view',
+    'manga_api_search_view', 'anime_api_search_view', 'novel_api_search_view', 'unified_api_search_view',
     'md_add_item_view', 'jikan_add_anime_view', 'jikan_add_novel_view',
-    'toggle_favorite',
-    'export_anime_csv', 'export_webtoon_csv', 'export_manga_csv', 'export_novel_csv',
+    'toggle_favorite', 'batch_favorites', 'fuzzy_title_search',
+    'export_anime_csv', 'export_webtoon_csv', 'export_manga_csv', 'export_novel_csv', 'export_library',
+    'import_library',
+    'job_list', 'job_status', 'job_download', 'enqueue_library_export', 'enqueue_metadata_refresh',
 ]
\ No newline at end of file
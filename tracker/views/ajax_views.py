@@ -7,9 +7,11 @@ from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse, Http404
 from django.contrib.contenttypes.models import ContentType
 from django.views.decorators.http import require_http_methods
+from django.urls import reverse
 
 # Modelleri import et
 from ..models import Favorite, Anime, Manga, Webtoon, Novel # get_object_or_404 için modellere ihtiyaç var
+from ..services import favorite_batch, favorite_counts, fuzzy_search
 
 logger = logging.getLogger(__name__)
 
@@ -78,4 +80,66 @@ def toggle_favorite(request):
     except Exception as e:
         # Beklenmedik hataları logla
         logger.error(f"Toggle Favorite Hatası: {e}", exc_info=True)
-        return JsonResponse({'status': 'error', 'message': 'Sunucu hatası.'}, status=500)
\ No newline at end of file
+        return JsonResponse({'status': 'error', 'message': 'Sunucu hatası.'}, status=500)
+
+
+# Toplu Favori Güncelleme (AJAX / Senkronizasyon İstemcileri)
+@login_required
+@require_http_methods(["POST"])
+def batch_favorites(request):
+    """
+    Birden fazla öğenin favori durumunu tek istekte ayarlar (JSON).
+    Gövde: {"items": [{"item_type": "anime", "item_id": 12, "favorite": true}, ...]}
+    Sadece kullanıcının kendi öğeleri işlenir; diğerleri 'not_found' içinde döner.
+    """
+    try:
+        data = json.loads(request.body)
+        changes = favorite_batch.parse_changes(data.get('items') if isinstance(data, dict) else None)
+    except json.JSONDecodeError:
+        logger.warning("Batch Favorites: Geçersiz JSON formatı.")
+        return JsonResponse({'status': 'error', 'message': 'Geçersiz JSON formatı.'}, status=400)
+    except favorite_batch.FavoriteBatchError as e:
+        logger.warning(f"Batch Favorites: {e}")
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    result = favorite_batch.apply_changes(request.user, changes)
+
+    def as_items(keys):
+        return [{'item_type': media_type, 'item_id': pk} for media_type, pk in keys]
+
+    return JsonResponse({
+        'status': 'ok',
+        'added': as_items(result.added),
+        'removed': as_items(result.removed),
+        'not_found': as_items(result.not_found),
+        'favorite_count': favorite_counts.get_favorite_count(request.user.pk), # Navbar rozeti için kesin değer
+    })
+
+
+# Kütüphanede Fuzzy Başlık Araması (AJAX)
+@login_required
+@require_http_methods(["GET"])
+def fuzzy_title_search(request):
+    """
+    Kullanıcının kütüphanesinde yazım hatalarına toleranslı başlık araması (JSON).
+    GET parametreleri: q (arama metni), type (opsiyonel, birden fazla: anime/webtoon/manga/novel), limit.
+    Sonuçlar benzerliğe (0-1) göre azalan sıradadır.
+    """
+    query = request.GET.get('q', '').strip()
+    media_types = [t for t in request.GET.getlist('type') if t in fuzzy_search.FUZZY_MODELS] or None
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 50)
+    except ValueError:
+        limit = 10
+    if not query:
+        return JsonResponse({'status': 'error', 'message': 'Arama metni gerekli.'}, status=400)
+
+    matches = fuzzy_search.find_similar(request.user, query, media_types=media_types, limit=limit)
+    results = [{
+        'type': match.media_type,
+        'id': match.item.pk,
+        'title': match.item.title,
+        'similarity': round(match.similarity, 3),
+        'url': reverse(f"tracker:{match.url_name}", kwargs={'pk': match.item.pk}),
+    } for match in matches]
+    return JsonResponse({'status': 'ok', 'query': query, 'results': results})
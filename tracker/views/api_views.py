@@ -1,22 +1,26 @@
 # tracker/views/api_views.py
+import asyncio
 import logging
 import uuid
 
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.urls import reverse, NoReverseMatch
+from django.utils import timezone
 
 # Modelleri ve Formları import et
 from ..models import Anime, Manga, Novel, Webtoon
 from ..forms import AnimeForm, MangaForm, NovelForm, WebtoonForm
 
 # Servisleri import et
-from ..services import mangadex as mangadex_service
-from ..services import jikan as jikan_service
+from ..services import mangadex_service
+from ..services import jikan_service
+from ..services import fuzzy_search
 
 # Yardımcı fonksiyonları import et
-from .helpers import _get_existing_mal_ids, _get_existing_mangadex_ids
+from .helpers import _get_existing_mal_ids, _get_existing_mangadex_ids, _get_existing_api_ids
 
 logger = logging.getLogger(__name__)
 
@@ -26,8 +30,10 @@ logger = logging.getLogger(__name__)
 # ==============================================================================
 
 # --- API Arama View'ları (Optimize Edildi) ---
+# Async view'lar: upstream beklenirken (rate limit, ağ) worker thread'i bloklanmaz (ASGI altında).
+# Veritabanı erişimi ve şablon render'ı (context processor'lar DB kullanır) sync_to_async ile yapılır.
 @login_required
-def manga_api_search_view(request):
+async def manga_api_search_view(request):
     """MangaDex API ile Manga/Webtoon arar ve sonuçları gösterir."""
     context = {
         'search_results': None, # Arama sonuçları
@@ -44,11 +50,11 @@ def manga_api_search_view(request):
         messages.warning(request, "Lütfen aramak için bir başlık girin.")
         # Boş arama formuyla template'i tekrar göster
         # === GÜNCELLEME: Template yolu değişti (Kullanıcının belirttiği yol) ===
-        return render(request, 'tracker/anime_manga_weptoon_novel_api/manga_api_search.html', context)
+        return await sync_to_async(render)(request, 'tracker/anime_manga_weptoon_novel_api/manga_api_search.html', context)
 
     if query: # Eğer bir arama sorgusu varsa
         context['query'] = query # Context'i güncelle
-        results = mangadex_service.search_manga(query) # API'dan arama yap
+        results = await mangadex_service.asearch_manga(query) # API'dan arama yap (async)
 
         # API yanıtını işle
         if results is None: # API hatası
@@ -63,14 +69,14 @@ def manga_api_search_view(request):
             if request.method == 'POST':
                 messages.success(request, f"'{query}' için {len(results)} sonuç bulundu.")
             # Kullanıcının listesinde zaten var olan ID'leri bul (Optimize Edildi)
-            context['existing_ids_in_db'] = _get_existing_mangadex_ids(request, results)
+            context['existing_ids_in_db'] = await sync_to_async(_get_existing_mangadex_ids)(request, results)
 
     # Template'i render et
     # === GÜNCELLEME: Template yolu değişti (Kullanıcının belirttiği yol) ===
-    return render(request, 'tracker/anime_manga_weptoon_novel_api/manga_api_search.html', context)
+    return await sync_to_async(render)(request, 'tracker/anime_manga_weptoon_novel_api/manga_api_search.html', context)
 
 @login_required
-def anime_api_search_view(request):
+async def anime_api_search_view(request):
     """Jikan API ile Anime arar ve sonuçları gösterir."""
     context = {
         'search_results': None,
@@ -85,11 +91,11 @@ def anime_api_search_view(request):
     if request.method == 'POST' and not query:
         messages.warning(request, "Lütfen aramak için bir anime başlığı girin.")
         # === GÜNCELLEME: Template yolu değişti (Kullanıcının belirttiği yol) ===
-        return render(request, 'tracker/anime_manga_weptoon_novel_api/anime_api_search.html', context)
+        return await sync_to_async(render)(request, 'tracker/anime_manga_weptoon_novel_api/anime_api_search.html', context)
 
     if query:
         context['query'] = query
-        results = jikan_service.search_anime(query) # Servis fonksiyonunu çağır
+        results = await jikan_service.asearch_anime(query) # Servis fonksiyonunu çağır (async)
 
         if results is None: # API hatası
             messages.error(request, "Jikan API hatası oluştu veya bağlantı kurulamadı.")
@@ -103,13 +109,13 @@ def anime_api_search_view(request):
              if request.method == 'POST':
                  messages.success(request, f"'{query}' için {len(results)} sonuç bulundu.")
              # Listede var olan MAL ID'lerini bul (Optimize Edildi)
-             context['existing_ids_in_db'] = _get_existing_mal_ids(request, results, Anime)
+             context['existing_ids_in_db'] = await sync_to_async(_get_existing_mal_ids)(request, results, Anime)
 
     # === GÜNCELLEME: Template yolu değişti (Kullanıcının belirttiği yol) ===
-    return render(request, 'tracker/anime_manga_weptoon_novel_api/anime_api_search.html', context)
+    return await sync_to_async(render)(request, 'tracker/anime_manga_weptoon_novel_api/anime_api_search.html', context)
 
 @login_required
-def novel_api_search_view(request):
+async def novel_api_search_view(request):
     """Jikan API ile Novel arar ve sonuçları gösterir."""
     context = {
         'search_results': None,
@@ -124,11 +130,11 @@ def novel_api_search_view(request):
     if request.method == 'POST' and not query:
         messages.warning(request, "Lütfen aramak için bir novel başlığı girin.")
         # === GÜNCELLEME: Template yolu değişti (Kullanıcının belirttiği yol) ===
-        return render(request, 'tracker/anime_manga_weptoon_novel_api/novel_api_search.html', context)
+        return await sync_to_async(render)(request, 'tracker/anime_manga_weptoon_novel_api/novel_api_search.html', context)
 
     if query:
         context['query'] = query
-        results = jikan_service.search_novel(query) # Novel arama servisi
+        results = await jikan_service.asearch_novel(query) # Novel arama servisi (async)
 
         if results is None: # API hatası
             messages.error(request, "Jikan API Novel arama hatası oluştu veya bağlantı kurulamadı.")
@@ -142,13 +148,133 @@ def novel_api_search_view(request):
              if request.method == 'POST':
                  messages.success(request, f"'{query}' için {len(results)} novel sonucu bulundu.")
              # Listede var olan MAL ID'lerini bul (Optimize Edildi)
-             context['existing_ids_in_db'] = _get_existing_mal_ids(request, results, Novel)
+             context['existing_ids_in_db'] = await sync_to_async(_get_existing_mal_ids)(request, results, Novel)
 
     # === GÜNCELLEME: Template yolu değişti (Kullanıcının belirttiği yol) ===
-    return render(request, 'tracker/anime_manga_weptoon_novel_api/novel_api_search.html', context)
+    return await sync_to_async(render)(request, 'tracker/anime_manga_weptoon_novel_api/novel_api_search.html', context)
+
+
+# --- Birleşik (Çok Kaynaklı) API Araması ---
+# Kaynak anahtarı -> servis modülü, async arama fonksiyonunun adı ve şablon bilgileri.
+# Fonksiyonlar isimle tutulur (çağrı anında getattr) ki testlerde patch edilebilsinler.
+UNIFIED_SEARCH_SOURCES = {
+    'anime': {
+        'service': jikan_service, 'search_func': 'asearch_anime', 'id_key': 'mal_id',
+        'label': 'Anime (Jikan)', 'item_type_name': 'Anime', 'add_item_url_name': 'tracker:jikan_add_anime',
+    },
+    'novel': {
+        'service': jikan_service, 'search_func': 'asearch_novel', 'id_key': 'mal_id',
+        'label': 'Light Novel (Jikan)', 'item_type_name': 'Novel', 'add_item_url_name': 'tracker:jikan_add_novel',
+    },
+    'manga': {
+        'service': mangadex_service, 'search_func': 'asearch_manga', 'id_key': 'id',
+        'label': 'Manga/Webtoon (MangaDex)', 'item_type_name': 'Manga/Webtoon', 'add_item_url_name': 'tracker:md_add_item',
+    },
+}
+
+def _merge_search_results(results_by_source):
+    """
+    Kaynakların sonuçlarını sıralarına göre sırayla (round-robin) birleştirir ve
+    (kaynak, ID) çiftine göre tekrar edenleri atar. Her kaynağın en alakalı sonuçları üstte kalır.
+    """
+    merged = []
+    seen = set()
+    ordered = [(source, results or []) for source, results in results_by_source.items()]
+    longest = max((len(results) for _, results in ordered), default=0)
+    for rank in range(longest):
+        for source, results in ordered:
+            if rank >= len(results):
+                continue
+            result = results[rank]
+            api_id = result.get(UNIFIED_SEARCH_SOURCES[source]['id_key'])
+            if not api_id or (source, str(api_id)) in seen:
+                continue
+            seen.add((source, str(api_id)))
+            merged.append({'source': source, 'result': result})
+    return merged
+
+@login_required
+async def unified_api_search_view(request):
+    """
+    Jikan anime, Jikan light novel ve MangaDex'te aynı anda arar (asyncio.gather).
+    Toplam süre üç kaynağın toplamı değil, en yavaş kaynağın süresi kadardır.
+    Listede olan ID'ler tek bir UNION ALL sorgusuyla bulunur.
+    """
+    template = 'tracker/anime_manga_weptoon_novel_api/unified_api_search.html'
+    query = request.POST.get('query', request.GET.get('query', '')).strip()
+    # Aranacak kaynaklar (varsayılan: hepsi)
+    selected_sources = [
+        s for s in (request.POST.getlist('sources') or request.GET.getlist('sources'))
+        if s in UNIFIED_SEARCH_SOURCES
+    ] or list(UNIFIED_SEARCH_SOURCES)
+    context = {
+        'query': query,
+        'search_title': 'Tüm Kaynaklarda Ara (Anime, Novel, Manga/Webtoon)',
+        'sources': [{'key': key, 'label': cfg['label']} for key, cfg in UNIFIED_SEARCH_SOURCES.items()],
+        'selected_sources': selected_sources,
+        'merged_results': None,
+        'source_summaries': [],
+    }
+
+    if request.method == 'POST' and not query:
+        messages.warning(request, "Lütfen aramak için bir başlık girin.")
+        return await sync_to_async(render)(request, template, context)
+
+    if query:
+        # 1. Tüm kaynaklara aynı anda istek at (bir kaynağın hatası diğerlerini etkilemez)
+        coroutines = [
+            getattr(UNIFIED_SEARCH_SOURCES[source]['service'], UNIFIED_SEARCH_SOURCES[source]['search_func'])(query)
+            for source in selected_sources
+        ]
+        gathered = await asyncio.gather(*coroutines, return_exceptions=True)
+
+        results_by_source = {}
+        for source, outcome in zip(selected_sources, gathered):
+            cfg = UNIFIED_SEARCH_SOURCES[source]
+            if isinstance(outcome, BaseException):
+                logger.error(f"Birleşik arama - {source} kaynağı hata verdi: {outcome}", exc_info=outcome)
+                outcome = None
+            results_by_source[source] = outcome
+            context['source_summaries'].append({
+                'key': source, 'label': cfg['label'],
+                'error': outcome is None, 'count': len(outcome or []),
+            })
+            if outcome is None:
+                messages.error(request, f"{cfg['label']} kaynağına bağlanırken bir hata oluştu.")
+
+        # 2. Birleştir ve tekrar edenleri at
+        merged = _merge_search_results(results_by_source)
+
+        # 3. Listede olanları tek DB sorgusuyla bul
+        mal_ids_by_source = {
+            source: [r.get('mal_id') for r in (results_by_source.get(source) or [])]
+            for source in ('anime', 'novel')
+        }
+        mangadex_ids = [r.get('id') for r in (results_by_source.get('manga') or []) if r.get('id')]
+        existing = await sync_to_async(_get_existing_api_ids)(request, mal_ids_by_source, mangadex_ids)
+
+        for entry in merged:
+            cfg = UNIFIED_SEARCH_SOURCES[entry['source']]
+            entry['label'] = cfg['label']
+            entry['item_type_name'] = cfg['item_type_name']
+            entry['add_item_url_name'] = cfg['add_item_url_name']
+            entry['existing_ids_in_db'] = existing[entry['source']]
+        context['merged_results'] = merged
+
+        if request.method == 'POST':
+            if merged:
+                messages.success(request, f"'{query}' için toplam {len(merged)} sonuç bulundu.")
+            elif not all(summary['error'] for summary in context['source_summaries']):
+                messages.warning(request, f"'{query}' için hiçbir kaynakta sonuç bulunamadı.")
+
+    return await sync_to_async(render)(request, template, context)
 
 
 # --- API Ekleme View'ları (Optimize Edilmiş Kontroller) ---
+def _wants_refresh(request):
+    """GET isteğinde ?refresh=1 verildiyse detaylar önbellek atlanarak API'dan yeniden alınır."""
+    return request.method == 'GET' and request.GET.get('refresh') == '1'
+
 @login_required
 def md_add_item_view(request, mangadex_id):
     """MangaDex'ten gelen veriyi kullanarak Manga veya Webtoon ekler."""
@@ -159,8 +285,8 @@ def md_add_item_view(request, mangadex_id):
         messages.error(request, "Geçersiz MangaDex ID formatı.")
         return redirect('tracker:manga_api_search') # Arama sayfasına dön
 
-    # 1. API'dan detayları al
-    initial_data = mangadex_service.get_manga_details(str(md_id_uuid))
+    # 1. API'dan detayları al (önbellekteki eski kayıt hemen sunulur, ?refresh=1 ile zorla yenilenir)
+    initial_data = mangadex_service.get_manga_details(str(md_id_uuid), force_refresh=_wants_refresh(request))
     if initial_data is None:
         messages.error(request, f"MangaDex ID '{md_id_uuid}' için detaylar alınamadı veya bulunamadı.")
         return redirect('tracker:manga_api_search')
@@ -201,6 +327,7 @@ def md_add_item_view(request, mangadex_id):
                 instance = form.save(commit=False)
                 instance.user = request.user
                 instance.mangadex_id = md_id_uuid # MangaDex ID'yi ata
+                instance.metadata_refreshed_at = timezone.now() # Form API verisiyle dolduruldu
                 instance.save()
                 # API'dan gelen etiketleri ekle (tags_list servis tarafından sağlanmalı)
                 api_tags = initial_data.get('tags_list', [])
@@ -235,15 +362,19 @@ def md_add_item_view(request, mangadex_id):
     context = {
         'form': form,
         'mangadex_data': initial_data, # API verisini teyit için göster
-        'model_verbose_name': name # Template başlığı vb. için
+        'model_verbose_name': name, # Template başlığı vb. için
+        # Farklı ID/elle eklenmiş benzer başlıklar (MangaDex hem manga hem webtoon olabilir)
+        'possible_duplicates': fuzzy_search.find_possible_duplicates(
+            request.user, initial_data.get('title'), media_types=['manga', 'webtoon']
+        ),
     }
     return render(request, template, context)
 
 @login_required
 def jikan_add_anime_view(request, mal_id):
     """Jikan'dan gelen veriyi kullanarak Anime ekler."""
-    # 1. API'dan detayları al
-    initial_data = jikan_service.get_anime_details(mal_id)
+    # 1. API'dan detayları al (önbellekteki eski kayıt hemen sunulur, ?refresh=1 ile zorla yenilenir)
+    initial_data = jikan_service.get_anime_details(mal_id, force_refresh=_wants_refresh(request))
     if initial_data is None:
         messages.error(request, f"Anime (MAL ID: {mal_id}) için detaylar alınamadı veya bulunamadı.")
         return redirect('tracker:anime_api_search')
@@ -274,6 +405,7 @@ def jikan_add_anime_view(request, mal_id):
                 instance = form.save(commit=False)
                 instance.user = request.user
                 instance.mal_id = mal_id # MAL ID'yi ata
+                instance.metadata_refreshed_at = timezone.now() # Form API verisiyle dolduruldu
                 instance.save()
                 form.save_m2m() # Etiketleri kaydet
                 messages.success(request, f"{name} '{instance.title}' başarıyla eklendi.")
@@ -296,15 +428,19 @@ def jikan_add_anime_view(request, mal_id):
     context = {
         'form': form,
         'api_data': initial_data, # API verisini teyit için göster
-        'model_verbose_name': name
+        'model_verbose_name': name,
+        # Farklı MAL ID ile veya elle eklenmiş benzer başlıklar
+        'possible_duplicates': fuzzy_search.find_possible_duplicates(
+            request.user, initial_data.get('title'), media_types=['anime']
+        ),
     }
     return render(request, template, context)
 
 @login_required
 def jikan_add_novel_view(request, mal_id):
     """Jikan'dan gelen veriyi kullanarak Novel ekler."""
-    # 1. API'dan detayları al
-    initial_data = jikan_service.get_novel_details(mal_id)
+    # 1. API'dan detayları al (önbellekteki eski kayıt hemen sunulur, ?refresh=1 ile zorla yenilenir)
+    initial_data = jikan_service.get_novel_details(mal_id, force_refresh=_wants_refresh(request))
     if initial_data is None:
         messages.error(request, f"Novel (MAL ID: {mal_id}) için detaylar alınamadı veya bulunamadı.")
         return redirect('tracker:novel_api_search')
@@ -335,6 +471,7 @@ def jikan_add_novel_view(request, mal_id):
                 instance = form.save(commit=False)
                 instance.user = request.user
                 instance.mal_id = mal_id # MAL ID'yi ata
+                instance.metadata_refreshed_at = timezone.now() # Form API verisiyle dolduruldu
                 instance.save()
                 form.save_m2m() # Etiketleri kaydet
                 messages.success(request, f"{name} '{instance.title}' başarıyla eklendi.")
@@ -357,6 +494,10 @@ def jikan_add_novel_view(request, mal_id):
     context = {
         'form': form,
         'api_data': initial_data, # API verisini teyit için göster
-        'model_verbose_name': name
+        'model_verbose_name': name,
+        # Farklı MAL ID ile veya elle eklenmiş benzer başlıklar
+        'possible_duplicates': fuzzy_search.find_possible_duplicates(
+            request.user, initial_data.get('title'), media_types=['novel']
+        ),
     }
     return render(request, template, context)
\ No newline at end of file
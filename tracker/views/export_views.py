@@ -1,13 +1,21 @@
 # tracker/views/export_views.py
 import logging
 
+from django.conf import settings
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, OuterRef, Subquery
+from django.http import StreamingHttpResponse
+from django.shortcuts import redirect
+from django.utils import timezone
 
 # Modelleri import et
-from ..models import Anime, Manga, Novel, Webtoon
+from ..models import Anime, Manga, Novel, Webtoon, Favorite
+from ..services import export_formats
 
 # Yardımcı fonksiyonları import et
-from .helpers import _export_csv
+from .helpers import _export_media, _export_chunks, DEFAULT_EXPORT_CHUNK_SIZE
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +24,7 @@ logger = logging.getLogger(__name__)
 # 5. API VE EXPORT VIEW'LARI (Export kısmı) - Orijinal views.py'den taşındı
 # ==============================================================================
 
-# --- CSV Export View'ları (Refactored - _export_csv'yi kullanıyor) ---
+# --- Export View'ları (_export_media kullanıyor; ?format=csv|jsonl|parquet&compression=gzip|zstd) ---
 # Alan eşleştirmeleri (model alanı -> CSV başlığı)
 ANIME_FIELDS_MAP = {"pk":"ID", "title":"Baslik", "get_status_display":"Durum", "rating":"Puan", "studio":"Stüdyo", "episodes_watched":"Izlenen Bolum", "total_episodes":"Toplam Bolum", "start_date":"Baslama Tarihi", "end_date":"Bitirme Tarihi", "added_date":"Eklenme Tarihi", "tags":"Etiketler", "mal_id":"MAL ID", "notes":"Notlar", "cover_image_url":"Kapak URL"}
 WEBTOON_FIELDS_MAP = {"pk":"ID", "title":"Baslik", "get_status_display":"Durum", "rating":"Puan", "author":"Yazar", "artist":"Cizer", "chapters_read":"Okunan Bolum", "total_chapters":"Toplam Bolum", "platform":"Platform", "start_date":"Baslama Tarihi", "end_date":"Bitirme Tarihi", "added_date":"Eklenme Tarihi", "tags":"Etiketler", "mangadex_id":"MangaDex ID", "notes":"Notlar", "cover_image_url":"Kapak URL"}
@@ -25,13 +33,96 @@ NOVEL_FIELDS_MAP = {"pk":"ID", "title":"Baslik", "get_status_display":"Durum", "
 
 @login_required
 def export_anime_csv(request):
-    return _export_csv(request, Anime, "anime", ANIME_FIELDS_MAP)
+    return _export_media(request, Anime, "anime", ANIME_FIELDS_MAP)
 @login_required
 def export_webtoon_csv(request):
-     return _export_csv(request, Webtoon, "webtoon", WEBTOON_FIELDS_MAP)
+     return _export_media(request, Webtoon, "webtoon", WEBTOON_FIELDS_MAP)
 @login_required
 def export_manga_csv(request):
-     return _export_csv(request, Manga, "manga", MANGA_FIELDS_MAP)
+     return _export_media(request, Manga, "manga", MANGA_FIELDS_MAP)
 @login_required
 def export_novel_csv(request):
-     return _export_csv(request, Novel, "novel", NOVEL_FIELDS_MAP)
\ No newline at end of file
+     return _export_media(request, Novel, "novel", NOVEL_FIELDS_MAP)
+
+# --- Tüm Kütüphane Dışa Aktarımı (tek ZIP) ---
+# Dört medya türü + favoriler + etiketler tek istekte, tek ZIP akışı olarak.
+# Her model için tek geçiş: iterator(chunk_size) + parça başına etiket prefetch'i; bellek kullanımı sabit.
+LIBRARY_EXPORT_MODELS = (
+    ("anime", Anime, ANIME_FIELDS_MAP),
+    ("webtoon", Webtoon, WEBTOON_FIELDS_MAP),
+    ("manga", Manga, MANGA_FIELDS_MAP),
+    ("novel", Novel, NOVEL_FIELDS_MAP),
+)
+# (anahtar, CSV başlığı, değer türü)
+FAVORITE_EXPORT_COLUMNS = (
+    ("media_type", "Tur", "text"), ("object_id", "ID", "int"), ("title", "Baslik", "text"), ("created_at", "Eklenme Zamani", "datetime"),
+)
+TAG_EXPORT_COLUMNS = (
+    ("name", "Etiket", "text"), ("slug", "Slug", "text"),
+    *((f"{media_type}_count", f"{media_type.capitalize()} Sayisi", "int") for media_type, _, _ in LIBRARY_EXPORT_MODELS),
+)
+
+
+def _favorite_row_chunks(user, chunk_size):
+    """Kullanıcının favorileri; başlıklar tür başına tek sorguda Subquery ile alınır."""
+    content_types = ContentType.objects.get_for_models(*(model for _, model, _ in LIBRARY_EXPORT_MODELS))
+    for media_type, model, _ in LIBRARY_EXPORT_MODELS:
+        favorites = (
+            Favorite.objects.filter(user=user, content_type=content_types[model])
+            .annotate(title=Subquery(model.objects.filter(pk=OuterRef('object_id')).values('title')[:1]))
+            .order_by('-created_at')
+            .values_list('object_id', 'title', 'created_at')
+        )
+        rows = []
+        for object_id, title, created_at in favorites.iterator(chunk_size=chunk_size):
+            rows.append([media_type, object_id, title, created_at])
+            if len(rows) >= chunk_size:
+                yield rows
+                rows = []
+        if rows:
+            yield rows
+
+
+def _tag_row_chunks(user):
+    """Kullanıcının kullandığı etiketler ve tür başına kullanım sayıları (model başına tek GROUP BY)."""
+    counts = {}
+    for index, (_, model, _) in enumerate(LIBRARY_EXPORT_MODELS):
+        usage = (
+            model.objects.filter(user=user, tags__isnull=False).order_by()
+            .values_list('tags__name', 'tags__slug').annotate(count=Count('pk'))
+        )
+        for name, slug, count in usage:
+            counts.setdefault((name, slug), [0] * len(LIBRARY_EXPORT_MODELS))[index] = count
+    yield [[name, slug, *per_type] for (name, slug), per_type in sorted(counts.items())]
+
+
+def library_export_chunks(user, export_format="csv"):
+    """Kullanıcının tüm kütüphanesini ZIP olarak parça parça üretir (view ve export_library komutu kullanır)."""
+    chunk_size = getattr(settings, "EXPORT_CHUNK_SIZE", DEFAULT_EXPORT_CHUNK_SIZE)
+    extension = export_formats.file_extension(export_format)
+
+    def entries():
+        for media_type, model, fields_map in LIBRARY_EXPORT_MODELS:
+            queryset = model.objects.select_related('user').prefetch_related('tags').filter(user=user)
+            yield f"{media_type}.{extension}", _export_chunks(queryset, fields_map, export_format)
+        yield f"favorites.{extension}", export_formats.table_chunks(
+            FAVORITE_EXPORT_COLUMNS, _favorite_row_chunks(user, chunk_size), export_format)
+        yield f"tags.{extension}", export_formats.table_chunks(TAG_EXPORT_COLUMNS, _tag_row_chunks(user), export_format)
+
+    return export_formats.zip_chunks(entries())
+
+
+@login_required
+def export_library(request):
+    """Tüm kütüphaneyi (anime, webtoon, manga, novel, favoriler, etiketler) tek ZIP olarak indirir. ?format=csv|jsonl|parquet"""
+    export_format = request.GET.get("format") or export_formats.DEFAULT_FORMAT
+    try:
+        export_formats.validate(export_format)
+    except export_formats.ExportFormatError as e:
+        messages.error(request, str(e))
+        return redirect('tracker:dashboard')
+
+    timestamp = timezone.localtime(timezone.now()).strftime("%Y%m%d_%H%M")
+    response = StreamingHttpResponse(library_export_chunks(request.user, export_format), content_type="application/zip")
+    response["Content-Disposition"] = f'attachment; filename="kutuphane_{export_format}_{timestamp}.zip"'
+    return response
@@ -1,6 +1,6 @@
 # tracker/views/helpers.py
-import csv
 import datetime
+import functools
 import json
 import logging
 import uuid
@@ -10,22 +10,37 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect, get_object_or_404
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.db.models import Count, F, Q
-from django.http import HttpResponse, JsonResponse, Http404
+from django.db.models import Count, Exists, F, OuterRef, Q, Value, CharField, IntegerField, UUIDField
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.http import JsonResponse, Http404, StreamingHttpResponse
 from django.contrib.contenttypes.models import ContentType
 from django.urls import reverse, NoReverseMatch
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
-from taggit.models import Tag
+from django.utils.http import urlencode
+from taggit.models import TaggedItem
 
 # Bir üst dizindeki modülleri import et
-from ..models import Anime, Manga, Novel, Webtoon, Favorite
+from ..models import Anime, Manga, Novel, Webtoon
 from ..forms import AnimeForm, MangaForm, NovelForm, WebtoonForm # Gerekliyse (handle_create_form vb. kullanıyor)
-from ..services import mangadex as mangadex_service
-from ..services import jikan as jikan_service
+from ..services import mangadex_service
+from ..services import jikan_service
+from ..services import stats_service
+from ..services import fulltext_search
+from ..services import fuzzy_search
+from ..services import export_formats
+from ..services import jobs
+from ..services import favorite_index
+from ..services import tag_facets
+from .pagination import CURSOR_PARAM, PAGINATION_MODE_CURSOR, get_pagination_mode, paginate_by_cursor
 
 logger = logging.getLogger(__name__)
 
+# Dışa aktarımda veritabanından okunan parça boyutu (settings.EXPORT_CHUNK_SIZE ile değiştirilebilir)
+DEFAULT_EXPORT_CHUNK_SIZE = 1000
+
 
 # ==============================================================================
 # 1. YARDIMCI FONKSİYONLAR (HELPERS) - Orijinal views.py'den taşındı
@@ -33,7 +48,15 @@ logger = logging.getLogger(__name__)
 
 # --- Sıralama ---
 def apply_sorting(queryset, sort_by_param, default_sort="-added_date"):
-    """Verilen queryset'i belirtilen parametreye göre sıralar."""
+    """
+    Verilen queryset'i belirtilen parametreye göre sıralar.
+    "relevance": tam metin arama sonuçlarını alaka düzeyine göre sıralar (search_rank yoksa varsayılana düşer).
+    """
+    if sort_by_param == "relevance":
+        if _has_search_rank(queryset):
+            return queryset.order_by(f"-{fulltext_search.RANK_ANNOTATION}", "-added_date")
+        sort_by_param = default_sort
+
     valid_sort_options = {
         "title_asc": "title", "title_desc": "-title",
         "rating_asc": "rating", "rating_desc": "-rating", # F() ile null kontrolü aşağıda
@@ -52,6 +75,37 @@ def apply_sorting(queryset, sort_by_param, default_sort="-added_date"):
         # Diğer alanlar için normal sıralama
         return queryset.order_by(order_field)
 
+# --- Etiket Filtresi (Çoklu Etiket, Tümü/Herhangi) ---
+TAG_FILTER_MODES = ('all', 'any') # all: tüm etiketler (VE), any: en az biri (VEYA)
+DEFAULT_TAG_FILTER_MODE = 'all'
+
+def apply_tag_filter(queryset, model, tag_slugs, mode=DEFAULT_TAG_FILTER_MODE):
+    """
+    Queryset'i etiket slug'larına göre filtreler. tags__slug join'i yerine ilişkili (correlated) EXISTS alt
+    sorguları kullanılır: join satırları çoğaltmaz (distinct gerekmez) ve sayfalama/sıralama sorgusu değişmez.
+    Alt sorgular dıştaki satıra bağlıdır ((content_type, object_id, tag) benzersiz indeksiyle satır başına tek
+    arama); maliyet kullanıcının öğe sayısıyla sınırlıdır, sitedeki toplam etiket ilişkisi sayısıyla büyümez.
+    - any (veya tek etiket): EXISTS (etiketlerden herhangi biri)
+    - all: etiket başına bir EXISTS (hepsi VE ile)
+    """
+    if not tag_slugs:
+        return queryset
+    content_type = ContentType.objects.get_for_model(model) # Süreç içi cache
+    tagged_items = TaggedItem.objects.filter(content_type=content_type, object_id=OuterRef('pk'))
+    if mode == 'any' or len(tag_slugs) == 1:
+        return queryset.filter(Exists(tagged_items.filter(tag__slug__in=tag_slugs)))
+    return queryset.filter(*(Exists(tagged_items.filter(tag__slug=slug)) for slug in tag_slugs))
+
+def _get_tag_mode(request):
+    """?mode=all|any (geçersiz veya yoksa varsayılan)."""
+    mode = request.GET.get("mode", DEFAULT_TAG_FILTER_MODE)
+    return mode if mode in TAG_FILTER_MODES else DEFAULT_TAG_FILTER_MODE
+
+def _has_search_rank(queryset):
+    """Queryset tam metin aramadan geçmiş mi (search_rank annotation veya extra select var mı)?"""
+    name = fulltext_search.RANK_ANNOTATION
+    return name in queryset.query.annotations or name in queryset.query.extra
+
 # --- Filtreleme/Arama (İlişkili Verilerle - Optimize Edildi) ---
 def _get_filtered_queryset(request, model):
     """
@@ -60,7 +114,9 @@ def _get_filtered_queryset(request, model):
     """
     status_filter = request.GET.get("status", "")
     search_query = request.GET.get("q", "").strip()
-    tag_filter = request.GET.get("tag", "") # Etiket slug'ı
+    # Etiket slug'ları (?tag=a&tag=b); tekrarlar ve boşlar atılır, sıra korunur
+    tag_filter = list(dict.fromkeys(slug.strip() for slug in request.GET.getlist("tag") if slug.strip()))
+    tag_mode = _get_tag_mode(request)
 
     # Temel queryset: Sadece mevcut kullanıcıya ait olanlar
     # select_related('user'): Her öğe için user sorgusunu önler.
@@ -71,11 +127,12 @@ def _get_filtered_queryset(request, model):
     if status_filter:
         queryset = queryset.filter(status=status_filter)
     if tag_filter:
-        # Etikete göre filtreleme (taggit slug alanını kullanır)
-        queryset = queryset.filter(tags__slug=tag_filter)
+        # Etiketlere göre filtreleme (EXISTS alt sorguları; join yok, satır çoğalmaz)
+        queryset = apply_tag_filter(queryset, model, tag_filter, tag_mode)
     if search_query:
-        # Başlıkta büyük/küçük harf duyarsız arama
-        queryset = queryset.filter(title__icontains=search_query)
+        # Tam metin arama (başlık, yazar/çizer/stüdyo, notlar; kelime başı eşleşme)
+        # Sonuçlar search_rank ile işaretlenir ("relevance" sıralaması için)
+        queryset = fulltext_search.search_queryset(queryset, search_query)
 
     return queryset, status_filter, search_query, tag_filter
 
@@ -94,6 +151,20 @@ def _paginate_queryset(request, queryset, paginate_by):
         page_obj = paginator.page(paginator.num_pages)
     return page_obj, paginator
 
+# --- Yardımcı: Cursor Sayfalama İçin Yaklaşık Toplam (MediaStats'tan, COUNT sorgusu yok) ---
+def _get_approximate_total(user, model, filters):
+    """
+    Filtresiz veya sadece durum filtreli listelerde toplamı denormalize istatistiklerden okur.
+    Arama/etiket filtresi varsa toplam bilinmez (None); COUNT(*) yapılmaz.
+    """
+    status_filter, search_query, tag_filter = filters
+    if search_query or tag_filter:
+        return None
+    stats = stats_service.get_user_stats(user)[stats_service.media_type_for(model)]
+    if status_filter:
+        return stats.status_counts().get(status_filter, 0)
+    return stats.total_count
+
 # --- Form İşleme (Create - Optimize Edildi) ---
 def _handle_create_form(request, form_class, model, redirect_url_name):
     """POST isteğinde yeni öğe oluşturma formunu işler."""
@@ -126,17 +197,23 @@ def _build_list_context(request, page_obj, paginator, form, model, filters, sort
     # Sayfalama linkleri için mevcut GET parametrelerini koru (page hariç)
     existing_params = request.GET.copy()
     existing_params.pop("page", None)
+    existing_params.pop(CURSOR_PARAM, None) # Cursor sayfalama token'ı
     params_encoded = existing_params.urlencode()
 
     # Mevcut sayfadaki öğelerin favori durumunu tek sorguyla al
     favorited_pks = _get_favorited_pks(request, model, page_obj.object_list if page_obj else [])
 
-    # Kullanıcının bu model türü için kullandığı tüm etiketleri al (filtreleme için)
-    all_tags = _get_all_user_tags(request.user, model)
+    # Kullanıcının bu model türü için kullandığı tüm etiketler ve öğe sayıları (filtreleme için; seçili duruma göre)
+    all_tags = _get_all_user_tags(request.user, model, status_filter)
 
     # Varsa API arama URL'ini al
     api_search_url = _get_api_search_url(item_type_lower)
 
+    # Arama sonuç vermediyse yazım hatası olabilir: trigram indeksinden benzer başlıkları öner
+    fuzzy_suggestions = []
+    if search_query and page_obj is not None and not page_obj.object_list:
+        fuzzy_suggestions = fuzzy_search.find_similar(request.user, search_query, media_types=[item_type_lower], limit=5)
+
     # Toplam öğe sayısını al (filtresiz) - Bu pahalı olabilir, opsiyonel
     # total_items_count = model.objects.filter(user=request.user).count()
 
@@ -147,55 +224,51 @@ def _build_list_context(request, page_obj, paginator, form, model, filters, sort
         "status_choices": model.STATUS_CHOICES, # Durum filtreleme seçenekleri
         "current_status_filter": status_filter, # Seçili durum filtresi
         "search_query": search_query, # Arama sorgusu
-        "current_tag_filter": tag_filter, # Seçili etiket filtresi
-        "all_tags": all_tags, # Tüm etiketler (filtreleme için)
+        "current_tag_filter": tag_filter, # Seçili etiket slug'ları (liste)
+        "current_tag_mode": _get_tag_mode(request), # all: tümü (VE), any: herhangi biri (VEYA)
+        "all_tags": all_tags, # Tüm etiketler ve sayıları (filtreleme için)
         "current_sort": sort_by, # Mevcut sıralama
         "params_encoded": params_encoded, # Sayfalama için GET parametreleri
+        "cursor_param": CURSOR_PARAM, # Cursor sayfalamada token parametresinin adı
         "model_name_plural": model._meta.verbose_name_plural.capitalize(), # Modelin çoğul adı (örn: Animeler)
         "favorited_pks": favorited_pks, # Template'de favori butonunu işaretlemek için
         "item_type_str": item_type_lower, # Model adının küçük harfli hali (örn: anime)
         "list_url_name": f'tracker:{item_type_lower}_list_view', # Liste view'ının URL adı
         "export_url_name": f"tracker:export_{item_type_lower}_csv", # CSV export URL adı
+        # Dışa aktarım linkleri için filtre parametreleri ve bu kurulumda kullanılabilen biçim/sıkıştırmalar
+        "export_query": urlencode({"status": status_filter, "tag": tag_filter, "mode": _get_tag_mode(request), "q": search_query}, doseq=True),
+        "export_formats_available": export_formats.available_formats(), # parquet: pyarrow gerekir
+        "export_compressions_available": export_formats.available_compressions(), # zstd: zstandard gerekir
         "api_search_url": api_search_url, # API arama view'ının URL'i (varsa)
+        "fuzzy_suggestions": fuzzy_suggestions, # Boş arama sonucunda "Bunu mu demek istediniz?" önerileri
         # "total_items_count": total_items_count, # Filtresiz toplam sayı (opsiyonel)
     }
     return context
 
 # --- Yardımcı: Favori PK'ları Alma (Optimize Edildi) ---
 def _get_favorited_pks(request, model, items_list):
-    """Verilen öğe listesi için kullanıcının favori PK'larını tek sorguyla döndürür."""
+    """Verilen öğe listesi için kullanıcının favori PK'larını döndürür (cache'lenmiş favori kümesinden)."""
     favorited_pks = set()
     if request.user.is_authenticated and items_list:
-        item_ids = [item.pk for item in items_list]
-        if not item_ids: # Eğer liste boşsa sorgu yapma
-            return favorited_pks
         try:
-            content_type = ContentType.objects.get_for_model(model)
-            # Tek bir sorguyla mevcut sayfadaki favori ID'lerini al
-            favorited_pks = set(
-                Favorite.objects.filter(
-                    user=request.user,
-                    content_type=content_type,
-                    object_id__in=item_ids # Sadece bu ID'ler içinde ara
-                ).values_list('object_id', flat=True) # Sadece ID'leri al
-            )
-        except ContentType.DoesNotExist:
-            logger.warning(f"Favori PK'ları alınamadı: Model '{model.__name__}' için ContentType bulunamadı.")
+            # Kullanıcının tüm favorileri tek cache okumasıyla gelir; sayfadaki öğelerle kesiştir
+            user_pks = favorite_index.favorite_pks(request.user.pk, model)
+            favorited_pks = {item.pk for item in items_list if item.pk in user_pks}
         except Exception as e:
             logger.error(f"Favori PK'ları alınırken hata: {e}", exc_info=True)
     return favorited_pks
 
 # --- Yardımcı: Kullanıcı Etiketleri Alma (Optimize Edildi) ---
-def _get_all_user_tags(user, model):
-    """Belirli bir model türü için kullanıcının tüm etiketlerini (Tag nesneleri) döndürür."""
+def _get_all_user_tags(user, model, status=None):
+    """
+    Belirli bir model türü için kullanıcının etiket facet'lerini (ada göre sıralı, öğe sayılarıyla) döndürür.
+    Önceden hesaplanmış cache'ten okunur (services/tag_facets.py); status verilirse sayılar o duruma göredir.
+    """
     try:
-        # Kullanıcının ilgili modeldeki tüm öğelerinin etiket ID'lerini al
-        tag_pks = model.objects.filter(user=user, tags__isnull=False).values_list('tags', flat=True).distinct()
-        # Bu ID'lere sahip Tag nesnelerini tek sorguyla getir
-        return Tag.objects.filter(pk__in=tag_pks).order_by('name')
+        return tag_facets.facets_for_status(tag_facets.get_facets(user.pk, model), status)
     except Exception as e:
         logger.error(f"Kullanıcı etiketleri alınırken hata (Model: {model.__name__}): {e}", exc_info=True)
-        return Tag.objects.none() # Hata durumunda boş QuerySet dön
+        return [] # Hata durumunda boş liste dön
 
 # --- Yardımcı: API Arama URL'ini Alma ---
 def _get_api_search_url(item_type_lower):
@@ -279,19 +352,11 @@ def _handle_edit_form(request, instance, form_class, model):
 
 # --- Yardımcı: Favori Durumunu Al (Optimize Edildi) ---
 def _get_favorite_status(request, item):
-    """Verilen öğenin mevcut kullanıcı için favori olup olmadığını kontrol eder."""
+    """Verilen öğenin mevcut kullanıcı için favori olup olmadığını kontrol eder (cache'lenmiş favori kümesinden)."""
     is_favorite = False
     if request.user.is_authenticated and item: # item None değilse
         try:
-            content_type = ContentType.objects.get_for_model(item.__class__)
-            # exists() kullanmak, sadece var olup olmadığını kontrol etmek için daha verimlidir
-            is_favorite = Favorite.objects.filter(
-                user=request.user,
-                content_type=content_type,
-                object_id=item.pk
-            ).exists()
-        except ContentType.DoesNotExist:
-            logger.warning(f"Favori durumu kontrolü: Model '{item.__class__.__name__}' için ContentType bulunamadı.")
+            is_favorite = favorite_index.is_favorite(request.user.pk, item)
         except Exception as e:
             logger.error(f"Favori durumu kontrol hatası (PK: {item.pk}, Type: {item.__class__.__name__}): {e}", exc_info=True)
     return is_favorite
@@ -359,6 +424,176 @@ def _build_csv_row(item, fields_map):
         row.append(str(value)) # Her değeri string'e çevir
     return row
 
+# --- Yardımcı: Derlenmiş Satır Serileştiriciler (Dışa Aktarım) ---
+# _build_csv_row her satırda ve her alanda alan adını yeniden yorumlar (string karşılaştırmaları,
+# isinstance zinciri, iç içe try/except). Burada (model, alanlar) başına bir kez, her alan için
+# tipine özel bir erişimci (callable) üretilir; satır başına iş tek bir liste üretimine iner.
+# CSV serileştiricisi biçimlendirilmiş metin, tipli serileştirici (JSONL/Parquet) Python değerleri üretir.
+def _get_csv_row_serializer(model, fields_map):
+    """fields_map için derlenmiş satır serileştiricisini döndürür (model + alan listesi başına önbelleklenir)."""
+    return _compile_csv_row_serializer(model, tuple(fields_map))
+
+
+def _get_typed_row_serializer(model, fields_map):
+    """
+    JSONL/Parquet için (anahtarlar, değer türleri, serileştirici) üçlüsü.
+    Anahtarlar model alan adlarıdır ('pk' -> 'id', 'get_status_display' -> 'status' ham değeriyle);
+    etiketler liste, tarih/saatler date/datetime, sayılar int olarak döner.
+    """
+    return _compile_typed_row_serializer(model, tuple(fields_map))
+
+
+def _export_field_kind(model, field_name):
+    """Dışa aktarılan alanın değer türü: status, tags, related, datetime, date, int, text veya attr."""
+    if field_name == 'get_status_display':
+        return 'status'
+    if field_name == 'tags':
+        return 'tags'
+    if '__' in field_name: # İlişkili alan (örn: user__username), select_related edildiği varsayılır
+        return 'related'
+    try:
+        field = model._meta.pk if field_name == 'pk' else model._meta.get_field(field_name)
+    except FieldDoesNotExist:
+        return 'attr' # Property vb.
+    if isinstance(field, models.DateTimeField): # DateField'ın alt sınıfı, önce kontrol edilmeli
+        return 'datetime'
+    if isinstance(field, models.DateField):
+        return 'date'
+    if isinstance(field, models.IntegerField): # AutoField ve Positive*Field dahil
+        return 'int'
+    return 'text'
+
+
+def _export_attname(model, field_name):
+    """Model alanı için doğrudan okunacak öznitelik adı (örn: 'pk' -> 'id')."""
+    field = model._meta.pk if field_name == 'pk' else model._meta.get_field(field_name)
+    return field.attname
+
+
+def _format_csv_value(value):
+    """Tipi önceden bilinmeyen değerler için _build_csv_row ile aynı biçimlendirme."""
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        return timezone.localtime(value).strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, datetime.date):
+        return value.strftime("%Y-%m-%d")
+    return str(value)
+
+
+def _prefetched_tag_names(item):
+    # Prefetch edilmiş etiketler (parça başına tek sorgu); yoksa yavaş yol
+    tags = getattr(item, '_prefetched_objects_cache', {}).get('tags')
+    return [tag.name for tag in (item.tags.all() if tags is None else tags)]
+
+
+def _related_accessor(field_name):
+    attrs = field_name.split('__')
+    def related_accessor(item):
+        value = item
+        for attr in attrs:
+            value = getattr(value, attr, None)
+            if value is None:
+                return None
+        return str(value)
+    return related_accessor
+
+
+def _csv_field_accessor(model, field_name):
+    """Tek bir CSV alanı için item -> str erişimcisi üretir."""
+    kind = _export_field_kind(model, field_name)
+    if kind == 'status':
+        # Model metodu yerine etiket tablosu (choices dışındaki değer olduğu gibi yazılır)
+        labels = {value: str(label) for value, label in model.STATUS_CHOICES}
+        return lambda item: labels.get(item.status, item.status or "")
+    if kind == 'tags':
+        return lambda item: ", ".join(_prefetched_tag_names(item))
+    if kind == 'related':
+        get_related = _related_accessor(field_name)
+        return lambda item: get_related(item) or ""
+    if kind == 'attr':
+        return lambda item: _format_csv_value(getattr(item, field_name, ""))
+
+    attname = _export_attname(model, field_name)
+    if kind == 'datetime':
+        def datetime_accessor(item):
+            value = getattr(item, attname)
+            return timezone.localtime(value).strftime("%Y-%m-%d %H:%M:%S") if value else ""
+        return datetime_accessor
+    if kind == 'date':
+        def date_accessor(item):
+            value = getattr(item, attname)
+            return value.strftime("%Y-%m-%d") if value else ""
+        return date_accessor
+    # Sayı, metin, UUID: None -> "", diğerleri str()
+    def plain_accessor(item):
+        value = getattr(item, attname)
+        return "" if value is None else str(value)
+    return plain_accessor
+
+
+def _typed_field_accessor(model, field_name):
+    """Tek bir alan için item -> Python değeri erişimcisi üretir (JSONL/Parquet)."""
+    kind = _export_field_kind(model, field_name)
+    if kind == 'status':
+        return lambda item: item.status # Ham değer (içe aktarımda doğrudan kullanılabilir)
+    if kind == 'tags':
+        return _prefetched_tag_names
+    if kind == 'related':
+        return _related_accessor(field_name)
+    if kind == 'attr':
+        return lambda item: _format_csv_value(getattr(item, field_name, None)) or None
+    attname = _export_attname(model, field_name)
+    if kind == 'text':
+        def text_accessor(item):
+            value = getattr(item, attname)
+            return None if value is None else str(value) # UUID -> str
+        return text_accessor
+    return lambda item: getattr(item, attname) # int, date, datetime olduğu gibi
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_csv_row_serializer(model, field_names):
+    accessors = tuple(_csv_field_accessor(model, field_name) for field_name in field_names)
+    fields_map = dict.fromkeys(field_names)
+
+    def serialize(item):
+        try:
+            return [accessor(item) for accessor in accessors]
+        except Exception:
+            # Beklenmedik veri: alan bazında hata işleyen yavaş yola düş ("HATA" hücreleri)
+            return _build_csv_row(item, fields_map)
+    return serialize
+
+
+# Tipli çıktıda alan adı -> anahtar (diğer alanlar kendi adıyla yazılır)
+TYPED_EXPORT_KEYS = {'pk': 'id', 'get_status_display': 'status'}
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_typed_row_serializer(model, field_names):
+    keys = tuple(TYPED_EXPORT_KEYS.get(name, name) for name in field_names)
+    kinds = tuple(
+        {'status': 'text', 'related': 'text', 'attr': 'text'}.get(kind, kind)
+        for kind in (_export_field_kind(model, name) for name in field_names)
+    )
+    accessors = tuple(_typed_field_accessor(model, field_name) for field_name in field_names)
+
+    def serialize(item):
+        try:
+            return [accessor(item) for accessor in accessors]
+        except Exception:
+            # Alan bazında tekrar dene; okunamayan alan None olur
+            row = []
+            for field_name, accessor in zip(field_names, accessors):
+                try:
+                    row.append(accessor(item))
+                except Exception as e:
+                    logger.error(f"Dışa aktarım satır hatası (PK: {item.pk}, Alan: {field_name}): {e}")
+                    row.append(None)
+            return row
+    return keys, kinds, serialize
+
 # --- YENİ Yardımcı: API Sonuçlarından DB'de Olan MAL ID'leri Bulma (Optimize Edildi) ---
 def _get_existing_mal_ids(request, results, model_class):
     """Jikan API sonuçlarındaki MAL ID'lerden hangilerinin kullanıcının DB'sinde olduğunu tek sorguyla bulur."""
@@ -407,24 +642,91 @@ def _get_existing_mangadex_ids(request, results):
 
     return existing_ids_str
 
+# --- YENİ Yardımcı: Birleşik API Aramasında Listede Olanları Tek Sorguda Bulma ---
+def _get_existing_api_ids(request, mal_ids_by_source, mangadex_ids):
+    """
+    Birleşik arama için kullanıcının listesinde olan ID'leri tek bir UNION ALL sorgusuyla bulur.
+    mal_ids_by_source: {'anime': [...], 'novel': [...]} (MAL ID'leri, integer)
+    mangadex_ids: MangaDex UUID string'leri (Manga ve Webtoon listelerinde aranır)
+    Dönüş: {'anime': {int}, 'novel': {int}, 'manga': {str}}
+    """
+    existing = {'anime': set(), 'novel': set(), 'manga': set()}
+    if not request.user.is_authenticated:
+        return existing
+
+    valid_uuids = set()
+    for id_str in mangadex_ids:
+        try:
+            valid_uuids.add(uuid.UUID(str(id_str)))
+        except ValueError:
+            logger.warning(f"Geçersiz MangaDex UUID formatı: {id_str}")
+
+    # Her kaynak için (source, mal_id, mangadex_id) sütunlarını seçen alt sorgular
+    # Sütun tipleri Value(..., output_field) ile sabitlenir ki UNION sonucu doğru dönüştürülsün
+    subqueries = []
+    for source, model_class in (('anime', Anime), ('novel', Novel)):
+        ids = [i for i in mal_ids_by_source.get(source, []) if isinstance(i, int)]
+        if ids:
+            subqueries.append(
+                model_class.objects.filter(user=request.user, mal_id__in=ids)
+                .annotate(source=Value(source, output_field=CharField()),
+                          md_id=Value(None, output_field=UUIDField()))
+                .values_list('source', 'mal_id', 'md_id')
+                .order_by() # Model Meta.ordering UNION alt sorgularında kullanılamaz
+            )
+    if valid_uuids:
+        for model_class in (Manga, Webtoon):
+            subqueries.append(
+                model_class.objects.filter(user=request.user, mangadex_id__in=valid_uuids)
+                .annotate(source=Value('manga', output_field=CharField()),
+                          mal=Value(None, output_field=IntegerField()))
+                .values_list('source', 'mal', 'mangadex_id')
+                .order_by()
+            )
+
+    if not subqueries:
+        return existing
+
+    union_qs = subqueries[0].union(*subqueries[1:], all=True) if len(subqueries) > 1 else subqueries[0]
+    for source, mal_id, mangadex_id in union_qs:
+        if source == 'manga':
+            existing['manga'].add(str(mangadex_id)) # Şablon string karşılaştırması yapar
+        else:
+            existing[source].add(mal_id)
+    return existing
+
 
 # ==============================================================================
 # 2. GENEL VIEW İŞLEYİCİLERİ (PROCESSORS using Helpers) - Orijinal views.py'den taşındı
 # ==============================================================================
 
 @login_required
-def _process_list_view(request, model, form_class, template_name, redirect_url_name, paginate_by=15):
-    """Listeleme ve oluşturma görünümünü işler (Refactored)."""
+def _process_list_view(request, model, form_class, template_name, redirect_url_name, paginate_by=15, pagination_mode=None):
+    """
+    Listeleme ve oluşturma görünümünü işler (Refactored).
+    pagination_mode: 'page' (Paginator, sayfa numaraları) veya 'cursor' (keyset, sonraki/önceki token'ları).
+    Verilmezse settings.LIST_PAGINATION_MODE kullanılır.
+    """
     # 1. Filtrelenmiş ve ilişkili verileri yüklenmiş queryset'i al
     queryset, status_filter, search_query, tag_filter = _get_filtered_queryset(request, model)
     filters = (status_filter, search_query, tag_filter) # Context için filtreleri paketle
 
     # 2. Sıralamayı uygula
-    sort_by = request.GET.get("sort", "-added_date") # Varsayılan sıralama
+    # Varsayılan sıralama: arama varsa alaka düzeyi, yoksa en yeni
+    sort_by = request.GET.get("sort") or ("relevance" if search_query else "-added_date")
     queryset = apply_sorting(queryset, sort_by)
 
     # 3. Sayfalamayı yap
-    page_obj, paginator = _paginate_queryset(request, queryset, paginate_by)
+    use_cursor = get_pagination_mode(pagination_mode) == PAGINATION_MODE_CURSOR
+    if use_cursor and sort_by == "relevance" and _has_search_rank(queryset):
+        # Alaka skoru (search_rank) için keyset yok: arama sonuçları offset sayfalamayla gösterilir
+        use_cursor = False
+    if use_cursor:
+        # Keyset sayfalama: COUNT/OFFSET yok; toplam sayı (varsa) istatistik tablosundan
+        approximate_total = _get_approximate_total(request.user, model, filters)
+        page_obj, paginator = paginate_by_cursor(request, queryset, paginate_by, sort_by, approximate_total)
+    else:
+        page_obj, paginator = _paginate_queryset(request, queryset, paginate_by)
 
     # 4. Eğer POST isteği ise, yeni öğe oluşturma formunu işle
     redirect_response, form = _handle_create_form(request, form_class, model, redirect_url_name)
@@ -542,66 +844,82 @@ def _render_detail_view(request, pk, model):
         "item_type": name_lower, # Favori butonu vb. için
         "is_favorite": is_favorite, # Favori butonunun durumunu belirlemek için
         "is_owner": is_owner, # Düzenle/Sil butonlarını göstermek için
+        "can_refresh": is_owner and jobs.can_refresh_metadata(instance), # API'den bilgi yenileme butonu için
         "list_url_base": list_url_base # Breadcrumb ve etiket linkleri için
     }
 
     # 6. Ortak detay template'ini render et
     return render(request, "tracker/detail_base.html", context)
 
-# --- Yeniden Düzenlenmiş _export_csv ---
+# --- Dışa Aktarım (CSV / JSONL / Parquet, isteğe bağlı gzip/zstd) ---
 @login_required
-def _export_csv(request, model, filename_prefix, fields_map):
-    """Verileri CSV olarak dışa aktarır (Refactored & Optimized)."""
+def _export_media(request, model, filename_prefix, fields_map):
+    """
+    Filtrelenmiş listeyi dışa aktarır (StreamingHttpResponse ile akış halinde).
+    GET parametreleri: status/tag/q (liste filtreleri), format (csv|jsonl|parquet), compression (gzip|zstd).
+    Kayıtlar iterator(chunk_size=...) ile parça parça okunur; etiketler her parça için tek sorguyla
+    prefetch edilir (Django 4.1+). Tüm dosya bellekte tutulmaz, ilk bayt hemen gönderilir.
+    """
+    export_format = request.GET.get("format") or export_formats.DEFAULT_FORMAT
+    compression = request.GET.get("compression") or None
+    try:
+        export_formats.validate(export_format, compression)
+    except export_formats.ExportFormatError as e:
+        messages.error(request, str(e))
+        return redirect(f"tracker:{model._meta.model_name}_list_view")
+
     # 1. Filtrelenmiş queryset'i al (_get_filtered_queryset zaten select/prefetch yapıyor)
     queryset, status_filter, search_query, tag_filter = _get_filtered_queryset(request, model)
 
-    # 2. HTTP yanıtını hazırla (CSV formatı ve dosya adı)
-    response = HttpResponse(content_type="text/csv; charset=utf-8")
-    # UTF-8 BOM (Byte Order Mark) ekleyerek Excel uyumluluğunu artır
-    response.write("\ufeff".encode("utf8"))
+    # 2. Dosya adını hazırla
     timestamp = timezone.localtime(timezone.now()).strftime("%Y%m%d_%H%M")
     filename_suffix = ""
     if status_filter: filename_suffix += f"_durum-{status_filter.replace(' ', '_')}"
-    if tag_filter: filename_suffix += f"_etiket-{tag_filter}"
+    if tag_filter: filename_suffix += f"_etiket-{'-'.join(tag_filter)}"
     if search_query: filename_suffix += f"_arama-{search_query[:15].replace(' ','_').replace('.','')}" # Max 15 char, boşlukları değiştir
-    filename = f"{filename_prefix}_export_{timestamp}{filename_suffix}.csv"
+    extension = export_formats.file_extension(export_format, compression)
+    filename = f"{filename_prefix}_export_{timestamp}{filename_suffix}.{extension}"
+
+    # 3. Biçime göre bayt parçası üreticisi (satırlar istemci okudukça üretilir)
+    chunks = _export_chunks(queryset, fields_map, export_format, compression)
+    if compression and export_format != "parquet":
+        chunks = export_formats.compress_chunks(chunks, compression)
+
+    response = StreamingHttpResponse(chunks, content_type=export_formats.content_type(export_format, compression))
     # Dosya adını güvenli hale getir (tarayıcıların yorumlamasını engellemek için)
     response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
 
-    # 3. CSV yazıcısını oluştur ve başlık satırını yaz
-    writer = csv.writer(response, delimiter=";", quotechar='"', quoting=csv.QUOTE_MINIMAL)
-    writer.writerow(list(fields_map.values())) # fields_map'in value'ları başlıklar
 
-    # 4. Verileri işle ve satırları yaz
-    # CSV için ek prefetch/select (user/tags zaten _get_filtered_queryset'te var)
-    # Örn: fields_map'te 'category__name' varsa, 'category' select_related edilmeli
-    related_fields_to_select = set()
-    related_fields_to_prefetch = set() # Örn: GenericForeignKey veya başka ManyToMany
-    for field_name in fields_map.keys():
-        if '__' in field_name and field_name != 'user__username' and field_name != 'get_status_display':
-            # Şu an sadece user select_related ediliyor, diğerleri gerekirse eklenebilir.
-            # base_field = field_name.split('__')[0]
-            # if base_field != 'tags': # tags zaten prefetch ediliyor
-                 # related_fields_to_select.add(base_field) # Gerekirse aktive et
-            pass
-
-    if related_fields_to_select:
-        try: queryset = queryset.select_related(*related_fields_to_select)
-        except Exception as e: logger.warning(f"CSV Export ek select_related hatası ({model.__name__}): {e}")
-    if related_fields_to_prefetch:
-         try: queryset = queryset.prefetch_related(*related_fields_to_prefetch)
-         except Exception as e: logger.warning(f"CSV Export ek prefetch_related hatası ({model.__name__}): {e}")
-
-    # Veritabanından tüm sonuçları tek seferde çekmek yerine
-    # .iterator() kullanarak belleği daha verimli kullan (çok büyük listeler için)
-    # Ancak prefetch_related ile iterator kullanımı uyumsuz olabilir, dikkat!
-    # Şimdilik normal queryset üzerinde döngüye girelim.
-    # Belirli bir sıra önemliyse burada order_by eklenebilir.
-    queryset = queryset.order_by("-added_date", "title") # Tutarlı bir sıra olsun
-
-    for item in queryset:
-        row = _build_csv_row(item, fields_map) # Yardımcı fonksiyonu kullan
-        writer.writerow(row)
-
-    # 5. Yanıtı döndür
-    return response
\ No newline at end of file
+def _export_chunks(queryset, fields_map, export_format, compression=None):
+    """
+    Queryset'i verilen biçimde bayt parçaları olarak üretir (sıkıştırmasız; Parquet kendi codec'ini kullanır).
+    Tüm kütüphane dışa aktarımı (export_library) da her model için bunu kullanır.
+    """
+    model = queryset.model
+    # Tutarlı bir sıra (parçalar arasında sıra değişmemeli)
+    queryset = queryset.order_by("-added_date", "title")
+    chunk_size = getattr(settings, "EXPORT_CHUNK_SIZE", DEFAULT_EXPORT_CHUNK_SIZE)
+    item_chunks = _iter_item_chunks(queryset, chunk_size)
+
+    if export_format == "csv":
+        serialize_row = _get_csv_row_serializer(model, fields_map) # Alan erişimcileri bir kez derlenir
+        row_chunks = ([serialize_row(item) for item in items] for items in item_chunks)
+        return export_formats.csv_chunks(list(fields_map.values()), row_chunks) # value'lar başlıklar
+    keys, kinds, serialize_row = _get_typed_row_serializer(model, fields_map)
+    row_chunks = ([serialize_row(item) for item in items] for items in item_chunks)
+    if export_format == "jsonl":
+        return export_formats.jsonl_chunks(keys, row_chunks)
+    return export_formats.parquet_chunks(keys, kinds, row_chunks, compression=compression)
+
+
+def _iter_item_chunks(queryset, chunk_size):
+    """Queryset'i chunk_size'lık öğe listeleri halinde okur (iterator + parça başına prefetch)."""
+    items = []
+    for item in queryset.iterator(chunk_size=chunk_size):
+        items.append(item)
+        if len(items) >= chunk_size:
+            yield items
+            items = []
+    if items:
+        yield items
@@ -0,0 +1,48 @@
+# tracker/views/import_views.py
+import logging
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import redirect, render
+
+from ..forms import ImportForm
+from ..services import importer, jobs
+
+logger = logging.getLogger(__name__)
+
+
+# --- Toplu İçe Aktarım (CSV / JSON Lines / MAL XML / MangaDex JSON) ---
+@login_required
+def import_library(request):
+    """GET: yükleme formu. POST: dosyayı okuyup seçilen türün listesine toplu ekler, sonra listeye yönlendirir."""
+    if request.method == "POST":
+        form = ImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            media_type = form.cleaned_data["media_type"]
+            upload = form.cleaned_data["file"]
+            if form.cleaned_data["run_in_background"]:
+                # Dosya storage'a kaydedilir, okuma/doğrulama/ekleme worker'da (manage.py run_jobs) yapılır
+                path = jobs.store_upload(upload.read(), upload.name)
+                job = jobs.enqueue("import", user=request.user,
+                                   payload={"media_type": media_type, "path": path, "filename": upload.name})
+                messages.info(request, f"İçe aktarım sıraya alındı (iş #{job.pk}).")
+                return redirect("tracker:job_list")
+            try:
+                result = importer.import_file(request.user, media_type, upload.read(), upload.name)
+            except importer.ImportFormatError as e:
+                messages.error(request, str(e))
+                return render(request, "tracker/import_form.html", {"form": form})
+
+            messages.success(
+                request,
+                f"{result.created} öğe eklendi, {result.skipped} öğe zaten listede olduğu için atlandı.",
+            )
+            if result.invalid:
+                # İlk birkaç hata satır numarasıyla gösterilir; tamamı loga yazılır
+                details = " | ".join(f"Satır {row_number}: {message}" for row_number, message in result.errors[:5])
+                messages.warning(request, f"{result.invalid} satır geçersiz olduğu için eklenmedi. {details}")
+                logger.info(f"İçe aktarım hataları (user_id={request.user.pk}): {result.errors}")
+            return redirect(f"tracker:{media_type}_list_view")
+    else:
+        form = ImportForm(initial={"media_type": request.GET.get("type", "anime")})
+    return render(request, "tracker/import_form.html", {"form": form})
@@ -0,0 +1,112 @@
+# tracker/views/job_views.py
+import logging
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.views.decorators.http import require_POST
+
+from ..models import BackgroundJob
+from ..services import export_formats, jobs
+from ..services.fuzzy_search import FUZZY_MODELS
+
+logger = logging.getLogger(__name__)
+
+# İş türü -> kullanıcıya gösterilen ad
+JOB_TYPE_LABELS = {
+    'import': "İçe Aktarım",
+    'export_library': "Kütüphane Dışa Aktarımı",
+    'refresh_metadata': "Bilgi Yenileme",
+    'refresh_all_metadata': "Toplu Bilgi Yenileme",
+}
+RECENT_JOBS_LIMIT = 20
+
+
+# ==============================================================================
+# ARKA PLAN İŞLERİ (Kuyruğa ekleme, durum sorgulama, sonuç indirme)
+# ==============================================================================
+
+def _job_status_dict(job):
+    """Durum endpoint'i ve iş listesi için ortak JSON gösterimi."""
+    data = {
+        'id': job.pk,
+        'job_type': job.job_type,
+        'label': JOB_TYPE_LABELS.get(job.job_type, job.job_type),
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'progress': job.progress,
+        'message': job.progress_message,
+        'attempts': job.attempts,
+        'error': job.error if job.status == BackgroundJob.STATUS_FAILED else "",
+        'finished': job.is_finished,
+        'result': job.result if job.status == BackgroundJob.STATUS_SUCCEEDED else None,
+        'download_url': None,
+    }
+    if job.status == BackgroundJob.STATUS_SUCCEEDED and (job.result or {}).get('path'):
+        data['download_url'] = reverse('tracker:job_download', args=[job.pk])
+        data['result'] = {key: value for key, value in job.result.items() if key != 'path'} # Storage yolu gösterilmez
+    return data
+
+
+@login_required
+def job_list(request):
+    """Kullanıcının son işleri; bitmemiş işler sayfada JS ile job_status üzerinden takip edilir."""
+    recent_jobs = BackgroundJob.objects.filter(user=request.user)[:RECENT_JOBS_LIMIT]
+    context = {
+        'jobs': [_job_status_dict(job) for job in recent_jobs],
+        'page_title': "Arka Plan İşleri",
+    }
+    return render(request, 'tracker/jobs.html', context)
+
+
+@login_required
+def job_status(request, pk):
+    """İşin durumu ve ilerlemesi (JSON, polling için)."""
+    job = get_object_or_404(BackgroundJob, pk=pk, user=request.user)
+    return JsonResponse(_job_status_dict(job))
+
+
+@login_required
+def job_download(request, pk):
+    """Tamamlanan dışa aktarım işinin ürettiği dosyayı indirir."""
+    job = get_object_or_404(BackgroundJob, pk=pk, user=request.user, status=BackgroundJob.STATUS_SUCCEEDED)
+    path = (job.result or {}).get('path')
+    if not path or not default_storage.exists(path):
+        raise Http404("Dosya bulunamadı (süresi dolmuş olabilir).")
+    return FileResponse(default_storage.open(path, 'rb'), as_attachment=True,
+                        filename=job.result.get('filename') or path.rsplit('/', 1)[-1])
+
+
+@login_required
+@require_POST
+def enqueue_library_export(request):
+    """Tüm kütüphane ZIP'ini arka planda hazırlar (?format=csv|jsonl|parquet)."""
+    export_format = request.POST.get("format") or export_formats.DEFAULT_FORMAT
+    try:
+        export_formats.validate(export_format)
+    except export_formats.ExportFormatError as e:
+        messages.error(request, str(e))
+        return redirect('tracker:dashboard')
+    job = jobs.enqueue('export_library', user=request.user, payload={'format': export_format})
+    messages.info(request, f"Kütüphane dışa aktarımı sıraya alındı (iş #{job.pk}). Hazır olunca buradan indirebilirsiniz.")
+    return redirect('tracker:job_list')
+
+
+@login_required
+@require_POST
+def enqueue_metadata_refresh(request, media_type, pk):
+    """Öğenin toplam bölüm/cilt ve kapak bilgisini API'den arka planda yeniler (mal_id/mangadex_id gerekli)."""
+    model = FUZZY_MODELS.get(media_type)
+    if model is None:
+        raise Http404("Geçersiz medya türü.")
+    item = get_object_or_404(model, pk=pk, user=request.user)
+    detail_url = reverse(f'tracker:{media_type}_detail', args=[item.pk])
+    if not jobs.can_refresh_metadata(item):
+        messages.warning(request, "Bu öğe bir API kaydına (MAL/MangaDex) bağlı değil, bilgileri yenilenemez.")
+        return redirect(detail_url)
+    job = jobs.enqueue('refresh_metadata', user=request.user, payload={'media_type': media_type, 'pk': item.pk})
+    messages.info(request, f"'{item.title}' bilgileri arka planda yenilenecek (iş #{job.pk}).")
+    return redirect(detail_url)
@@ -0,0 +1,169 @@
+# tracker/views/pagination.py
+# Liste görünümleri için keyset (cursor) sayfalama.
+# Paginator her sayfada COUNT(*) + OFFSET taraması yapar; binlerce kaydı olan kullanıcılarda derin
+# sayfalar doğrusal olarak yavaşlar. Keyset sayfalamada sonraki/önceki sayfa, aktif sıralama alanı ve
+# pk üzerinde "bu satırdan sonra/önce" koşuluyla (WHERE) bulunur; COUNT ve OFFSET yoktur.
+# Cursor token'ları imzalıdır (django.core.signing), istemci tarafından okunup değiştirilemez.
+
+import logging
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import F, Q
+
+logger = logging.getLogger(__name__)
+
+CURSOR_PARAM = "cursor"
+CURSOR_SALT = "tracker.pagination.cursor"
+
+# Geçerli sayfalama modları (settings.LIST_PAGINATION_MODE veya _process_list_view parametresi)
+PAGINATION_MODE_PAGE = "page"
+PAGINATION_MODE_CURSOR = "cursor"
+
+# apply_sorting ile aynı sıralama anahtarları: anahtar -> (alan, azalan mı, null olabilir mi)
+# Eşit değerlerde sıra pk ile belirlenir (aynı yönde); null puanlar her iki yönde de sonda.
+CURSOR_SORT_FIELDS = {
+    "title_asc": ("title", False, False),
+    "title_desc": ("title", True, False),
+    "rating_asc": ("rating", False, True),
+    "rating_desc": ("rating", True, True),
+    "date_asc": ("added_date", False, False),
+    "date_desc": ("added_date", True, False),
+}
+DEFAULT_CURSOR_SORT = "date_desc" # apply_sorting varsayılanı (-added_date)
+
+
+def get_pagination_mode(mode=None):
+    """Parametre verilmemişse settings.LIST_PAGINATION_MODE (varsayılan: 'page') kullanılır."""
+    mode = mode or getattr(settings, "LIST_PAGINATION_MODE", PAGINATION_MODE_PAGE)
+    return mode if mode in (PAGINATION_MODE_PAGE, PAGINATION_MODE_CURSOR) else PAGINATION_MODE_PAGE
+
+
+def _sort_spec(sort_by):
+    sort_key = sort_by if sort_by in CURSOR_SORT_FIELDS else DEFAULT_CURSOR_SORT
+    return (sort_key, *CURSOR_SORT_FIELDS[sort_key])
+
+
+def _ordering(field, descending, nullable, forward):
+    """Keyset sıralaması. Geri giderken (önceki sayfa) sıra tamamen ters çevrilir, sonra Python'da düzeltilir."""
+    field_desc = descending if forward else not descending
+    if nullable:
+        # İleri yönde null'lar sonda; ters sırada başta olmalı
+        field_order = F(field).desc(nulls_last=True) if field_desc else F(field).asc(nulls_last=True)
+        if not forward:
+            field_order = F(field).desc(nulls_first=True) if field_desc else F(field).asc(nulls_first=True)
+    else:
+        field_order = f"-{field}" if field_desc else field
+    return [field_order, "-pk" if field_desc else "pk"]
+
+
+def _keyset_filter(field, descending, nullable, value, pk, forward):
+    """
+    (value, pk) satırından sonra (forward=True) veya önce (forward=False) gelen satırlar için Q.
+    Sıralama: alan (null'lar sonda), eşitlikte pk; her ikisi de aynı yönde.
+    """
+    after = "lt" if descending else "gt"
+    before = "gt" if descending else "lt"
+    lookup = after if forward else before
+    if nullable and value is None:
+        if forward:
+            # Null bloğundaki sonraki satırlar
+            return Q(**{f"{field}__isnull": True, f"pk__{lookup}": pk})
+        # Null olmayan tüm satırlar + null bloğunda öncekiler
+        return Q(**{f"{field}__isnull": False}) | Q(**{f"{field}__isnull": True, f"pk__{lookup}": pk})
+    condition = Q(**{f"{field}__{lookup}": value}) | Q(**{field: value, f"pk__{lookup}": pk})
+    if nullable and forward:
+        condition |= Q(**{f"{field}__isnull": True}) # Null'lar her zaman sonda
+    return condition
+
+
+def encode_cursor(sort_key, field, item, forward):
+    """Sayfa sınırındaki öğeden opak (imzalı) cursor token'ı üretir."""
+    value = getattr(item, field)
+    if value is not None and not isinstance(value, (int, str)):
+        value = value.isoformat() # datetime
+    payload = {"s": sort_key, "v": value, "pk": item.pk, "d": "n" if forward else "p"}
+    return signing.dumps(payload, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(token, model, sort_key, field):
+    """Token'ı çözer; geçersiz, değiştirilmiş veya başka sıralamaya ait ise None döner (ilk sayfa)."""
+    if not token:
+        return None
+    try:
+        payload = signing.loads(token, salt=CURSOR_SALT)
+        if payload["s"] != sort_key:
+            return None
+        value = payload["v"]
+        if value is not None:
+            value = model._meta.get_field(field).to_python(value)
+        return value, int(payload["pk"]), payload["d"] == "n"
+    except (signing.BadSignature, KeyError, TypeError, ValueError) as e:
+        logger.warning(f"Geçersiz sayfalama cursor'ı yok sayıldı: {e}")
+        return None
+
+
+class CursorPaginator:
+    """Şablonların page_obj.paginator üzerinden eriştiği bilgiler (sayfa sayısı bilinmez)."""
+
+    def __init__(self, per_page, approximate_total=None):
+        self.per_page = per_page
+        self.count = approximate_total # Yaklaşık toplam (bilinmiyorsa None)
+        self.is_approximate = approximate_total is not None
+        self.num_pages = None
+
+
+class CursorPage:
+    """Paginator'ın Page nesnesine benzer (iterable, len, object_list) ama sayfa numarası yerine token'lar taşır."""
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def paginate_by_cursor(request, queryset, paginate_by, sort_by, approximate_total=None):
+    """
+    Queryset'i keyset yöntemiyle sayfalar (COUNT ve OFFSET yok).
+    Sayfa boyutundan bir fazla satır çekilerek ilgili yönde başka sayfa olup olmadığı anlaşılır.
+    Dönüş: (CursorPage, CursorPaginator)
+    """
+    sort_key, field, descending, nullable = _sort_spec(sort_by)
+    paginator = CursorPaginator(paginate_by, approximate_total)
+    cursor = decode_cursor(request.GET.get(CURSOR_PARAM), queryset.model, sort_key, field)
+
+    forward = True
+    if cursor is not None:
+        value, pk, forward = cursor
+        queryset = queryset.filter(_keyset_filter(field, descending, nullable, value, pk, forward))
+    rows = list(queryset.order_by(*_ordering(field, descending, nullable, forward))[:paginate_by + 1])
+    has_more = len(rows) > paginate_by
+    rows = rows[:paginate_by]
+    if not forward:
+        rows.reverse() # Ters sırayla çekildi, görüntüleme sırasına çevir
+
+    has_next = has_more if forward else True # Geri gelindiyse ileride en az bir sayfa var
+    has_previous = (cursor is not None) if forward else has_more
+    next_cursor = encode_cursor(sort_key, field, rows[-1], forward=True) if rows and has_next else None
+    previous_cursor = encode_cursor(sort_key, field, rows[0], forward=False) if rows and has_previous else None
+    return CursorPage(rows, paginator, next_cursor, previous_cursor), paginator